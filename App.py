@@ -1,23 +1,62 @@
 # app.py
 import modal
 from stone_core import market, combat
+from truth_rebuild import rebuild_archive
+from risk_engine import RiskEngine
+from checkpoint import load_checkpoint, write_checkpoint
 
 app = modal.App("sagebrush-sleeper")
+# Positions + rolling covariance live in a checkpoint on a volume: containers come and
+# go every 30 minutes, the book has to outlive them
+risk_volume = modal.Volume.from_name("sagebrush-risk", create_if_missing=True)
+RISK_CHECKPOINT = "/risk/book.ckpt"
+risk = RiskEngine()
 
-@app.function(gpu="A100", secrets=[modal.Secret.from_name("trading-secrets")])
+def load_risk():
+    """Resume the book once per container (a no-op after the first call)"""
+    if risk.last_ts is None:
+        risk_volume.reload()
+        risk.restore(load_checkpoint(RISK_CHECKPOINT))
+    return risk
+
+def save_risk():
+    write_checkpoint(RISK_CHECKPOINT, *risk.checkpoint_state())
+    risk_volume.commit()
+
+@app.function(gpu="A100", secrets=[modal.Secret.from_name("trading-secrets")],
+              volumes={"/risk": risk_volume})
 def execute_strategy(signal: dict):
     """Wyoming-grade trading execution"""
+    # Vol-targeted size, checked against weight, gross and VaR limits (replaces the flat risk=0.02)
+    order = load_risk().size(signal)
+    if not order["approved"]:
+        return order
     # VERIFY: This core combat function exists
-    return combat.execute(signal, risk=0.02)
+    result = combat.execute({**signal, "quantity": order["quantity"]}, risk=order["risk"])
+    risk.fill(order["symbol"], order["quantity"], order["price"])
+    save_risk()
+    return result
 
-@app.function(schedule=modal.Period(minutes=30))
+@app.function(schedule=modal.Period(minutes=30), volumes={"/risk": risk_volume})
 def monitor_markets():
     """Stone-cold market scanning"""
+    load_risk()
+    closes, signals = {}, []
     for ticker in ["SPY", "BTC-USD", "STONE"]:
+        # Not the market service: this runs on Modal, which can't reach a localhost
+        # service, and STONE isn't a yfinance symbol
         data = market.fetch(ticker, interval="60m")
+        closes[ticker] = data["close"]
         signal = combat.analyze(data)
         if signal["action"] != "HOLD":
-            execute_strategy.remote(signal)
+            signals.append({**signal, "symbol": ticker})
+    # Each closed bar is folded once: a cold book seeds from the whole fetched
+    # history, later runs only add bars newer than the last one seen
+    risk.update_history(closes)
+    save_risk()
+    for signal in signals:
+        # Same container, same book: a remote call would size against an empty engine
+        execute_strategy.local(signal)
 def analyze_candlestick(data: pd.DataFrame) -> dict:
     """Wyoming Pattern Recognition Engine"""
     # Stone-cold reversal patterns
@@ -36,16 +75,11 @@ def analyze_candlestick(data: pd.DataFrame) -> dict:
     return {"action": "HOLD", "confidence": 0.65}
     def rebuild_from_truth(archive_path: str, output_dir: str):
     """Wyoming-grade reconstruction"""
-    os.makedirs(output_dir, exist_ok=True)
-    for filename in os.listdir(archive_path):
-        if filename.endswith(".json"):
-            with open(os.path.join(archive_path, filename)) as f:
-                entry = json.load(f)
-                if entry["type"] == "code":
-                    filepath = os.path.join(output_dir, f"recovered_{entry['timestamp'][:10]}.py")
-                    with open(filepath, "w") as code_file:
-                        code_file.write(entry["content"])
-    print(f"Rebuilt {len(os.listdir(output_dir))} files from truth anchors")
+    # Parallel + incremental: unchanged anchors are skipped via the manifest
+    stats = rebuild_archive(archive_path, output_dir)
+    print(f"Rebuilt {stats['written']} of {stats['scanned']} files from truth anchors "
+          f"({stats['entries_per_sec']:,.0f} entries/sec)")
+    return stats
     stone-cli audit --full --repair
     # app.py
 from st_cors import st_cors 
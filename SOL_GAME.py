@@ -1,31 +1,50 @@
 # Game Engine with Solana Integration
-def game_loop():
-    while True:
+import time
+
+
+def game_loop(fetch=None, sleep=time.sleep, frames=None, headless=False, corners=("BTC", "SOL"),
+              on_round=None):
+    # fetch/sleep are injectable: tick_tape replays a recorded feed on a virtual clock
+    # headless skips rendering and chain submission (match_sim.py batches thousands of bouts)
+    import numpy as np
+
+    from match_sim import Arena
+
+    fetch = fetch or fetch_pyth_data
+    arena = Arena(1)  # same rule book as the batch simulator
+    frame = 0
+    while frames is None or frame < frames:
         # Get real-time crypto data
-        crypto_data = fetch_pyth_data()
-        
-        # Process market signals
-        signals = map_signals_to_moves(crypto_data)
+        crypto_data = fetch()
+        if crypto_data is None:  # replay tape exhausted
+            break
+        frame += 1
         
-        # Update boxer states
-        for boxer, signal in zip(boxers, signals):
-            boxer.update(signal)
-            if boxer.is_combo_ready():
-                execute_combo(boxer)
+        # Market signals -> moves, damage and combos for both boxers
+        arena.step(np.array([[crypto_data.get(symbol, np.nan) for symbol in corners]]))
         
-        # Wyoming-compliant rendering
-        render_game_state()
+        if not headless:
+            # Wyoming-compliant rendering
+            render_game_state(arena)
         
-        # Submit to Solana blockchain
-        if game_round_complete():
-            submit_to_solana_chain()
+        if arena.done[0]:
+            result = arena.result(0)
+            if on_round:
+                on_round(result)
+            if not headless:
+                # Submit to Solana blockchain
+                submit_to_solana_chain(result)
+            arena = Arena(1)
         
-        time.sleep(0.03)  # 30 FPS for Wyoming compliance
+        sleep(0.03)  # 30 FPS for Wyoming compliance
+    return frame
 
 def fetch_pyth_data():
-    # Solana-native price feeds
-    return {
-        "BTC": fetch_pyth_price("FsJ3A3u2vn5cTVofAjvy6y5kwABJAqYWpe4975bi2epH"),
-        "SOL": fetch_pyth_price("3A56n98409948324n"),
-        # Add 48 more crypto feeds
-    }
+    # Solana-native price feeds: every account in one getMultipleAccounts batch
+    from pyth_accounts import decode_price_accounts, feed_keys, fetch_price_accounts, prices
+    from rpc_pool import rpc_pool
+
+    feeds = feed_keys()  # PYTH_FEEDS="BTC=<key>,SOL=<key>,..." for the other 48
+    raw = fetch_price_accounts(rpc_pool("solana"), list(feeds.values()))
+    table = prices(decode_price_accounts(raw))
+    return {symbol: float(price) for symbol, price in zip(feeds, table["price"])}
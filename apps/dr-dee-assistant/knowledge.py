@@ -0,0 +1,59 @@
+"""
+📖 Dr. Dee's Knowledge - What the doc knows about the WyoVerse
+App facts and the troubleshooting playbook, shown in the UI and indexed for search
+"""
+
+from typing import Dict
+
+WYOVERSE_KNOWLEDGE = {
+    "sagebrush_sniper": {
+        "purpose": "AI-powered crypto trading analysis",
+        "features": ["RSI", "MACD", "Bollinger Bands", "Volume Analysis"],
+        "status": "✅ Operational"
+    },
+    "crypto_clashers": {
+        "purpose": "Market-driven boxing game",
+        "features": ["NFT Characters", "Real-time Animations", "Prize Pools"],
+        "status": "🔧 In Development"
+    },
+    "frontier_trader": {
+        "purpose": "Commodities trading simulation",
+        "features": ["Wyoming Economic Data", "Risk Management"],
+        "status": "📋 Planned"
+    },
+    "bar_keep_bill": {
+        "purpose": "AI bartender with market insights",
+        "features": ["Conversational AI", "Market Commentary"],
+        "status": "🎪 Beta"
+    }
+}
+
+TROUBLESHOOTING = """
+### 🤠 Common Issues & Solutions
+
+**🎯 Sagebrush Sniper Issues:**
+- Check yfinance API limits
+- Verify internet connection
+- Restart Streamlit server
+
+**🥊 Crypto Clashers Issues:**
+- Ensure wallet connection
+- Check Avalanche network status
+- Verify NFT metadata
+
+**🏛️ DAO Issues:**
+- Confirm Wyoming compliance
+- Check governance tokens
+- Verify voting mechanisms
+"""
+
+
+def knowledge_docs() -> Dict[str, str]:
+    """Everything above as markdown documents for the doc index (``{key: text}``)"""
+    docs = {"dr-dee/troubleshooting": TROUBLESHOOTING}
+    for app, info in WYOVERSE_KNOWLEDGE.items():
+        name = app.replace('_', ' ').title()
+        docs[f"dr-dee/knowledge/{app}"] = (
+            f"# {name}\n{info['purpose']}\n\nFeatures: {', '.join(info['features'])}\n\nStatus: {info['status']}\n"
+        )
+    return docs
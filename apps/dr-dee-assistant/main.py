@@ -5,12 +5,52 @@ Your AI companion for the crypto frontier
 """
 
 import streamlit as st
-import requests
 import json
 import os
+import sys
+import time
 from datetime import datetime
 from typing import Dict, List, Optional
-import pandas as pd
+
+# Shared repo-level helpers (stage_metrics) live at the repo root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+from knowledge import TROUBLESHOOTING, WYOVERSE_KNOWLEDGE, knowledge_docs
+from stage_metrics import render_debug_panel, serve_metrics, stage, timed, track_request
+
+MARKET_SERVICE_URL = os.getenv("MARKET_SERVICE_URL", "http://localhost:5000")
+METRICS_PORT = os.getenv("METRICS_PORT")
+# How often a worker re-stats the repo docs for the search index
+REINDEX_SECONDS = float(os.getenv("DOC_REINDEX_SECONDS", "60"))
+
+
+@st.cache_resource
+def doc_index():
+    """The repo-wide doc index, mapped once per worker (built on first use)"""
+    from doc_index import DocIndex
+
+    return {"index": DocIndex.open(), "checked": 0.0}
+
+
+def search_docs(query: str, k: int = 5) -> List[Dict]:
+    """🔎 BM25 over the repo docs and Dr. Dee's own knowledge, reindexing what changed"""
+    cached = doc_index()
+    index = cached["index"]
+    if time.time() - cached["checked"] > REINDEX_SECONDS:
+        cached["checked"] = time.time()
+        with stage("doc_reindex"):
+            index.refresh(extra=knowledge_docs())
+    with stage("doc_search"):
+        return index.search(query, k)
+
+
+@st.cache_resource
+def metrics_server():
+    """Prometheus scrape target for this worker (only when METRICS_PORT is set)"""
+    return serve_metrics(int(METRICS_PORT)) if METRICS_PORT else None
+
 
 class DrDeeAssistant:
     """🤖 Dr. Dee - Your Wyoming digital companion"""
@@ -28,37 +68,17 @@ class DrDeeAssistant:
     
     def _load_wyoverse_knowledge(self) -> Dict:
         """Load comprehensive WyoVerse ecosystem knowledge"""
-        return {
-            "sagebrush_sniper": {
-                "purpose": "AI-powered crypto trading analysis",
-                "features": ["RSI", "MACD", "Bollinger Bands", "Volume Analysis"],
-                "status": "✅ Operational"
-            },
-            "crypto_clashers": {
-                "purpose": "Market-driven boxing game",
-                "features": ["NFT Characters", "Real-time Animations", "Prize Pools"],
-                "status": "🔧 In Development"
-            },
-            "frontier_trader": {
-                "purpose": "Commodities trading simulation",
-                "features": ["Wyoming Economic Data", "Risk Management"],
-                "status": "📋 Planned"
-            },
-            "bar_keep_bill": {
-                "purpose": "AI bartender with market insights",
-                "features": ["Conversational AI", "Market Commentary"],
-                "status": "🎪 Beta"
-            }
-        }
+        return WYOVERSE_KNOWLEDGE
     
     def analyze_ecosystem_health(self) -> Dict:
         """Analyze the health of the WyoVerse ecosystem"""
-        health_metrics = {
-            "deployment_status": self._check_deployments(),
-            "api_connectivity": self._test_api_connections(),
-            "blockchain_status": self._check_blockchain_connections(),
-            "ai_services": self._test_ai_services()
-        }
+        with track_request("health_check"):
+            health_metrics = {
+                "deployment_status": self._check_deployments(),
+                "api_connectivity": self._test_api_connections(),
+                "blockchain_status": self._check_blockchain_connections(),
+                "ai_services": self._test_ai_services()
+            }
         
         overall_health = sum([
             1 for status in health_metrics.values() 
@@ -71,8 +91,11 @@ class DrDeeAssistant:
             "recommendations": self._generate_recommendations(health_metrics)
         }
     
+    @timed("dr_dee_probe_deployments")
     def _check_deployments(self) -> Dict:
         """Check deployment status of all apps"""
+        import requests  # only the health check needs HTTP
+
         deployments = {
             "vercel": "https://wyoverse.vercel.app",
             "surge": "https://wyoverse.surge.sh",
@@ -96,8 +119,11 @@ class DrDeeAssistant:
         
         return {"status": status, "details": details}
     
+    @timed("dr_dee_probe_apis")
     def _test_api_connections(self) -> Dict:
         """Test external API connections"""
+        import requests  # only the health check needs HTTP
+
         apis = {
             "coinbase": "https://api.coinbase.com/v2/time",
             "coingecko": "https://api.coingecko.com/api/v3/ping"
@@ -120,40 +146,31 @@ class DrDeeAssistant:
         
         return {"status": status, "details": details}
     
+    @timed("dr_dee_probe_blockchains")
     def _check_blockchain_connections(self) -> Dict:
         """Check blockchain network connectivity"""
-        networks = {
-            "avalanche": "https://api.avax.network/ext/health",
-            "solana": "https://api.mainnet-beta.solana.com"
-        }
+        # Shared kept-alive pools; both networks are probed concurrently
+        from rpc_pool import HEALTH_METHODS, RpcError, rpc_pool
+
+        probes = {network: rpc_pool(network).submit(method) for network, method in HEALTH_METHODS.items()}
         
         status = "healthy"
         details = []
         
-        for network, url in networks.items():
+        for network, probe in probes.items():
             try:
-                if network == "solana":
-                    # Solana RPC call
-                    payload = {
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "getHealth"
-                    }
-                    response = requests.post(url, json=payload, timeout=5)
-                else:
-                    response = requests.get(url, timeout=5)
-                
-                if response.status_code == 200:
-                    details.append(f"✅ {network}: Connected")
-                else:
-                    details.append(f"⚠️ {network}: Connection issues")
-                    status = "warning"
-            except:
+                probe.result(timeout=5)
+                details.append(f"✅ {network}: Connected")
+            except RpcError:
+                details.append(f"⚠️ {network}: Connection issues")
+                status = "warning"
+            except Exception:
                 details.append(f"❌ {network}: Disconnected")
                 status = "error"
         
         return {"status": status, "details": details}
     
+    @timed("dr_dee_probe_ai_services")
     def _test_ai_services(self) -> Dict:
         """Test AI service availability"""
         # Mock AI service checks (replace with actual API calls)
@@ -183,8 +200,21 @@ class DrDeeAssistant:
     
     def get_trading_insights(self, symbol: str = "BTC-USD") -> Dict:
         """Get AI-powered trading insights"""
+        live = self._fetch_market_snapshot(symbol)
+        if live:
+            bar, signals = live["bar"], live["signals"]
+            return {
+                "symbol": symbol,
+                "recommendation": signals["recommendation"],
+                "confidence": max(signals["buy_score"], signals["sell_score"]) / 10,
+                "key_levels": {
+                    "support": bar.get("BB_lower"),
+                    "resistance": bar.get("BB_upper")
+                },
+                "wyoming_factor": "🏔️ Mountain strong - Wyoming energy backing detected"
+            }
         try:
-            # Mock trading analysis (integrate with actual Sagebrush Sniper)
+            # Mock trading analysis (market service offline)
             insights = {
                 "symbol": symbol,
                 "recommendation": "🟡 HOLD - Market consolidation detected",
@@ -199,6 +229,19 @@ class DrDeeAssistant:
         except Exception as e:
             return {"error": f"Failed to get insights: {str(e)}"}
     
+    @timed("market_service_snapshot")
+    def _fetch_market_snapshot(self, symbol: str) -> Optional[Dict]:
+        """Ask the shared Sagebrush market service instead of hitting upstream"""
+        import requests
+
+        try:
+            response = requests.get(f"{MARKET_SERVICE_URL}/api/snapshot/{symbol}", timeout=2)
+            if response.status_code == 200:
+                return response.json()
+        except requests.RequestException:
+            pass
+        return None
+    
     def suggest_next_actions(self) -> List[str]:
         """Suggest next actions for WyoVerse development"""
         return [
@@ -229,6 +272,8 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
+    metrics_server()
+    
     # Initialize Dr. Dee
     dr_dee = DrDeeAssistant()
     
@@ -250,6 +295,8 @@ def main():
         if st.button("🔍 ANALYZE", type="primary", use_container_width=True):
             st.session_state.action = action
             st.session_state.analysis_time = datetime.now()
+        
+        render_debug_panel()
     
     # Main content
     if 'action' in st.session_state:
@@ -326,24 +373,16 @@ def main():
         elif "Technical Support" in action:
             st.markdown("## 🔧 Technical Support")
             
-            st.markdown("""
-            ### 🤠 Common Issues & Solutions
-            
-            **🎯 Sagebrush Sniper Issues:**
-            - Check yfinance API limits
-            - Verify internet connection
-            - Restart Streamlit server
-            
-            **🥊 Crypto Clashers Issues:**
-            - Ensure wallet connection
-            - Check Avalanche network status
-            - Verify NFT metadata
+            query = st.text_input("🔎 Search the docs", placeholder="e.g. yfinance rate limit, warm restart")
+            if query:
+                hits = search_docs(query)
+                if not hits:
+                    st.info("🤷 Nothing in the docs for that one, partner")
+                for hit in hits:
+                    st.markdown(f"**{hit['title']}** · `{hit['path']}:{hit['line']}`")
+                    st.caption(hit["snippet"])
             
-            **🏛️ DAO Issues:**
-            - Confirm Wyoming compliance
-            - Check governance tokens
-            - Verify voting mechanisms
-            """)
+            st.markdown(TROUBLESHOOTING)
     
     else:
         # Welcome screen
@@ -0,0 +1,12 @@
+"""
+🧭 Sagebrush Paths - Puts the repo root on ``sys.path``
+The Sniper's entry points import this first, so shared repo-level modules
+(stage_metrics, checkpoint, rpc_pool, ...) resolve however they're launched.
+"""
+
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
@@ -0,0 +1,361 @@
+"""
+🔔 Sagebrush Alerts - Thousands of tripwires, one glance per tick
+"ETH RSI < 25", "BTC crosses lower BB", "SOL Volume_Ratio > 3"
+
+Alerts are edge triggered: they fire when the watched value moves through
+the threshold. Thresholds live in per-indicator sorted arrays, so a tick
+moving RSI from 31 to 27 binary-searches straight to the alerts between 27
+and 31 and never looks at the rest. Adds and removals only mark an index
+dirty; it is re-sorted once, on the next tick that reads it.
+"""
+
+import itertools
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from indicators import DEFAULT_OUTPUTS, RAW_COLUMNS
+
+BELOW, ABOVE = 'below', 'above'
+# Registered alerts per engine ("crosses" counts twice)
+ALERT_MAX = int(os.getenv("ALERT_MAX", "1000"))
+# Friendly names -> bar columns
+FIELD_ALIASES = {
+    'price': 'Close', 'close': 'Close', 'volume': 'Volume',
+    'rsi': 'RSI', 'macd': 'MACD', 'macd signal': 'MACD_signal',
+    'lower bb': 'BB_lower', 'upper bb': 'BB_upper', 'middle bb': 'BB_middle',
+    'sma 20': 'SMA_20', 'sma 50': 'SMA_50', 'volume ratio': 'Volume_Ratio',
+}
+
+# Every column an indicator update carries, also reachable by its own name
+# in any case ("bb_lower", "Volume Ratio")
+COLUMNS = RAW_COLUMNS + tuple(DEFAULT_OUTPUTS)
+for _column in COLUMNS:
+    FIELD_ALIASES.setdefault(_column.replace('_', ' ').lower(), _column)
+
+# Several alerts in one input: ";", newlines, or a comma that starts a new phrase
+# (a comma inside a number like 100,000 stays)
+_SEPARATOR = re.compile(r'[;\n]|,(?=\s*[A-Za-z])')
+
+_SPEC = re.compile(
+    r'^\s*(?P<symbol>[A-Za-z0-9.\-]+)\s+(?:(?P<field>.+?)\s+)?'
+    r'(?P<op><|>|crosses(?:\s+(?:above|below))?)\s+(?P<target>.+?)\s*$',
+    re.IGNORECASE
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _field(name: str) -> str:
+    key = ' '.join(name.strip().replace('_', ' ').lower().split())
+    if key not in FIELD_ALIASES:
+        raise ValueError(f"Unknown field {name.strip()!r} - try RSI, MACD, lower BB, volume ratio or price")
+    return FIELD_ALIASES[key]
+
+
+class Alert:
+    """One user tripwire: ``field - ref`` crossing ``threshold`` in ``direction``"""
+
+    def __init__(self, alert_id: int, symbol: str, field: str, direction: str,
+                 threshold: float = 0.0, ref: Optional[str] = None, crossing: bool = False,
+                 interval: str = '1h', once: bool = False, label: str = ''):
+        self.id = alert_id
+        self.symbol = symbol
+        self.field = field
+        self.direction = direction
+        self.threshold = float(threshold)
+        self.ref = ref
+        self.crossing = crossing
+        self.interval = interval
+        self.once = once
+        self.label = label or self.describe()
+
+    @property
+    def key(self) -> Tuple[str, str, str, Optional[str]]:
+        return (self.symbol, self.interval, self.field, self.ref)
+
+    def describe(self) -> str:
+        target = self.ref if self.ref else f"{self.threshold:g}"
+        op = f"crosses {self.direction}" if self.crossing else ('<' if self.direction == BELOW else '>')
+        return f"{self.symbol} {self.field} {op} {target}"
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id, 'symbol': self.symbol, 'interval': self.interval, 'field': self.field,
+            'direction': self.direction, 'threshold': self.threshold, 'ref': self.ref,
+            'crossing': self.crossing, 'once': self.once, 'label': self.label,
+        }
+
+
+def parse_alert(spec: str, quote: str = 'USD') -> List[Dict]:
+    """Turn ``"ETH RSI < 25"`` style text into ``AlertEngine.add`` kwargs
+
+    A bare ticker gets ``-{quote}`` appended. "crosses lower BB" means price
+    falling through the band, "crosses upper BB" rising through it; any other
+    bare "crosses" watches both directions.
+    """
+    match = _SPEC.match(spec)
+    if not match:
+        raise ValueError(f"Can't read alert {spec!r} - try 'ETH RSI < 25'")
+    symbol = match['symbol'].upper()
+    if '-' not in symbol:
+        symbol = f"{symbol}-{quote}"
+    field = _field(match['field']) if match['field'] else 'Close'
+    op = ' '.join(match['op'].lower().split())
+    target = match['target'].strip()
+    try:
+        threshold, ref = float(target.replace(',', '')), None
+    except ValueError:
+        threshold, ref = 0.0, _field(target)
+
+    if op in ('<', '>'):
+        directions, crossing = [BELOW if op == '<' else ABOVE], False
+    elif op == 'crosses':
+        crossing = True
+        directions = {'BB_lower': [BELOW], 'BB_upper': [ABOVE]}.get(ref, [BELOW, ABOVE])
+    else:
+        directions, crossing = [op.split()[1]], True
+    return [{'symbol': symbol, 'field': field, 'direction': d, 'threshold': threshold,
+             'ref': ref, 'crossing': crossing, 'label': spec.strip()} for d in directions]
+
+
+def parse_alerts(text: str, quote: str = 'USD') -> List[Dict]:
+    """``parse_alert`` over every alert in ``"ETH RSI < 25; BTC crosses lower BB"``
+
+    All or nothing: one unreadable alert rejects the whole input.
+    """
+    specs = [spec for spec in _SEPARATOR.split(text) if spec.strip()]
+    if not specs:
+        raise ValueError("No alert given - try 'ETH RSI < 25'")
+    return [kwargs for spec in specs for kwargs in parse_alert(spec, quote)]
+
+
+class ThresholdIndex:
+    """Sorted thresholds for one direction of one ``(symbol, interval, field, ref)``"""
+
+    __slots__ = ('entries', 'thresholds', 'ids', 'crossing', 'dirty')
+
+    def __init__(self):
+        self.entries: Dict[int, Tuple[float, bool]] = {}
+        self.thresholds = np.empty(0)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.crossing = np.empty(0, dtype=bool)
+        self.dirty = False
+
+    def add(self, alert: Alert):
+        self.entries[alert.id] = (alert.threshold, alert.crossing)
+        self.dirty = True
+
+    def remove(self, alert_id: int):
+        if self.entries.pop(alert_id, None) is not None:
+            self.dirty = True
+
+    def _rebuild(self):
+        n = len(self.entries)
+        ids = np.fromiter(self.entries.keys(), dtype=np.int64, count=n)
+        thresholds = np.fromiter((t for t, _ in self.entries.values()), dtype=float, count=n)
+        crossing = np.fromiter((c for _, c in self.entries.values()), dtype=bool, count=n)
+        order = np.argsort(thresholds, kind='stable')
+        self.thresholds, self.ids, self.crossing = thresholds[order], ids[order], crossing[order]
+        self.dirty = False
+
+    def crossed(self, direction: str, prev: Optional[float], value: float) -> np.ndarray:
+        """Ids whose condition just turned true moving ``prev -> value``"""
+        if self.dirty:
+            self._rebuild()
+        th = self.thresholds
+        if prev is None:
+            # First sighting: level alerts that already hold fire, crossings wait
+            hit = slice(np.searchsorted(th, value, 'right'), None) if direction == BELOW \
+                else slice(0, np.searchsorted(th, value, 'left'))
+            return self.ids[hit][~self.crossing[hit]]
+        if direction == BELOW:
+            if value >= prev:
+                return self.ids[:0]
+            # value < t <= prev
+            return self.ids[np.searchsorted(th, value, 'right'):np.searchsorted(th, prev, 'right')]
+        if value <= prev:
+            return self.ids[:0]
+        # prev <= t < value
+        return self.ids[np.searchsorted(th, prev, 'left'):np.searchsorted(th, value, 'left')]
+
+
+class AlertEngine:
+    """🎯 Registry + per-indicator indexes + notifier fan-out
+
+    ``update(symbol, interval, row)`` is called on every indicator update
+    with the latest bar (a mapping of column -> value) and returns the fired
+    events after handing them to every notifier.
+    """
+
+    def __init__(self, notifiers: Iterable[Callable[[Dict], None]] = (), max_alerts: int = ALERT_MAX):
+        self.notifiers: List[Callable[[Dict], None]] = list(notifiers)
+        self.max_alerts = max_alerts
+        self.alerts: Dict[int, Alert] = {}
+        self._indexes: Dict[Tuple, Dict[str, ThresholdIndex]] = {}
+        self._by_symbol: Dict[Tuple[str, str], List[Tuple]] = {}
+        self._last: Dict[Tuple, float] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def add(self, symbol: str, field: str, direction: str, threshold: float = 0.0,
+            ref: Optional[str] = None, crossing: bool = False, interval: str = '1h',
+            once: bool = False, label: str = '') -> Alert:
+        with self._lock:
+            self._check_room(1)
+            return self._install(Alert(next(self._ids), symbol, field, direction, threshold, ref,
+                                       crossing, interval, once, label))
+
+    def add_spec(self, spec: str, interval: str = '1h', once: bool = False) -> List[Alert]:
+        """Register text alerts ("ETH RSI < 25; BTC crosses lower BB"); "crosses" may create two
+
+        All or nothing, including the ``max_alerts`` cap.
+        """
+        parsed = parse_alerts(spec)
+        with self._lock:
+            self._check_room(len(parsed))
+            return [self._install(Alert(next(self._ids), interval=interval, once=once, **kwargs))
+                    for kwargs in parsed]
+
+    def _check_room(self, count: int):
+        if len(self.alerts) + count > self.max_alerts:
+            raise ValueError(f"Alert limit reached ({self.max_alerts}); remove some first")
+
+    def _install(self, alert: Alert) -> Alert:
+        if alert.direction not in (BELOW, ABOVE):
+            raise ValueError(f"direction must be {BELOW!r} or {ABOVE!r}")
+        self.alerts[alert.id] = alert
+        indexes = self._indexes.get(alert.key)
+        if indexes is None:
+            indexes = self._indexes[alert.key] = {BELOW: ThresholdIndex(), ABOVE: ThresholdIndex()}
+            self._by_symbol.setdefault((alert.symbol, alert.interval), []).append(alert.key)
+        indexes[alert.direction].add(alert)
+        return alert
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [alert.to_dict() for alert in self.alerts.values()]
+
+    def restore(self, alerts: Iterable[Dict]) -> int:
+        """Re-register ``snapshot()`` rows with their ids (warm restarts); returns how many"""
+        with self._lock:
+            restored = 0
+            for row in alerts:
+                if row['id'] in self.alerts:
+                    continue
+                self._install(Alert(row['id'], row['symbol'], row['field'], row['direction'],
+                                    row['threshold'], row['ref'], row['crossing'], row['interval'],
+                                    row['once'], row['label']))
+                restored += 1
+            self._ids = itertools.count(max(self.alerts, default=0) + 1)
+            return restored
+
+    def remove(self, alert_id: int) -> bool:
+        with self._lock:
+            alert = self.alerts.pop(alert_id, None)
+            if alert is None:
+                return False
+            self._drop_from_index(alert.key, alert.direction, alert_id)
+            return True
+
+    def _drop_from_index(self, key: Tuple, direction: str, alert_id: int):
+        """Unlink an alert; the last one out of a key takes the key's bookkeeping with it"""
+        indexes = self._indexes[key]
+        indexes[direction].remove(alert_id)
+        if any(index.entries for index in indexes.values()):
+            return
+        del self._indexes[key]
+        self._last.pop(key, None)
+        siblings = self._by_symbol[key[:2]]
+        siblings.remove(key)
+        if not siblings:
+            del self._by_symbol[key[:2]]
+
+    def update(self, symbol: str, interval: str, row) -> List[Dict]:
+        """Evaluate one indicator update; only crossed thresholds are touched"""
+        events = []
+        with self._lock:
+            spent = []
+            for key in list(self._by_symbol.get((symbol, interval), ())):
+                _, _, field, ref = key
+                try:
+                    value = float(row[field]) - (float(row[ref]) if ref else 0.0)
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if value != value:  # NaN while indicators warm up
+                    continue
+                prev = self._last.get(key)
+                self._last[key] = value
+                if prev == value:
+                    continue
+                for direction, index in self._indexes[key].items():
+                    for alert_id in index.crossed(direction, prev, value).tolist():
+                        alert = self.alerts.get(alert_id)
+                        if alert is None:
+                            continue
+                        events.append({
+                            'type': 'alert',
+                            'id': alert_id,
+                            'symbol': symbol,
+                            'interval': interval,
+                            'label': alert.label,
+                            'field': field,
+                            'value': value + (float(row[ref]) if ref else 0.0),
+                            'threshold': float(row[ref]) if ref else alert.threshold,
+                            'direction': direction,
+                            'time': time.time(),
+                        })
+                        if alert.once:
+                            self.alerts.pop(alert_id)
+                            spent.append((key, direction, alert_id))
+            for key, direction, alert_id in spent:
+                self._drop_from_index(key, direction, alert_id)
+        for event in events:
+            for notify in self.notifiers:
+                try:
+                    notify(event)
+                except Exception:
+                    logger.exception("🔔 notifier failed for alert %s", event['id'])
+        return events
+
+
+# ---------------------------------------------------------------- notifiers
+
+def log_notifier(event: Dict):
+    """Default delivery: a log line"""
+    logger.info("🔔 %s (value %.4g)", event['label'], event['value'])
+
+
+class WebhookNotifier:
+    """📮 POST each event as JSON from a background thread (never blocks a tick)"""
+
+    def __init__(self, url: str, timeout: float = 5.0, max_pending: int = 10000):
+        self.url = url
+        self.timeout = timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        threading.Thread(target=self._drain, name="alert-webhook", daemon=True).start()
+
+    def __call__(self, event: Dict):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            logger.warning("🔔 webhook backlog full, dropping alert %s", event['id'])
+
+    def _drain(self):
+        import requests
+
+        while True:
+            event = self._queue.get()
+            try:
+                requests.post(self.url, json=event, timeout=self.timeout)
+            except requests.RequestException:
+                logger.warning("🔔 webhook %s unreachable, alert %s not delivered", self.url, event['id'])
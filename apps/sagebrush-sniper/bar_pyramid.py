@@ -0,0 +1,212 @@
+"""
+🏔️ Sagebrush Bar Pyramid - One base feed, every timeframe
+Fetch the fine bars once; stack the coarser ones locally
+
+Higher timeframes are aggregated from the base interval with vectorized
+``reduceat`` passes. On each ingest only the buckets touched by new or
+revised base bars are rebuilt, so keeping 15m/1h/4h/1d current costs a few
+array slices instead of extra upstream downloads.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+INTERVAL_NS = {
+    '1m': 60 * 10**9,
+    '5m': 5 * 60 * 10**9,
+    '15m': 15 * 60 * 10**9,
+    '1h': 3600 * 10**9,
+    '4h': 4 * 3600 * 10**9,
+    '1d': 86400 * 10**9,
+}
+PYRAMID_BASE = os.getenv("PYRAMID_BASE", "5m")
+PYRAMID_LEVELS = ['5m', '15m', '1h', '4h', '1d']
+# Longest history yfinance serves for each base interval
+BASE_HISTORY = {'1m': '7d', '5m': '60d', '15m': '60d', '1h': '730d'}
+
+
+def aggregate_ohlcv(index_ns: np.ndarray, values: np.ndarray, width_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized OHLCV roll-up of sorted bars into ``width_ns`` buckets (UTC aligned)"""
+    if len(index_ns) == 0:
+        return index_ns[:0], values[:0]
+    buckets = index_ns // width_ns
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(index_ns)] - 1
+    out = np.empty((len(starts), 5))
+    out[:, 0] = values[starts, 0]
+    out[:, 1] = np.fmax.reduceat(values[:, 1], starts)
+    out[:, 2] = np.fmin.reduceat(values[:, 2], starts)
+    out[:, 3] = values[ends, 3]
+    out[:, 4] = np.add.reduceat(np.nan_to_num(values[:, 4]), starts)
+    return buckets[starts] * width_ns, out
+
+
+def _utc_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.tz_convert('UTC').as_unit('ns').asi8
+
+
+class BarPyramid:
+    """🎯 Base bars plus a cached stack of higher timeframes for one symbol"""
+
+    def __init__(self, base_interval: str = PYRAMID_BASE, levels: Optional[List[str]] = None,
+                 max_base_bars: int = 50000):
+        self.base_interval = base_interval
+        base_ns = INTERVAL_NS[base_interval]
+        self.levels = [lvl for lvl in (levels or PYRAMID_LEVELS)
+                       if INTERVAL_NS[lvl] > base_ns and INTERVAL_NS[lvl] % base_ns == 0]
+        self.max_base_bars = max_base_bars
+        self.frames: Dict[str, pd.DataFrame] = {
+            lvl: pd.DataFrame(columns=OHLCV, dtype=float) for lvl in [base_interval] + self.levels
+        }
+        # Bumped whenever a timeframe's frame changes (keys derived caches)
+        self.versions: Dict[str, int] = {lvl: 0 for lvl in self.frames}
+        self._lock = threading.Lock()
+
+    @property
+    def intervals(self) -> List[str]:
+        return [self.base_interval] + self.levels
+
+    def get(self, interval: str) -> pd.DataFrame:
+        """Pure local read of one timeframe"""
+        return self.frames[interval]
+
+    def get_versioned(self, interval: str) -> Tuple[pd.DataFrame, int]:
+        """One timeframe together with the version it belongs to"""
+        with self._lock:
+            return self.frames[interval], self.versions[interval]
+
+    def ingest(self, bars: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Fold new base bars in; return only the rows that changed per level"""
+        if bars is None or bars.empty:
+            return {}
+        incoming = bars[OHLCV].astype(float)
+        incoming.index = pd.DatetimeIndex(_utc_ns(incoming.index), tz='UTC')
+
+        with self._lock:
+            base = self.frames[self.base_interval]
+            if not base.empty:
+                overlap = incoming.index.intersection(base.index)
+                revised = overlap[(base.loc[overlap] != incoming.loc[overlap]).any(axis=1).to_numpy()]
+                changed = incoming.index.difference(base.index).union(revised)
+                if len(changed) == 0:
+                    return {}
+                base = pd.concat([base, incoming.loc[changed]])
+                base = base[~base.index.duplicated(keep='last')].sort_index()
+                first_changed = changed.min()
+            else:
+                base = incoming[~incoming.index.duplicated(keep='last')].sort_index()
+                first_changed = base.index.min()
+            base = base.tail(self.max_base_bars)
+            self.frames[self.base_interval] = base
+
+            result = {self.base_interval: base.loc[base.index >= first_changed]}
+            base_ns = base.index.asi8
+            values = base.to_numpy()
+            first_ns = first_changed.value
+            for lvl in self.levels:
+                width = INTERVAL_NS[lvl]
+                # Rebuild from the start of the first touched bucket onward
+                start = np.searchsorted(base_ns, (first_ns // width) * width)
+                ts, agg = aggregate_ohlcv(base_ns[start:], values[start:], width)
+                fresh = pd.DataFrame(agg, index=pd.DatetimeIndex(ts, tz='UTC'), columns=OHLCV)
+                kept = self.frames[lvl]
+                if not kept.empty and len(ts):
+                    kept = kept[kept.index < fresh.index[0]]
+                self.frames[lvl] = pd.concat([kept, fresh]) if not kept.empty else fresh
+                result[lvl] = fresh
+            for lvl in result:
+                self.versions[lvl] += 1
+            return result
+
+
+class PyramidCache:
+    """🗃️ Process-wide pyramids, refreshed from upstream at most once per TTL"""
+
+    def __init__(self, fetcher: Callable[[str, str, str], pd.DataFrame],
+                 base_interval: str = PYRAMID_BASE, ttl_seconds: float = 60.0):
+        self.fetcher = fetcher
+        self.base_interval = base_interval
+        self.ttl_seconds = ttl_seconds
+        self._pyramids: Dict[str, BarPyramid] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def peek(self, symbol: str) -> Optional[BarPyramid]:
+        """Cached pyramid without touching the network"""
+        return self._pyramids.get(symbol)
+
+    def refresh(self, symbol: str, force: bool = False) -> Dict[str, pd.DataFrame]:
+        with self._guard:
+            lock = self._locks.setdefault(symbol, threading.Lock())
+        with lock:
+            pyramid = self._pyramids.get(symbol)
+            if not force and pyramid is not None and \
+                    time.time() - self._fetched_at.get(symbol, 0) < self.ttl_seconds:
+                return {}
+            fresh = pyramid is None
+            if fresh:
+                pyramid = BarPyramid(self.base_interval)
+            period = self._period(pyramid)
+            changed = pyramid.ingest(self.fetcher(symbol, period, self.base_interval))
+            # Only a pyramid that took its first fetch is cached; a failed one retries in full
+            if fresh:
+                self._pyramids[symbol] = pyramid
+            self._fetched_at[symbol] = time.time()
+            return changed
+
+    def _period(self, pyramid: BarPyramid) -> str:
+        """Full history for an empty pyramid, else whole days back to its last base bar"""
+        full = BASE_HISTORY.get(self.base_interval, '60d')
+        bars = pyramid.get(self.base_interval)
+        if bars.empty:
+            return full
+        behind = pd.Timestamp.now(tz='UTC') - bars.index[-1]
+        days = int(np.ceil(behind / pd.Timedelta(days=1)))
+        return f"{min(max(days, 1), int(full[:-1]))}d"
+
+    def symbols(self) -> List[str]:
+        return list(self._pyramids)
+
+    def drop(self, symbol: str):
+        """Forget a symbol; its next refresh starts from full history"""
+        with self._guard:
+            lock = self._locks.setdefault(symbol, threading.Lock())
+        with lock:
+            self._pyramids.pop(symbol, None)
+            self._fetched_at.pop(symbol, None)
+        with self._guard:
+            self._locks.pop(symbol, None)
+
+    def get(self, symbol: str) -> BarPyramid:
+        self.refresh(symbol)
+        return self._pyramids[symbol]
+
+    def seed(self, symbol: str, bars: pd.DataFrame, fetched_at: float) -> Dict[str, pd.DataFrame]:
+        """Warm start from checkpointed base bars, as if fetched at ``fetched_at``
+
+        The next refresh after the TTL only pulls the short incremental tail.
+        """
+        with self._guard:
+            lock = self._locks.setdefault(symbol, threading.Lock())
+        with lock:
+            pyramid = self._pyramids.get(symbol)
+            if pyramid is None:
+                pyramid = self._pyramids[symbol] = BarPyramid(self.base_interval)
+            changed = pyramid.ingest(bars)
+            self._fetched_at[symbol] = max(self._fetched_at.get(symbol, 0.0), fetched_at)
+            return changed
+
+    def export(self) -> Dict[str, Tuple[pd.DataFrame, float]]:
+        """Base bars and fetch time per symbol (coarser levels rebuild from these)"""
+        return {symbol: (pyramid.get(self.base_interval), self._fetched_at.get(symbol, 0.0))
+                for symbol, pyramid in list(self._pyramids.items())}
@@ -0,0 +1,182 @@
+"""
+🗄️ Sagebrush Bar Store - One shared corral for bars, indicators and signals
+Fetch once, serve every rider
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicators import calculate_indicators
+from signals import analyze_signals
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+logger = logging.getLogger(__name__)
+
+
+def to_plain(value):
+    """Make numpy/pandas scalars JSON friendly (NaN -> None)"""
+    if isinstance(value, (np.floating, float)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value
+
+
+def plain_signals(signals: Dict) -> Dict:
+    return {key: to_plain(value) for key, value in signals.items()}
+
+
+def bars_json(frame: pd.DataFrame) -> str:
+    """Rows as a JSON array of ``{'time': iso, column: value}`` (vectorized)"""
+    return frame.rename_axis('time').reset_index().to_json(
+        orient='records', date_format='iso', date_unit='s', double_precision=15
+    )
+
+
+def bar_lines(frame: pd.DataFrame) -> List[bytes]:
+    """One encoded JSON object per row, same fields as ``bars_json``"""
+    if frame.empty:
+        return []
+    return frame.rename_axis('time').reset_index().to_json(
+        orient='records', lines=True, date_format='iso', date_unit='s', double_precision=15
+    ).encode().splitlines()
+
+
+def bar_records(frame: pd.DataFrame) -> List[Dict]:
+    return json.loads(bars_json(frame))
+
+
+class BarSeries:
+    """Bars + indicators + latest signals for one symbol/interval"""
+
+    def __init__(self, symbol: str, interval: str):
+        self.symbol = symbol
+        self.interval = interval
+        self.data = pd.DataFrame(columns=OHLCV)
+        self.signals: Dict = {}
+        self.version = 0
+        self.updated_at = 0.0
+        self.fetched_at = 0.0
+        self.lock = threading.Lock()
+
+
+class BarStore:
+    """🎯 Thread-safe bar storage keyed by ``(symbol, interval)``
+
+    ``merge`` folds freshly fetched bars into what we already hold, recomputes
+    indicators and signals only when something actually changed, and reports
+    exactly which bars are new so subscribers can append instead of reload.
+    ``regime`` (symbol, interval) -> market regime state feeds signal scoring.
+    ``events`` (symbol, interval, signals, bar_ns) records each evaluation,
+    e.g. ``SignalStore.append``; restored series are not re-recorded.
+    """
+
+    def __init__(self, max_bars: int = 20000,
+                 regime: Optional[Callable[[str, str], Optional[Dict]]] = None,
+                 events: Optional[Callable[[str, str, Dict, int], object]] = None):
+        self.max_bars = max_bars
+        self.regime = regime
+        self.events = events
+        self._series: Dict[Tuple[str, str], BarSeries] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str, interval: str) -> Optional[BarSeries]:
+        return self._series.get((symbol, interval))
+
+    def keys(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return list(self._series)
+
+    def _series_for(self, symbol: str, interval: str) -> BarSeries:
+        with self._lock:
+            series = self._series.get((symbol, interval))
+            if series is None:
+                series = self._series[(symbol, interval)] = BarSeries(symbol, interval)
+            return series
+
+    def drop(self, symbol: str) -> int:
+        """Forget every interval of ``symbol``; returns how many series went"""
+        with self._lock:
+            keys = [key for key in self._series if key[0] == symbol]
+            for key in keys:
+                del self._series[key]
+            return len(keys)
+
+    def touch(self, symbol: str, interval: str):
+        """Mark a fetch that returned nothing new (keeps the TTL honest)"""
+        self._series_for(symbol, interval).fetched_at = time.time()
+
+    def merge(self, symbol: str, interval: str, bars: pd.DataFrame) -> Optional[Dict]:
+        """Fold new OHLCV bars in; return a change description or ``None``"""
+        series = self._series_for(symbol, interval)
+        if bars is None or bars.empty:
+            series.fetched_at = time.time()
+            return None
+
+        with series.lock:
+            incoming = bars[OHLCV].astype(float)
+            old = series.data[OHLCV] if not series.data.empty else None
+            if old is not None:
+                overlap = incoming.index.intersection(old.index)
+                revised = overlap[(old.loc[overlap] != incoming.loc[overlap]).any(axis=1).to_numpy()]
+                changed = incoming.index.difference(old.index).union(revised)
+                if len(changed) == 0:
+                    series.fetched_at = time.time()
+                    return None
+                merged = pd.concat([old, incoming])
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+                first_changed = changed.min()
+            else:
+                merged = incoming.sort_index()
+                first_changed = merged.index.min()
+
+            merged = merged.tail(self.max_bars)
+            data = calculate_indicators(merged.copy())
+            regime = self.regime(symbol, interval) if self.regime else None
+            signals = plain_signals(analyze_signals(data, regime))
+
+            if self.events is not None:
+                # Recording must not abort the merge (we hold the series lock)
+                try:
+                    self.events(symbol, interval, signals, data.index[-1].value)
+                except Exception as e:
+                    logger.warning("🗂️ Signal event for %s %s not recorded: %s", symbol, interval, e)
+
+            signals_changed = signals != series.signals
+            series.data = data
+            series.signals = signals
+            series.version += 1
+            series.updated_at = series.fetched_at = time.time()
+            return {
+                'symbol': symbol,
+                'interval': interval,
+                'version': series.version,
+                'bars': bar_records(data.loc[data.index >= first_changed]),
+                'signals': signals,
+                'signals_changed': signals_changed,
+            }
+
+    def export(self) -> List[BarSeries]:
+        """Every series with data, for checkpointing (frames are replaced, never mutated)"""
+        with self._lock:
+            return [series for series in self._series.values() if not series.data.empty]
+
+    def restore(self, symbol: str, interval: str, data: pd.DataFrame, signals: Dict,
+                fetched_at: float):
+        """Install checkpointed bars + indicators + signals without recomputing them"""
+        series = self._series_for(symbol, interval)
+        with series.lock:
+            series.data = data
+            series.signals = signals
+            series.version += 1
+            series.updated_at = time.time()
+            series.fetched_at = fetched_at
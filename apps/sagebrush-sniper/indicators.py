@@ -0,0 +1,302 @@
+"""
+📈 Sagebrush Indicators - Technical indicators for the Sagebrush Sniper
+Sharp as a desert wind
+
+Every indicator is a node in a dependency graph: it names the columns it
+needs (raw OHLCV or other nodes) and the columns it produces. Callers ask for
+outputs; only those and the intermediates they share are computed, once each,
+so registering another indicator costs nothing to queries that don't use it.
+
+    calculate_indicators(data)                               # the Sniper's default set
+    calculate_indicators(data, ["ATR", "STOCH_K", "VWAP"])   # just these (+ their inputs)
+
+Pass a ``memo`` slot (``IndicatorMemo.slot(key, version)``) to reuse results
+for a data version that has already been computed.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+RAW_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+# What signals, charts and alerts read
+DEFAULT_OUTPUTS = (
+    'SMA_20', 'SMA_50', 'BB_middle', 'BB_upper', 'BB_lower',
+    'RSI', 'MACD', 'MACD_signal', 'Volume_MA', 'Volume_Ratio',
+)
+
+
+class Node:
+    """One indicator: ``fn(*inputs) -> output`` (or a tuple, one per output)"""
+
+    __slots__ = ('name', 'outputs', 'inputs', 'fn')
+
+    def __init__(self, name: str, outputs: Tuple[str, ...], inputs: Tuple[str, ...], fn: Callable):
+        self.name = name
+        self.outputs = outputs
+        self.inputs = inputs
+        self.fn = fn
+
+
+# output column -> node producing it
+REGISTRY: Dict[str, Node] = {}
+_PLANS: Dict[Tuple[str, ...], List[Node]] = {}
+
+
+def indicator(*outputs: str, needs: Sequence[str] = ('Close',)):
+    """Register a node; names starting with ``_`` are intermediates, never written to the frame"""
+    def register(fn: Callable) -> Callable:
+        node = Node(fn.__name__, tuple(outputs), tuple(needs), fn)
+        for column in outputs:
+            REGISTRY[column] = node
+        _PLANS.clear()
+        return fn
+    return register
+
+
+def plan(outputs: Iterable[str]) -> List[Node]:
+    """Nodes needed for ``outputs``, dependencies first (cached per output set)"""
+    key = tuple(outputs)
+    cached = _PLANS.get(key)
+    if cached is not None:
+        return cached
+    order: List[Node] = []
+    state: Dict[str, bool] = {}  # node name -> finished
+
+    def visit(column: str):
+        if column in RAW_COLUMNS:
+            return
+        node = REGISTRY.get(column)
+        if node is None:
+            raise KeyError(f"Unknown indicator {column!r}")
+        done = state.get(node.name)
+        if done:
+            return
+        if done is False:
+            raise ValueError(f"Indicator cycle through {node.name!r}")
+        state[node.name] = False
+        for dependency in node.inputs:
+            visit(dependency)
+        state[node.name] = True
+        order.append(node)
+
+    for column in key:
+        visit(column)
+    _PLANS[key] = order
+    return order
+
+
+def compute(data: pd.DataFrame, outputs: Iterable[str] = DEFAULT_OUTPUTS,
+            memo: Optional[Dict[str, pd.Series]] = None) -> Dict[str, pd.Series]:
+    """Evaluate just what ``outputs`` need; ``memo`` holds results for this data version"""
+    outputs = tuple(outputs)
+    values = memo if memo is not None else {}
+    for node in plan(outputs):
+        if all(column in values for column in node.outputs):
+            continue
+        result = node.fn(*(values[c] if c in values else data[c] for c in node.inputs))
+        if len(node.outputs) == 1:
+            result = (result,)
+        values.update(zip(node.outputs, result))
+    return {column: values[column] for column in outputs}
+
+
+def calculate_indicators(data: pd.DataFrame, outputs: Iterable[str] = DEFAULT_OUTPUTS,
+                         memo: Optional[Dict[str, pd.Series]] = None) -> pd.DataFrame:
+    """Calculate technical indicators (adds the requested columns to ``data``)"""
+    for column, series in compute(data, outputs, memo).items():
+        if not column.startswith('_'):
+            data[column] = series
+    return data
+
+
+class IndicatorMemo:
+    """🗃️ Computed columns per ``key`` for its latest data version only"""
+
+    def __init__(self, max_keys: int = 256):
+        self.max_keys = max_keys
+        self._slots: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def slot(self, key, version) -> Dict[str, pd.Series]:
+        """Scratch dict for ``(key, version)``; a new version starts empty"""
+        with self._lock:
+            current = self._slots.get(key)
+            if current is None or current[0] != version:
+                current = self._slots[key] = (version, {})
+            self._slots.move_to_end(key)
+            while len(self._slots) > self.max_keys:
+                self._slots.popitem(last=False)
+            return current[1]
+
+
+# ---------------------------------------------------------------- moving averages
+
+@indicator('SMA_20')
+def sma_20(close):
+    return close.rolling(window=20).mean()
+
+
+@indicator('SMA_50')
+def sma_50(close):
+    return close.rolling(window=50).mean()
+
+
+@indicator('EMA_12')
+def ema_12(close):
+    return close.ewm(span=12).mean()
+
+
+@indicator('EMA_26')
+def ema_26(close):
+    return close.ewm(span=26).mean()
+
+
+# ---------------------------------------------------------------- bands and oscillators
+
+@indicator('BB_middle', needs=('SMA_20',))
+def bb_middle(sma):
+    return sma
+
+
+@indicator('_BB_std')
+def bb_std(close):
+    return close.rolling(window=20).std()
+
+
+@indicator('BB_upper', 'BB_lower', needs=('BB_middle', '_BB_std'))
+def bollinger(middle, std):
+    return middle + (std * 2), middle - (std * 2)
+
+
+@indicator('_delta')
+def delta(close):
+    return close.diff()
+
+
+@indicator('RSI', needs=('_delta',))
+def rsi(delta):
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+@indicator('MACD', needs=('EMA_12', 'EMA_26'))
+def macd(fast, slow):
+    return fast - slow
+
+
+@indicator('MACD_signal', needs=('MACD',))
+def macd_signal(macd):
+    return macd.ewm(span=9).mean()
+
+
+@indicator('MACD_histogram', needs=('MACD', 'MACD_signal'))
+def macd_histogram(macd, signal):
+    return macd - signal
+
+
+@indicator('_low_14', needs=('Low',))
+def low_14(low):
+    return low.rolling(window=14).min()
+
+
+@indicator('_high_14', needs=('High',))
+def high_14(high):
+    return high.rolling(window=14).max()
+
+
+@indicator('STOCH_K', needs=('Close', '_low_14', '_high_14'))
+def stochastic_k(close, low, high):
+    return 100 * (close - low) / (high - low)
+
+
+@indicator('STOCH_D', needs=('STOCH_K',))
+def stochastic_d(k):
+    return k.rolling(window=3).mean()
+
+
+# ---------------------------------------------------------------- range and volume
+
+@indicator('_true_range', needs=('High', 'Low', 'Close'))
+def true_range(high, low, close):
+    import numpy as np
+
+    prev = close.shift(1)
+    # fmax skips the NaN gap on the first bar, leaving High - Low
+    return np.fmax(high - low, np.fmax((high - prev).abs(), (low - prev).abs()))
+
+
+@indicator('ATR', needs=('_true_range',))
+def atr(tr):
+    # Wilder smoothing
+    return tr.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+
+
+@indicator('Volume_MA', needs=('Volume',))
+def volume_ma(volume):
+    return volume.rolling(window=20).mean()
+
+
+@indicator('Volume_Ratio', needs=('Volume', 'Volume_MA'))
+def volume_ratio(volume, volume_ma):
+    return volume / volume_ma
+
+
+@indicator('OBV', needs=('_delta', 'Volume'))
+def obv(delta, volume):
+    direction = delta.gt(0).astype(float) - delta.lt(0).astype(float)
+    return (direction * volume).cumsum()
+
+
+@indicator('_typical_price', needs=('High', 'Low', 'Close'))
+def typical_price(high, low, close):
+    return (high + low + close) / 3
+
+
+@indicator('VWAP', needs=('_typical_price', 'Volume'))
+def vwap(typical, volume):
+    """Anchored at each UTC day for intraday bars, over the whole frame otherwise"""
+    flow = typical * volume
+    index = typical.index
+    if hasattr(index, 'normalize') and len(index) > 1 and (index[1:] - index[:-1]).min().days < 1:
+        day = index.normalize()
+        return flow.groupby(day).cumsum() / volume.groupby(day).cumsum()
+    return flow.cumsum() / volume.cumsum()
+
+
+# ---------------------------------------------------------------- Ichimoku
+
+def _midpoint(high, low, window: int):
+    return (high.rolling(window=window).max() + low.rolling(window=window).min()) / 2
+
+
+@indicator('ICHIMOKU_tenkan', needs=('High', 'Low'))
+def ichimoku_tenkan(high, low):
+    return _midpoint(high, low, 9)
+
+
+@indicator('ICHIMOKU_kijun', needs=('High', 'Low'))
+def ichimoku_kijun(high, low):
+    return _midpoint(high, low, 26)
+
+
+@indicator('ICHIMOKU_span_a', needs=('ICHIMOKU_tenkan', 'ICHIMOKU_kijun'))
+def ichimoku_span_a(tenkan, kijun):
+    return ((tenkan + kijun) / 2).shift(26)
+
+
+@indicator('ICHIMOKU_span_b', needs=('High', 'Low'))
+def ichimoku_span_b(high, low):
+    return _midpoint(high, low, 52).shift(26)
+
+
+@indicator('ICHIMOKU_chikou')
+def ichimoku_chikou(close):
+    return close.shift(-26)
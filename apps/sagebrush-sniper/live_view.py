@@ -0,0 +1,205 @@
+"""
+📡 Sagebrush Live View - Push-based auto-refresh for the dashboard
+The browser listens to the market service and patches itself; Python renders once
+
+The Streamlit script draws the component a single time. After that the
+browser holds a WebSocket to the market service, which only speaks when a
+bar or signal actually changes (or one of your alerts fires). Each message patches the tiles whose text
+changed and appends (or revises) points with ``Plotly.extendTraces`` - no
+script rerun, no refetch, no figure rebuild.
+"""
+
+import json
+import os
+from typing import Dict
+
+MARKET_SERVICE_WS_URL = os.getenv("MARKET_SERVICE_WS_URL", "ws://localhost:5000")
+PLOTLY_JS = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+MAX_POINTS = 2000
+MAX_ALERTS = 5
+
+# Trace order produced by create_price_chart -> bar column feeding each trace
+LIVE_TRACES = [
+    [0, "candle"],
+    [1, "BB_upper"],
+    [2, "BB_lower"],
+    [3, "SMA_20"],
+    [4, "RSI"],
+    [5, "MACD"],
+    [6, "MACD_signal"],
+]
+
+_TEMPLATE = """
+<style>
+  body { margin: 0; font-family: sans-serif; color: #fafafa; }
+  .tiles { display: flex; gap: 12px; margin-bottom: 8px; }
+  .tile { flex: 1; padding: 10px 14px; border-radius: 10px; background: #262730; }
+  .tile .label { font-size: 13px; opacity: 0.75; }
+  .tile .value { font-size: 28px; }
+  .status { font-size: 12px; opacity: 0.6; text-align: right; }
+  .signals { display: flex; gap: 12px; margin-top: 8px; font-size: 14px; }
+  .signals div { flex: 1; }
+  .alerts { font-size: 14px; margin-top: 8px; color: #FFD700; }
+</style>
+<div class="status" id="status">📡 connecting...</div>
+<div class="tiles">
+  <div class="tile"><div class="label">💰 Price</div><div class="value" id="price"></div></div>
+  <div class="tile"><div class="label" id="rsi-label">RSI</div><div class="value" id="rsi"></div></div>
+  <div class="tile"><div class="label">📊 Signal</div><div class="value" id="signal"></div></div>
+  <div class="tile"><div class="label">📈 Strength</div><div class="value" id="strength"></div></div>
+</div>
+<div id="chart"></div>
+<div class="signals"><div id="buy"></div><div id="sell"></div></div>
+<div id="recommendation"></div>
+<div class="alerts" id="alerts"></div>
+<script src="__PLOTLY_JS__"></script>
+<script>
+const CONFIG = __CONFIG__;
+const gd = document.getElementById("chart");
+const DTYPES = {f8: Float64Array, f4: Float32Array, i4: Int32Array, i2: Int16Array,
+                i1: Int8Array, u4: Uint32Array, u2: Uint16Array, u1: Uint8Array};
+
+// Plotly's JSON packs arrays as base64 typed arrays; plain arrays are what we append to
+function unpack(value) {
+  if (Array.isArray(value)) return value.map(unpack);
+  if (value && typeof value === "object") {
+    if (value.bdata !== undefined && DTYPES[value.dtype]) {
+      const raw = Uint8Array.from(atob(value.bdata), c => c.charCodeAt(0));
+      return Array.from(new DTYPES[value.dtype](raw.buffer));
+    }
+    for (const key of Object.keys(value)) value[key] = unpack(value[key]);
+  }
+  return value;
+}
+const fig = unpack(CONFIG.figure);
+fig.layout.height = CONFIG.chartHeight;
+Plotly.newPlot(gd, fig.data, fig.layout, {responsive: true});
+
+function patch(id, text) {
+  const el = document.getElementById(id);
+  if (el.textContent !== text) el.textContent = text;   // untouched when unchanged
+}
+function patchHtml(id, html) {
+  const el = document.getElementById(id);
+  if (el.innerHTML !== html) el.innerHTML = html;
+}
+
+function applySignals(s) {
+  if (!s || s.current_price == null) return;
+  patch("price", "$" + s.current_price.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2}));
+  const rsi = s.rsi == null ? NaN : s.rsi;
+  patch("rsi-label", (rsi < 30 ? "🟢" : rsi > 70 ? "🔴" : "🟡") + " RSI");
+  patch("rsi", isNaN(rsi) ? "-" : rsi.toFixed(1));
+  patch("signal", s.recommendation.split(" - ")[0]);
+  patch("strength", Math.max(s.buy_score, s.sell_score) + "/10");
+  patchHtml("buy", s.buy_signals.length ? "<b>🟢 BUY SIGNALS</b><br>" + s.buy_signals.map(x => "• " + x).join("<br>") : "");
+  patchHtml("sell", s.sell_signals.length ? "<b>🔴 SELL SIGNALS</b><br>" + s.sell_signals.map(x => "• " + x).join("<br>") : "");
+  patch("recommendation", s.recommendation);
+}
+
+function lastTime() {
+  const x = gd.data[0].x;
+  return x.length ? new Date(x[x.length - 1]).getTime() : -Infinity;
+}
+
+function applyBars(bars) {
+  if (!bars || !bars.length) return;
+  let revised = false;
+  const appended = CONFIG.traces.map(() => ({x: [], y: [], open: [], high: [], low: [], close: []}));
+  for (const bar of bars) {
+    const t = new Date(bar.time).getTime();
+    const last = lastTime();
+    if (t < last) continue;                      // older than the chart: already drawn
+    if (t === last) {                            // live bar revised in place
+      CONFIG.traces.forEach(([i, col]) => {
+        const tr = gd.data[i], n = tr.x.length - 1;
+        if (col === "candle") {
+          tr.open[n] = bar.Open; tr.high[n] = bar.High; tr.low[n] = bar.Low; tr.close[n] = bar.Close;
+        } else {
+          tr.y[n] = bar[col];
+        }
+      });
+      revised = true;
+      continue;
+    }
+    CONFIG.traces.forEach(([i, col], k) => {
+      appended[k].x.push(bar.time);
+      if (col === "candle") {
+        appended[k].open.push(bar.Open); appended[k].high.push(bar.High);
+        appended[k].low.push(bar.Low); appended[k].close.push(bar.Close);
+      } else {
+        appended[k].y.push(bar[col]);
+      }
+    });
+  }
+  if (appended[0].x.length) {
+    CONFIG.traces.forEach(([i, col], k) => {
+      const update = col === "candle"
+        ? {x: [appended[k].x], open: [appended[k].open], high: [appended[k].high], low: [appended[k].low], close: [appended[k].close]}
+        : {x: [appended[k].x], y: [appended[k].y]};
+      Plotly.extendTraces(gd, update, [i], CONFIG.maxPoints);
+    });
+  } else if (revised) {
+    Plotly.redraw(gd);
+  }
+}
+
+function applyAlert(a) {
+  const line = document.createElement("div");
+  line.textContent = "🔔 " + new Date(a.time * 1000).toLocaleTimeString() + " " + a.label;
+  const box = document.getElementById("alerts");
+  box.prepend(line);
+  while (box.childNodes.length > CONFIG.maxAlerts) box.removeChild(box.lastChild);
+}
+
+let backoff = 1000;
+function connect() {
+  const ws = new WebSocket(CONFIG.wsUrl);
+  ws.onopen = () => { backoff = 1000; patch("status", "📡 live"); };
+  ws.onmessage = (event) => {
+    const msg = JSON.parse(event.data);
+    if (msg.type === "snapshot") {
+      applyBars([msg.bar]);
+      applySignals(msg.signals);
+    } else if (msg.type === "update") {
+      applyBars(msg.bars);
+      if (msg.signals_changed) applySignals(msg.signals);
+    } else if (msg.type === "alert") {
+      applyAlert(msg);
+    }
+  };
+  ws.onclose = () => {
+    patch("status", "📡 reconnecting...");
+    setTimeout(connect, backoff);
+    backoff = Math.min(backoff * 2, 30000);
+  };
+}
+applySignals(CONFIG.signals);
+connect();
+</script>
+"""
+
+
+def live_dashboard_html(fig, signals: Dict, symbol: str, interval: str = "1h",
+                        ws_url: str = MARKET_SERVICE_WS_URL, chart_height: int = 800) -> str:
+    """Build the self-updating tiles + chart component"""
+    config = {
+        "figure": json.loads(fig.to_json()),
+        "signals": signals,
+        "traces": LIVE_TRACES,
+        "maxPoints": MAX_POINTS,
+        "maxAlerts": MAX_ALERTS,
+        "chartHeight": chart_height,
+        "wsUrl": f"{ws_url}/ws/stream?symbols={symbol}&interval={interval}",
+    }
+    payload = json.dumps(config, default=float).replace("</", "<\\/")
+    return _TEMPLATE.replace("__PLOTLY_JS__", PLOTLY_JS).replace("__CONFIG__", payload)
+
+
+def render_live_dashboard(fig, signals: Dict, symbol: str, interval: str = "1h",
+                          chart_height: int = 800):
+    """🎯 Render once; every later update arrives over the WebSocket"""
+    import streamlit.components.v1 as components
+
+    components.html(live_dashboard_html(fig, signals, symbol, interval, chart_height=chart_height),
+                    height=chart_height + 260 + 20 * MAX_ALERTS, scrolling=False)
@@ -4,16 +4,89 @@
 Built with the spirit of the frontier
 """
 
+from __future__ import annotations
+
 import streamlit as st
-import yfinance as yf
-import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
+import logging
 import os
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Optional
+
+import _paths  # noqa: F401  (repo-root modules; keep first)
+
+from indicators import IndicatorMemo
+from live_view import render_live_dashboard
+from pipeline import MARKET_SERVICE_URL, analyze_bars, fetch_base_bars
+from stage_metrics import render_debug_panel, serve_metrics, timed, track_request
+
+# Heavy hitters (yfinance, pandas, plotly) load on the paths that need them,
+# so a fresh worker can serve the welcome screen without paying for them
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from bar_pyramid import BarPyramid
+
+BAR_SIZES = ["5m", "15m", "1h", "4h", "1d"]
+METRICS_PORT = os.getenv("METRICS_PORT")
+MARKET_CHECKPOINT = os.getenv("MARKET_CHECKPOINT")
+# Alerts are an admin endpoint on the market service
+MARKET_ADMIN_TOKEN = os.getenv("MARKET_ADMIN_TOKEN")
+SIGNAL_STORE = os.getenv("SIGNAL_STORE")
+
+logger = logging.getLogger(__name__)
+
+
+def register_alert(spec: str, interval: str) -> str:
+    """🔔 Hand an alert like "ETH RSI < 25" to the market service, which watches every tick"""
+    import requests
+
+    try:
+        response = requests.post(f"{MARKET_SERVICE_URL}/api/alerts",
+                                 json={"spec": spec, "interval": interval}, timeout=3,
+                                 headers={"X-Admin-Token": MARKET_ADMIN_TOKEN} if MARKET_ADMIN_TOKEN else None)
+    except requests.RequestException:
+        return "❌ Market service unreachable - alerts need it running"
+    if response.status_code != 200:
+        return f"❌ {response.json().get('detail', 'Alert rejected')}"
+    return "✅ Watching: " + ", ".join(a["label"] for a in response.json()["alerts"])
+
+
+@st.cache_resource
+def pyramid_cache():
+    """One pyramid per symbol per process: timeframe switches never hit the network"""
+    from bar_pyramid import OHLCV, PyramidCache
+    from checkpoint import load_checkpoint, read_frame
+
+    cache = PyramidCache(fetch_base_bars)
+    # Warm start from the market service's checkpoint (same base interval only)
+    ckpt = load_checkpoint(MARKET_CHECKPOINT)
+    if ckpt is not None and ckpt.meta.get("base_interval") == cache.base_interval:
+        for symbol, info in ckpt.meta.get("pyramids", {}).items():
+            cache.seed(symbol, read_frame(ckpt, f"pyramid/{info['id']}", OHLCV), info["fetched_at"])
+    return cache
+
+
+@st.cache_resource
+def indicator_memo():
+    """Indicator columns per (symbol, timeframe), reused until the pyramid moves on"""
+    return IndicatorMemo()
+
+
+@st.cache_resource
+def signal_store():
+    """Signal event history shared with the market service (only when SIGNAL_STORE is set)"""
+    if not SIGNAL_STORE:
+        return None
+    from signal_store import SignalStore
+
+    return SignalStore(SIGNAL_STORE)
+
+
+@st.cache_resource
+def metrics_server():
+    """Prometheus scrape target for this worker (only when METRICS_PORT is set)"""
+    return serve_metrics(int(METRICS_PORT)) if METRICS_PORT else None
 
 class SagebrushSniper:
     """🎯 The legendary crypto sniper - faster than Wyoming lightning"""
@@ -22,159 +95,62 @@ class SagebrushSniper:
         self.motto = "🏜️ Silent as sagebrush, deadly as a diamondback"
         self.trade_history = []
         
-    def analyze_target(self, symbol: str = "BTC-USD", period: str = "30d") -> Optional[Dict]:
+    def analyze_target(self, symbol: str = "BTC-USD", period: str = "30d",
+                       interval: str = "1h") -> Optional[Dict]:
         """🔍 Scoutin' the digital frontier for opportunities"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period=period, interval="1h")
-            
-            if data.empty:
-                st.error(f"🤠 Couldn't rustle up data for {symbol}, partner!")
-                return None
-            
-            # Calculate technical indicators
-            data = self._calculate_indicators(data)
-            
-            # Generate trading signals
-            signals = self._analyze_signals(data)
-            
-            return {
-                'data': data,
-                'signals': signals,
-                'symbol': symbol,
-                'last_updated': datetime.now()
-            }
-            
+            with track_request("analyze"):
+                # Refreshes the base bars at most once per TTL, then reads locally
+                pyramid = pyramid_cache().get(symbol)
+                return self._analyze_bars(symbol, pyramid, period, interval)
         except Exception as e:
             st.error(f"🤠 Error analyzing {symbol}: {str(e)}")
             return None
     
-    def _calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Calculate technical indicators"""
-        # Moving Averages
-        data['SMA_20'] = data['Close'].rolling(window=20).mean()
-        data['SMA_50'] = data['Close'].rolling(window=50).mean()
-        data['EMA_12'] = data['Close'].ewm(span=12).mean()
-        data['EMA_26'] = data['Close'].ewm(span=26).mean()
-        
-        # Bollinger Bands
-        data['BB_middle'] = data['Close'].rolling(window=20).mean()
-        bb_std = data['Close'].rolling(window=20).std()
-        data['BB_upper'] = data['BB_middle'] + (bb_std * 2)
-        data['BB_lower'] = data['BB_middle'] - (bb_std * 2)
-        
-        # RSI
-        delta = data['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        data['RSI'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        data['MACD'] = data['EMA_12'] - data['EMA_26']
-        data['MACD_signal'] = data['MACD'].ewm(span=9).mean()
-        data['MACD_histogram'] = data['MACD'] - data['MACD_signal']
-        
-        # Volume analysis
-        data['Volume_MA'] = data['Volume'].rolling(window=20).mean()
-        data['Volume_Ratio'] = data['Volume'] / data['Volume_MA']
-        
-        return data
+    def view_cached(self, symbol: str, period: str, interval: str) -> Optional[Dict]:
+        """🗺️ Re-read another timeframe from the cached pyramid (no network)"""
+        pyramid = pyramid_cache().peek(symbol)
+        if pyramid is None:
+            return None
+        try:
+            with track_request("view_cached"):
+                return self._analyze_bars(symbol, pyramid, period, interval)
+        except Exception as e:
+            st.error(f"🤠 Error analyzing {symbol}: {str(e)}")
+            return None
     
-    def _analyze_signals(self, data: pd.DataFrame) -> Dict:
-        """Generate trading signals"""
-        if data.empty:
-            return self._empty_signals()
-            
-        latest = data.iloc[-1]
-        
-        # Buy signals
-        buy_signals = []
-        buy_score = 0
-        
-        if latest['RSI'] < 30:
-            buy_signals.append("🎯 RSI Oversold (Bullish)")
-            buy_score += 2
-            
-        if latest['Close'] <= latest['BB_lower'] * 1.02:
-            buy_signals.append("🎯 Touching Lower BB (Bounce Expected)")
-            buy_score += 2
-            
-        if (latest['MACD'] > latest['MACD_signal'] and 
-            data['MACD'].iloc[-2] <= data['MACD_signal'].iloc[-2]):
-            buy_signals.append("🎯 MACD Bullish Crossover")
-            buy_score += 3
-            
-        if latest['Volume_Ratio'] > 1.5:
-            buy_signals.append("🎯 High Volume Confirmation")
-            buy_score += 1
-            
-        if latest['SMA_20'] > latest['SMA_50']:
-            buy_signals.append("🎯 Golden Cross Active")
-            buy_score += 1
-        
-        # Sell signals
-        sell_signals = []
-        sell_score = 0
+    def _analyze_bars(self, symbol: str, pyramid: BarPyramid, period: str,
+                      interval: str) -> Optional[Dict]:
+        bars, version = pyramid.get_versioned(interval)
+        if bars.empty:
+            st.error(f"🤠 Couldn't rustle up data for {symbol}, partner!")
+            return None
         
-        if latest['RSI'] > 70:
-            sell_signals.append("⚠️ RSI Overbought (Bearish)")
-            sell_score += 2
-            
-        if latest['Close'] >= latest['BB_upper'] * 0.98:
-            sell_signals.append("⚠️ Near Upper BB (Resistance)")
-            sell_score += 2
-            
-        if (latest['MACD'] < latest['MACD_signal'] and 
-            data['MACD'].iloc[-2] >= data['MACD_signal'].iloc[-2]):
-            sell_signals.append("⚠️ MACD Bearish Crossover")
-            sell_score += 3
-            
-        if latest['SMA_20'] < latest['SMA_50']:
-            sell_signals.append("⚠️ Death Cross Active")
-            sell_score += 1
+        # Indicators over everything we hold, trimmed to the lookback, then signals;
+        # a timeframe that hasn't changed since the last look reuses its columns
+        data, signals = analyze_bars(bars, period, indicator_memo().slot((symbol, interval), version))
+        events = signal_store()
+        if events is not None:
+            # History is a side record; a failed write never costs the user their analysis
+            try:
+                events.append(symbol, interval, signals, data.index[-1].value)
+            except Exception as e:
+                logger.warning("🗂️ Signal event for %s %s not recorded: %s", symbol, interval, e)
         
         return {
-            'buy_signals': buy_signals,
-            'sell_signals': sell_signals,
-            'buy_score': buy_score,
-            'sell_score': sell_score,
-            'recommendation': self._get_recommendation(buy_score, sell_score),
-            'current_price': latest['Close'],
-            'rsi': latest['RSI'],
-            'macd': latest['MACD'],
-            'volume_ratio': latest['Volume_Ratio']
-        }
-    
-    def _get_recommendation(self, buy_score: int, sell_score: int) -> str:
-        """Generate trading recommendation"""
-        if buy_score >= 5:
-            return "🟢 STRONG BUY - Mount up, partner!"
-        elif buy_score >= 3:
-            return "🟡 BUY - Good lookin' opportunity"
-        elif sell_score >= 5:
-            return "🔴 STRONG SELL - Time to mosey on out"
-        elif sell_score >= 3:
-            return "🟠 SELL - Consider lightenin' the load"
-        else:
-            return "⚪ HOLD - Keep your powder dry"
-    
-    def _empty_signals(self) -> Dict:
-        """Return empty signals structure"""
-        return {
-            'buy_signals': [],
-            'sell_signals': [],
-            'buy_score': 0,
-            'sell_score': 0,
-            'recommendation': "⚪ NO DATA - Check connection",
-            'current_price': 0,
-            'rsi': 50,
-            'macd': 0,
-            'volume_ratio': 1
+            'data': data,
+            'signals': signals,
+            'symbol': symbol,
+            'period': period,
+            'interval': interval,
+            'last_updated': datetime.now()
         }
 
+@timed("create_price_chart")
 def create_price_chart(data: pd.DataFrame, symbol: str):
     """📊 Creating charts prettier than a Wyoming sunset"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
     
     fig = make_subplots(
         rows=3, cols=1,
@@ -265,6 +241,8 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
+    metrics_server()
+    
     # Initialize sniper
     sniper = SagebrushSniper()
     
@@ -284,21 +262,52 @@ def main():
             index=2
         )
         
+        interval = st.selectbox(
+            "🕰️ Bar Size",
+            BAR_SIZES,
+            index=2
+        )
+        
+        live_mode = st.toggle(
+            "📡 Live Mode",
+            help="Stream new bars and signal changes from the market service"
+        )
+        
+        with st.expander("🔔 Alerts"):
+            spec = st.text_input("New alert", placeholder="ETH RSI < 25; BTC crosses lower BB")
+            if st.button("➕ Add Alert", use_container_width=True) and spec:
+                st.caption(register_alert(spec, interval))
+            st.caption("Fired alerts show up in Live Mode")
+        
         st.markdown("---")
         
         if st.button("🔍 ANALYZE TARGET", type="primary", use_container_width=True):
             with st.spinner("🏜️ Scouting the digital frontier..."):
-                analysis = sniper.analyze_target(symbol, period)
+                analysis = sniper.analyze_target(symbol, period, interval)
                 if analysis:
                     st.session_state.analysis = analysis
                     st.success("🎯 Target acquired!")
+        
+        render_debug_panel()
     
     # Main content
     if 'analysis' in st.session_state:
         analysis = st.session_state.analysis
+        if (analysis['symbol'] == symbol and
+                (analysis.get('period'), analysis.get('interval')) != (period, interval)):
+            # Switching timeframe is a pure local read from the pyramid
+            switched = sniper.view_cached(symbol, period, interval)
+            if switched:
+                analysis = st.session_state.analysis = switched
         data = analysis['data']
         signals = analysis['signals']
         
+        if live_mode:
+            # Rendered once; the browser patches tiles and appends bars itself
+            fig = create_price_chart(data, analysis['symbol'])
+            render_live_dashboard(fig, signals, analysis['symbol'], analysis['interval'])
+            return
+        
         # Metrics row
         col1, col2, col3, col4 = st.columns(4)
         
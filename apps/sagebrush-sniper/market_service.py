@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+🛰️ Sagebrush Market Service - One feed for the whole frontier
+Owns fetching, bar storage and signal computation for every WyoVerse app
+
+Run:
+    cd apps/sagebrush-sniper
+    uvicorn market_service:app --port 5000
+
+REST:
+    GET /api/health
+    GET /api/market_data                  snapshot of every tracked symbol
+    GET /api/snapshot/{symbol}            latest bar, indicators and signals
+    GET /api/history/{symbol}?limit=500   bars with indicators
+    (interval=5m/15m/1h/4h/1d all come from one base feed via the bar pyramid;
+    watch=false reads without adding the series to the poll set, for one-off scans)
+    GET /api/signals/{symbol}             latest signals only
+    GET /api/signals/{symbol}/last?all=macd_bullish_cross,volume_confirmation
+                                          when those rules last fired together (SIGNAL_STORE)
+    GET /api/regime?symbol=BTC-USD        cross-asset market regime (and one asset's view)
+    GET /api/pairs?min_corr=0.7&top=20    ranked pair spreads (hedge ratio, z-score, half-life)
+    GET/POST /api/alerts                  list / register ("ETH RSI < 25", admin, at most ALERT_MAX)
+    DELETE /api/alerts/{id}               (admin)
+    GET /metrics                          stage latencies in Prometheus text format
+    POST /api/debug/instrumentation       ?enabled=&profiling= runtime switches (admin)
+WebSocket:
+    /ws/stream?symbols=BTC-USD,ETH-USD    snapshot on connect, then only changes (and alerts)
+
+Admin endpoints want an ``X-Admin-Token`` header matching MARKET_ADMIN_TOKEN
+and are switched off while it is unset.
+
+Polling: a series joins the poll set once a consumer has read it successfully.
+Series nobody has read for MARKET_WATCH_TTL_SECONDS (and that no stream or
+alert holds) are dropped along with their bars, so stray lookups don't turn
+into upstream load forever. MARKET_SYMBOLS are always polled.
+
+Warm restarts: with MARKET_CHECKPOINT=market.ckpt the hub writes its bars,
+indicator columns, signals, regime state and alerts every CHECKPOINT_SECONDS (and on
+shutdown), and maps them back in at startup, so a fresh deploy serves right
+away and only asks upstream for the short incremental tail.
+
+Signal history: with SIGNAL_STORE=signal_events every evaluation is appended
+to the columnar event store (signal_store.py) for range and rule queries.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, Response
+from pydantic import BaseModel
+
+import _paths  # noqa: F401  (repo-root modules; keep first)
+
+from alerts import AlertEngine, WebhookNotifier, log_notifier, parse_alerts
+from bar_pyramid import PYRAMID_BASE, BarPyramid, PyramidCache
+from bar_store import OHLCV, BarStore, bar_lines, bar_records
+from checkpoint import Checkpoint, Checkpointer, frame_arrays, load_checkpoint, read_frame
+from pairs import PairsEngine
+from regime import WARMING_UP, RegimeEngine
+from signal_store import SignalStore
+from stage_metrics import METRICS, stage
+from tick_tape import TickRecorder
+from upstream import background, yfinance_history
+
+DEFAULT_SYMBOLS = os.getenv(
+    "MARKET_SYMBOLS", "BTC-USD,ETH-USD,SOL-USD,AVAX-USD,ADA-USD,DOGE-USD,LTC-USD"
+).split(",")
+REFRESH_SECONDS = float(os.getenv("MARKET_REFRESH_SECONDS", "60"))
+WATCH_TTL_SECONDS = float(os.getenv("MARKET_WATCH_TTL_SECONDS", "3600"))
+REGIME_INTERVAL = os.getenv("REGIME_INTERVAL", "1h")
+ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL")
+TICK_TAPE = os.getenv("TICK_TAPE")
+MARKET_CHECKPOINT = os.getenv("MARKET_CHECKPOINT")
+SIGNAL_STORE = os.getenv("SIGNAL_STORE")
+MARKET_ADMIN_TOKEN = os.getenv("MARKET_ADMIN_TOKEN")
+# Bump when the hub's checkpoint contents change shape; older files are ignored
+HUB_CHECKPOINT_SCHEMA = 1
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_bars(symbol: str, period: str, interval: str) -> pd.DataFrame:
+    """🤠 Rustle up OHLCV bars from yfinance (coalesced, rate limited, retried)"""
+    return yfinance_history(symbol, period, interval)
+
+
+class MarketDataHub:
+    """🏛️ Single owner of upstream fetches, the bar store and subscribers
+
+    Every client reads from the same ``BarStore``. Concurrent requests for a
+    stale symbol share one upstream fetch, and subscribers are only woken when
+    a merge reports new or revised bars.
+    """
+
+    def __init__(self, fetcher: Callable[[str, str, str], pd.DataFrame] = fetch_bars,
+                 store: Optional[BarStore] = None, ttl_seconds: float = REFRESH_SECONDS,
+                 tape=None, watch_ttl: float = WATCH_TTL_SECONDS):
+        self.fetcher = fetcher
+        # Every upstream fetch can be taped for replay (tick_tape.py); False disables TICK_TAPE
+        self.tape = tape if tape is not None else (TickRecorder(TICK_TAPE) if TICK_TAPE else None)
+        self.regimes = RegimeEngine()
+        self.pairs = PairsEngine()
+        notifiers = [log_notifier, self._publish_alert]
+        if ALERT_WEBHOOK_URL:
+            notifiers.append(WebhookNotifier(ALERT_WEBHOOK_URL))
+        self.alerts = AlertEngine(notifiers)
+        self.signal_store = SignalStore(SIGNAL_STORE) if SIGNAL_STORE else None
+        self.store = store or BarStore(regime=self.regime_for,
+                                       events=self.signal_store.append if self.signal_store else None)
+        self.ttl_seconds = ttl_seconds
+        self.pyramids = PyramidCache(self._counted_fetch, PYRAMID_BASE, ttl_seconds)
+        self.pyramid_intervals = BarPyramid(PYRAMID_BASE).intervals
+        self.watch_ttl = watch_ttl
+        # Configured symbols, polled for good
+        self.pinned: Set[Tuple[str, str]] = set()
+        # Keys a consumer read successfully, and when any key was last read
+        self.watched: Set[Tuple[str, str]] = set()
+        self._touched: Dict[Tuple[str, str], float] = {}
+        self.upstream_calls = 0
+        self._subscribers: Dict[asyncio.Queue, Tuple[Set[str], str]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._snapshot_cache: Dict[Tuple[str, str], Tuple[int, bytes]] = {}
+        # Encoded rows per series; any ``limit`` is a slice, so the cache stays one entry per series
+        self._history_cache: Dict[Tuple[str, str], Tuple[int, List[bytes]]] = {}
+
+    def _counted_fetch(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        self.upstream_calls += 1
+        bars = self.fetcher(symbol, period, interval)
+        if self.tape:
+            self.tape.bars(symbol, bars)
+        return bars
+
+    def check_interval(self, interval: str):
+        """Only the pyramid's timeframes are served (anything else would be its own upstream feed)"""
+        if interval not in self.pyramid_intervals:
+            raise ValueError(f"Unsupported interval {interval!r}; use one of {', '.join(self.pyramid_intervals)}")
+
+    def refresh(self, symbol: str, interval: str = "1h", force: bool = False) -> Optional[Dict]:
+        """Fetch upstream if stale; one base-interval fetch updates every timeframe in the pyramid"""
+        self.check_interval(interval)
+        changes = self.pyramids.refresh(symbol, force=force)
+        pyramid = self.pyramids.peek(symbol)
+        if pyramid is None:
+            return None
+        requested = None
+        for level in pyramid.intervals:
+            rows = changes.get(level)
+            series = self.store.get(symbol, level)
+            if series is None or series.data.empty:
+                # A series the store doesn't hold (yet, or since it expired) gets the whole timeframe
+                rows = pyramid.get(level)
+            if rows is None or rows.empty:
+                continue
+            with stage("store_merge"):
+                change = self.store.merge(symbol, level, rows)
+            if change:
+                self._evaluate_alerts(symbol, level)
+                self._publish(change)
+                if level == interval:
+                    requested = change
+        return requested
+
+    def _evaluate_alerts(self, symbol: str, interval: str):
+        """Run the latest bar through the alert indexes"""
+        series = self.store.get(symbol, interval)
+        if series is None or series.data.empty or not len(self.alerts):
+            return
+        with stage("alert_eval"):
+            self.alerts.update(symbol, interval, series.data.iloc[-1])
+
+    def series(self, symbol: str, interval: str = "1h", watch: bool = True):
+        """Fresh bars for a consumer; ``watch`` also keeps them polled from now on"""
+        self.refresh(symbol, interval)
+        series = self.store.get(symbol, interval)
+        if series is None or series.data.empty:
+            raise KeyError(symbol)
+        self._touched[(symbol, interval)] = time.time()
+        if watch:
+            self.watched.add((symbol, interval))
+        return series
+
+    def tracked(self) -> Set[Tuple[str, str]]:
+        """Everything the poller refreshes"""
+        return self.watched | self.pinned
+
+    def expire(self, now: Optional[float] = None) -> List[str]:
+        """Drop symbols no consumer has read within ``watch_ttl``; returns them
+
+        Pinned keys and keys held by a stream subscriber or an alert count as
+        read. A dropped symbol loses its bars, pyramid and encoded responses.
+        """
+        cutoff = (now or time.time()) - self.watch_ttl
+        live = set(self.pinned)
+        for symbols, interval in list(self._subscribers.values()):
+            live.update((symbol, interval) for symbol in symbols)
+        live.update((alert["symbol"], alert["interval"]) for alert in self.alerts.snapshot())
+        live.update(key for key, touched in list(self._touched.items()) if touched >= cutoff)
+        self.watched &= live
+        for key in [key for key in self._touched if key not in live]:
+            self._touched.pop(key, None)
+        keep = {symbol for symbol, _ in live}
+        held = {symbol for symbol, _ in self.store.keys()} | set(self.pyramids.symbols())
+        dropped = sorted(held - keep)
+        for symbol in dropped:
+            self.pyramids.drop(symbol)
+            self.store.drop(symbol)
+            for cache in (self._snapshot_cache, self._history_cache):
+                for key in [key for key in cache if key[0] == symbol]:
+                    cache.pop(key, None)
+        return dropped
+
+    def snapshot(self, symbol: str, interval: str = "1h", watch: bool = True) -> Dict:
+        series = self.series(symbol, interval, watch)
+        return {
+            "symbol": symbol,
+            "interval": interval,
+            "version": series.version,
+            "updated_at": series.updated_at,
+            "bar": bar_records(series.data.tail(1))[0],
+            "signals": series.signals,
+        }
+
+    def snapshot_bytes(self, symbol: str, interval: str = "1h", watch: bool = True) -> bytes:
+        """Serialized snapshot, encoded once per data version for all clients"""
+        series = self.series(symbol, interval, watch)
+        cached = self._snapshot_cache.get((symbol, interval))
+        if cached and cached[0] == series.version:
+            return cached[1]
+        body = json.dumps(self.snapshot(symbol, interval, watch)).encode()
+        self._snapshot_cache[(symbol, interval)] = (series.version, body)
+        return body
+
+    def history_bytes(self, symbol: str, interval: str = "1h", limit: int = 500,
+                      watch: bool = True) -> bytes:
+        """Serialized history; rows are encoded once per version and sliced per ``limit``"""
+        series = self.series(symbol, interval, watch)
+        cached = self._history_cache.get((symbol, interval))
+        if cached and cached[0] == series.version:
+            rows = cached[1]
+        else:
+            rows = bar_lines(series.data)
+            self._history_cache[(symbol, interval)] = (series.version, rows)
+        return (f'{{"symbol": {json.dumps(symbol)}, "interval": {json.dumps(interval)}, '
+                f'"version": {series.version}, "bars": ['.encode()
+                + b",".join(rows[-limit:]) + b"]}")
+
+    # ------------------------------------------------------------ regime
+
+    def regime_for(self, symbol: str, interval: str) -> Optional[Dict]:
+        state = self.regimes.state(symbol)
+        return None if state['regime'] == WARMING_UP else state
+
+    def update_regime(self) -> Dict:
+        """Fold every closed bar newer than the engine's last into the regime state
+
+        The cross-section is aligned on bar time across all tracked symbols;
+        the last bar of each series is still forming and waits for the next
+        cycle. A symbol that lags a whole bar just contributes a two-bar return.
+        """
+        if self.tape:
+            self.tape.mark()
+        last_ts = self.regimes.last_ts
+        closes, volumes = {}, {}
+        for symbol, interval in self.store.keys():
+            series = self.store.get(symbol, interval)
+            if interval != REGIME_INTERVAL or series is None or len(series.data) < 2:
+                continue
+            closed = series.data.iloc[:-1]
+            if last_ts is not None:
+                closed = closed.iloc[closed.index.as_unit("ns").asi8.searchsorted(last_ts, side='right'):]
+            if not closed.empty:
+                closes[symbol] = closed['Close']
+                volumes[symbol] = closed['Volume']
+        if closes:
+            close_frame = pd.concat(closes, axis=1).sort_index()
+            volume_frame = pd.concat(volumes, axis=1).reindex(close_frame.index)
+            columns = self.regimes.ensure(list(close_frame.columns))
+            width = len(self.regimes.symbols)
+            close_block = np.full((len(close_frame), width), np.nan)
+            volume_block = np.full((len(close_frame), width), np.nan)
+            close_block[:, columns] = close_frame.to_numpy(dtype=float)
+            volume_block[:, columns] = volume_frame.to_numpy(dtype=float)
+            with stage("regime_update"):
+                self.regimes.step_many(close_block, volume_block, close_frame.index.as_unit("ns").asi8)
+            # Same aligned closes, laid out in the pairs engine's own symbol order
+            pair_columns = self.pairs.ensure(list(close_frame.columns))
+            pair_block = np.full((len(close_frame), len(self.pairs.symbols)), np.nan)
+            pair_block[:, pair_columns] = close_frame.to_numpy(dtype=float)
+            with stage("pairs_update"):
+                self.pairs.step_many(pair_block)
+        return self.regimes.state()
+
+    # ------------------------------------------------------------ checkpoints
+
+    def checkpoint_state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """Everything a restarted hub needs to serve without refetching history"""
+        arrays: Dict[str, np.ndarray] = {}
+        pyramids, series_meta = {}, []
+        for i, (symbol, (bars, fetched_at)) in enumerate(self.pyramids.export().items()):
+            arrays.update(frame_arrays(f"pyramid/{i}", bars))
+            pyramids[symbol] = {"id": i, "fetched_at": fetched_at}
+        for i, series in enumerate(self.store.export()):
+            with series.lock:
+                data, signals, fetched_at = series.data, series.signals, series.fetched_at
+            arrays.update(frame_arrays(f"series/{i}", data))
+            series_meta.append({"symbol": series.symbol, "interval": series.interval,
+                                "columns": list(data.columns), "signals": signals,
+                                "fetched_at": fetched_at})
+        regime_arrays, regime_meta = self.regimes.export_state()
+        arrays.update({f"regime/{name}": value for name, value in regime_arrays.items()})
+        pair_arrays, pair_meta = self.pairs.export_state()
+        arrays.update({f"pairs/{name}": value for name, value in pair_arrays.items()})
+        meta = {"schema": HUB_CHECKPOINT_SCHEMA, "base_interval": PYRAMID_BASE,
+                "pyramids": pyramids, "series": series_meta, "regime": regime_meta, "pairs": pair_meta,
+                "watched": sorted(self.watched), "alerts": self.alerts.snapshot()}
+        return arrays, meta
+
+    def restore(self, ckpt: Checkpoint) -> bool:
+        """Install a checkpoint's state; False (and a cold start) if it doesn't fit this build"""
+        meta = ckpt.meta
+        if meta.get("schema") != HUB_CHECKPOINT_SCHEMA or meta.get("base_interval") != PYRAMID_BASE:
+            return False
+        with stage("checkpoint_restore"):
+            for symbol, info in meta["pyramids"].items():
+                self.pyramids.seed(symbol, read_frame(ckpt, f"pyramid/{info['id']}", OHLCV),
+                                   info["fetched_at"])
+            now = time.time()
+            for i, info in enumerate(meta["series"]):
+                self.store.restore(info["symbol"], info["interval"],
+                                   read_frame(ckpt, f"series/{i}", info["columns"]),
+                                   info["signals"], info["fetched_at"])
+                # A restart doesn't count against the watch TTL
+                self._touched[(info["symbol"], info["interval"])] = now
+            self.regimes.restore_state({name[len("regime/"):]: ckpt[name] for name in ckpt.names("regime/")},
+                                       meta["regime"])
+            if "pairs" in meta:
+                try:
+                    self.pairs.restore_state({name[len("pairs/"):]: ckpt[name] for name in ckpt.names("pairs/")},
+                                             meta["pairs"])
+                except ValueError as e:
+                    logger.warning("⚖️ Pairs state not restored: %s", e)
+            self.alerts.restore(meta.get("alerts", ()))
+            # Only keys that came back with bars; anything else would be polled blind
+            for symbol, interval in meta["watched"]:
+                series = self.store.get(symbol, interval)
+                if series is not None and not series.data.empty:
+                    self.watched.add((symbol, interval))
+        return True
+
+    # ------------------------------------------------------------ streaming
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def subscribe(self, symbols: List[str], interval: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self._subscribers[queue] = (set(symbols), interval)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.pop(queue, None)
+
+    def _publish(self, change: Dict):
+        if self._loop is None:
+            return
+        message = {"type": "update", **change}
+        for queue, (symbols, interval) in list(self._subscribers.items()):
+            if change["symbol"] in symbols and change["interval"] == interval:
+                self._loop.call_soon_threadsafe(self._offer, queue, message)
+
+    def _publish_alert(self, event: Dict):
+        if self._loop is None:
+            return
+        for queue, (symbols, interval) in list(self._subscribers.items()):
+            if event["symbol"] in symbols and event["interval"] == interval:
+                self._loop.call_soon_threadsafe(self._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: Dict):
+        if queue.full():
+            # A slow client gets the newest state, not an ever-growing backlog
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    async def poll_forever(self):
+        """Background refresh of everything someone is watching"""
+        # Polls queue behind interactive fetches for the upstream rate limit
+        with background():
+            while True:
+                self.expire()
+                for symbol, interval in sorted(self.tracked()):
+                    try:
+                        await asyncio.to_thread(self.refresh, symbol, interval)
+                    except Exception:
+                        # One bad ticker shouldn't stall the rest of the herd
+                        continue
+                await asyncio.to_thread(self.update_regime)
+                await asyncio.sleep(self.ttl_seconds)
+
+
+class AlertRequest(BaseModel):
+    spec: str
+    interval: str = "1h"
+    once: bool = False
+
+
+def create_app(hub: Optional[MarketDataHub] = None,
+               symbols: Optional[List[str]] = None, poll: bool = True,
+               checkpoint_path: Optional[str] = MARKET_CHECKPOINT,
+               admin_token: Optional[str] = MARKET_ADMIN_TOKEN) -> FastAPI:
+    """🏗️ Build the FastAPI app around a hub"""
+    hub = hub or MarketDataHub()
+    symbols = symbols if symbols is not None else DEFAULT_SYMBOLS
+    app = FastAPI(title="🏜️ Sagebrush Market Service")
+    app.state.hub = hub
+
+    @app.on_event("startup")
+    async def _startup():
+        hub.bind_loop(asyncio.get_running_loop())
+        if checkpoint_path:
+            ckpt = load_checkpoint(checkpoint_path)
+            if ckpt is not None and await asyncio.to_thread(hub.restore, ckpt):
+                logger.info("💾 Warm start from %s (%.0fs old)", checkpoint_path, ckpt.age)
+            app.state.checkpointer = Checkpointer(checkpoint_path, hub.checkpoint_state).start()
+        hub.pinned.update((symbol, "1h") for symbol in symbols)
+        if poll:
+            app.state.poller = asyncio.create_task(hub.poll_forever())
+
+    @app.on_event("shutdown")
+    async def _shutdown():
+        poller = getattr(app.state, "poller", None)
+        if poller:
+            poller.cancel()
+        checkpointer = getattr(app.state, "checkpointer", None)
+        if checkpointer:
+            await asyncio.to_thread(checkpointer.stop)
+        if hub.tape:
+            hub.tape.close()
+
+    def _admin(x_admin_token: Optional[str] = Header(None)):
+        # The service listens on every interface; process-wide switches need the token
+        if not admin_token:
+            raise HTTPException(status_code=403, detail="Admin endpoints are off (set MARKET_ADMIN_TOKEN)")
+        if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), admin_token.encode()):
+            raise HTTPException(status_code=401, detail="Admin token required")
+
+    def _json(body: bytes) -> Response:
+        return Response(content=body, media_type="application/json")
+
+    def _lookup(fn, symbol: str, *args):
+        try:
+            return fn(symbol, *args)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"No data for {symbol}")
+
+    @app.get("/api/health")
+    def health():
+        return {
+            "status": "healthy",
+            "tracked": len(hub.tracked()),
+            "subscribers": len(hub._subscribers),
+            "upstream_calls": hub.upstream_calls,
+            "regime": hub.regimes.state()["regime"],
+        }
+
+    @app.get("/api/market_data")
+    def market_data(interval: str = "1h"):
+        snapshots = {}
+        for symbol in sorted({s for s, i in hub.tracked() if i == interval}):
+            try:
+                snapshots[symbol] = hub.snapshot(symbol, interval)
+            except Exception:
+                continue
+        return {"interval": interval, "markets": snapshots}
+
+    @app.get("/api/snapshot/{symbol}")
+    def snapshot(symbol: str, interval: str = "1h"):
+        return _json(_lookup(hub.snapshot_bytes, symbol, interval))
+
+    @app.get("/api/signals/{symbol}")
+    def signals(symbol: str, interval: str = "1h"):
+        return _lookup(hub.snapshot, symbol, interval)["signals"]
+
+    @app.get("/api/signals/{symbol}/last")
+    def signal_last(symbol: str, interval: str = "1h", all_of: str = Query("", alias="all"),
+                    any_of: str = Query("", alias="any")):
+        if hub.signal_store is None:
+            raise HTTPException(status_code=404, detail="Signal history is off (set SIGNAL_STORE)")
+        try:
+            row = hub.signal_store.last(symbol, interval, [r for r in all_of.split(",") if r],
+                                        [r for r in any_of.split(",") if r])
+        except KeyError as e:
+            raise HTTPException(status_code=400, detail=str(e.args[0]))
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"No matching {symbol} {interval} event")
+        return row
+
+    @app.get("/metrics")
+    def metrics():
+        return PlainTextResponse(METRICS.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+    @app.post("/api/debug/instrumentation", dependencies=[Depends(_admin)])
+    def instrumentation(enabled: Optional[bool] = None, profiling: Optional[bool] = None):
+        if enabled is not None:
+            METRICS.enabled = enabled
+        if profiling is not None:
+            METRICS.profiling = profiling
+        return {"enabled": METRICS.enabled, "profiling": METRICS.profiling, "stages": METRICS.snapshot()}
+
+    @app.get("/api/alerts")
+    def list_alerts():
+        return {"alerts": hub.alerts.snapshot()}
+
+    @app.post("/api/alerts", dependencies=[Depends(_admin)])
+    def add_alert(request: AlertRequest):
+        try:
+            hub.check_interval(request.interval)
+            symbols = sorted({alert["symbol"] for alert in parse_alerts(request.spec)})
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # An alert keeps its series polled, so it has to be a series that exists
+        for symbol in symbols:
+            _lookup(hub.series, symbol, request.interval)
+        try:
+            created = hub.alerts.add_spec(request.spec, request.interval, request.once)
+        except ValueError as e:
+            # The spec already parsed, so this is the ALERT_MAX cap
+            raise HTTPException(status_code=429, detail=str(e))
+        return {"alerts": [alert.to_dict() for alert in created]}
+
+    @app.delete("/api/alerts/{alert_id}", dependencies=[Depends(_admin)])
+    def remove_alert(alert_id: int):
+        if not hub.alerts.remove(alert_id):
+            raise HTTPException(status_code=404, detail=f"No alert {alert_id}")
+        return {"removed": alert_id}
+
+    @app.get("/api/regime")
+    def regime(symbol: Optional[str] = None):
+        return hub.regimes.state(symbol)
+
+    @app.get("/api/pairs")
+    def pairs(min_corr: float = Query(0.7, ge=-1, le=1), top: int = Query(20, ge=1, le=500),
+              entry_z: float = Query(2.0, gt=0)):
+        return hub.pairs.scan(min_corr, top, entry_z)
+
+    @app.get("/api/history/{symbol}")
+    def history(symbol: str, interval: str = "1h", limit: int = Query(500, ge=1, le=20000),
+                watch: bool = True):
+        return _json(_lookup(hub.history_bytes, symbol, interval, limit, watch))
+
+    @app.websocket("/ws/stream")
+    async def stream(websocket: WebSocket, symbols: str = "BTC-USD", interval: str = "1h"):
+        await websocket.accept()
+        try:
+            hub.check_interval(interval)
+        except ValueError as e:
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.close(code=1008)
+            return
+        wanted = [s for s in symbols.split(",") if s]
+        queue = hub.subscribe(wanted, interval)
+        try:
+            for symbol in wanted:
+                try:
+                    snap = await asyncio.to_thread(hub.snapshot, symbol, interval)
+                except Exception:
+                    continue
+                await websocket.send_json({"type": "snapshot", **snap})
+            while True:
+                await websocket.send_json(await queue.get())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            hub.unsubscribe(queue)
+
+    return app
+
+
+app = create_app()
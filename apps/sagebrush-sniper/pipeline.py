@@ -0,0 +1,66 @@
+"""
+🔭 Sagebrush Pipeline - The Sniper's fetch → indicators → signals path, minus the UI
+Shared by the Streamlit app and the headless scanner (scan.py)
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import timedelta
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from indicators import calculate_indicators
+from signals import analyze_signals
+from stage_metrics import stage
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MARKET_SERVICE_URL = os.getenv("MARKET_SERVICE_URL", "http://localhost:5000")
+# Lookback per "Time Frame" choice; bar size is picked separately
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 30, "3mo": 90}
+BAR_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}
+
+
+def fetch_base_bars(symbol: str, period: str, interval: str, watch: bool = True) -> pd.DataFrame:
+    """🛰️ Base bars from the shared market service, or yfinance if it's down
+
+    ``watch=False`` is for one-off readers (scans): the service answers but
+    doesn't keep polling the symbol on their behalf.
+    """
+    import pandas as pd
+    import requests
+
+    days = int(period.rstrip("d")) if period.endswith("d") else 60
+    try:
+        with stage("market_service_history"):
+            response = requests.get(
+                f"{MARKET_SERVICE_URL}/api/history/{symbol}",
+                params={"interval": interval, "limit": min(20000, days * 86400 // BAR_SECONDS[interval]),
+                        "watch": str(watch).lower()},
+                timeout=3
+            )
+            if response.status_code == 200:
+                bars = pd.DataFrame(response.json()["bars"])
+                if not bars.empty:
+                    bars.index = pd.to_datetime(bars.pop("time"), utc=True)
+                    return bars
+    except (requests.RequestException, ValueError):
+        pass
+
+    # Coalesced with other sessions' identical fetches and kept under the rate limit
+    from upstream import yfinance_history
+
+    return yfinance_history(symbol, period, interval)
+
+
+def analyze_bars(bars: pd.DataFrame, period: str,
+                 memo: Optional[Dict] = None) -> Tuple[pd.DataFrame, Dict]:
+    """Indicators over everything we hold, trimmed to the lookback, then signals"""
+    with stage("calculate_indicators"):
+        data = calculate_indicators(bars.copy(), memo=memo)
+    cutoff = data.index[-1] - timedelta(days=PERIOD_DAYS.get(period, 30))
+    data = data[data.index > cutoff]
+    with stage("analyze_signals"):
+        signals = analyze_signals(data)
+    return data, signals
@@ -0,0 +1,238 @@
+"""
+🌪️ Sagebrush Regime Engine - Reads the weather across the whole frontier
+Rolling volatility, volume profiles and cross-asset correlation, one bar at a time
+
+Everything is exponentially weighted, so each bar folds into the running
+state instead of recomputing from history: O(n) for volatility and volume,
+one O(n²) rank-one update for the covariance matrix. The average pairwise
+correlation comes from ``z' C z`` with ``z = 1/σ`` - another O(n²) pass with
+no correlation matrix materialized.
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+WARMING_UP = 'WARMING_UP'
+HIGH_VOLATILITY_DECOUPLED = 'HIGH_VOLATILITY_DECOUPLED'
+HIGH_VOLATILITY_CORRELATED = 'HIGH_VOLATILITY_CORRELATED'
+HIGH_VOLATILITY = 'HIGH_VOLATILITY'
+LOW_VOLATILITY_QUIET = 'LOW_VOLATILITY_QUIET'
+NORMAL = 'NORMAL'
+
+HOURS_PER_DAY = 24
+
+
+def _alpha(halflife: float) -> float:
+    return 1.0 - 0.5 ** (1.0 / halflife)
+
+
+class RegimeEngine:
+    """🎯 Incremental EW volatility / volume / covariance state for a symbol universe
+
+    ``step`` takes one cross-section of closes (and optionally volumes) per
+    bar. Missing prices carry forward as a zero return; the universe grows on
+    demand when new symbols show up.
+    """
+
+    def __init__(self, symbols: Sequence[str] = (), fast_halflife: float = 24,
+                 slow_halflife: float = 168, min_bars: int = 24,
+                 high_vol_ratio: float = 1.5, low_vol_ratio: float = 0.7,
+                 decoupled_corr: float = 0.3, correlated_corr: float = 0.6):
+        self.fast = _alpha(fast_halflife)
+        self.slow = _alpha(slow_halflife)
+        self.min_bars = min_bars
+        self.high_vol_ratio = high_vol_ratio
+        self.low_vol_ratio = low_vol_ratio
+        self.decoupled_corr = decoupled_corr
+        self.correlated_corr = correlated_corr
+
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.last_price = np.empty(0)
+        self.mean = np.empty(0)
+        self.cov = np.empty((0, 0))
+        self.slow_var = np.empty(0)
+        self.volume_profile = np.empty((0, HOURS_PER_DAY))
+        self.volume_ratio = np.empty(0)
+        self.bars = 0
+        self.last_ts: Optional[int] = None
+        self._outer = np.empty((0, 0))
+        self._market_cache = None
+        self._lock = threading.Lock()
+        self.ensure(symbols)
+
+    # ------------------------------------------------------------ universe
+
+    def ensure(self, symbols: Sequence[str]) -> np.ndarray:
+        """Grow the universe to include ``symbols``; return their positions"""
+        with self._lock:
+            new = [s for s in dict.fromkeys(symbols) if s not in self.index]
+            if new:
+                n, k = len(self.symbols), len(new)
+                for offset, symbol in enumerate(new):
+                    self.index[symbol] = n + offset
+                self.symbols.extend(new)
+                self.last_price = np.r_[self.last_price, np.full(k, np.nan)]
+                self.mean = np.r_[self.mean, np.zeros(k)]
+                self.slow_var = np.r_[self.slow_var, np.zeros(k)]
+                self.volume_ratio = np.r_[self.volume_ratio, np.ones(k)]
+                self.volume_profile = np.vstack([self.volume_profile, np.full((k, HOURS_PER_DAY), np.nan)])
+                self.cov = np.pad(self.cov, ((0, k), (0, k)))
+                self._outer = np.empty_like(self.cov)
+                self._market_cache = None
+            return np.fromiter((self.index[s] for s in symbols), dtype=np.intp, count=len(symbols))
+
+    # ------------------------------------------------------------ updates
+
+    def step(self, closes: np.ndarray, volumes: Optional[np.ndarray] = None,
+             ts: Optional[int] = None):
+        """Fold one bar for the whole universe (arrays in ``self.symbols`` order)
+
+        ``ts`` is the bar open time in epoch nanoseconds; it picks the
+        hour-of-day bucket of the volume profile.
+        """
+        closes = np.asarray(closes, dtype=float)
+        with self._lock:
+            seen = np.isfinite(closes) & np.isfinite(self.last_price) & (closes > 0)
+            returns = np.zeros(len(closes))
+            np.log(closes, out=returns, where=seen)
+            returns[seen] -= np.log(self.last_price[seen])
+            np.copyto(self.last_price, closes, where=np.isfinite(closes) & (closes > 0))
+
+            # West's EW covariance: C <- (1 - a)(C + a d d')
+            a = self.fast
+            delta = returns - self.mean
+            self.mean += a * delta
+            np.multiply.outer(delta, delta, out=self._outer)
+            self._outer *= a
+            self.cov += self._outer
+            self.cov *= 1.0 - a
+            self.slow_var += self.slow * (returns * returns - self.slow_var)
+
+            if volumes is not None:
+                self._fold_volume(np.asarray(volumes, dtype=float), ts)
+            self.bars += 1
+            self.last_ts = ts
+
+    def _fold_volume(self, volumes: np.ndarray, ts: Optional[int]):
+        hour = 0 if ts is None else int(ts // 3_600_000_000_000 % HOURS_PER_DAY)
+        column = self.volume_profile[:, hour]
+        valid = np.isfinite(volumes) & (volumes > 0)
+        fresh = valid & ~np.isfinite(column)
+        ratio = np.ones(len(volumes))
+        np.divide(volumes, column, out=ratio, where=valid & ~fresh)
+        self.volume_ratio = np.where(valid, ratio, self.volume_ratio)
+        column[fresh] = volumes[fresh]
+        update = valid & ~fresh
+        column[update] += self.slow * (volumes[update] - column[update])
+
+    def step_many(self, closes: np.ndarray, volumes: Optional[np.ndarray] = None,
+                  ts: Optional[np.ndarray] = None):
+        """Fold a ``(bars, assets)`` block, oldest row first"""
+        for i in range(len(closes)):
+            self.step(closes[i], None if volumes is None else volumes[i],
+                      None if ts is None else int(ts[i]))
+
+    # ------------------------------------------------------------ checkpoints
+
+    STATE_ARRAYS = ('last_price', 'mean', 'cov', 'slow_var', 'volume_profile', 'volume_ratio')
+
+    def export_state(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """``(arrays, meta)`` copy of the running state, for ``checkpoint.py``"""
+        with self._lock:
+            arrays = {name: getattr(self, name).copy() for name in self.STATE_ARRAYS}
+            return arrays, {'symbols': list(self.symbols), 'bars': self.bars, 'last_ts': self.last_ts}
+
+    def restore_state(self, arrays: Dict[str, np.ndarray], meta: Dict):
+        """Resume from ``export_state`` output instead of warming up again"""
+        n = len(meta['symbols'])
+        if arrays['cov'].shape != (n, n):
+            raise ValueError("Regime checkpoint doesn't match its symbol list")
+        with self._lock:
+            self.symbols = list(meta['symbols'])
+            self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+            for name in self.STATE_ARRAYS:
+                setattr(self, name, np.array(arrays[name], dtype=float))
+            self.bars = int(meta['bars'])
+            self.last_ts = meta['last_ts']
+            self._outer = np.empty_like(self.cov)
+            self._market_cache = None
+
+    # ------------------------------------------------------------ readouts
+
+    def volatility(self) -> np.ndarray:
+        """Per-bar EW volatility of each asset"""
+        return np.sqrt(np.clip(np.diagonal(self.cov), 0.0, None))
+
+    def average_correlation(self) -> float:
+        """Mean off-diagonal correlation, without building the matrix"""
+        sigma = self.volatility()
+        live = sigma > 0
+        n = int(live.sum())
+        if n < 2:
+            return 0.0
+        z = 1.0 / sigma[live]
+        total = z @ self.cov[np.ix_(live, live)] @ z
+        return float((total - n) / (n * (n - 1)))
+
+    def correlation_matrix(self) -> np.ndarray:
+        sigma = self.volatility()
+        z = np.divide(1.0, sigma, out=np.zeros_like(sigma), where=sigma > 0)
+        return self.cov * np.multiply.outer(z, z)
+
+    def classify(self, vol_ratio: float, avg_corr: float) -> str:
+        if self.bars < self.min_bars or not self.symbols:
+            return WARMING_UP
+        if vol_ratio >= self.high_vol_ratio:
+            if avg_corr < self.decoupled_corr:
+                return HIGH_VOLATILITY_DECOUPLED
+            if avg_corr >= self.correlated_corr:
+                return HIGH_VOLATILITY_CORRELATED
+            return HIGH_VOLATILITY
+        if vol_ratio <= self.low_vol_ratio:
+            return LOW_VOLATILITY_QUIET
+        return NORMAL
+
+    def _market(self) -> Dict:
+        """Universe-wide readout, computed once per bar"""
+        if self._market_cache is not None and self._market_cache[0] == self.bars:
+            return self._market_cache[1]
+        sigma = self.volatility()
+        live = sigma > 0
+        vol_ratio = float(np.median(sigma[live] / np.sqrt(self.slow_var[live]))) if live.any() else 1.0
+        avg_corr = self.average_correlation()
+        market = {
+            'regime': self.classify(vol_ratio, avg_corr),
+            'volatility': float(np.median(sigma[live])) if live.any() else 0.0,
+            'volatility_ratio': vol_ratio,
+            'avg_correlation': avg_corr,
+            'volume_ratio': float(np.median(self.volume_ratio)) if len(self.volume_ratio) else 1.0,
+            'assets': len(self.symbols),
+            'bars': self.bars,
+        }
+        self._market_cache = (self.bars, market)
+        return market
+
+    def state(self, symbol: Optional[str] = None) -> Dict:
+        """📊 Current regime plus the numbers behind it (and one asset's view)"""
+        with self._lock:
+            state = dict(self._market())
+            i = self.index.get(symbol) if symbol else None
+            if i is None or self.cov[i, i] <= 0:
+                return state
+            # Mean correlation of this asset with the rest: row i of z' C z, O(n)
+            sigma = self.volatility()
+            live = sigma > 0
+            z = np.divide(1.0, sigma, out=np.zeros_like(sigma), where=live)
+            peers = int(live.sum()) - 1
+            row = float(z[i] * (self.cov[i] @ z) - 1.0)
+            state['asset'] = {
+                'symbol': symbol,
+                'volatility': float(sigma[i]),
+                'volatility_ratio': float(sigma[i] / np.sqrt(self.slow_var[i])) if self.slow_var[i] > 0 else 1.0,
+                'avg_correlation': row / peers if peers > 0 else 0.0,
+                'volume_ratio': float(self.volume_ratio[i]),
+            }
+            return state
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+🎲 Sagebrush Robustness - Walk-forward and Monte Carlo for the Sniper's scoring
+Don't trust a strategy that's only ever seen the trail it was blazed on
+
+    python robustness.py BTC-USD                        # 1y of 1h bars, 10k paths
+    python robustness.py BTC-USD --csv btc_1h.csv       # offline, any OHLCV csv
+    python robustness.py ETH-USD --paths 20000 --workers 8 --json
+
+Walk-forward: each rolling split picks the entry/exit score thresholds that
+did best in-sample (the scoring weights themselves stay as
+``signals.get_recommendation`` uses them) and trades the next window with them.
+The stitched out-of-sample returns are then block-bootstrapped into
+thousands of alternative histories for Sharpe and drawdown confidence
+intervals.
+
+Price returns, scores and out-of-sample returns sit in shared memory; the
+process pool attaches to them once per worker, so tasks ship only a few
+integers each.
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BARS_PER_YEAR = {"5m": 105120, "15m": 35040, "1h": 8760, "4h": 2190, "1d": 365}
+# Entry: buy score needed to go long. Exit: sell score needed to go flat.
+# (3, 3) is exactly signals.get_recommendation's BUY / SELL boundary.
+DEFAULT_THRESHOLDS = (3, 3)
+THRESHOLD_GRID = [(entry, exit_) for entry in range(2, 7) for exit_ in range(2, 7)]
+
+_ATTACHED: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+
+
+# ---------------------------------------------------------------- shared arrays
+
+def share(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple[str, Tuple[int, ...]]]:
+    """Copy ``array`` (float64) into shared memory; return the block and its handle"""
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=np.float64, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape)
+
+
+def attached(handle: Tuple[str, Tuple[int, ...]]) -> np.ndarray:
+    """Worker-side view of a shared array (attached once per process)"""
+    name, shape = handle
+    if name not in _ATTACHED:
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            import multiprocessing
+            from multiprocessing import resource_tracker
+
+            block = shared_memory.SharedMemory(name=name)
+            if multiprocessing.get_start_method() != "fork":
+                # Python < 3.13 under spawn: this worker's own tracker would unlink the parent's block
+                resource_tracker.unregister(block._name, "shared_memory")
+        _ATTACHED[name] = (block, np.ndarray(shape, dtype=np.float64, buffer=block.buf))
+    return _ATTACHED[name][1]
+
+
+# ---------------------------------------------------------------- strategy
+
+def positions(buy: np.ndarray, sell: np.ndarray, entry: int, exit_: int) -> np.ndarray:
+    """Long/flat state from scores: long on buy >= entry, flat on sell >= exit, else hold"""
+    go_long = buy >= entry
+    go_flat = (sell >= exit_) & ~go_long
+    event = go_long | go_flat
+    last = np.maximum.accumulate(np.where(event, np.arange(len(buy)), -1))
+    return np.where(last >= 0, go_long[np.maximum(last, 0)], False).astype(np.float64)
+
+
+def strategy_returns(returns: np.ndarray, buy: np.ndarray, sell: np.ndarray,
+                     entry: int, exit_: int, fee: float) -> np.ndarray:
+    """Bar returns of the strategy: yesterday's position earns today's move, minus turnover"""
+    pos = positions(buy, sell, entry, exit_)
+    held = np.r_[0.0, pos[:-1]]
+    turnover = np.abs(np.diff(np.r_[0.0, pos]))
+    return held * returns - fee * turnover
+
+
+def sharpe(returns: np.ndarray, bars_per_year: int, axis: int = -1) -> np.ndarray:
+    std = returns.std(axis=axis)
+    mean = returns.mean(axis=axis)
+    return np.divide(mean, std, out=np.zeros_like(mean), where=std > 0) * np.sqrt(bars_per_year)
+
+
+def max_drawdown(returns: np.ndarray, axis: int = -1) -> np.ndarray:
+    """Worst peak-to-trough loss of the compounded equity curve (0..1)"""
+    log_equity = np.cumsum(np.log1p(returns), axis=axis)
+    peak = np.maximum(np.maximum.accumulate(log_equity, axis=axis), 0.0)
+    return 1.0 - np.exp((log_equity - peak).min(axis=axis))
+
+
+# ---------------------------------------------------------------- pool tasks
+
+def _walk_forward_split(market, train: Tuple[int, int], test: Tuple[int, int],
+                        fee: float, bars_per_year: int) -> Dict:
+    data = attached(market)
+    returns, buy, sell = data[0], data[1], data[2]
+    t0, t1 = train
+    best, best_sharpe = DEFAULT_THRESHOLDS, -np.inf
+    for entry, exit_ in THRESHOLD_GRID:
+        score = float(sharpe(strategy_returns(returns[t0:t1], buy[t0:t1], sell[t0:t1], entry, exit_, fee),
+                             bars_per_year))
+        if score > best_sharpe:
+            best, best_sharpe = (entry, exit_), score
+    s0, s1 = test
+    # Warm the position up on the training window so the test starts in the right state
+    oos = strategy_returns(returns[t0:s1], buy[t0:s1], sell[t0:s1], *best, fee)[s0 - t0:]
+    return {"train": train, "test": test, "thresholds": best, "in_sample_sharpe": best_sharpe,
+            "oos_sharpe": float(sharpe(oos, bars_per_year)), "oos": oos}
+
+
+def _bootstrap_chunk(series, seed: int, paths: int, block: int, bars_per_year: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Moving-block bootstrap: paths x len(series) resampled in blocks of ``block`` bars
+
+    A series shorter than ``block`` is one block: every path is the series itself.
+    """
+    returns = attached(series)
+    n = len(returns)
+    block = max(1, min(block, n))
+    rng = np.random.default_rng(seed)
+    blocks = -(-n // block)
+    starts = rng.integers(0, n - block + 1, size=(paths, blocks))
+    index = (starts[:, :, None] + np.arange(block)).reshape(paths, -1)[:, :n]
+    sample = returns[index]
+    return sharpe(sample, bars_per_year, axis=1), max_drawdown(sample, axis=1)
+
+
+# ---------------------------------------------------------------- runner
+
+def splits(n: int, train: int, test: int) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Rolling (train, test) index windows stepping forward by ``test`` bars"""
+    out = []
+    start = 0
+    while start + train + test <= n:
+        out.append(((start, start + train), (start + train, start + train + test)))
+        start += test
+    return out
+
+
+def _interval(values: np.ndarray) -> Dict:
+    lo, mid, hi = np.percentile(values, [2.5, 50, 97.5])
+    return {"p2_5": float(lo), "median": float(mid), "p97_5": float(hi)}
+
+
+def run_robustness(bars, interval: str = "1h", paths: int = 10000, block: int = 24,
+                   train_bars: Optional[int] = None, test_bars: Optional[int] = None,
+                   fee_bps: float = 10.0, workers: Optional[int] = None,
+                   chunk_paths: int = 250, seed: int = 7) -> Dict:
+    """🎯 Walk-forward + block-bootstrap report for an OHLCV frame"""
+    from indicators import calculate_indicators
+    from signals import signal_scores
+
+    started = time.perf_counter()
+    bars_per_year = BARS_PER_YEAR.get(interval, 8760)
+    data = calculate_indicators(bars[['Open', 'High', 'Low', 'Close', 'Volume']].astype(float).copy())
+    buy, sell = signal_scores(data)
+    returns = np.nan_to_num(data['Close'].pct_change().to_numpy())
+    n = len(returns)
+    fee = fee_bps / 10000
+    train_bars = train_bars or n // 4
+    test_bars = test_bars or n // 12
+    windows = splits(n, train_bars, test_bars)
+    if not windows:
+        raise ValueError(f"Need more than {train_bars + test_bars} bars for walk-forward, got {n}")
+
+    market_block, market = share(np.vstack([returns, buy, sell]))
+    oos_block = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            folds = list(pool.map(_walk_forward_split, [market] * len(windows),
+                                  [w[0] for w in windows], [w[1] for w in windows],
+                                  [fee] * len(windows), [bars_per_year] * len(windows)))
+            oos = np.concatenate([fold.pop("oos") for fold in folds])
+            walk_forward_s = time.perf_counter() - started
+
+            oos_block, series = share(oos)
+            block = max(1, min(block, len(oos)))  # what _bootstrap_chunk will really use
+            seeds = np.random.SeedSequence(seed).generate_state(-(-paths // chunk_paths))
+            sizes = [min(chunk_paths, paths - i * chunk_paths) for i in range(len(seeds))]
+            chunks = list(pool.map(_bootstrap_chunk, [series] * len(seeds), seeds.tolist(), sizes,
+                                   [block] * len(seeds), [bars_per_year] * len(seeds)))
+    finally:
+        market_block.close()
+        market_block.unlink()
+        if oos_block is not None:
+            oos_block.close()
+            oos_block.unlink()
+
+    sharpes = np.concatenate([c[0] for c in chunks])
+    drawdowns = np.concatenate([c[1] for c in chunks])
+    in_sample = strategy_returns(returns, buy, sell, *DEFAULT_THRESHOLDS, fee)
+    return {
+        "bars": n,
+        "interval": interval,
+        "splits": len(folds),
+        "folds": folds,
+        "default_full_sample": {"sharpe": float(sharpe(in_sample, bars_per_year)),
+                                "max_drawdown": float(max_drawdown(in_sample))},
+        "walk_forward": {"sharpe": float(sharpe(oos, bars_per_year)),
+                         "max_drawdown": float(max_drawdown(oos)),
+                         "bars": len(oos)},
+        "monte_carlo": {
+            "paths": len(sharpes),
+            "block": block,
+            "sharpe": _interval(sharpes),
+            "max_drawdown": _interval(drawdowns),
+            "prob_sharpe_below_zero": float((sharpes < 0).mean()),
+        },
+        "seconds": {"walk_forward": walk_forward_s, "total": time.perf_counter() - started},
+    }
+
+
+def _load_bars(symbol: str, period: str, interval: str, csv: Optional[str]):
+    import pandas as pd
+
+    if csv:
+        return pd.read_csv(csv, index_col=0, parse_dates=True)
+    import yfinance as yf
+
+    return yf.Ticker(symbol).history(period=period, interval=interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🎲 Walk-forward + Monte Carlo for the Sagebrush Sniper")
+    parser.add_argument("symbol", nargs="?", default="BTC-USD")
+    parser.add_argument("--period", default="1y")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--csv", help="read OHLCV bars from a csv instead of yfinance")
+    parser.add_argument("--paths", type=int, default=10000, help="Monte Carlo paths (default 10000)")
+    parser.add_argument("--block", type=int, default=24, help="bootstrap block length in bars")
+    parser.add_argument("--fee-bps", type=float, default=10.0, help="cost per position change")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    bars = _load_bars(args.symbol, args.period, args.interval, args.csv)
+    if bars.empty:
+        sys.exit(f"🤠 Couldn't rustle up data for {args.symbol}, partner!")
+    report = run_robustness(bars, args.interval, args.paths, args.block,
+                            fee_bps=args.fee_bps, workers=args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n🎯 {args.symbol} {args.interval}: {report['bars']} bars, {report['splits']} walk-forward splits")
+    for fold in report["folds"]:
+        print(f"   test {fold['test'][0]:>6}-{fold['test'][1]:<6} thresholds {fold['thresholds']} "
+              f"in-sample {fold['in_sample_sharpe']:6.2f}  out-of-sample {fold['oos_sharpe']:6.2f}")
+    full, wf, mc = report["default_full_sample"], report["walk_forward"], report["monte_carlo"]
+    print(f"\n   default (3, 3) full sample  Sharpe {full['sharpe']:6.2f}  max DD {full['max_drawdown']:6.1%}")
+    print(f"   walk-forward out-of-sample  Sharpe {wf['sharpe']:6.2f}  max DD {wf['max_drawdown']:6.1%}")
+    print(f"\n🎲 {mc['paths']} block-bootstrap paths (block {mc['block']} bars)")
+    for name, fmt in (("sharpe", "{:6.2f}"), ("max_drawdown", "{:6.1%}")):
+        ci = mc[name]
+        print(f"   {name:<13} 95% CI [{fmt.format(ci['p2_5'])}, {fmt.format(ci['p97_5'])}]"
+              f"  median {fmt.format(ci['median'])}")
+    print(f"   P(Sharpe < 0) {mc['prob_sharpe_below_zero']:.1%}")
+    print(f"\n⏱️ {report['seconds']['total']:.1f}s total ({report['seconds']['walk_forward']:.1f}s walk-forward)")
+
+
+if __name__ == "__main__":
+    main()
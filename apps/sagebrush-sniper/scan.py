@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+🔭 Sagebrush Scanner - The Sniper's whole pipeline over a universe, no clicking
+Nightly scans as a cron job: worker pool, streaming output, resumable
+
+    cd apps/sagebrush-sniper
+    python scan.py BTC-USD ETH-USD SOL-USD                        # JSONL to stdout
+    python scan.py --symbols-file universe.txt --out nightly.jsonl --workers 8
+    python scan.py --symbols-file universe.txt --out nightly.csv --resume
+    python scan.py --symbols-file universe.txt --out nightly/ --format parquet --resume
+
+Each symbol goes through exactly what ANALYZE TARGET does. Base bars come
+from the market service (yfinance if it's down) and are stacked into the bar
+pyramid. Indicators run over the chosen bar size, the result is trimmed to
+the time frame, and signals are scored. One flat row per symbol is written
+as soon as it finishes, with at most ``--window`` symbols in flight, so
+memory stays flat however long the list is.
+
+``--resume`` skips symbols that already have an ``ok`` row; failed ones are
+retried and the later row wins. A crash can leave a torn last line in JSONL
+or CSV, which is trimmed before appending. Parquet output is a directory
+with one part file per run; each row also goes to the part's journal
+(``part-NNNNN.parquet.rows.jsonl``) as it is written, and the journal is
+removed once the part has its footer. A crashed part is rebuilt from its
+journal on ``--resume``, so nothing past the last finished row is lost.
+
+The upstream rate limit (``UPSTREAM_LIMITS``) is per process, so it is
+split evenly across the workers.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import _paths  # noqa: F401  (repo-root modules; keep first)
+
+BAR_SIZES = ["5m", "15m", "1h", "4h", "1d"]
+PERIODS = ["1d", "5d", "1mo", "3mo"]
+FIELDS = [
+    "symbol", "status", "error", "period", "interval", "bars", "last_bar",
+    "current_price", "rsi", "macd", "volume_ratio", "buy_score", "sell_score",
+    "recommendation", "buy_signals", "sell_signals", "seconds", "scanned_at",
+]
+FORMATS = {".jsonl": "jsonl", ".json": "jsonl", ".csv": "csv", ".parquet": "parquet"}
+
+
+# ---------------------------------------------------------------- worker side
+
+def _init_worker(workers: int):
+    """Give each worker process its share of the upstream rate limit"""
+    from upstream import UPSTREAM, UPSTREAM_LIMITS, parse_limits
+
+    for provider, (rate, burst) in parse_limits(UPSTREAM_LIMITS).items():
+        UPSTREAM.configure(provider, rate / workers, max(1.0, burst / workers))
+
+
+def scan_symbol(symbol: str, period: str, interval: str) -> Dict:
+    """One symbol through the Sniper pipeline, flattened to a row (errors become rows too)"""
+    from bar_pyramid import BASE_HISTORY, PYRAMID_BASE, BarPyramid
+    from bar_store import to_plain
+    from pipeline import analyze_bars, fetch_base_bars
+
+    started = time.perf_counter()
+    row: Dict = {"symbol": symbol, "period": period, "interval": interval}
+    try:
+        pyramid = BarPyramid(PYRAMID_BASE)
+        pyramid.ingest(fetch_base_bars(symbol, BASE_HISTORY.get(PYRAMID_BASE, "60d"), PYRAMID_BASE,
+                                       watch=False))
+        bars = pyramid.get(interval)
+        if bars.empty:
+            raise LookupError("no bars")
+        data, signals = analyze_bars(bars, period)
+        row.update({
+            "status": "ok",
+            "bars": len(data),
+            "last_bar": data.index[-1].isoformat(),
+            **{key: to_plain(signals[key]) for key in
+               ("current_price", "rsi", "macd", "volume_ratio", "buy_score", "sell_score", "recommendation")},
+            "buy_signals": "; ".join(signals["buy_signals"]),
+            "sell_signals": "; ".join(signals["sell_signals"]),
+        })
+    except Exception as e:
+        row.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    row["seconds"] = round(time.perf_counter() - started, 3)
+    row["scanned_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return {field: row.get(field) for field in FIELDS}
+
+
+# ---------------------------------------------------------------- sinks
+
+def _trim_torn_tail(path: str):
+    """Drop a partial last line left by a crash mid-write"""
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Walk back to the last newline in modest chunks
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            cut = f.read(end - start).rfind(b"\n")
+            if cut >= 0:
+                f.truncate(start + cut + 1)
+                return
+            end = start
+        f.truncate(0)
+
+
+class JsonlSink:
+    """One JSON object per line, flushed per row (stdout when ``path`` is None)"""
+
+    def __init__(self, path: Optional[str], append: bool):
+        if path:
+            if append and os.path.exists(path):
+                _trim_torn_tail(path)
+            self._file = open(path, "a" if append else "w", encoding="utf-8")
+        else:
+            self._file = sys.stdout
+
+    @staticmethod
+    def done(path: str) -> Set[str]:
+        ok = set()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if row.get("status") == "ok":
+                    ok.add(row["symbol"])
+        return ok
+
+    def write(self, row: Dict):
+        self._file.write(json.dumps(row) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class CsvSink:
+    """Flat CSV with a header row, flushed per row"""
+
+    def __init__(self, path: str, append: bool):
+        fresh = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        if not fresh:
+            _trim_torn_tail(path)
+        self._file = open(path, "w" if fresh else "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS)
+        if fresh:
+            self._writer.writeheader()
+
+    @staticmethod
+    def done(path: str) -> Set[str]:
+        with open(path, newline="", encoding="utf-8") as f:
+            return {row["symbol"] for row in csv.DictReader(f) if row.get("status") == "ok"}
+
+    def write(self, row: Dict):
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """A directory of part files; rows are buffered into row groups of ``row_group``
+
+    Every row is journaled (JSON lines, flushed) beside the open part until
+    its footer is written, so a crash loses at most a torn last line.
+    """
+
+    JOURNAL = ".rows.jsonl"
+
+    def __init__(self, path: str, append: bool, row_group: int = 1000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        os.makedirs(path, exist_ok=True)
+        self.schema = pa.schema([
+            (field, pa.float64() if field in ("current_price", "rsi", "macd", "volume_ratio", "seconds")
+             else pa.int64() if field in ("bars", "buy_score", "sell_score") else pa.string())
+            for field in FIELDS
+        ])
+        if append:
+            self._recover(path)
+        self.part = os.path.join(path, f"part-{self._next_part(path):05d}.parquet")
+        self._writer = pq.ParquetWriter(self.part, self.schema)
+        self._journal = open(self.part + self.JOURNAL, "w", encoding="utf-8")
+        self._rows: List[Dict] = []
+        self.row_group = row_group
+
+    @staticmethod
+    def _next_part(path: str) -> int:
+        """One past the highest part number, so a deleted part never hands out a live name"""
+        numbers = [int(name[len("part-"):].split(".", 1)[0]) for name in os.listdir(path)
+                   if name.startswith("part-") and name.split(".", 1)[0][len("part-"):].isdigit()]
+        return max(numbers, default=-1) + 1
+
+    @classmethod
+    def _journal_rows(cls, journal: str) -> List[Dict]:
+        rows = []
+        with open(journal, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue  # torn last line
+        return rows
+
+    @staticmethod
+    def _readable(part: str) -> bool:
+        import pyarrow.parquet as pq
+
+        try:
+            pq.read_metadata(part)
+            return True
+        except Exception:
+            return False
+
+    def _recover(self, path: str):
+        """Rebuild parts that crashed before their footer from their journals"""
+        import pyarrow.parquet as pq
+
+        for name in sorted(os.listdir(path)):
+            if not name.endswith(self.JOURNAL):
+                continue
+            journal = os.path.join(path, name)
+            part = journal[:-len(self.JOURNAL)]
+            if not self._readable(part):
+                rows = self._journal_rows(journal)
+                pq.write_table(self._pa.Table.from_pylist(rows, schema=self.schema), part)
+            os.unlink(journal)
+
+    @classmethod
+    def done(cls, path: str) -> Set[str]:
+        import pyarrow.parquet as pq
+
+        ok: Set[str] = set()
+        for name in sorted(os.listdir(path)):
+            full = os.path.join(path, name)
+            if name.endswith(cls.JOURNAL):
+                if not cls._readable(full[:-len(cls.JOURNAL)]):
+                    ok.update(row["symbol"] for row in cls._journal_rows(full) if row.get("status") == "ok")
+                continue
+            if not name.endswith(".parquet"):
+                continue
+            try:
+                table = pq.read_table(full, columns=["symbol", "status"])
+            except Exception:
+                continue  # crashed before its footer was written (its journal has the rows)
+            for symbol, status in zip(table.column("symbol").to_pylist(), table.column("status").to_pylist()):
+                if status == "ok":
+                    ok.add(symbol)
+        return ok
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def write(self, row: Dict):
+        self._journal.write(json.dumps(row) + "\n")
+        self._journal.flush()
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        self._journal.close()
+        os.unlink(self.part + self.JOURNAL)
+
+
+SINKS = {"jsonl": JsonlSink, "csv": CsvSink, "parquet": ParquetSink}
+
+
+# ---------------------------------------------------------------- driver
+
+def read_symbols(symbols: Iterable[str], symbols_file: Optional[str]) -> Iterator[str]:
+    """Command-line symbols, then the file's (one per line, ``#`` comments), deduplicated"""
+    seen: Set[str] = set()
+
+    def lines():
+        yield from symbols
+        if symbols_file == "-":
+            # Not in a ``with``: closing stdin would break anything reading it later
+            for line in sys.stdin:
+                yield line.split("#", 1)[0]
+        elif symbols_file:
+            with open(symbols_file, encoding="utf-8") as f:
+                for line in f:
+                    yield line.split("#", 1)[0]
+
+    for raw in lines():
+        for symbol in raw.replace(",", " ").split():
+            symbol = symbol.strip().upper()
+            if symbol and symbol not in seen:
+                seen.add(symbol)
+                yield symbol
+
+
+def run_scan(symbols: Iterable[str], sink, period: str, interval: str, workers: int,
+             window: int, progress=None) -> Dict:
+    """Scan with at most ``window`` symbols in flight, writing rows as they complete"""
+    stats = {"scanned": 0, "ok": 0, "errors": 0, "recommendations": {}}
+    started = time.perf_counter()
+
+    def record(row: Dict):
+        stats["scanned"] += 1
+        if row["status"] == "ok":
+            stats["ok"] += 1
+            label = row["recommendation"].split(" - ")[0]
+            stats["recommendations"][label] = stats["recommendations"].get(label, 0) + 1
+        else:
+            stats["errors"] += 1
+        sink.write(row)
+        if progress:
+            progress(stats, row)
+
+    queue = iter(symbols)
+    if workers <= 1:
+        for symbol in queue:
+            record(scan_symbol(symbol, period, interval))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(workers,)) as pool:
+            pending = set()
+            for symbol in queue:
+                pending.add(pool.submit(scan_symbol, symbol, period, interval))
+                if len(pending) >= window:
+                    break
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(future.result())
+                    symbol = next(queue, None)
+                    if symbol is not None:
+                        pending.add(pool.submit(scan_symbol, symbol, period, interval))
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🔭 Headless Sagebrush Sniper scan")
+    parser.add_argument("symbols", nargs="*", help="symbols (also accepts comma-separated)")
+    parser.add_argument("--symbols-file", help="one symbol per line, '#' comments; '-' for stdin")
+    parser.add_argument("--period", default="1mo", choices=PERIODS, help="time frame (as in the app)")
+    parser.add_argument("--interval", default="1h", choices=BAR_SIZES, help="bar size")
+    parser.add_argument("--out", help="output file (JSONL/CSV) or directory (Parquet); stdout if omitted")
+    parser.add_argument("--format", choices=sorted(SINKS), help="default: from --out's extension, else jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--window", type=int, default=0, help="max symbols in flight (default 4 x workers)")
+    parser.add_argument("--resume", action="store_true", help="skip symbols already scanned ok in --out")
+    parser.add_argument("--quiet", action="store_true", help="no progress on stderr")
+    args = parser.parse_args()
+
+    fmt = args.format or FORMATS.get(os.path.splitext(args.out or "")[1].lower(), "jsonl")
+    if fmt != "jsonl" and not args.out:
+        parser.error(f"--format {fmt} needs --out")
+    if args.resume and not args.out:
+        parser.error("--resume needs --out")
+    if args.out and os.path.exists(args.out) and not args.resume:
+        parser.error(f"{args.out} exists; pass --resume to continue it or choose a new path")
+    if not args.symbols and not args.symbols_file:
+        parser.error("give symbols or --symbols-file")
+
+    skip = SINKS[fmt].done(args.out) if args.resume and os.path.exists(args.out) else set()
+    symbols = (s for s in read_symbols(args.symbols, args.symbols_file) if s not in skip)
+    sink = SINKS[fmt](args.out, append=args.resume)
+
+    def progress(stats: Dict, row: Dict):
+        mark = "✅" if row["status"] == "ok" else "❌"
+        print(f"\r{mark} {stats['scanned']} scanned ({stats['errors']} errors)  {row['symbol']:<14}",
+              end="", file=sys.stderr, flush=True)
+
+    try:
+        stats = run_scan(symbols, sink, args.period, args.interval, args.workers,
+                         args.window or 4 * args.workers, None if args.quiet else progress)
+    finally:
+        sink.close()
+    rate = stats["scanned"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"\n🔭 {stats['scanned']} scanned, {stats['ok']} ok, {stats['errors']} errors, "
+          f"{len(skip)} skipped (resume) in {stats['seconds']:.1f}s ({rate:.1f}/s)", file=sys.stderr)
+    for label, count in sorted(stats["recommendations"].items(), key=lambda kv: -kv[1]):
+        print(f"   {label}: {count}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+🗂️ Sagebrush Signal Store - Every shot the Sniper ever called, on the record
+Columnar, append-only signal events with rule bitsets, by symbol and time
+
+    store = SignalStore("signal_events")
+    store.append("ETH-USD", "1h", signals, bar_ts_ns)      # one analyze_signals result
+    store.last("ETH-USD", "1h", all_of=["macd_bullish_cross", "volume_confirmation"])
+    store.events("BTC-USD", "1h", start=t0, end=t1, any_of=["rsi_oversold"])
+    store.changes("SOL-USD", "1h")                          # recommendation flips (audit)
+    store.co_occurrence(["macd_bullish_cross"], min_symbols=3)
+
+    python signal_store.py backfill BTC-USD ETH-USD --period 730d --interval 1h
+    python signal_store.py last ETH-USD --all macd_bullish_cross,volume_confirmation
+    python signal_store.py bench --symbols 300 --years 3
+
+Each (symbol, interval) partition is a directory of column files: ``ts``
+(bar open, epoch ns), ``at`` (evaluation time), ``bits`` (one bit per rule
+in ``signals.RULES``), ``buy``/``sell`` scores, ``rec`` (recommendation
+code), ``flags`` and ``price``. Columns are raw little-endian arrays,
+appended under a file lock and memory-mapped for queries. A rule query is
+one ``(bits & mask) == mask`` pass over the rows that ``searchsorted`` on
+``ts`` picks out. Per-block OR summaries (zone maps) let ``last`` skip
+blocks where the rules never fired.
+"""
+
+import argparse
+import fcntl
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+import _paths  # noqa: F401  (repo-root modules; keep first)
+
+from signals import RULE_BITS, RECOMMENDATIONS, recommendation_code, signal_bits
+
+COLUMNS = {
+    "ts": np.dtype("<i8"),
+    "at": np.dtype("<i8"),
+    "bits": np.dtype("<u4"),
+    "buy": np.dtype("u1"),
+    "sell": np.dtype("u1"),
+    "rec": np.dtype("u1"),
+    "flags": np.dtype("u1"),
+    "price": np.dtype("<f8"),
+}
+FLAG_CHANGED = 1  # recommendation differs from the partition's previous event
+BLOCK = 4096
+SIGNAL_STORE = os.getenv("SIGNAL_STORE")
+
+
+def rule_mask(rules: Iterable[str]) -> int:
+    mask = 0
+    for rule in rules:
+        if rule not in RULE_BITS:
+            raise KeyError(f"Unknown rule {rule!r} (one of {', '.join(RULE_BITS)})")
+        mask |= RULE_BITS[rule]
+    return mask
+
+
+def rule_names(bits: int) -> List[str]:
+    return [rule for rule, bit in RULE_BITS.items() if bits & bit]
+
+
+class Partition:
+    """📁 One (symbol, interval): mapped columns, refreshed when the files grow"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self.columns: Dict[str, np.ndarray] = {}
+        self.block_or = np.empty(0, dtype=np.uint32)
+        self._size = -1
+
+    def _file(self, column: str) -> str:
+        return os.path.join(self.path, column)
+
+    def _bytes(self, column: str) -> int:
+        try:
+            return os.stat(self._file(column)).st_size
+        except FileNotFoundError:
+            return 0
+
+    def refresh(self) -> "Partition":
+        """Remap if another writer appended since we last looked (one ``stat``)"""
+        try:
+            size = os.stat(self._file("ts")).st_size
+        except FileNotFoundError:
+            return self
+        if size == self._size:
+            return self
+        # Columns are written in order, so a torn append shows as ragged lengths
+        # (or, torn during the very first append, as missing column files)
+        rows = min(self._bytes(name) // dtype.itemsize for name, dtype in COLUMNS.items())
+        self.columns = {
+            name: np.memmap(self._file(name), dtype=dtype, mode="r", shape=(rows,)) if rows
+            else np.empty(0, dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+        self.rows = rows
+        bits = self.columns["bits"]
+        self.block_or = np.bitwise_or.reduceat(bits, np.arange(0, rows, BLOCK)) if rows else np.empty(0, np.uint32)
+        self._size = size
+        return self
+
+    def append(self, rows: Dict[str, np.ndarray]) -> int:
+        """Append aligned column arrays (flags are derived here); returns rows written
+
+        Ordering is checked under the lock, so several writers can share a
+        partition. An evaluation older than the stored tail (a slower writer
+        finishing late) and a repeat of the previous row are dropped.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.refresh()
+            # Heal a torn previous append before adding to it
+            for name, dtype in COLUMNS.items():
+                path = self._file(name)
+                if os.path.exists(path) and os.path.getsize(path) != self.rows * dtype.itemsize:
+                    os.truncate(path, self.rows * dtype.itemsize)
+            ts = np.asarray(rows["ts"], dtype=np.int64)
+            bits = np.asarray(rows["bits"], dtype=np.uint32)
+            rec = np.asarray(rows["rec"], dtype=np.uint8)
+            if self.rows:
+                tail = self.rows - 1
+                prev_ts = np.r_[self.columns["ts"][tail], ts[:-1]]
+                prev_bits = np.r_[self.columns["bits"][tail], bits[:-1]]
+                prev_rec = np.r_[self.columns["rec"][tail], rec[:-1]]
+            else:
+                prev_ts, prev_bits, prev_rec = np.r_[ts[:1] - 1, ts[:-1]], bits, rec
+            in_order = ts >= np.maximum.accumulate(prev_ts)
+            repeat = (ts == prev_ts) & (bits == prev_bits) & (rec == prev_rec)
+            keep = in_order & ~repeat
+            if not keep.any():
+                return 0
+            rows = {name: np.asarray(column)[keep] for name, column in rows.items()}
+            rec = rec[keep]
+            previous = self.columns["rec"][-1:] if self.rows else rec[:1]
+            changed = rec != np.r_[previous, rec[:-1]]
+            rows["flags"] = np.where(changed, FLAG_CHANGED, 0)
+            for name, dtype in COLUMNS.items():
+                with open(self._file(name), "ab") as f:
+                    f.write(np.ascontiguousarray(rows[name], dtype=dtype).tobytes())
+            self.refresh()
+            return int(keep.sum())
+
+    def span(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        """Row range with ``start <= ts < end``"""
+        ts = self.columns.get("ts")
+        if ts is None or not self.rows:
+            return 0, 0
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = self.rows if end is None else int(np.searchsorted(ts, end, side="left"))
+        return lo, hi
+
+    def hits(self, lo: int, hi: int, all_mask: int = 0, any_mask: int = 0) -> np.ndarray:
+        """Row numbers in ``[lo, hi)`` where every ``all_mask`` bit and some ``any_mask`` bit fired"""
+        bits = self.columns["bits"][lo:hi]
+        keep = np.ones(len(bits), dtype=bool)
+        if all_mask:
+            keep &= (bits & np.uint32(all_mask)) == all_mask
+        if any_mask:
+            keep &= (bits & np.uint32(any_mask)) != 0
+        return lo + np.flatnonzero(keep)
+
+
+class SignalStore:
+    """🗂️ All partitions under one root directory"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._partitions: Dict[Tuple[str, str], Partition] = {}
+
+    def partition(self, symbol: str, interval: str) -> Partition:
+        key = (symbol, interval)
+        part = self._partitions.get(key)
+        if part is None:
+            path = os.path.join(self.root, quote(symbol, safe=""), interval)
+            part = self._partitions[key] = Partition(path)
+        return part.refresh()
+
+    def keys(self) -> List[Tuple[str, str]]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted((unquote(symbol), interval)
+                      for symbol in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, symbol))
+                      for interval in os.listdir(os.path.join(self.root, symbol)))
+
+    # ------------------------------------------------------------ writes
+
+    def append(self, symbol: str, interval: str, signals: Dict, ts: int, at: Optional[int] = None) -> bool:
+        """Persist one ``analyze_signals`` result for the bar opening at ``ts`` (epoch ns)
+
+        A re-evaluation of the latest bar that fires the same rules with the
+        same call is not stored again, and neither is one older than the
+        stored tail; returns whether a row was written.
+        """
+        return bool(self.append_many(
+            symbol, interval, np.array([ts]), np.array([signal_bits(signals)]),
+            np.array([signals['buy_score']]), np.array([signals['sell_score']]),
+            np.array([recommendation_code(signals['recommendation'])]),
+            np.array([float(signals['current_price'] or 0.0)]),
+            np.array([time.time_ns() if at is None else at])))
+
+    def append_many(self, symbol: str, interval: str, ts: np.ndarray, bits: np.ndarray,
+                    buy: np.ndarray, sell: np.ndarray, rec: np.ndarray, price: np.ndarray,
+                    at: Optional[np.ndarray] = None) -> int:
+        """Bulk append (backfills); rows older than the partition's tail are skipped"""
+        if not len(ts):
+            return 0
+        part = self.partition(symbol, interval)
+        return part.append({"ts": ts, "bits": bits, "buy": buy, "sell": sell, "rec": rec, "price": price,
+                            "at": np.full(len(ts), time.time_ns()) if at is None else at})
+
+    # ------------------------------------------------------------ queries
+
+    def events(self, symbol: str, interval: str, start: Optional[int] = None, end: Optional[int] = None,
+               all_of: Sequence[str] = (), any_of: Sequence[str] = (),
+               changes_only: bool = False) -> Dict[str, np.ndarray]:
+        """Columns of matching events in ``[start, end)``"""
+        part = self.partition(symbol, interval)
+        lo, hi = part.span(start, end)
+        if not all_of and not any_of and not changes_only:
+            return {name: column[lo:hi] for name, column in part.columns.items()}
+        rows = part.hits(lo, hi, rule_mask(all_of), rule_mask(any_of))
+        if changes_only:
+            rows = rows[(part.columns["flags"][rows] & FLAG_CHANGED) != 0]
+        return {name: column[rows] for name, column in part.columns.items()}
+
+    def count(self, symbol: str, interval: str, start: Optional[int] = None, end: Optional[int] = None,
+              all_of: Sequence[str] = (), any_of: Sequence[str] = ()) -> int:
+        part = self.partition(symbol, interval)
+        lo, hi = part.span(start, end)
+        return len(part.hits(lo, hi, rule_mask(all_of), rule_mask(any_of)))
+
+    def last(self, symbol: str, interval: str, all_of: Sequence[str] = (), any_of: Sequence[str] = (),
+             before: Optional[int] = None) -> Optional[Dict]:
+        """Most recent matching event, walking back block by block past zone-map misses"""
+        part = self.partition(symbol, interval)
+        all_mask, any_mask = rule_mask(all_of), rule_mask(any_of)
+        _, hi = part.span(None, before)
+        block = (hi - 1) // BLOCK
+        while block >= 0:
+            summary = int(part.block_or[block])
+            if (summary & all_mask) == all_mask and (not any_mask or summary & any_mask):
+                rows = part.hits(block * BLOCK, min(hi, (block + 1) * BLOCK), all_mask, any_mask)
+                if len(rows):
+                    return self._row(part, int(rows[-1]))
+            block -= 1
+        return None
+
+    def changes(self, symbol: str, interval: str, start: Optional[int] = None,
+                end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Recommendation state changes, for auditing what was called and when"""
+        return self.events(symbol, interval, start, end, changes_only=True)
+
+    def co_occurrence(self, all_of: Sequence[str], interval: str = "1h", symbols: Optional[Sequence[str]] = None,
+                      start: Optional[int] = None, end: Optional[int] = None,
+                      min_symbols: int = 2) -> Dict[str, np.ndarray]:
+        """Bars where at least ``min_symbols`` symbols fired ``all_of`` together"""
+        mask = rule_mask(all_of)
+        symbols = symbols if symbols is not None else [s for s, i in self.keys() if i == interval]
+        stamps, owners = [], []
+        for n, symbol in enumerate(symbols):
+            part = self.partition(symbol, interval)
+            lo, hi = part.span(start, end)
+            # Re-evaluations of one bar count once per symbol
+            ts = np.unique(part.columns["ts"][part.hits(lo, hi, mask)]) if part.rows else np.empty(0, np.int64)
+            stamps.append(ts)
+            owners.append(np.full(len(ts), n, dtype=np.int32))
+        if not stamps:
+            return {"ts": np.empty(0, np.int64), "count": np.empty(0, np.int64), "symbols": []}
+        ts, owner = np.concatenate(stamps), np.concatenate(owners)
+        order = np.argsort(ts, kind="stable")
+        ts, owner = ts[order], owner[order]
+        bars, first, counts = np.unique(ts, return_index=True, return_counts=True)
+        keep = counts >= min_symbols
+        groups = np.split(owner, first[1:])
+        return {"ts": bars[keep], "count": counts[keep],
+                "symbols": [[symbols[i] for i in g] for g, k in zip(groups, keep) if k]}
+
+    @staticmethod
+    def _row(part: Partition, i: int) -> Dict:
+        row = {name: column[i].item() for name, column in part.columns.items()}
+        row["rules"] = rule_names(row["bits"])
+        row["recommendation"] = RECOMMENDATIONS[row["rec"]] if row["rec"] < len(RECOMMENDATIONS) else "?"
+        return row
+
+
+def backfill(store: SignalStore, symbol: str, data, interval: str) -> int:
+    """Vectorized signals for every bar of an indicator frame, appended after what's stored"""
+    from signals import recommendation_codes, signal_bit_array, signal_scores
+
+    ts = data.index.as_unit("ns").asi8 if data.index.tz is not None else data.index.tz_localize("UTC").as_unit("ns").asi8
+    part = store.partition(symbol, interval)
+    fresh = ts > part.columns["ts"][-1] if part.rows else np.ones(len(ts), dtype=bool)
+    buy, sell = signal_scores(data)
+    store.append_many(symbol, interval, ts[fresh], signal_bit_array(data)[fresh], buy[fresh], sell[fresh],
+                      recommendation_codes(buy, sell)[fresh], data["Close"].to_numpy(dtype=float)[fresh])
+    return int(fresh.sum())
+
+
+# ---------------------------------------------------------------- CLI
+
+def _ns(text: Optional[str]) -> Optional[int]:
+    if not text:
+        return None
+    import pandas as pd
+
+    stamp = pd.Timestamp(text)
+    return (stamp if stamp.tz is not None else stamp.tz_localize("UTC")).value
+
+
+def _when(ns: int) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.gmtime(ns / 1e9))
+
+
+def _bench(root: str, symbols: int, years: int):
+    rng = np.random.default_rng(0)
+    store = SignalStore(root)
+    bars = years * 365 * 24
+    ts = (np.arange(bars, dtype=np.int64) + 1_600_000_000 // 3600) * 3_600_000_000_000
+    started = time.perf_counter()
+    for i in range(symbols):
+        # Sparse firings: each rule on ~3% of bars
+        bits = (rng.random((bars, len(RULE_BITS))) < 0.03) @ (1 << np.arange(len(RULE_BITS))).astype(np.uint32)
+        store.append_many(f"SYM{i:03d}", "1h", ts, bits.astype(np.uint32), rng.integers(0, 9, bars),
+                          rng.integers(0, 9, bars), rng.integers(1, 6, bars), np.full(bars, 100.0))
+    write = time.perf_counter() - started
+    store = SignalStore(root)
+    for key in store.keys():
+        store.partition(*key)
+
+    def timed(fn, repeat=20):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = fn()
+        return (time.perf_counter() - started) / repeat * 1e3, result
+
+    both = ["macd_bullish_cross", "volume_confirmation"]
+    last_ms, _ = timed(lambda: store.last("SYM007", "1h", all_of=both))
+    range_ms, count = timed(lambda: store.count("SYM007", "1h", ts[bars // 2], ts[-1], all_of=both))
+    co_ms, co = timed(lambda: store.co_occurrence(both, "1h", min_symbols=3), repeat=3)
+    print(f"🗂️ {symbols} symbols × {bars:,} hourly bars ({symbols * bars:,} events) written in {write:.1f}s")
+    print(f"   last(all_of)             {last_ms:8.3f} ms")
+    print(f"   range count (half)       {range_ms:8.3f} ms  ({count} hits)")
+    print(f"   co-occurrence (≥3 syms)  {co_ms:8.1f} ms  ({len(co['ts'])} bars)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🗂️ Signal event store")
+    parser.add_argument("--root", default=SIGNAL_STORE or "signal_events")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fill = sub.add_parser("backfill", help="compute and store signals for historical bars")
+    fill.add_argument("symbols", nargs="+")
+    fill.add_argument("--period", default="730d")
+    fill.add_argument("--interval", default="1h")
+    last = sub.add_parser("last", help="most recent event matching rules")
+    last.add_argument("symbol")
+    last.add_argument("--interval", default="1h")
+    last.add_argument("--all", default="", help="comma-separated rules that must all fire")
+    last.add_argument("--any", default="", help="comma-separated rules, at least one fires")
+    events = sub.add_parser("events", help="matching events in a time range")
+    events.add_argument("symbol")
+    events.add_argument("--interval", default="1h")
+    events.add_argument("--all", default="")
+    events.add_argument("--any", default="")
+    events.add_argument("--start")
+    events.add_argument("--end")
+    events.add_argument("--changes", action="store_true", help="recommendation changes only")
+    co = sub.add_parser("cooccur", help="bars where several symbols fired the same rules")
+    co.add_argument("--all", required=True)
+    co.add_argument("--interval", default="1h")
+    co.add_argument("--min-symbols", type=int, default=2)
+    co.add_argument("--start")
+    co.add_argument("--end")
+    sub.add_parser("rules", help="list rule names")
+    bench = sub.add_parser("bench", help="synthetic history: write and query timings")
+    bench.add_argument("--symbols", type=int, default=300)
+    bench.add_argument("--years", type=int, default=3)
+    args = parser.parse_args()
+
+    def split(text: str) -> List[str]:
+        return [rule for rule in text.split(",") if rule]
+
+    store = SignalStore(args.root)
+    if args.command == "rules":
+        print("\n".join(RULE_BITS))
+    elif args.command == "bench":
+        _bench(args.root, args.symbols, args.years)
+    elif args.command == "backfill":
+        from indicators import calculate_indicators
+        from pipeline import fetch_base_bars
+
+        for symbol in args.symbols:
+            bars = fetch_base_bars(symbol, args.period, args.interval)
+            added = backfill(store, symbol, calculate_indicators(bars.copy()), args.interval) if len(bars) else 0
+            print(f"📥 {symbol}: {added} events")
+    elif args.command == "last":
+        row = store.last(args.symbol, args.interval, split(args.all), split(args.any))
+        if row is None:
+            print("🤷 never")
+        else:
+            print(f"🎯 {_when(row['ts'])}  {row['recommendation']}  ${row['price']:,.2f}  {', '.join(row['rules'])}")
+    elif args.command == "events":
+        found = store.events(args.symbol, args.interval, _ns(args.start), _ns(args.end),
+                             split(args.all), split(args.any), args.changes)
+        for i in range(len(found["ts"])):
+            print(f"{_when(int(found['ts'][i]))}  {RECOMMENDATIONS[found['rec'][i]]:16s} "
+                  f"buy {found['buy'][i]} sell {found['sell'][i]}  {', '.join(rule_names(int(found['bits'][i])))}")
+    elif args.command == "cooccur":
+        found = store.co_occurrence(split(args.all), args.interval, None, _ns(args.start), _ns(args.end),
+                                    args.min_symbols)
+        for ts, symbols in zip(found["ts"], found["symbols"]):
+            print(f"{_when(int(ts))}  {len(symbols)}  {' '.join(symbols)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+🎯 Sagebrush Signals - Signal scoring for the Sagebrush Sniper
+Faster than a rattlesnake strike
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Market regime -> (buy score delta, sell score delta, note)
+REGIME_ADJUSTMENTS = {
+    'HIGH_VOLATILITY_CORRELATED': (-1, 2, "⚠️ Market-Wide Risk-Off Regime"),
+    'HIGH_VOLATILITY_DECOUPLED': (-1, -1, "⚠️ Choppy Decoupled Regime (Signals Discounted)"),
+    'HIGH_VOLATILITY': (-1, 0, "⚠️ High Volatility Regime"),
+}
+
+
+def analyze_signals(data: pd.DataFrame, regime: Optional[Dict] = None) -> Dict:
+    """Generate trading signals (optionally weighted by the market regime)
+
+    Fewer than two bars can't show a crossover, so they score as no data.
+    """
+    if len(data) < 2:
+        return empty_signals()
+
+    latest = data.iloc[-1]
+
+    # Buy signals
+    buy_signals = []
+    buy_score = 0
+
+    if latest['RSI'] < 30:
+        buy_signals.append("🎯 RSI Oversold (Bullish)")
+        buy_score += 2
+
+    if latest['Close'] <= latest['BB_lower'] * 1.02:
+        buy_signals.append("🎯 Touching Lower BB (Bounce Expected)")
+        buy_score += 2
+
+    if (latest['MACD'] > latest['MACD_signal'] and 
+        data['MACD'].iloc[-2] <= data['MACD_signal'].iloc[-2]):
+        buy_signals.append("🎯 MACD Bullish Crossover")
+        buy_score += 3
+
+    if latest['Volume_Ratio'] > 1.5:
+        buy_signals.append("🎯 High Volume Confirmation")
+        buy_score += 1
+
+    if latest['SMA_20'] > latest['SMA_50']:
+        buy_signals.append("🎯 Golden Cross Active")
+        buy_score += 1
+
+    # Sell signals
+    sell_signals = []
+    sell_score = 0
+
+    if latest['RSI'] > 70:
+        sell_signals.append("⚠️ RSI Overbought (Bearish)")
+        sell_score += 2
+
+    if latest['Close'] >= latest['BB_upper'] * 0.98:
+        sell_signals.append("⚠️ Near Upper BB (Resistance)")
+        sell_score += 2
+
+    if (latest['MACD'] < latest['MACD_signal'] and 
+        data['MACD'].iloc[-2] >= data['MACD_signal'].iloc[-2]):
+        sell_signals.append("⚠️ MACD Bearish Crossover")
+        sell_score += 3
+
+    if latest['SMA_20'] < latest['SMA_50']:
+        sell_signals.append("⚠️ Death Cross Active")
+        sell_score += 1
+
+    if regime and regime.get('regime') in REGIME_ADJUSTMENTS:
+        buy_delta, sell_delta, note = REGIME_ADJUSTMENTS[regime['regime']]
+        buy_score = max(buy_score + buy_delta, 0)
+        sell_score = max(sell_score + sell_delta, 0)
+        sell_signals.append(note)
+
+    return {
+        'buy_signals': buy_signals,
+        'sell_signals': sell_signals,
+        'buy_score': buy_score,
+        'sell_score': sell_score,
+        'recommendation': get_recommendation(buy_score, sell_score),
+        'current_price': latest['Close'],
+        'rsi': latest['RSI'],
+        'macd': latest['MACD'],
+        'volume_ratio': latest['Volume_Ratio'],
+        'regime': regime['regime'] if regime else None
+    }
+
+
+def rule_masks(data: pd.DataFrame) -> Dict:
+    """Every rule of ``analyze_signals`` evaluated over whole columns (bool array per rule key)"""
+    import numpy as np
+
+    close = data['Close'].to_numpy(dtype=float)
+    rsi = data['RSI'].to_numpy(dtype=float)
+    macd = data['MACD'].to_numpy(dtype=float)
+    macd_signal = data['MACD_signal'].to_numpy(dtype=float)
+    prev_macd = np.r_[np.nan, macd[:-1]]
+    prev_signal = np.r_[np.nan, macd_signal[:-1]]
+    sma_20 = data['SMA_20'].to_numpy(dtype=float)
+    sma_50 = data['SMA_50'].to_numpy(dtype=float)
+    return {
+        'rsi_oversold': rsi < 30,
+        'lower_bb': close <= data['BB_lower'].to_numpy(dtype=float) * 1.02,
+        'macd_bullish_cross': (macd > macd_signal) & (prev_macd <= prev_signal),
+        'volume_confirmation': data['Volume_Ratio'].to_numpy(dtype=float) > 1.5,
+        'golden_cross': sma_20 > sma_50,
+        'rsi_overbought': rsi > 70,
+        'upper_bb': close >= data['BB_upper'].to_numpy(dtype=float) * 0.98,
+        'macd_bearish_cross': (macd < macd_signal) & (prev_macd >= prev_signal),
+        'death_cross': sma_20 < sma_50,
+    }
+
+
+def signal_scores(data: pd.DataFrame):
+    """Vectorized twin of ``analyze_signals``: buy/sell score for every bar
+
+    Same rules and weights (regime adjustment aside), evaluated over whole
+    columns so backtests don't loop ``analyze_signals`` bar by bar.
+    """
+    import numpy as np
+
+    rules = rule_masks(data)
+    buy = (2 * rules['rsi_oversold'] + 2 * rules['lower_bb'] + 3 * rules['macd_bullish_cross']
+           + 1 * rules['volume_confirmation'] + 1 * rules['golden_cross'])
+    sell = (2 * rules['rsi_overbought'] + 2 * rules['upper_bb'] + 3 * rules['macd_bearish_cross']
+            + 1 * rules['death_cross'])
+    return buy.astype(np.int8), sell.astype(np.int8)
+
+
+# Rule key -> label, in bitset order (the signal event store persists these bits:
+# append new rules at the end, never reorder)
+RULES = (
+    ('rsi_oversold', "🎯 RSI Oversold (Bullish)"),
+    ('lower_bb', "🎯 Touching Lower BB (Bounce Expected)"),
+    ('macd_bullish_cross', "🎯 MACD Bullish Crossover"),
+    ('volume_confirmation', "🎯 High Volume Confirmation"),
+    ('golden_cross', "🎯 Golden Cross Active"),
+    ('rsi_overbought', "⚠️ RSI Overbought (Bearish)"),
+    ('upper_bb', "⚠️ Near Upper BB (Resistance)"),
+    ('macd_bearish_cross', "⚠️ MACD Bearish Crossover"),
+    ('death_cross', "⚠️ Death Cross Active"),
+    ('regime_risk_off', REGIME_ADJUSTMENTS['HIGH_VOLATILITY_CORRELATED'][2]),
+    ('regime_decoupled', REGIME_ADJUSTMENTS['HIGH_VOLATILITY_DECOUPLED'][2]),
+    ('regime_high_volatility', REGIME_ADJUSTMENTS['HIGH_VOLATILITY'][2]),
+)
+RULE_BITS = {key: 1 << i for i, (key, _) in enumerate(RULES)}
+_LABEL_BITS = {label: 1 << i for i, (_, label) in enumerate(RULES)}
+# Recommendation codes, bearish to bullish (0 = no data)
+RECOMMENDATIONS = ("⚪ NO DATA", "🔴 STRONG SELL", "🟠 SELL", "⚪ HOLD", "🟡 BUY", "🟢 STRONG BUY")
+
+
+def signal_bits(signals: Dict) -> int:
+    """Bitset of the rules that fired in an ``analyze_signals`` result"""
+    bits = 0
+    for label in signals['buy_signals'] + signals['sell_signals']:
+        bits |= _LABEL_BITS.get(label, 0)
+    return bits
+
+
+def signal_bit_array(data: pd.DataFrame):
+    """Vectorized ``signal_bits`` for every bar (regime notes aside)"""
+    import numpy as np
+
+    bits = np.zeros(len(data), dtype=np.uint32)
+    for key, mask in rule_masks(data).items():
+        bits |= mask.astype(np.uint32) * np.uint32(RULE_BITS[key])
+    return bits
+
+
+def recommendation_code(recommendation: str) -> int:
+    head = recommendation.split(' - ')[0]
+    return RECOMMENDATIONS.index(head) if head in RECOMMENDATIONS else 0
+
+
+def recommendation_codes(buy_score, sell_score):
+    """Vectorized ``get_recommendation`` as ``RECOMMENDATIONS`` codes"""
+    import numpy as np
+
+    return np.select([buy_score >= 5, buy_score >= 3, sell_score >= 5, sell_score >= 3],
+                     [5, 4, 1, 2], 3).astype(np.uint8)
+
+
+def get_recommendation(buy_score: int, sell_score: int) -> str:
+    """Generate trading recommendation"""
+    if buy_score >= 5:
+        return "🟢 STRONG BUY - Mount up, partner!"
+    elif buy_score >= 3:
+        return "🟡 BUY - Good lookin' opportunity"
+    elif sell_score >= 5:
+        return "🔴 STRONG SELL - Time to mosey on out"
+    elif sell_score >= 3:
+        return "🟠 SELL - Consider lightenin' the load"
+    else:
+        return "⚪ HOLD - Keep your powder dry"
+
+
+def empty_signals() -> Dict:
+    """Return empty signals structure"""
+    return {
+        'buy_signals': [],
+        'sell_signals': [],
+        'buy_score': 0,
+        'sell_score': 0,
+        'recommendation': "⚪ NO DATA - Check connection",
+        'current_price': 0,
+        'rsi': 50,
+        'macd': 0,
+        'volume_ratio': 1,
+        'regime': None
+    }
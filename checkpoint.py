@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+💾 WyoVerse Checkpoints - Warm restarts without a stampede to upstream
+Versioned binary snapshots of arrays, memory-mapped straight back in
+
+    write_checkpoint("market.ckpt", {"regime/cov": cov, ...}, meta={"symbols": [...]})
+
+    ckpt = load_checkpoint("market.ckpt")     # None if missing, torn or from another version
+    ckpt.meta["symbols"], ckpt["regime/cov"]  # read-only views over the mapped file
+
+    saver = Checkpointer("market.ckpt", hub.checkpoint_state, every=60).start()
+    saver.stop()                              # one last write on the way out
+
+Layout: 8-byte magic, ``<II`` format version and header length, a JSON
+header (meta plus dtype/shape/offset per array), then each array's raw bytes
+at a 64-byte aligned offset. Nothing is unpickled; loading is one ``mmap``
+and a ``np.frombuffer`` per array, so pages are only read when touched.
+Writes go to a temp file that is fsynced and renamed over the old one.
+Readers holding the old mapping keep a consistent snapshot.
+
+    python checkpoint.py info market.ckpt
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from stage_metrics import METRICS, stage
+
+MAGIC = b"WYOCKPT\0"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<II")
+ALIGN = 64
+CHECKPOINT_SECONDS = float(os.getenv("CHECKPOINT_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointError(ValueError):
+    """File isn't a checkpoint this build can read"""
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def write_checkpoint(path: str, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> int:
+    """Atomically replace ``path`` with ``arrays`` + JSON-able ``meta``; returns bytes written"""
+    arrays = {name: np.ascontiguousarray(value) for name, value in arrays.items()}
+    for name, value in arrays.items():
+        if value.dtype.hasobject:
+            raise TypeError(f"Checkpoint array {name!r} has object dtype")
+
+    # Offsets are relative to the data area, so the header can be sized after the fact
+    layout, offset = {}, 0
+    for name, value in arrays.items():
+        offset = _aligned(offset)
+        layout[name] = {"dtype": value.dtype.str, "shape": list(value.shape), "offset": offset}
+        offset += value.nbytes
+    header = json.dumps({"created": time.time(), "meta": meta or {}, "arrays": layout}).encode()
+    data_start = _aligned(len(MAGIC) + PREAMBLE.size + len(header))
+
+    tmp = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + PREAMBLE.pack(FORMAT_VERSION, len(header)) + header)
+            for name, value in arrays.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(memoryview(value).cast("B") if value.nbytes else b"")
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    # The rename itself has to reach the disk too
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+    return data_start + offset
+
+
+class Checkpoint:
+    """📂 A mapped checkpoint: ``meta`` dict plus read-only array views"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        head = len(MAGIC) + PREAMBLE.size
+        if len(self._map) < head or self._map[:len(MAGIC)] != MAGIC:
+            raise CheckpointError(f"{path} is not a checkpoint")
+        version, header_len = PREAMBLE.unpack_from(self._map, len(MAGIC))
+        if version != FORMAT_VERSION:
+            raise CheckpointError(f"{path} is format v{version}, this build reads v{FORMAT_VERSION}")
+        header = json.loads(bytes(self._map[head:head + header_len]))
+        self.created: float = header["created"]
+        self.meta: Dict = header["meta"]
+        self._layout: Dict[str, Dict] = header["arrays"]
+        self._data_start = _aligned(head + header_len)
+        for name, spec in self._layout.items():
+            end = self._data_start + spec["offset"] + self._nbytes(spec)
+            if end > len(self._map):
+                raise CheckpointError(f"{path} is truncated (array {name!r})")
+
+    @staticmethod
+    def _nbytes(spec: Dict) -> int:
+        return int(np.prod(spec["shape"], dtype=np.int64)) * np.dtype(spec["dtype"]).itemsize
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._layout
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        spec = self._layout[name]
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        array = np.frombuffer(self._map, dtype=spec["dtype"], count=count,
+                              offset=self._data_start + spec["offset"])
+        return array.reshape(spec["shape"])
+
+    def names(self, prefix: str = "") -> Iterator[str]:
+        return (name for name in self._layout if name.startswith(prefix))
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created
+
+
+def load_checkpoint(path: Optional[str]) -> Optional[Checkpoint]:
+    """Map ``path`` if it's a readable checkpoint; a cold start is never an error"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with stage("checkpoint_load"):
+            return Checkpoint(path)
+    except (CheckpointError, OSError, ValueError, KeyError) as e:
+        logger.warning("💾 Ignoring checkpoint %s: %s", path, e)
+        return None
+
+
+def frame_arrays(prefix: str, frame) -> Dict[str, np.ndarray]:
+    """A float DataFrame as ``{prefix}/ts`` (UTC epoch ns) + ``{prefix}/values``"""
+    index = frame.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_convert("UTC")
+    return {f"{prefix}/ts": index.as_unit("ns").asi8,
+            f"{prefix}/values": frame.to_numpy(dtype=np.float64)}
+
+
+def read_frame(ckpt: Checkpoint, prefix: str, columns):
+    """Inverse of ``frame_arrays`` (UTC index); the values stay backed by the mapping"""
+    import pandas as pd
+
+    return pd.DataFrame(ckpt[f"{prefix}/values"], columns=list(columns),
+                        index=pd.DatetimeIndex(ckpt[f"{prefix}/ts"], tz="UTC"), copy=False)
+
+
+class Checkpointer:
+    """⏱️ Write ``collect()``'s ``(arrays, meta)`` every ``every`` seconds from a daemon thread"""
+
+    def __init__(self, path: str, collect: Callable[[], Tuple[Dict[str, np.ndarray], Dict]],
+                 every: float = CHECKPOINT_SECONDS):
+        self.path = path
+        self.collect = collect
+        self.every = every
+        self.last_written = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def save(self) -> int:
+        with self._lock:
+            with stage("checkpoint_write"):
+                arrays, meta = self.collect()
+                size = write_checkpoint(self.path, arrays, meta)
+            self.last_written = time.time()
+            METRICS.inc("checkpoint_writes_total")
+            return size
+
+    def _run(self):
+        while not self._stop.wait(self.every):
+            try:
+                self.save()
+            except Exception:
+                logger.exception("💾 Checkpoint write to %s failed", self.path)
+
+    def start(self) -> "Checkpointer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="checkpointer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, final: bool = True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if final:
+            self.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="💾 Checkpoint inspector")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="header, meta keys and arrays")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    ckpt = Checkpoint(args.path)
+    print(f"💾 {args.path}: format v{FORMAT_VERSION}, {os.path.getsize(args.path) / 2**20:.2f} MB, "
+          f"written {ckpt.age:.0f}s ago")
+    print(f"   meta: {', '.join(sorted(ckpt.meta)) or '-'}")
+    for name in ckpt.names():
+        array = ckpt[name]
+        print(f"   {name:40s} {str(array.dtype):8s} {array.shape}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+📚 WyoVerse Doc Index - Ask the range, not the whole library
+BM25 over the repo's docs, module docstrings and Dr. Dee's knowledge
+
+    index = DocIndex.open()                        # maps .doc_index (or DOC_INDEX)
+    index.refresh(extra={"dr-dee/support": text})  # re-tokenizes only what changed
+    index.search("yfinance rate limit", k=5)       # [{"title", "path", "line", "score", "snippet"}]
+
+    python doc_index.py build
+    python doc_index.py query "warm restart checkpoint"
+    python doc_index.py bench
+
+Sources are markdown files (one section per heading) and Python files (the
+module docstring plus each class and function docstring). Files that are
+named ``.py`` but don't parse, like ``streamlit.py``'s deployment guide, are
+read as markdown. Callers can add virtual documents as ``{key: markdown}``.
+
+The index is a checkpoint file (``checkpoint.py``): sorted 64-bit term
+hashes, CSR postings (section ids and term frequencies), per-term IDF,
+per-section length norms, and section titles and text for snippets. Opening it is
+one ``mmap``. A query hashes its terms, ``searchsorted``s them and sums
+BM25 over their posting slices. Files are never read at query time.
+``refresh`` stats the sources and rebuilds postings from the mapped
+arrays for unchanged files and re-tokenizes only new or edited ones.
+"""
+
+import argparse
+import ast
+import fcntl
+import hashlib
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from checkpoint import load_checkpoint, write_checkpoint
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+DOC_INDEX = os.getenv("DOC_INDEX", os.path.join(REPO_ROOT, ".doc_index"))
+DOC_EXTENSIONS = tuple(os.getenv("DOC_EXTENSIONS", ".md,.py").split(","))
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", "profiles", ".pytest_cache"}
+MAX_FILE_BYTES = 1 << 20
+INDEX_SCHEMA = 1
+
+K1 = 1.2
+B = 0.75
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from has have how i if in into is it its my not of on or our so that "
+    "the their then there these this to was we were what when where which will with you your".split()
+)
+_TOKEN = re.compile(r"[a-z0-9]+")
+_HEADING = re.compile(r"^#{1,6}\s+(.*?)\s*#*\s*$")
+
+
+def _stem(term: str) -> str:
+    # Just enough folding that "limits" finds "limit"
+    return term[:-1] if len(term) > 3 and term.endswith("s") and not term.endswith("ss") else term
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode(), digest_size=8).digest(), "little")
+
+
+# ---------------------------------------------------------------- sources
+
+def markdown_sections(text: str, title: str) -> List[Tuple[str, int, str]]:
+    """``(title, line, body)`` per heading; text before the first heading goes under ``title``"""
+    sections, current, start, body = [], title, 1, []
+    for number, line in enumerate(text.splitlines(), 1):
+        match = _HEADING.match(line)
+        if match:
+            if "".join(body).strip():
+                sections.append((current, start, "\n".join(body).strip()))
+            current, start, body = match.group(1).strip("*_ ") or title, number, []
+        else:
+            body.append(line)
+    if "".join(body).strip():
+        sections.append((current, start, "\n".join(body).strip()))
+    return sections
+
+
+def python_sections(text: str, title: str) -> Optional[List[Tuple[str, int, str]]]:
+    """Module, class and function docstrings; ``None`` if the file isn't Python"""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return None
+    sections = []
+    doc = ast.get_docstring(tree)
+    if doc:
+        sections.append((doc.strip().splitlines()[0].strip() or title, 1, doc))
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            doc = ast.get_docstring(node)
+            if doc:
+                sections.append((f"{title}: {node.name}", node.lineno, doc))
+    return sections
+
+
+def file_sections(path: str, rel: str) -> List[Tuple[str, int, str]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError):
+        return []
+    if rel.endswith(".py"):
+        sections = python_sections(text, rel)
+        if sections is not None:
+            return sections
+    return markdown_sections(text, rel)
+
+
+def repo_files(root: str = REPO_ROOT) -> Dict[str, Tuple[int, int]]:
+    """``{relative path: (mtime_ns, size)}`` for every indexable file under ``root``"""
+    found = {}
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in files:
+            if name.endswith(DOC_EXTENSIONS):
+                path = os.path.join(directory, name)
+                info = os.stat(path)
+                if info.st_size <= MAX_FILE_BYTES:
+                    found[os.path.relpath(path, root)] = (info.st_mtime_ns, info.st_size)
+    return found
+
+
+# ---------------------------------------------------------------- index
+
+class _Mapped:
+    """One index file's arrays; a ``DocIndex`` swaps these whole, never field by field
+
+    Holding the checkpoint keeps its mapping alive for queries still reading
+    a snapshot that ``refresh`` has already replaced.
+    """
+
+    def __init__(self, ckpt=None):
+        self.ckpt = ckpt
+        self.sources: Dict[str, List] = ckpt.meta["sources"] if ckpt else {}  # key -> [*signature, first, count]
+        self.source_keys = list(self.sources)
+        if ckpt is None:
+            self.sections = 0
+            return
+        self.terms = ckpt["terms"]
+        self.idf = ckpt["idf"]
+        self.offsets = ckpt["offsets"]
+        self.post_sections = ckpt["post_sections"]
+        self.post_tf = ckpt["post_tf"]
+        self.norm = ckpt["norm"]
+        self.section_source = ckpt["section_source"]
+        self.section_line = ckpt["section_line"]
+        self.text = ckpt["text"]
+        self.text_offsets = ckpt["text_offsets"]
+        self.sections = len(self.norm)
+
+    def section(self, i: int) -> Tuple[str, str]:
+        raw = bytes(self.text[self.text_offsets[i]:self.text_offsets[i + 1]]).decode("utf-8")
+        title, _, body = raw.partition("\0")
+        return title, body
+
+
+class DocIndex:
+    """🔎 A mapped BM25 index; empty until the first ``refresh`` writes one
+
+    Safe to share between threads: a query reads one ``_Mapped`` snapshot
+    from start to finish while ``refresh`` installs the next one with a
+    single assignment.
+    """
+
+    def __init__(self, path: str = DOC_INDEX):
+        self.path = path
+        self._load()
+
+    @classmethod
+    def open(cls, path: str = DOC_INDEX) -> "DocIndex":
+        return cls(path)
+
+    def _load(self):
+        ckpt = load_checkpoint(self.path)
+        if ckpt is not None and ckpt.meta.get("schema") != INDEX_SCHEMA:
+            ckpt = None
+        self._mapped = _Mapped(ckpt)
+
+    @property
+    def sources(self) -> Dict[str, List]:
+        return self._mapped.sources
+
+    @property
+    def sections(self) -> int:
+        return self._mapped.sections
+
+    @property
+    def terms(self) -> np.ndarray:
+        return self._mapped.terms
+
+    # ------------------------------------------------------------ queries
+
+    def search(self, query: str, k: int = 5) -> List[Dict]:
+        """Top ``k`` sections by BM25; ``[]`` for an empty index or no known terms"""
+        mapped = self._mapped
+        if not mapped.sections:
+            return []
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        hashes = np.array([term_hash(t) for t in terms], dtype=np.uint64)
+        at = np.searchsorted(mapped.terms, hashes)
+        inside = at < len(mapped.terms)
+        at, hashes = at[inside], hashes[inside]
+        at = at[mapped.terms[at] == hashes]
+        if not len(at):
+            return []
+        scores = np.zeros(mapped.sections, dtype=np.float32)
+        for term in at:
+            lo, hi = mapped.offsets[term], mapped.offsets[term + 1]
+            sections = mapped.post_sections[lo:hi]
+            tf = mapped.post_tf[lo:hi].astype(np.float32)
+            scores[sections] += mapped.idf[term] * tf * (K1 + 1) / (tf + mapped.norm[sections])
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(scores[hits], -k)[-k:]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [self._result(mapped, int(i), float(scores[i]), terms) for i in hits]
+
+    @staticmethod
+    def _result(mapped: _Mapped, i: int, score: float, terms: List[str]) -> Dict:
+        title, body = mapped.section(i)
+        lines = [line.strip() for line in body.splitlines() if line.strip()]
+        # The line that mentions the most query terms (earliest wins a tie)
+        snippet = max(lines, key=lambda line: sum(term in line.lower() for term in terms), default="")
+        return {
+            "title": title,
+            "path": mapped.source_keys[mapped.section_source[i]],
+            "line": int(mapped.section_line[i]),
+            "score": round(score, 3),
+            "snippet": snippet[:240],
+        }
+
+    # ------------------------------------------------------------ builds
+
+    def refresh(self, root: str = REPO_ROOT, extra: Optional[Dict[str, str]] = None,
+                files: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict:
+        """Bring the index in line with ``root``'s files plus ``extra`` virtual docs
+
+        Unchanged sources keep their postings (recovered from the mapped
+        arrays); only new or edited ones are read and tokenized. Returns what
+        was done. Writers are serialized with a lock next to the index file.
+        """
+        started = time.perf_counter()
+        wanted: Dict[str, List] = {rel: list(sig) for rel, sig in (files if files is not None else repo_files(root)).items()}
+        for key, text in (extra or {}).items():
+            wanted[key] = [hashlib.blake2b(text.encode(), digest_size=8).hexdigest()]
+        stale = [key for key, sig in wanted.items() if self.sources.get(key, [None])[0:len(sig)] != sig]
+        removed = [key for key in self.sources if key not in wanted]
+        if not stale and not removed:
+            return {"changed": 0, "removed": 0, "sections": self.sections, "seconds": time.perf_counter() - started}
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._load()  # another worker may have just rebuilt it
+            stale = [key for key, sig in wanted.items() if self.sources.get(key, [None])[0:len(sig)] != sig]
+            removed = [key for key in self.sources if key not in wanted]
+            if stale or removed:
+                fresh = {}
+                for key in stale:
+                    if key in (extra or {}):
+                        fresh[key] = markdown_sections(extra[key], key)
+                    else:
+                        fresh[key] = file_sections(os.path.join(root, key), key)
+                self._rebuild(wanted, fresh)
+        return {"changed": len(stale), "removed": len(removed), "sections": self.sections,
+                "seconds": time.perf_counter() - started}
+
+    @staticmethod
+    def _kept(mapped: _Mapped, keep_sources: List[str]):
+        """Postings, text and positions of the sections belonging to ``keep_sources``"""
+        if not mapped.sections or not keep_sources:
+            return None
+        keep = np.zeros(mapped.sections, dtype=bool)
+        for key in keep_sources:
+            first, count = mapped.sources[key][-2:]
+            keep[first:first + count] = True
+        new_id = np.cumsum(keep) - 1
+        term = np.repeat(np.arange(len(mapped.terms)), np.diff(mapped.offsets))
+        live = keep[mapped.post_sections]
+        return {
+            "keep": keep,
+            "hash": mapped.terms[term[live]],
+            "section": new_id[mapped.post_sections[live]],
+            "tf": mapped.post_tf[live],
+            "length": np.bincount(new_id[mapped.post_sections[live]], weights=mapped.post_tf[live],
+                                  minlength=int(keep.sum())),
+        }
+
+    def _rebuild(self, wanted: Dict[str, List], fresh: Dict[str, List[Tuple[str, int, str]]]):
+        mapped = self._mapped
+        # Kept sources stay in their old order, so ``_kept``'s renumbering lines up
+        keep_sources = sorted((key for key in wanted if key not in fresh and key in mapped.sources),
+                              key=lambda key: mapped.sources[key][-2])
+        kept = self._kept(mapped, keep_sources)
+
+        hashes, sections, tfs, lengths = [], [], [], []
+        source_of, lines, texts = [], [], []
+        layout: Dict[str, List] = {}
+        kept_total = 0
+        for key in keep_sources:
+            first, count = mapped.sources[key][-2:]
+            layout[key] = wanted[key] + [kept_total, count]
+            source_of.append(np.full(count, len(layout) - 1, dtype=np.uint32))
+            lines.append(np.asarray(mapped.section_line[first:first + count]))
+            texts.extend(bytes(mapped.text[mapped.text_offsets[i]:mapped.text_offsets[i + 1]])
+                         for i in range(first, first + count))
+            kept_total += count
+        if kept is not None:
+            hashes.append(kept["hash"])
+            sections.append(kept["section"])
+            tfs.append(kept["tf"])
+            lengths.append(kept["length"])
+
+        next_id = kept_total
+        vocab: Dict[str, int] = {}
+        for key, parts in fresh.items():
+            layout[key] = wanted[key] + [next_id, len(parts)]
+            source_of.append(np.full(len(parts), len(layout) - 1, dtype=np.uint32))
+            lines.append(np.array([line for _, line, _ in parts], dtype=np.uint32))
+            new_hash, new_section, new_tf, new_length = [], [], [], []
+            for title, _, body in parts:
+                counts = Counter(tokenize(f"{title}\n{body}"))
+                for term, tf in counts.items():
+                    if term not in vocab:
+                        vocab[term] = term_hash(term)
+                    new_hash.append(vocab[term])
+                    new_section.append(next_id)
+                    new_tf.append(min(tf, 65535))
+                new_length.append(sum(counts.values()))
+                texts.append(f"{title}\0{body}".encode("utf-8"))
+                next_id += 1
+            hashes.append(np.array(new_hash, dtype=np.uint64))
+            sections.append(np.array(new_section, dtype=np.int64))
+            tfs.append(np.array(new_tf, dtype=np.uint16))
+            lengths.append(np.array(new_length, dtype=np.float64))
+
+        total = next_id
+        if not total:
+            # Nothing indexable: drop the file rather than write empty arrays
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self._load()
+            return
+        hash_all = np.concatenate(hashes).astype(np.uint64)
+        section_all = np.concatenate(sections).astype(np.uint32)
+        tf_all = np.concatenate(tfs).astype(np.uint16)
+        length = np.concatenate(lengths)
+
+        order = np.lexsort((section_all, hash_all))
+        hash_all, section_all, tf_all = hash_all[order], section_all[order], tf_all[order]
+        terms, starts, df = np.unique(hash_all, return_index=True, return_counts=True)
+        offsets = np.append(starts, len(hash_all)).astype(np.int64)
+        idf = np.log1p((total - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = (K1 * (1 - B + B * length / max(length.mean(), 1.0))).astype(np.float32)
+        text = np.frombuffer(b"".join(texts), dtype=np.uint8)
+        text_offsets = np.concatenate([[0], np.cumsum([len(t) for t in texts])]).astype(np.int64)
+
+        arrays = {
+            "terms": terms, "idf": idf, "offsets": offsets, "post_sections": section_all, "post_tf": tf_all,
+            "norm": norm, "section_source": np.concatenate(source_of), "section_line": np.concatenate(lines).astype(np.uint32),
+            "text": text if len(text) else np.zeros(1, np.uint8), "text_offsets": text_offsets,
+        }
+        write_checkpoint(self.path, arrays, meta={"schema": INDEX_SCHEMA, "sources": layout, "k1": K1, "b": B})
+        self._load()
+
+
+# ---------------------------------------------------------------- CLI
+
+def main():
+    parser = argparse.ArgumentParser(description="📚 Repo doc index")
+    parser.add_argument("--index", default=DOC_INDEX)
+    parser.add_argument("--root", default=REPO_ROOT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="index new and changed docs")
+    query = sub.add_parser("query", help="search the index")
+    query.add_argument("text")
+    query.add_argument("-k", type=int, default=5)
+    bench = sub.add_parser("bench", help="query latency")
+    bench.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    index = DocIndex.open(args.index)
+    if args.command == "build":
+        stats = index.refresh(args.root)
+        print(f"📚 {args.index}: {stats['changed']} changed, {stats['removed']} removed, "
+              f"{stats['sections']} sections, {len(index.sources)} sources in {stats['seconds'] * 1e3:.1f} ms")
+    elif args.command == "query":
+        for hit in index.search(args.text, args.k):
+            print(f"{hit['score']:7.2f}  {hit['path']}:{hit['line']}  {hit['title']}")
+            print(f"         {hit['snippet']}")
+    elif args.command == "bench":
+        queries = ["yfinance rate limit", "warm restart checkpoint", "rsi oversold signal",
+                   "streamlit cloud deployment", "wallet connection avalanche", "process pool workers"]
+        started = time.perf_counter()
+        for i in range(args.repeat):
+            index.search(queries[i % len(queries)])
+        per_query = (time.perf_counter() - started) / args.repeat * 1e6
+        started = time.perf_counter()
+        DocIndex.open(args.index)
+        opened = (time.perf_counter() - started) * 1e3
+        print(f"🔎 {index.sections} sections, {len(index.terms)} terms: "
+              f"{per_query:.0f} µs/query, open {opened:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+🥊 WyoVerse Match Sim - Crypto Clashers without the arena lights
+Thousands of headless matches from synthetic or taped price paths
+
+    python match_sim.py --matches 20000                      # synthetic paths, all cores
+    python match_sim.py --matches 5000 --tape incident.tape  # windows of a recorded feed
+    python match_sim.py --matches 2000 --workers 1 --json    # machine-readable report
+
+    arena = Arena(1)                                          # what SOL_GAME.game_loop drives
+    arena.step(np.array([[btc_price, sol_price]]))
+
+``Arena`` holds the whole game state for ``matches`` bouts as ``(matches, 2)``
+arrays, one column per corner. A frame for every bout costs a few dozen
+NumPy ops, so the live loop (one bout) and the batch runner share one rule
+book. Each frame, a boxer's own price feed picks the move
+(``supabase/in.env/boxing_logic``):
+
+    +2% over the band window  double jab      RSI > 70          uppercut
+    +1%                       jab             MACD crosses up   combo
+    above upper Bollinger     hook            MACD crosses down stumble
+
+Hits fill the combo meter, and a full meter fires a combo. A guarding
+defender takes half damage, a stumbling one double. A bout ends on a
+knockout or after ``MATCH_FRAMES``, when it goes to the higher health.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+MOVES = ("guard", "jab", "double_jab", "hook", "uppercut", "combo", "stumble")
+GUARD, JAB, DOUBLE_JAB, HOOK, UPPERCUT, COMBO, STUMBLE = range(len(MOVES))
+DAMAGE = np.array([0.0, 1.0, 2.0, 3.0, 4.0, 0.0, 0.0])
+COMBO_DAMAGE = 1.5 * (DAMAGE[JAB] + DAMAGE[HOOK] + DAMAGE[UPPERCUT])
+# How hard each move lands on a defender doing the given move
+DEFENSE = np.array([0.5, 1.0, 1.0, 1.0, 1.0, 1.0, 2.0])
+METER_FULL = 100.0
+START_HEALTH = 100.0
+DRAW = 2
+
+FPS = 30
+MATCH_FRAMES = int(os.getenv("MATCH_FRAMES", str(60 * FPS)))
+BAND_WINDOW = 20
+RSI_PERIOD = 14
+WARMUP_FRAMES = 26  # slow MACD EMA
+
+# Synthetic feeds: per-frame volatility, time-compressed so a bout sees real swings
+TOKEN_VOLS = {"BTC": 0.002, "ETH": 0.0024, "SOL": 0.0032, "LINK": 0.003, "WYO": 0.005}
+
+
+def _ema_alpha(span: int) -> float:
+    return 2.0 / (span + 1)
+
+
+class Arena:
+    """🏟️ ``matches`` bouts stepped together, corners in columns 0 and 1"""
+
+    def __init__(self, matches: int, max_frames: int = MATCH_FRAMES):
+        shape = (matches, 2)
+        self.matches = matches
+        self.max_frames = max_frames
+        self.health = np.full(shape, START_HEALTH)
+        self.meter = np.zeros(shape)
+        self.done = np.zeros(matches, dtype=bool)
+        self.winner = np.full(matches, -1)  # corner, DRAW, or -1 while fighting
+        self.knockout = np.zeros(matches, dtype=bool)
+        self.frames = np.zeros(matches, dtype=np.int64)
+        self.move_counts = np.zeros((matches, 2, len(MOVES)), dtype=np.int64)
+        self.last_moves = np.zeros(shape, dtype=np.int8)
+
+        # Per-corner signal state, all incremental
+        self.seen = 0
+        self.last = np.full(shape, np.nan)
+        self.ring = np.zeros((matches, 2, BAND_WINDOW))
+        self.avg_gain = np.zeros(shape)
+        self.avg_loss = np.zeros(shape)
+        self.ema_fast = np.zeros(shape)
+        self.ema_slow = np.zeros(shape)
+        self.macd_signal = np.zeros(shape)
+        self.histogram = np.zeros(shape)
+
+    def _signals(self, price: np.ndarray) -> np.ndarray:
+        """Fold one price per corner into the indicators and pick each boxer's move"""
+        first = self.seen == 0
+        prev = price if first else self.last
+        slot = self.seen % BAND_WINDOW
+        window_ago = self.ring[:, :, slot].copy()
+        self.ring[:, :, slot] = price
+        self.seen += 1
+
+        delta = price - prev
+        self.avg_gain += (np.maximum(delta, 0.0) - self.avg_gain) / RSI_PERIOD
+        self.avg_loss += (np.maximum(-delta, 0.0) - self.avg_loss) / RSI_PERIOD
+        if first:
+            self.ema_fast[:] = price
+            self.ema_slow[:] = price
+        else:
+            self.ema_fast += _ema_alpha(12) * (price - self.ema_fast)
+            self.ema_slow += _ema_alpha(26) * (price - self.ema_slow)
+        macd = self.ema_fast - self.ema_slow
+        self.macd_signal += _ema_alpha(9) * (macd - self.macd_signal)
+        histogram = macd - self.macd_signal
+        crossed_up = (self.histogram <= 0) & (histogram > 0)
+        crossed_down = (self.histogram >= 0) & (histogram < 0)
+        self.histogram = histogram
+        self.last = price
+
+        if self.seen <= max(WARMUP_FRAMES, BAND_WINDOW):
+            return np.full(price.shape, GUARD, dtype=np.int8)
+        change = (price / window_ago - 1.0) * 100.0
+        upper = self.ring.mean(axis=2) + 2.0 * self.ring.std(axis=2, ddof=1)
+        loss = np.where(self.avg_loss > 0, self.avg_loss, np.nan)
+        rsi = np.where(self.avg_loss > 0, 100.0 - 100.0 / (1.0 + self.avg_gain / loss), 100.0)
+        return np.select(
+            [change > 2, change > 1, price > upper, rsi > 70, crossed_up, crossed_down],
+            [DOUBLE_JAB, JAB, HOOK, UPPERCUT, COMBO, STUMBLE], GUARD,
+        ).astype(np.int8)
+
+    def step(self, prices: np.ndarray) -> np.ndarray:
+        """One frame: ``prices`` is ``(matches, 2)``; returns the moves thrown"""
+        prices = np.asarray(prices, dtype=float).reshape(self.matches, 2)
+        # A missing or bad tick holds the last good price
+        if self.seen:
+            prices = np.where(np.isfinite(prices) & (prices > 0), prices, self.last)
+        moves = self._signals(prices)
+        live = ~self.done
+
+        self.meter += DAMAGE[moves]
+        combo = (moves == COMBO) | (self.meter >= METER_FULL)
+        moves[combo] = COMBO
+        self.meter[combo] = 0.0
+        dealt = np.where(moves == COMBO, COMBO_DAMAGE, DAMAGE[moves])
+        taken = dealt[:, ::-1] * DEFENSE[moves]
+        self.health -= taken * live[:, None]
+
+        self.last_moves = moves
+        self.move_counts[live] += np.eye(len(MOVES), dtype=np.int64)[moves[live]]
+        self.frames += live
+        self._settle(live)
+        return moves
+
+    def _settle(self, live: np.ndarray, final: bool = False):
+        down = self.health <= 0
+        knocked = live & down.any(axis=1)
+        timed_out = live & ~knocked & (final | (self.frames >= self.max_frames))
+        ending = knocked | timed_out
+        if not ending.any():
+            return
+        red, blue = self.health[:, 0], self.health[:, 1]
+        verdict = np.where(red > blue, 0, np.where(blue > red, 1, DRAW))
+        self.winner[ending] = verdict[ending]
+        self.knockout[knocked] = True
+        self.done |= ending
+
+    def run(self, paths: np.ndarray) -> "Arena":
+        """Step through ``(matches, 2, frames)`` price paths until every bout is over"""
+        for f in range(paths.shape[2]):
+            if self.done.all():
+                break
+            self.step(paths[:, :, f])
+        # Paths shorter than a bout go to the cards
+        self._settle(~self.done, final=True)
+        return self
+
+    def result(self, match: int = 0) -> Dict:
+        return {
+            "winner": int(self.winner[match]),
+            "knockout": bool(self.knockout[match]),
+            "frames": int(self.frames[match]),
+            "health": self.health[match].round(1).tolist(),
+            "moves": {MOVES[m]: self.move_counts[match, :, m].tolist() for m in range(len(MOVES))},
+        }
+
+
+# ---------------------------------------------------------------- price paths
+
+def synthetic_paths(rng: np.random.Generator, vols: np.ndarray, corners: np.ndarray,
+                    frames: int) -> np.ndarray:
+    """Driftless GBM per corner, ``(matches, 2, frames)``, starting at 100"""
+    sigma = vols[corners][:, :, None]
+    steps = rng.standard_normal((len(corners), 2, frames)) * sigma - 0.5 * sigma ** 2
+    return 100.0 * np.exp(np.cumsum(steps, axis=2))
+
+
+def tape_prices(path: str) -> Dict[str, np.ndarray]:
+    """Aligned price grid from a tick tape: ticks, or bar closes if it has none"""
+    from tick_tape import KIND_BAR_LC, KIND_TICK, read_tape
+
+    records, symbols = read_tape(path)
+    picked = records[records["kind"] == KIND_TICK]
+    value = "a"
+    if not len(picked):
+        picked, value = records[records["kind"] == KIND_BAR_LC], "b"
+    grid = np.unique(picked["ts"])
+    prices = {}
+    for sid in np.unique(picked["symbol"]):
+        rows = picked[picked["symbol"] == sid]
+        at = np.searchsorted(rows["ts"], grid, side="right") - 1
+        # Leading gaps take the first price seen
+        prices[symbols[sid]] = rows[value][np.maximum(at, 0)]
+    return prices
+
+
+def tape_paths(rng: np.random.Generator, grid: np.ndarray, corners: np.ndarray,
+               frames: int) -> np.ndarray:
+    """Both corners read the same random window of the taped timeline"""
+    length = grid.shape[1]
+    frames = min(frames, length)
+    starts = rng.integers(0, length - frames + 1, size=len(corners))
+    cols = starts[:, None] + np.arange(frames)
+    return np.stack([grid[corners[:, c]][np.arange(len(corners))[:, None], cols] for c in (0, 1)], axis=1)
+
+
+# ---------------------------------------------------------------- batch runner
+
+_TAPE_GRID: Dict[str, np.ndarray] = {}
+
+
+def _tape_grid(path: str, tokens: Sequence[str]) -> np.ndarray:
+    if path not in _TAPE_GRID:
+        prices = tape_prices(path)
+        _TAPE_GRID[path] = np.stack([prices[t] for t in tokens])
+    return _TAPE_GRID[path]
+
+
+def simulate(matches: int, seed: int, tokens: Sequence[str], vols: Sequence[float],
+             frames: int = MATCH_FRAMES, tape: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """One worker's share: random pairings, run, then per-token tallies"""
+    rng = np.random.default_rng(seed)
+    n = len(tokens)
+    first = rng.integers(0, n, size=matches)
+    corners = np.stack([first, (first + rng.integers(1, n, size=matches)) % n], axis=1)
+    if tape:
+        paths = tape_paths(rng, _tape_grid(tape, tokens), corners, frames)
+    else:
+        paths = synthetic_paths(rng, np.asarray(vols, dtype=float), corners, frames)
+
+    arena = Arena(matches, frames).run(paths)
+    winners = arena.winner
+    decided = winners != DRAW
+    won_by = corners[np.flatnonzero(decided), winners[decided]]
+    return {
+        "bouts": np.bincount(corners.ravel(), minlength=n),
+        "wins": np.bincount(won_by, minlength=n),
+        "draws": np.array([int((~decided).sum())]),
+        "knockouts": np.array([int(arena.knockout.sum())]),
+        "frames": np.array([int(arena.frames.sum())]),
+        "moves": np.stack([np.bincount(corners.ravel(), weights=arena.move_counts[:, :, m].ravel(), minlength=n)
+                           for m in range(len(MOVES))], axis=1),
+    }
+
+
+def _simulate_job(job: tuple) -> Dict[str, np.ndarray]:
+    return simulate(*job)
+
+
+def run_batch(matches: int, tokens: Sequence[str], vols: Sequence[float], workers: Optional[int] = None,
+              chunk: int = 500, frames: int = MATCH_FRAMES, tape: Optional[str] = None,
+              seed: int = 0) -> Dict:
+    """Fan ``matches`` out over a process pool in ``chunk``-bout jobs and add up the tallies"""
+    workers = workers or os.cpu_count() or 1
+    sizes = [min(chunk, matches - start) for start in range(0, matches, chunk)]
+    seeds = np.random.SeedSequence(seed).generate_state(len(sizes))
+    jobs = [(size, int(s), list(tokens), list(vols), frames, tape) for size, s in zip(sizes, seeds)]
+
+    started = time.perf_counter()
+    if workers == 1:
+        parts = map(_simulate_job, jobs)
+        totals = _add_up(parts)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            totals = _add_up(pool.map(_simulate_job, jobs))
+    totals["seconds"] = time.perf_counter() - started
+    totals["workers"] = workers
+    return totals
+
+
+def _add_up(parts) -> Dict:
+    totals: Dict = {}
+    for part in parts:
+        for key, value in part.items():
+            totals[key] = totals[key] + value if key in totals else value
+    return totals
+
+
+def report(totals: Dict, tokens: Sequence[str], matches: int) -> Dict:
+    """Win rates, move mix and combo frequency per token, plus sim throughput"""
+    bouts, wins, moves = totals["bouts"], totals["wins"], totals["moves"]
+    thrown = moves.sum(axis=1)
+    per_token = {}
+    for i, token in enumerate(tokens):
+        per_token[token] = {
+            "bouts": int(bouts[i]),
+            "win_rate": float(wins[i] / bouts[i]) if bouts[i] else 0.0,
+            "combos_per_bout": float(moves[i, COMBO] / bouts[i]) if bouts[i] else 0.0,
+            "move_mix": {MOVES[m]: float(moves[i, m] / thrown[i]) if thrown[i] else 0.0
+                         for m in range(len(MOVES))},
+        }
+    frames = int(totals["frames"][0])
+    return {
+        "matches": matches,
+        "workers": totals["workers"],
+        "seconds": totals["seconds"],
+        "frames": frames,
+        "sim_fps": frames / totals["seconds"] if totals["seconds"] else 0.0,
+        "realtime_speedup": frames / FPS / totals["seconds"] if totals["seconds"] else 0.0,
+        "knockout_rate": float(totals["knockouts"][0] / matches),
+        "draw_rate": float(totals["draws"][0] / matches),
+        "tokens": per_token,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🥊 Headless Crypto Clashers batch simulator")
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=500, help="bouts per job")
+    parser.add_argument("--frames", type=int, default=MATCH_FRAMES, help="frames per bout before the cards")
+    parser.add_argument("--tokens", default=",".join(TOKEN_VOLS), help="roster (synthetic vols from TOKEN_VOLS)")
+    parser.add_argument("--tape", help="tick tape to cut price windows from instead of synthetic paths")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    tokens = [t for t in args.tokens.split(",") if t]
+    if args.tape:
+        taped = tape_prices(args.tape)
+        tokens = [t for t in tokens if t in taped] or sorted(taped)
+    if len(tokens) < 2:
+        parser.error("need at least two tokens to make a bout")
+    vols = [TOKEN_VOLS.get(t, 0.003) for t in tokens]
+
+    totals = run_batch(args.matches, tokens, vols, args.workers, args.chunk, args.frames, args.tape, args.seed)
+    summary = report(totals, tokens, args.matches)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"🥊 {summary['matches']} bouts on {summary['workers']} worker(s) in {summary['seconds']:.2f}s")
+    print(f"   {summary['frames']:,} frames  {summary['sim_fps']:,.0f} sim FPS "
+          f"({summary['realtime_speedup']:,.0f}x real time)")
+    print(f"   knockouts {summary['knockout_rate']:.1%}  draws {summary['draw_rate']:.1%}")
+    print(f"   {'token':6s} {'bouts':>7s} {'win%':>6s} {'combos':>7s}  top moves")
+    for token, stats in summary["tokens"].items():
+        mix = sorted(stats["move_mix"].items(), key=lambda kv: -kv[1])[:3]
+        print(f"   {token:6s} {stats['bouts']:7d} {stats['win_rate']:6.1%} {stats['combos_per_bout']:7.2f}  "
+              + "  ".join(f"{m} {share:.0%}" for m, share in mix))
+
+
+if __name__ == "__main__":
+    main()
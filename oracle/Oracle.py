@@ -1,25 +1,99 @@
 # oracles/market_oracle.py
-from pythclient import PythClient
-from solana.rpc.async_api import AsyncClient
+from collections import deque
+
+from stage_metrics import stage
 
 class CryptoBoxingOracle:
-    def __init__(self):
-        self.client = PythClient()
-        self.solana_client = AsyncClient("https://api.mainnet-beta.solana.com")
+    def __init__(self, client=None, solana_client=None, history=50, checkpoint_path=None):
+        # Clients are injectable so tick_tape can record or replay the feed
+        if client is None:
+            # Pyth ticks, not the market service's yfinance bars (it has no on-chain
+            # feed to share), so the oracle keeps its own client
+            # Raw price accounts over the pooled RPC, decoded in one NumPy pass
+            from pyth_accounts import PythAccountClient
+            client = PythAccountClient()
+        if solana_client is None:
+            # Shared pooled RPC (``await solana_client.acall("getSlot")``)
+            from rpc_pool import rpc_pool
+            solana_client = rpc_pool("solana")
+        self.client = client
+        self.solana_client = solana_client
+        self.history = {}
+        self.history_size = history
+        # Warm start: price buffers come back from the last checkpoint.py snapshot
+        # (keep it fresh with Checkpointer(path, oracle.checkpoint_state).start())
+        if checkpoint_path:
+            from checkpoint import load_checkpoint
+            ckpt = load_checkpoint(checkpoint_path)
+            if ckpt is not None:
+                self.restore(ckpt)
         
     async def get_crypto_data(self):
         # Get top 50 crypto prices
-        feeds = await self.client.get_price_feeds([
-            "BTC", "SOL", "ETH", "BNB", "ADA",  # Add 45 more
-        ])
+        with stage("oracle_fetch"):
+            feeds = await self.client.get_price_feeds([
+                "BTC", "SOL", "ETH", "BNB", "ADA",  # Add 45 more
+            ])
         
         processed = {}
         for symbol, feed in feeds.items():
+            prices = self.history.setdefault(symbol, deque(maxlen=self.history_size))
+            prices.append(feed.aggregate.price)
             processed[symbol] = {
                 "price": feed.aggregate.price,
                 "confidence": feed.aggregate.confidence,
-                "bollinger": self._calculate_bollinger(feed),
-                "rsi": self._calculate_rsi(feed),
-                "macd": self._calculate_macd(feed)
+                "bollinger": self._calculate_bollinger(prices),
+                "rsi": self._calculate_rsi(prices),
+                "macd": self._calculate_macd(prices)
             }
         return processed
+
+    # Checkpoints: history as one (symbols, history) block, NaN for empty slots
+    CHECKPOINT_SCHEMA = 1
+
+    def checkpoint_state(self):
+        import numpy as np
+        symbols = list(self.history)
+        block = np.full((len(symbols), self.history_size), np.nan)
+        for row, symbol in zip(block, symbols):
+            prices = self.history[symbol]
+            if prices:
+                row[-len(prices):] = list(prices)
+        return {"oracle/history": block}, {"schema": self.CHECKPOINT_SCHEMA, "symbols": symbols}
+
+    def restore(self, ckpt):
+        import numpy as np
+        if ckpt.meta.get("schema") != self.CHECKPOINT_SCHEMA or "oracle/history" not in ckpt:
+            return False
+        for symbol, row in zip(ckpt.meta["symbols"], ckpt["oracle/history"]):
+            prices = row[~np.isnan(row)].tolist()
+            self.history[symbol] = deque(prices, maxlen=self.history_size)
+        return True
+
+    # Indicators over the prices this oracle has seen (None until enough history)
+    def _calculate_bollinger(self, prices, window=20):
+        if len(prices) < window:
+            return None
+        recent = list(prices)[-window:]
+        mean = sum(recent) / window
+        std = (sum((p - mean) ** 2 for p in recent) / (window - 1)) ** 0.5
+        return {"upper": mean + 2 * std, "middle": mean, "lower": mean - 2 * std}
+
+    def _calculate_rsi(self, prices, window=14):
+        if len(prices) <= window:
+            return None
+        recent = list(prices)[-(window + 1):]
+        moves = [b - a for a, b in zip(recent, recent[1:])]
+        gain = sum(m for m in moves if m > 0) / window
+        loss = -sum(m for m in moves if m < 0) / window
+        return 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+
+    def _calculate_macd(self, prices, fast=12, slow=26):
+        if len(prices) < slow:
+            return None
+        def ema(span):
+            alpha, value = 2 / (span + 1), prices[0]
+            for p in prices:
+                value += alpha * (p - value)
+            return value
+        return ema(fast) - ema(slow)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+🔮 WyoVerse Pyth Accounts - Raw price-account bytes straight into NumPy
+Fifty feeds, one RPC round trip, zero Python objects per field
+
+    raw = fetch_price_accounts(rpc_pool("solana"), keys)   # one getMultipleAccounts batch
+    view = decode_price_accounts(raw)                      # structured view over the bytes
+    prices(view)                                           # float price/conf, status, time
+
+A Pyth v2 price account is a fixed 3,312-byte struct. ``ACCOUNT_DTYPE``
+names the fields we read at their byte offsets with the account size as the
+item size, so ``np.frombuffer`` over concatenated accounts *is* the decoded
+table: no parsing loop, no copies, microseconds for a thousand accounts.
+``prices`` does the one vectorized pass that applies the exponent.
+
+Fixtures: ``record`` saves live accounts with a field-by-field ``struct``
+decode beside them; ``verify`` checks the fast decoder against such a file.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import struct
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+PYTH_MAGIC = 0xA1B2C3D4
+ACCOUNT_TYPE_PRICE = 3
+PRICE_ACCOUNT_SIZE = 3312
+MAX_ACCOUNTS_PER_CALL = 100  # getMultipleAccounts limit
+STATUS_NAMES = {0: "unknown", 1: "trading", 2: "halted", 3: "auction", 4: "ignored"}
+STATUS_TRADING = 1
+PYTH_V2_LAUNCH = 1_630_000_000  # Aug 2021; older publish times mean misread bytes
+
+# Mainnet price accounts (override with PYTH_FEEDS="BTC=<key>,SOL=<key>")
+DEFAULT_FEEDS = {
+    "BTC": "GVXRSBjFk6e6J3NbVPXohDJetcTjaeeuykUpbQF8UoMU",
+    "ETH": "JBu1AL4obBcCMqKBBxhpWCNUt136ijcuMZLFvTP7iWdB",
+    "SOL": "H6ARHf6YXhGYeQfUzQNGk6rDNnLBQKrenN712K4AQJEG",
+}
+
+# Field offsets within the account (pyth-client oracle.h, v2)
+ACCOUNT_DTYPE = np.dtype({
+    "names": ["magic", "version", "atype", "size", "ptype", "expo", "num_components",
+              "last_slot", "valid_slot", "ema_price", "ema_conf", "publish_time",
+              "price", "conf", "status", "pub_slot"],
+    "formats": ["<u4", "<u4", "<u4", "<u4", "<u4", "<i4", "<u4",
+                "<u8", "<u8", "<i8", "<i8", "<i8",
+                "<i8", "<u8", "<u4", "<u8"],
+    "offsets": [0, 4, 8, 12, 16, 20, 24,
+                32, 40, 48, 72, 96,
+                208, 216, 224, 232],
+    "itemsize": PRICE_ACCOUNT_SIZE,
+})
+# Bytes an account needs for every field above (real ones are PRICE_ACCOUNT_SIZE)
+MIN_ACCOUNT_SIZE = max(ACCOUNT_DTYPE.fields[name][1] + ACCOUNT_DTYPE.fields[name][0].itemsize
+                       for name in ACCOUNT_DTYPE.names)
+PRICE_DTYPE = np.dtype([("price", "<f8"), ("conf", "<f8"), ("expo", "<i4"),
+                        ("publish_time", "<i8"), ("status", "<u4"), ("slot", "<u8")])
+
+
+def feed_keys() -> Dict[str, str]:
+    spec = os.getenv("PYTH_FEEDS")
+    if not spec:
+        return dict(DEFAULT_FEEDS)
+    return dict(item.strip().split("=", 1) for item in spec.split(",") if "=" in item)
+
+
+def decode_price_accounts(raw) -> np.ndarray:
+    """Zero-copy structured view over back-to-back price accounts
+
+    ``raw`` is any buffer (bytes, bytearray, memoryview, mmap) whose length
+    is a multiple of ``PRICE_ACCOUNT_SIZE``. The view shares its memory.
+    """
+    buffer = memoryview(raw)
+    if buffer.nbytes % PRICE_ACCOUNT_SIZE:
+        raise ValueError(f"{buffer.nbytes} bytes is not a whole number of {PRICE_ACCOUNT_SIZE}-byte accounts")
+    return np.frombuffer(buffer, dtype=ACCOUNT_DTYPE)
+
+
+def valid_mask(view: np.ndarray) -> np.ndarray:
+    """Accounts that really are Pyth price accounts"""
+    return (view["magic"] == PYTH_MAGIC) & (view["atype"] == ACCOUNT_TYPE_PRICE)
+
+
+def prices(view: np.ndarray) -> np.ndarray:
+    """Scaled aggregate prices as a compact ``PRICE_DTYPE`` table (NaN where invalid)"""
+    out = np.empty(len(view), dtype=PRICE_DTYPE)
+    scale = np.power(10.0, view["expo"].astype(np.float64))
+    ok = valid_mask(view)
+    out["price"] = np.where(ok, view["price"] * scale, np.nan)
+    out["conf"] = np.where(ok, view["conf"] * scale, np.nan)
+    out["expo"] = view["expo"]
+    out["publish_time"] = view["publish_time"]
+    out["status"] = np.where(ok, view["status"], 0)
+    out["slot"] = view["pub_slot"]
+    return out
+
+
+def pack_accounts(blobs: Sequence[Optional[bytes]]) -> bytearray:
+    """Lay account datas end to end, zero-padded to ``PRICE_ACCOUNT_SIZE``
+
+    Missing accounts and ones cut off before the price fields stay all zero,
+    so ``valid_mask`` rejects them instead of reading a price of 0.
+    """
+    raw = bytearray(len(blobs) * PRICE_ACCOUNT_SIZE)
+    for i, blob in enumerate(blobs):
+        if blob and len(blob) >= MIN_ACCOUNT_SIZE:
+            n = min(len(blob), PRICE_ACCOUNT_SIZE)
+            raw[i * PRICE_ACCOUNT_SIZE:i * PRICE_ACCOUNT_SIZE + n] = blob[:n]
+    return raw
+
+
+# ---------------------------------------------------------------- fetching
+
+def _account_calls(keys: Sequence[str]) -> List[Tuple[str, list]]:
+    return [("getMultipleAccounts", [list(keys[i:i + MAX_ACCOUNTS_PER_CALL]), {"encoding": "base64"}])
+            for i in range(0, len(keys), MAX_ACCOUNTS_PER_CALL)]
+
+
+def _blobs(results) -> List[Optional[bytes]]:
+    blobs = []
+    for result in results:
+        for account in result["value"]:
+            blobs.append(base64.b64decode(account["data"][0]) if account else None)
+    return blobs
+
+
+def fetch_price_accounts(pool, keys: Sequence[str]) -> bytearray:
+    """Every account in one HTTP request (one ``getMultipleAccounts`` per 100 keys, batched)"""
+    return pack_accounts(_blobs(pool.batch(_account_calls(keys))))
+
+
+async def afetch_price_accounts(pool, keys: Sequence[str]) -> bytearray:
+    results = await asyncio.gather(*(pool.acall(m, p) for m, p in _account_calls(keys)))
+    return pack_accounts(_blobs(results))
+
+
+class PythAccountClient:
+    """Drop-in for ``PythClient.get_price_feeds`` that reads raw accounts over the RPC pool"""
+
+    def __init__(self, pool=None, feeds: Optional[Dict[str, str]] = None):
+        if pool is None:
+            from rpc_pool import rpc_pool
+            pool = rpc_pool("solana")
+        self.pool = pool
+        self.feeds = feeds or feed_keys()
+
+    async def get_price_table(self, symbols: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+        wanted = [s for s in symbols if s in self.feeds]
+        raw = await afetch_price_accounts(self.pool, [self.feeds[s] for s in wanted])
+        return wanted, prices(decode_price_accounts(raw))
+
+    async def get_price_feeds(self, symbols: Sequence[str]):
+        from types import SimpleNamespace
+
+        wanted, table = await self.get_price_table(symbols)
+        return {
+            symbol: SimpleNamespace(aggregate=SimpleNamespace(price=float(row["price"]), confidence=float(row["conf"])))
+            for symbol, row in zip(wanted, table) if row["status"] == STATUS_TRADING
+        }
+
+
+# ---------------------------------------------------------------- fixtures
+
+def reference_decode(blob: bytes) -> Dict:
+    """Slow field-by-field decode, the yardstick fixtures are recorded with"""
+    magic, version, atype, size, ptype, expo, num = struct.unpack_from("<IIIIIiI", blob, 0)
+    last_slot, valid_slot = struct.unpack_from("<QQ", blob, 32)
+    (publish_time,) = struct.unpack_from("<q", blob, 96)
+    price, conf, status, _, pub_slot = struct.unpack_from("<qQIIQ", blob, 208)
+    return {"magic": magic, "atype": atype, "expo": expo, "price": price, "conf": conf,
+            "status": status, "publish_time": publish_time, "pub_slot": pub_slot}
+
+
+def encode_price_account(price: int, conf: int, expo: int, publish_time: int,
+                         status: int = STATUS_TRADING, slot: int = 0) -> bytes:
+    """Minimal valid account bytes (for benchmarks and synthetic fixtures)"""
+    blob = bytearray(PRICE_ACCOUNT_SIZE)
+    struct.pack_into("<IIIIIiI", blob, 0, PYTH_MAGIC, 2, ACCOUNT_TYPE_PRICE, PRICE_ACCOUNT_SIZE, 1, expo, 0)
+    struct.pack_into("<QQ", blob, 32, slot, slot)
+    struct.pack_into("<q", blob, 96, publish_time)
+    struct.pack_into("<qQIIQ", blob, 208, price, conf, status, 0, slot)
+    return bytes(blob)
+
+
+def record_fixture(path: str, pool, feeds: Dict[str, str]):
+    """Save live accounts (base64) with their reference decode as JSON lines"""
+    symbols = list(feeds)
+    results = pool.batch(_account_calls([feeds[s] for s in symbols]))
+    with open(path, "w") as f:
+        for symbol, blob in zip(symbols, _blobs(results)):
+            if blob is None:
+                continue
+            f.write(json.dumps({"symbol": symbol, "key": feeds[symbol],
+                                "data": base64.b64encode(blob).decode(),
+                                "expected": reference_decode(blob)}) + "\n")
+
+
+def verify_fixture(path: str) -> List[str]:
+    """Fast decoder vs recorded expectations; returns mismatch descriptions
+
+    The expectations share the decoder's offsets, so live accounts also have
+    to look live: right magic, type and size, a known status and a positive
+    price published after Pyth v2 launched.
+    """
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    view = decode_price_accounts(pack_accounts([base64.b64decode(r["data"]) for r in rows]))
+    table = prices(view)
+    problems = []
+    for i, row in enumerate(rows):
+        if not valid_mask(view[i:i + 1])[0] or view["size"][i] != PRICE_ACCOUNT_SIZE:
+            problems.append(f"{row['symbol']}: not a price account")
+        elif not (table["price"][i] > 0 and view["status"][i] in STATUS_NAMES
+                  and view["publish_time"][i] > PYTH_V2_LAUNCH):
+            problems.append(f"{row['symbol']}: implausible price {table['price'][i]} "
+                            f"(status {view['status'][i]}, published {view['publish_time'][i]})")
+        for field, expected in row["expected"].items():
+            decoded = int(view[field][i])
+            if decoded != expected:
+                problems.append(f"{row['symbol']}.{field}: decoded {decoded} expected {expected}")
+    return problems
+
+
+def _bench(accounts: int, repeat: int = 200):
+    rng = np.random.default_rng(0)
+    blobs = [encode_price_account(int(p), int(c), -8, 1_700_000_000 + i, slot=i)
+             for i, (p, c) in enumerate(zip(rng.integers(1e9, 1e13, accounts), rng.integers(1e5, 1e8, accounts)))]
+    raw = pack_accounts(blobs)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        view = decode_price_accounts(raw)
+    view_us = (time.perf_counter() - started) / repeat * 1e6
+    started = time.perf_counter()
+    for _ in range(repeat):
+        table = prices(decode_price_accounts(raw))
+    table_us = (time.perf_counter() - started) / repeat * 1e6
+    started = time.perf_counter()
+    reference = [reference_decode(b) for b in blobs]
+    reference_us = (time.perf_counter() - started) * 1e6
+
+    assert all(int(view["price"][i]) == r["price"] and int(view["conf"][i]) == r["conf"]
+               for i, r in enumerate(reference))
+    print(f"🎯 {accounts} accounts ({len(raw) / 2**20:.1f} MB)")
+    print(f"   zero-copy view        {view_us:10.1f} µs")
+    print(f"   scaled price table    {table_us:10.1f} µs")
+    print(f"   struct per account    {reference_us:10.1f} µs")
+    print(f"   last: {table[-1]['price']:.2f} ± {table[-1]['conf']:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🔮 Pyth price-account decoder")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="decode synthetic accounts")
+    bench.add_argument("--accounts", type=int, default=1000)
+    record = sub.add_parser("record", help="record live accounts as a fixture (needs RPC)")
+    record.add_argument("path")
+    verify = sub.add_parser("verify", help="check the decoder against a recorded fixture")
+    verify.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        _bench(args.accounts)
+    elif args.command == "record":
+        from rpc_pool import rpc_pool
+
+        record_fixture(args.path, rpc_pool("solana"), feed_keys())
+        print(f"📼 recorded {args.path}")
+    else:
+        problems = verify_fixture(args.path)
+        for problem in problems:
+            print(f"❌ {problem}")
+        print("✅ decoder matches fixture" if not problems else f"{len(problems)} mismatches")
+        raise SystemExit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
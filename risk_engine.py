@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+🛡️ WyoVerse Risk Engine - Size every shot against the whole herd
+Positions, rolling covariance, VaR/CVaR, risk contributions and pre-trade checks
+
+    risk = RiskEngine(equity=100_000)
+    risk.update({"BTC-USD": 64_000.0, "ETH-USD": 3_100.0})    # once per bar
+    order = risk.size({"symbol": "ETH-USD", "action": "BUY", "confidence": 0.9})
+    if order["approved"]:
+        risk.fill(order["symbol"], order["quantity"], order["price"])
+    risk.report()                                              # VaR, CVaR, contributions
+
+    risk.update_history({"BTC-USD": btc["close"], ...})       # closed bars newer than last_ts
+    write_checkpoint(path, *risk.checkpoint_state())           # warm start: risk.restore(ckpt)
+
+Covariance is exponentially weighted and folds in one bar at a time with a
+rank-one update, as in the Sniper's regime engine. ``Σw`` is cached, so
+a pre-trade check is O(1) per order: the new portfolio variance is
+``σ² + 2·Δ·(Σw)ᵢ + Δ²·Σᵢᵢ``. An order that would break a limit is scaled
+down to the largest size that fits, never silently passed.
+
+Sizing is volatility targeted: an order aims at the weight whose stand-alone
+annualized volatility is ``RISK_POSITION_VOL`` × confidence. That weight is
+then capped per asset, by gross leverage and by the portfolio VaR limit.
+
+    python risk_engine.py bench --assets 500
+"""
+
+import argparse
+import os
+import threading
+import time
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Dict, Optional, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+BARS_PER_YEAR = float(os.getenv("RISK_BARS_PER_YEAR", str(24 * 365)))   # hourly crypto bars
+HORIZON_BARS = float(os.getenv("RISK_HORIZON_BARS", "24"))             # VaR horizon: one day
+CONFIDENCE = float(os.getenv("RISK_CONFIDENCE", "0.99"))
+VAR_LIMIT = float(os.getenv("RISK_VAR_LIMIT", "0.02"))                 # of equity, at the horizon
+POSITION_VOL = float(os.getenv("RISK_POSITION_VOL", "0.10"))           # annualized, per position
+MAX_WEIGHT = float(os.getenv("RISK_MAX_WEIGHT", "0.25"))
+MAX_GROSS = float(os.getenv("RISK_MAX_GROSS", "1.5"))
+HALFLIFE_BARS = float(os.getenv("RISK_HALFLIFE_BARS", "72"))
+HISTORY_BARS = int(os.getenv("RISK_HISTORY_BARS", "500"))              # for historical VaR
+MIN_BARS = 20
+
+
+class RiskEngine:
+    """🎯 Incremental portfolio risk for a growing universe of assets"""
+
+    def __init__(self, symbols: Sequence[str] = (), equity: float = 100_000.0,
+                 halflife: float = HALFLIFE_BARS, confidence: float = CONFIDENCE,
+                 horizon: float = HORIZON_BARS, var_limit: float = VAR_LIMIT,
+                 position_vol: float = POSITION_VOL, max_weight: float = MAX_WEIGHT,
+                 max_gross: float = MAX_GROSS, history: int = HISTORY_BARS):
+        self.equity = equity
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf(confidence)
+        # Expected shortfall of a standard normal beyond z
+        self.es_factor = NormalDist().pdf(self.z) / (1.0 - confidence)
+        self.horizon = horizon
+        self.var_limit = var_limit
+        self.position_vol = position_vol
+        self.max_weight = max_weight
+        self.max_gross = max_gross
+
+        self.symbols = []
+        self.index: Dict[str, int] = {}
+        self.prices = np.empty(0)
+        self.quantities = np.empty(0)
+        self.mean = np.empty(0)
+        self.cov = np.empty((0, 0))
+        self.returns = np.zeros((history, 0))  # ring of recent bar returns
+        self.bars = 0
+        self.last_ts: Optional[int] = None  # open time (ns) of the newest bar folded in
+        self._outer = np.empty((0, 0))
+        self._cov_w: Optional[np.ndarray] = None  # Σw, rebuilt lazily
+        self._lock = threading.RLock()
+        self.ensure(symbols)
+
+    # ------------------------------------------------------------ universe and state
+
+    def ensure(self, symbols: Sequence[str]) -> np.ndarray:
+        """Grow the universe to include ``symbols``; return their positions"""
+        with self._lock:
+            new = [s for s in dict.fromkeys(symbols) if s not in self.index]
+            if new:
+                k = len(new)
+                for offset, symbol in enumerate(new):
+                    self.index[symbol] = len(self.symbols) + offset
+                self.symbols.extend(new)
+                self.prices = np.r_[self.prices, np.full(k, np.nan)]
+                self.quantities = np.r_[self.quantities, np.zeros(k)]
+                self.mean = np.r_[self.mean, np.zeros(k)]
+                self.cov = np.pad(self.cov, ((0, k), (0, k)))
+                self.returns = np.pad(self.returns, ((0, 0), (0, k)))
+                self._outer = np.empty_like(self.cov)
+                self._cov_w = None
+            return np.fromiter((self.index[s] for s in symbols), dtype=np.intp, count=len(symbols))
+
+    def update(self, closes: Dict[str, float]):
+        """Fold one bar of closes in (missing assets count as a flat bar)"""
+        with self._lock:
+            at = self.ensure(list(closes))
+            price = self.prices.copy()
+            price[at] = np.fromiter(closes.values(), dtype=float, count=len(at))
+            self.step(price)
+
+    def step(self, price: np.ndarray):
+        """Array form of ``update``: ``price`` in ``self.symbols`` order"""
+        with self._lock:
+            price = np.asarray(price, dtype=float)
+            seen = np.isfinite(price) & np.isfinite(self.prices) & (price > 0) & (self.prices > 0)
+            returns = np.zeros(len(price))
+            np.log(price, out=returns, where=seen)
+            returns[seen] -= np.log(self.prices[seen])
+            np.copyto(self.prices, price, where=np.isfinite(price) & (price > 0))
+
+            # West's EW covariance: C <- (1 - a)(C + a d d')
+            a = self.alpha
+            delta = returns - self.mean
+            self.mean += a * delta
+            np.multiply.outer(delta, delta, out=self._outer)
+            self._outer *= a
+            self.cov += self._outer
+            self.cov *= 1.0 - a
+            self.returns[self.bars % len(self.returns)] = returns
+            self.bars += 1
+            self._cov_w = None
+
+    def step_many(self, prices: np.ndarray, ts: np.ndarray):
+        """Fold a ``(bars, assets)`` block, oldest row first, skipping bars already seen"""
+        with self._lock:
+            for row, t in zip(prices, np.asarray(ts, dtype=np.int64).tolist()):
+                if self.last_ts is not None and t <= self.last_ts:
+                    continue
+                self.step(row)
+                self.last_ts = t
+
+    def update_history(self, closes: Dict[str, "pd.Series"]):
+        """Fold per-symbol close histories (indexed by bar open time) in one bar at a time
+
+        Only bars newer than ``last_ts`` count, so re-fetching an overlapping
+        window is harmless and the first call seeds the covariance from the
+        whole history. The last bar of each series is still forming and waits
+        for the next call.
+        """
+        import pandas as pd
+
+        frame = pd.concat({symbol: series.iloc[:-1] for symbol, series in closes.items()}, axis=1).sort_index()
+        if frame.empty:
+            return
+        with self._lock:
+            at = self.ensure(list(frame.columns))
+            block = np.full((len(frame), len(self.symbols)), np.nan)
+            block[:, at] = frame.to_numpy(dtype=float)
+            self.step_many(block, frame.index.as_unit("ns").asi8)
+
+    def fill(self, symbol: str, quantity: float, price: Optional[float] = None):
+        """Book an executed trade (signed quantity)"""
+        with self._lock:
+            i = self.ensure([symbol])[0]
+            before = self.weights()[i]
+            if price is not None:
+                self.prices[i] = price
+            self.quantities[i] += quantity
+            # Σw moves along one column: O(n) instead of a fresh O(n²) product
+            if self._cov_w is not None:
+                self._cov_w += self.cov[:, i] * (self.weights()[i] - before)
+
+    # Checkpoints: the whole book, so a fresh container resumes instead of warming up
+    CHECKPOINT_SCHEMA = 1
+
+    def checkpoint_state(self):
+        with self._lock:
+            arrays = {"risk/prices": self.prices, "risk/quantities": self.quantities, "risk/mean": self.mean,
+                      "risk/cov": self.cov, "risk/returns": self.returns}
+            return arrays, {"schema": self.CHECKPOINT_SCHEMA, "symbols": list(self.symbols), "bars": self.bars,
+                            "last_ts": self.last_ts, "equity": self.equity}
+
+    def restore(self, ckpt) -> bool:
+        if ckpt is None or ckpt.meta.get("schema") != self.CHECKPOINT_SCHEMA or "risk/cov" not in ckpt:
+            return False
+        n = len(ckpt.meta["symbols"])
+        if ckpt["risk/cov"].shape != (n, n) or ckpt["risk/returns"].shape[1] != n:
+            return False
+        with self._lock:
+            self.symbols = list(ckpt.meta["symbols"])
+            self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+            for name in ("prices", "quantities", "mean", "cov", "returns"):
+                # Copies: the checkpoint maps read-only
+                setattr(self, name, np.array(ckpt[f"risk/{name}"], dtype=float))
+            self.bars = int(ckpt.meta["bars"])
+            self.last_ts = ckpt.meta["last_ts"]
+            self.equity = float(ckpt.meta["equity"])
+            self._outer = np.empty_like(self.cov)
+            self._cov_w = None
+        return True
+
+    # ------------------------------------------------------------ readouts
+
+    def weights(self) -> np.ndarray:
+        """Position value / equity per asset"""
+        value = np.zeros(len(self.quantities))
+        np.multiply(self.quantities, self.prices, out=value, where=self.quantities != 0)
+        return value / self.equity
+
+    def _scale(self) -> float:
+        return float(np.sqrt(self.horizon))
+
+    def _sigma_w(self, w: np.ndarray) -> np.ndarray:
+        if self._cov_w is None:
+            self._cov_w = self.cov @ w
+        return self._cov_w
+
+    def volatility(self, annualized: bool = True) -> np.ndarray:
+        sigma = np.sqrt(np.clip(np.diagonal(self.cov), 0.0, None))
+        return sigma * np.sqrt(BARS_PER_YEAR) if annualized else sigma
+
+    def portfolio_sigma(self) -> float:
+        """Per-bar volatility of portfolio return"""
+        with self._lock:
+            w = self.weights()
+            return float(np.sqrt(max(w @ self._sigma_w(w), 0.0)))
+
+    def var(self, method: str = "parametric") -> Dict[str, float]:
+        """VaR and CVaR at ``confidence`` over the horizon, as fractions of equity"""
+        with self._lock:
+            w = self.weights()
+            if method == "historical":
+                filled = min(self.bars, len(self.returns))
+                pnl = self.returns[:filled] @ w * self._scale()
+                if not filled:
+                    return {"var": 0.0, "cvar": 0.0}
+                cutoff = np.quantile(pnl, 1.0 - self.confidence)
+                return {"var": float(-cutoff), "cvar": float(-pnl[pnl <= cutoff].mean())}
+            sigma = self.portfolio_sigma() * self._scale()
+            return {"var": self.z * sigma, "cvar": self.es_factor * sigma}
+
+    def contributions(self) -> Dict[str, np.ndarray]:
+        """Marginal risk ``∂σ/∂w = Σw/σ`` and each asset's share of portfolio σ (sums to 1)"""
+        with self._lock:
+            w = self.weights()
+            cov_w = self._sigma_w(w)
+            sigma = float(np.sqrt(max(w @ cov_w, 0.0)))
+            if sigma == 0:
+                zeros = np.zeros(len(w))
+                return {"marginal": zeros, "component": zeros, "share": zeros}
+            marginal = cov_w / sigma
+            component = w * marginal
+            return {"marginal": marginal, "component": component, "share": component / sigma}
+
+    def report(self, top: int = 10) -> Dict:
+        """📊 Portfolio-level numbers plus the biggest risk contributors"""
+        with self._lock:
+            parametric, historical = self.var(), self.var("historical")
+            parts = self.contributions()
+            w = self.weights()
+            order = np.argsort(-np.abs(parts["share"]))[:top]
+            return {
+                "equity": self.equity,
+                "gross": float(np.abs(w).sum()),
+                "net": float(w.sum()),
+                "volatility": self.portfolio_sigma() * float(np.sqrt(BARS_PER_YEAR)),
+                "var": parametric["var"], "cvar": parametric["cvar"],
+                "historical_var": historical["var"], "historical_cvar": historical["cvar"],
+                "confidence": self.confidence, "horizon_bars": self.horizon,
+                "contributors": [
+                    {"symbol": self.symbols[i], "weight": float(w[i]),
+                     "marginal": float(parts["marginal"][i]), "share": float(parts["share"][i])}
+                    for i in order if w[i] != 0
+                ],
+            }
+
+    # ------------------------------------------------------------ sizing and checks
+
+    def target_weight(self, symbol: str, direction: float, confidence: float = 1.0) -> float:
+        """Weight whose stand-alone annualized vol is ``position_vol × confidence``"""
+        i = self.index.get(symbol)
+        if i is None or self.bars < MIN_BARS:
+            return 0.0
+        vol = float(np.sqrt(max(self.cov[i, i], 0.0) * BARS_PER_YEAR))
+        if not vol > 0:
+            return 0.0
+        return float(np.clip(direction * confidence * self.position_vol / vol, -self.max_weight, self.max_weight))
+
+    def check(self, symbol: str, delta_weight: float) -> Dict:
+        """Largest part of a proposed weight change that keeps every limit, O(1) given Σw"""
+        with self._lock:
+            i = self.index[symbol]
+            w = self.weights()
+            cov_w = self._sigma_w(w)
+            variance = float(w @ cov_w)
+            direction = np.sign(delta_weight)
+            size = abs(delta_weight)
+            reasons = []
+
+            # Per-asset cap
+            room = self.max_weight - direction * w[i]
+            if size > room:
+                size, reasons = max(room, 0.0), reasons + ["max_weight"]
+            # Gross leverage: |w_i| may end at most this big; trading through zero frees |w_i| first
+            headroom = self.max_gross - float(np.abs(w).sum()) + abs(w[i])
+            t_gross = headroom + (abs(w[i]) if direction * w[i] < 0 else -abs(w[i]))
+            if size > t_gross:
+                size, reasons = max(t_gross, 0.0), reasons + ["max_gross"]
+            # VaR: var(t) = σ² + 2t·d·(Σw)ᵢ + t²Σᵢᵢ must stay under the limit (or not grow if already over)
+            limit = (self.var_limit / (self.z * self._scale())) ** 2
+            bound = max(limit, variance)
+            a, b, c = self.cov[i, i], 2.0 * direction * cov_w[i], variance - bound
+            if a > 0:
+                t_max = (-b + np.sqrt(max(b * b - 4 * a * c, 0.0))) / (2 * a)
+                if size > t_max:
+                    size, reasons = max(t_max, 0.0), reasons + ["var_limit"]
+            elif b > 0 and c >= 0:
+                size, reasons = 0.0, reasons + ["var_limit"]
+
+            new_variance = variance + 2 * direction * size * cov_w[i] + size * size * self.cov[i, i]
+            scale = self.z * self._scale()
+            return {
+                "approved": size > 0,
+                "weight": float(direction * size),
+                "requested_weight": float(delta_weight),
+                "limited_by": reasons,
+                "var_before": scale * float(np.sqrt(max(variance, 0.0))),
+                "var_after": scale * float(np.sqrt(max(new_variance, 0.0))),
+            }
+
+    def size(self, signal: Dict) -> Dict:
+        """🎯 Turn a ``{"symbol", "action", "confidence"}`` signal into a checked order"""
+        symbol = signal["symbol"]
+        direction = {"BUY": 1.0, "SELL": -1.0}.get(signal.get("action"), 0.0)
+        with self._lock:
+            i = self.ensure([symbol])[0]
+            price = self.prices[i]
+            current = self.weights()[i]
+            target = self.target_weight(symbol, direction, float(signal.get("confidence", 1.0)))
+            if direction == 0 or not price > 0 or target == 0 or direction * (target - current) <= 0:
+                reason = "no_signal" if direction == 0 else "no_risk_estimate" if target == 0 else "at_target"
+                return {"symbol": symbol, "approved": False, "quantity": 0.0, "price": float(price),
+                        "limited_by": [reason]}
+            verdict = self.check(symbol, target - current)
+            quantity = verdict["weight"] * self.equity / price
+            return {"symbol": symbol, "quantity": float(quantity), "price": float(price),
+                    "target_weight": target, **verdict,
+                    # The VaR this order adds, as a fraction of equity (what ``risk=`` used to fix)
+                    "risk": max(verdict["var_after"] - verdict["var_before"], 0.0)}
+
+
+def _bench(assets: int, bars: int, orders: int):
+    rng = np.random.default_rng(0)
+    symbols = [f"A{i:03d}" for i in range(assets)]
+    factor = rng.standard_normal((bars, 1)) * 0.004
+    paths = 100 * np.exp(np.cumsum(factor + rng.standard_normal((bars, assets)) * 0.006, axis=0))
+    engine = RiskEngine(symbols, equity=1_000_000)
+
+    started = time.perf_counter()
+    for row in paths:
+        engine.step(row)
+    step_us = (time.perf_counter() - started) / bars * 1e6
+
+    picks = rng.integers(0, assets, orders)
+    actions = rng.choice(["BUY", "SELL"], orders)
+    started, approved = time.perf_counter(), 0
+    for i, action in zip(picks, actions):
+        order = engine.size({"symbol": symbols[i], "action": action, "confidence": 0.8})
+        if order["approved"]:
+            approved += 1
+            engine.fill(order["symbol"], order["quantity"])
+    order_us = (time.perf_counter() - started) / orders * 1e6
+
+    report = engine.report(top=3)
+    print(f"🛡️ {assets} assets, {bars} bars, {orders} orders")
+    print(f"   bar update            {step_us:8.1f} µs")
+    print(f"   size + check + fill   {order_us:8.1f} µs/order ({approved} approved)")
+    print(f"   gross {report['gross']:.2f}  VaR {report['var']:.2%}  CVaR {report['cvar']:.2%}  "
+          f"hist VaR {report['historical_var']:.2%}")
+    for row in report["contributors"]:
+        print(f"   {row['symbol']}  w {row['weight']:+.3f}  share {row['share']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🛡️ Portfolio risk engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="synthetic universe: bar updates and order checks")
+    bench.add_argument("--assets", type=int, default=500)
+    bench.add_argument("--bars", type=int, default=500)
+    bench.add_argument("--orders", type=int, default=2000)
+    args = parser.parse_args()
+    _bench(args.assets, args.bars, args.orders)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""
+🔗 WyoVerse RPC Pool - Kept-alive, batched JSON-RPC for Solana and Avalanche
+One corral per network instead of a fresh horse for every message
+
+    from rpc_pool import rpc_pool
+
+    solana = rpc_pool("solana")
+    solana.call("getHealth")                                   # one call
+    solana.batch([("getSlot", None), ("getBalance", [key])])   # one HTTP request
+    slot = await solana.acall("getSlot")                       # auto-batched, asyncio friendly
+
+Each pool keeps a ``requests`` session with kept-alive connections to every
+endpoint of its network (``SOLANA_RPC_URLS`` / ``AVALANCHE_RPC_URLS``,
+comma-separated, first is preferred). ``submit``/``acall`` queue single
+calls; a flusher packs whatever arrives within ``linger`` into JSON-RPC batch
+arrays and sends up to ``pool_size`` of them at once, so callers never
+wait on each other's round trips.
+
+Endpoints are tried healthy-first in configured order; a measured endpoint
+only moves ahead of an earlier one once it is clearly faster (``FASTER_BY``
+on median latency, both with at least ``MIN_SAMPLES`` calls). A transport
+error, 429 or 5xx puts an endpoint on an exponential cooldown and the request
+moves to the next one. Any other 4xx is the request's fault, not the
+endpoint's, so it surfaces as ``RpcError`` without failing over.
+Per-endpoint latency lands in ``stats()`` and in the stage metrics
+(``rpc_<network>``).
+
+``python rpc_pool.py bench`` runs everything against the local
+``MockRpcServer``; ``python rpc_pool.py health solana`` pings a real network.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from stage_metrics import METRICS, Histogram
+
+NETWORKS = {
+    "solana": os.getenv("SOLANA_RPC_URLS", "https://api.mainnet-beta.solana.com"),
+    "avalanche": os.getenv("AVALANCHE_RPC_URLS", "https://api.avax.network/ext/bc/C/rpc"),
+}
+# Reordering needs evidence: this many timed calls, and a median this many times lower
+MIN_SAMPLES = 5
+FASTER_BY = 1.25
+# Cheapest liveness call per network
+HEALTH_METHODS = {"solana": "getHealth", "avalanche": "eth_blockNumber"}
+
+Call = Tuple[str, Any]
+
+
+class RpcError(Exception):
+    """The node answered with a JSON-RPC error object"""
+
+    def __init__(self, error: Dict):
+        self.code = error.get("code")
+        self.data = error.get("data")
+        super().__init__(f"{error.get('message', 'RPC error')} (code {self.code})")
+
+
+class RpcUnavailable(Exception):
+    """Every endpoint of the network failed"""
+
+
+class Endpoint:
+    """One RPC URL: latency histogram, error counts and cooldown state"""
+
+    def __init__(self, url: str, cooldown: float = 5.0, max_cooldown: float = 120.0):
+        self.url = url
+        self.host = urlsplit(url).netloc or url
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.latency = Histogram()
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0  # consecutive
+        self.down_until = 0.0
+        self._lock = threading.Lock()
+
+    def healthy(self, now: Optional[float] = None) -> bool:
+        return (now or time.monotonic()) >= self.down_until
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self.requests += 1
+            if ok:
+                self.latency.observe(seconds)
+                self.failures = 0
+                self.down_until = 0.0
+            else:
+                self.errors += 1
+                self.failures += 1
+                backoff = min(self.max_cooldown, self.cooldown * 2 ** (self.failures - 1))
+                self.down_until = time.monotonic() + backoff
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "url": self.url,
+                "healthy": self.healthy(),
+                "requests": self.requests,
+                "errors": self.errors,
+                "p50_ms": self.latency.quantile(0.50) * 1000,
+                "p99_ms": self.latency.quantile(0.99) * 1000,
+            }
+
+
+class RpcPool:
+    """🎯 Pooled, batching, failing-over JSON-RPC client for one network"""
+
+    def __init__(self, urls: Sequence[str], name: str = "rpc", pool_size: int = 8,
+                 timeout: float = 5.0, max_batch: int = 100, linger: float = 0.002,
+                 cooldown: float = 5.0):
+        if not urls:
+            raise ValueError("RpcPool needs at least one endpoint")
+        self.name = name
+        self.endpoints = [Endpoint(url, cooldown) for url in urls]
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.linger = linger
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.endpoints), pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._ids = itertools.count(1)
+        self._pending: List[Tuple[Call, Future]] = []
+        self._cond = threading.Condition()
+        self._senders = ThreadPoolExecutor(pool_size, thread_name_prefix=f"rpc-{name}")
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+    # ------------------------------------------------------------ transport
+
+    def _ranked(self) -> List[Endpoint]:
+        """Healthy endpoints in configured order (measured ones reordered by latency), then the rest"""
+        now = time.monotonic()
+        healthy = [e for e in self.endpoints if e.healthy(now)]
+        resting = sorted((e for e in self.endpoints if not e.healthy(now)), key=lambda e: e.down_until)
+        # Untested endpoints keep their configured slot; measured ones trade slots
+        # among themselves, and only to pass an endpoint that is clearly slower
+        slots = [i for i, e in enumerate(healthy) if e.latency.count >= MIN_SAMPLES]
+        ordered: List[Tuple[float, Endpoint]] = []
+        for i in slots:
+            median = healthy[i].latency.quantile(0.5)
+            at = len(ordered)
+            while at and median * FASTER_BY < ordered[at - 1][0]:
+                at -= 1
+            ordered.insert(at, (median, healthy[i]))
+        for i, (_, endpoint) in zip(slots, ordered):
+            healthy[i] = endpoint
+        return healthy + resting
+
+    def _post(self, body: Any) -> Any:
+        last: Optional[Exception] = None
+        for endpoint in self._ranked():
+            started = time.perf_counter()
+            try:
+                response = self.session.post(endpoint.url, json=body, timeout=self.timeout)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                payload = response.json() if response.status_code < 400 else None
+            except (requests.RequestException, ValueError) as e:
+                endpoint.record(time.perf_counter() - started, ok=False)
+                METRICS.inc("rpc_failovers_total", network=self.name, endpoint=endpoint.host)
+                last = e
+                continue
+            elapsed = time.perf_counter() - started
+            endpoint.record(elapsed, ok=True)
+            if METRICS.enabled:
+                METRICS.observe(f"rpc_{self.name}", elapsed)
+            if response.status_code >= 400:
+                # The node is fine, the request isn't: every other node would refuse it too
+                return self._refused(response)
+            return payload
+        raise RpcUnavailable(f"{self.name}: all {len(self.endpoints)} endpoints failed ({last})")
+
+    @staticmethod
+    def _refused(response: requests.Response) -> Any:
+        """A 4xx reply: its JSON-RPC error body if it has one, else an ``RpcError``"""
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = None
+        if isinstance(payload, list) or (isinstance(payload, dict) and isinstance(payload.get("error"), dict)):
+            return payload
+        raise RpcError({"code": response.status_code, "message": f"HTTP {response.status_code}: "
+                                                                  f"{response.text[:200]}"})
+
+    @staticmethod
+    def _request(call_id: int, method: str, params: Any) -> Dict:
+        request = {"jsonrpc": "2.0", "id": call_id, "method": method}
+        if params is not None:
+            request["params"] = params
+        return request
+
+    @staticmethod
+    def _unwrap(reply: Optional[Dict]) -> Any:
+        if reply is None:
+            return RpcError({"message": "no reply in batch", "code": -32603})
+        if "error" in reply:
+            return RpcError(reply["error"])
+        return reply.get("result")
+
+    # ------------------------------------------------------------ synchronous API
+
+    def call(self, method: str, params: Any = None) -> Any:
+        """One call, sent on its own (works with nodes that reject batches)"""
+        result = self._unwrap(self._post(self._request(next(self._ids), method, params)))
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    def batch(self, calls: Sequence[Call], raise_errors: bool = True) -> List[Any]:
+        """Many calls in as few HTTP requests as ``max_batch`` allows, results in order
+
+        With ``raise_errors=False`` failed calls come back as ``RpcError``
+        objects in their slot instead of raising.
+        """
+        results: List[Any] = []
+        for start in range(0, len(calls), self.max_batch):
+            chunk = calls[start:start + self.max_batch]
+            ids = [next(self._ids) for _ in chunk]
+            replies = self._post([self._request(i, m, p) for i, (m, p) in zip(ids, chunk)])
+            if isinstance(replies, dict):  # a node that rejects batches answers with one error
+                replies = [dict(replies, id=i) for i in ids]
+            by_id = {r.get("id"): r for r in replies}
+            results.extend(self._unwrap(by_id.get(i)) for i in ids)
+        if raise_errors:
+            for result in results:
+                if isinstance(result, RpcError):
+                    raise result
+        return results
+
+    # ------------------------------------------------------------ pipelined API
+
+    def submit(self, method: str, params: Any = None) -> Future:
+        """Queue one call; it rides in the next batch. Returns a ``Future``"""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} pool is closed")
+            self._pending.append(((method, params), future))
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name=f"rpc-{self.name}-flush",
+                                                 daemon=True)
+                self._flusher.start()
+            self._cond.notify()
+        return future
+
+    async def acall(self, method: str, params: Any = None) -> Any:
+        """``await`` form of ``submit``"""
+        return await asyncio.wrap_future(self.submit(method, params))
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+                # Give concurrent callers a moment to join the batch
+                if len(self._pending) < self.max_batch and self.linger:
+                    self._cond.wait(self.linger)
+                chunk, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            self._senders.submit(self._send, chunk)
+
+    def _send(self, chunk: List[Tuple[Call, Future]]):
+        try:
+            results = self.batch([call for call, _ in chunk], raise_errors=False)
+        except Exception as e:
+            for _, future in chunk:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(chunk, results):
+            if isinstance(result, RpcError):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    # ------------------------------------------------------------ housekeeping
+
+    def health(self) -> Any:
+        return self.call(HEALTH_METHODS.get(self.name, "getHealth"))
+
+    def stats(self) -> List[Dict]:
+        return [e.to_dict() for e in self.endpoints]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        self._senders.shutdown(wait=True)
+        self.session.close()
+
+
+_POOLS: Dict[str, RpcPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def rpc_pool(network: str) -> RpcPool:
+    """Process-wide pool for ``network`` ("solana", "avalanche" or a URL list)"""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(network)
+        if pool is None:
+            urls = [u.strip() for u in NETWORKS.get(network, network).split(",") if u.strip()]
+            pool = _POOLS[network] = RpcPool(urls, name=network)
+        return pool
+
+
+# ---------------------------------------------------------------- mock node
+
+class MockRpcServer:
+    """🧪 Local JSON-RPC node for tests and benchmarks
+
+    Answers single and batch requests with keep-alive. ``latency`` is added
+    once per HTTP request (like a network round trip); ``fail_status`` makes
+    every request fail with that HTTP status (for failover drills).
+    """
+
+    def __init__(self, latency: float = 0.0, fail_status: Optional[int] = None):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.latency = latency
+        self.fail_status = fail_status
+        self.requests = 0
+        self.calls = 0
+        self.connections = 0
+        self._slot = 0
+        self._lock = threading.Lock()
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with mock._lock:
+                    mock.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                with mock._lock:
+                    mock.requests += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+                if mock.fail_status:
+                    self._reply(b'{"error": "unavailable"}', mock.fail_status)
+                    return
+                request = json.loads(body)
+                reply = [mock.answer(r) for r in request] if isinstance(request, list) else mock.answer(request)
+                self._reply(json.dumps(reply).encode())
+
+            def _reply(self, body: bytes, status: int = 200):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-rpc", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def answer(self, request: Dict) -> Dict:
+        with self._lock:
+            self.calls += 1
+            self._slot += 1
+            slot = self._slot
+        method = request.get("method")
+        results = {
+            "getHealth": "ok",
+            "getSlot": slot,
+            "getBlockHeight": slot,
+            "eth_blockNumber": hex(slot),
+            "getBalance": {"context": {"slot": slot}, "value": 1_000_000_000},
+        }
+        if method not in results:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": results[method]}
+
+    def start(self) -> "MockRpcServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ---------------------------------------------------------------- CLI
+
+def _bench(calls: int, latency: float):
+    down = MockRpcServer(latency, fail_status=503).start()
+    node = MockRpcServer(latency).start()
+    try:
+        def timed(label, fn):
+            node.requests = node.connections = 0
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+            print(f"   {label:<34} {elapsed * 1000:8.0f} ms  {calls / elapsed:9.0f} calls/s  "
+                  f"{node.requests:5d} HTTP requests  {node.connections:4d} connections")
+
+        print(f"🎯 {calls} getSlot calls, {latency * 1000:.0f} ms simulated round trip")
+        timed("new connection per call", lambda: [
+            requests.post(node.url, json={"jsonrpc": "2.0", "id": i, "method": "getSlot"}, timeout=5)
+            for i in range(calls)])
+
+        pool = RpcPool([node.url], name="bench")
+        timed("pooled keep-alive, one by one", lambda: [pool.call("getSlot") for _ in range(calls)])
+        timed("batch arrays", lambda: pool.batch([("getSlot", None)] * calls))
+        timed("pipelined submit()", lambda: [f.result() for f in [pool.submit("getSlot") for _ in range(calls)]])
+
+        async def gather():
+            return await asyncio.gather(*(pool.acall("getSlot") for _ in range(calls)))
+        timed("asyncio acall()", lambda: asyncio.run(gather()))
+        pool.close()
+
+        failover = RpcPool([down.url, node.url], name="failover")
+        timed("failover (first endpoint 503)", lambda: [failover.call("getSlot") for _ in range(calls // 10)])
+        for row in failover.stats():
+            print(f"   {row['url']}: healthy={row['healthy']} requests={row['requests']} "
+                  f"errors={row['errors']} p50={row['p50_ms']:.1f} ms")
+        failover.close()
+    finally:
+        down.stop()
+        node.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🔗 Pooled JSON-RPC client")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="benchmark against local mock nodes")
+    bench.add_argument("--calls", type=int, default=1000)
+    bench.add_argument("--latency-ms", type=float, default=5.0)
+    health = sub.add_parser("health", help="ping a network's endpoints")
+    health.add_argument("network", choices=sorted(NETWORKS))
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        _bench(args.calls, args.latency_ms / 1000)
+        return
+    pool = rpc_pool(args.network)
+    try:
+        print(f"✅ {args.network}: {pool.health()}")
+    except (RpcError, RpcUnavailable) as e:
+        print(f"❌ {args.network}: {e}")
+    print(json.dumps(pool.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
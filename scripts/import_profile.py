@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+⏱️ Cold-start profiler for the Streamlit entry points
+Counts every millisecond a fresh worker spends before the welcome screen
+
+Usage:
+    python scripts/import_profile.py                      # both apps, report only
+    python scripts/import_profile.py --budget-ms 800      # fail if over budget
+    python scripts/import_profile.py --render             # include a headless welcome-screen run
+
+Exits non-zero when an app blows its budget or eagerly imports a module that
+should only load on the analysis/charting paths, so CI can enforce it. The same
+check runs under pytest in tests/test_import_budget.py.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = {
+    "sagebrush-sniper": os.path.join(REPO_ROOT, "apps", "sagebrush-sniper", "main.py"),
+    "dr-dee-assistant": os.path.join(REPO_ROOT, "apps", "dr-dee-assistant", "main.py"),
+}
+# Only the analysis and charting paths may pull these in (whatever streamlit
+# itself loads is the framework's cost, not the app's)
+LAZY_MODULES = ["yfinance", "plotly", "pandas", "numpy", "requests"]
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+_IMPORT_SNIPPET = """
+import sys
+sys.path.insert(0, {app_dir!r})
+import streamlit
+framework = set(sys.modules)
+import main
+print("LOADED", " ".join(sorted(m for m in set(sys.modules) - framework if "." not in m)))
+"""
+
+_RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app_path!r}, default_timeout=30).run()
+print("RENDER_MS", (time.perf_counter() - start) * 1000)
+print("EXCEPTIONS", len(at.exception))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Turn ``-X importtime`` output into per-module self/cumulative ms"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                "module": module,
+                "depth": len(indent) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            })
+    return rows
+
+
+def profile_app(app_path: str, render: bool = False) -> Dict:
+    """Profile one app in a fresh interpreter, the way a new worker sees it"""
+    app_dir = os.path.dirname(app_path)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_SNIPPET.format(app_dir=app_dir)],
+        cwd=app_dir, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"}
+
+    rows = parse_importtime(proc.stderr)
+    main_at = max(i for i, r in enumerate(rows) if r["module"] == "main" and r["depth"] == 0)
+    first = main_at
+    while first > 0 and rows[first - 1]["depth"] > 0:
+        first -= 1
+    # Direct imports of the app module, heaviest first
+    top_level = sorted((r for r in rows[first:main_at] if r["depth"] == 1),
+                       key=lambda r: r["cumulative_ms"], reverse=True)
+    stdout = dict(line.split(" ", 1) for line in proc.stdout.splitlines() if " " in line)
+    loaded = set(stdout.get("LOADED", "").split())
+    result = {
+        "process_ms": wall_ms,
+        "import_ms": rows[main_at]["cumulative_ms"],
+        "framework_ms": sum(r["cumulative_ms"] for r in rows if r["depth"] == 0 and r["module"] == "streamlit"),
+        "modules": top_level,
+        "eager_heavy": [m for m in LAZY_MODULES if m in loaded],
+    }
+
+    if render:
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", _RENDER_SNIPPET.format(app_path=app_path)],
+                              cwd=app_dir, capture_output=True, text=True)
+        result["render_process_ms"] = (time.perf_counter() - started) * 1000
+        out = dict(line.split(" ", 1) for line in proc.stdout.splitlines() if " " in line)
+        if proc.returncode != 0 or out.get("EXCEPTIONS", "1") != "0":
+            result["render_error"] = proc.stderr.strip()[-500:] or "welcome screen raised"
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🏜️ Cold-start import profiler")
+    parser.add_argument("apps", nargs="*", default=list(APPS), help="app names to profile")
+    parser.add_argument("--budget-ms", type=float, default=1000.0,
+                        help="max fresh-process time to first screen (default 1000)")
+    parser.add_argument("--top", type=int, default=15, help="modules to show per app")
+    parser.add_argument("--render", action="store_true",
+                        help="also render the welcome screen headlessly (needs streamlit.testing)")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    failures = []
+    report = {}
+    for name in args.apps:
+        result = profile_app(APPS.get(name, name), render=args.render)
+        report[name] = result
+        if "error" in result:
+            failures.append(f"{name}: {result['error']}")
+            continue
+        startup_ms = result.get("render_process_ms", result["process_ms"])
+        if startup_ms > args.budget_ms:
+            failures.append(f"{name}: cold start {startup_ms:.0f} ms > budget {args.budget_ms:.0f} ms")
+        if result["eager_heavy"]:
+            failures.append(f"{name}: eagerly imports {', '.join(result['eager_heavy'])}")
+        if result.get("render_error"):
+            failures.append(f"{name}: {result['render_error']}")
+
+    if args.json:
+        print(json.dumps({"apps": report, "failures": failures}, indent=2))
+    else:
+        for name, result in report.items():
+            print(f"\n🎯 {name}")
+            if "error" in result:
+                print(f"   ❌ {result['error']}")
+                continue
+            print(f"   process {result['process_ms']:.0f} ms | streamlit {result['framework_ms']:.0f} ms"
+                  f" | import main {result['import_ms']:.0f} ms"
+                  + (f" | welcome screen {result['render_process_ms']:.0f} ms" if "render_process_ms" in result else ""))
+            print(f"   {'cumulative ms':>14}  {'self ms':>8}  module")
+            for row in result["modules"][:args.top]:
+                print(f"   {row['cumulative_ms']:>14.1f}  {row['self_ms']:>8.1f}  {row['module']}")
+        print()
+        for failure in failures:
+            print(f"❌ {failure}")
+        if not failures:
+            print(f"✅ All apps within {args.budget_ms:.0f} ms cold-start budget")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
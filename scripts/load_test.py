@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+🐎 Concurrent-session load test for the Streamlit apps
+How many riders can one worker carry before the p99 bucks them off?
+
+Usage:
+    python scripts/load_test.py                                 # both apps, 1/5/10/25 sessions
+    python scripts/load_test.py sagebrush-sniper --sessions 50 --iterations 10
+    python scripts/load_test.py --slo-ms 1500 --node-mem-gb 16 --json
+
+Each scenario (app × session count) runs in a fresh interpreter that plays
+one Streamlit server process: N threads, each owning an ``AppTest`` session
+of the real app script, click through the analyze flow (Sagebrush Sniper) or
+the health check (Dr. Dee) ``--iterations`` times. ``st.cache_resource``
+state is shared between sessions exactly as it is in a live worker.
+
+Upstream calls never leave the box: ``MARKET_SERVICE_URL`` points at a local
+stub that serves synthetic bars, and every other ``requests`` call is
+rerouted to the same stub with ``--stub-latency-ms`` of simulated network
+delay. ``--live`` skips the rerouting (market service URL still stubbed).
+
+Reported per scenario: p50/p99/max flow latency, flows per second, errors,
+and resident memory per session (RSS growth over a warmed-up baseline). The
+summary sizes workers per node from the largest session count that kept p99
+under ``--slo-ms``.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = {
+    "sagebrush-sniper": os.path.join(REPO_ROOT, "apps", "sagebrush-sniper", "main.py"),
+    "dr-dee-assistant": os.path.join(REPO_ROOT, "apps", "dr-dee-assistant", "main.py"),
+}
+STUB_BARS = 20000
+BAR_SECONDS = 300
+
+
+# ---------------------------------------------------------------- stub upstream
+
+def _stub_history(symbol: str, limit: int) -> bytes:
+    """Deterministic random-walk 5m bars in the market service's history shape"""
+    rng = random.Random(symbol)
+    price = 100.0 + rng.random() * 1000
+    end = int(time.time()) // BAR_SECONDS * BAR_SECONDS
+    start = end - limit * BAR_SECONDS
+    bars = []
+    for i in range(limit):
+        open_ = price
+        price *= math.exp(rng.gauss(0, 0.004))
+        high = max(open_, price) * (1 + abs(rng.gauss(0, 0.001)))
+        low = min(open_, price) * (1 - abs(rng.gauss(0, 0.001)))
+        bars.append({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start + i * BAR_SECONDS)),
+            "Open": open_, "High": high, "Low": low, "Close": price,
+            "Volume": rng.uniform(1e3, 1e5),
+        })
+    return json.dumps({"symbol": symbol, "interval": "5m", "version": 1, "bars": bars}).encode()
+
+
+def start_stub(latency: float):
+    """🛰️ Local upstream: market service history/snapshot plus a 200 for anything else"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    cache: Dict[tuple, bytes] = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _reply(self, body: bytes, status: int = 200):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(latency)
+            url = urlparse(self.path)
+            parts = url.path.strip("/").split("/")
+            if parts[:2] == ["api", "history"] and len(parts) == 3:
+                limit = min(STUB_BARS, int(parse_qs(url.query).get("limit", ["500"])[0]))
+                key = (parts[2], limit)
+                with lock:
+                    if key not in cache:
+                        cache[key] = _stub_history(parts[2], limit)
+                self._reply(cache[key])
+            elif parts[:2] == ["api", "snapshot"]:
+                self._reply(b'{"signals": {"buy_score": 2, "sell_score": 1}}')
+            else:
+                self._reply(b'{"status": "ok"}')
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+            time.sleep(latency)
+            try:
+                request = json.loads(body)
+            except ValueError:
+                request = {}
+            # JSON-RPC: answer every call of a batch, ids preserved
+            answer = lambda r: {"jsonrpc": "2.0", "id": r.get("id"), "result": "ok"}
+            reply = [answer(r) for r in request] if isinstance(request, list) else answer(request)
+            self._reply(json.dumps(reply).encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="load-stub", daemon=True).start()
+    return server
+
+
+def reroute_requests(base_url: str):
+    """Send every ``requests`` call (sessions and pools included) to the stub, keeping the path"""
+    from urllib.parse import urlsplit, urlunsplit
+
+    import requests
+
+    real_request = requests.Session.request
+    stub = urlsplit(base_url)
+
+    def request(session, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        return real_request(session, method,
+                            urlunsplit((stub.scheme, stub.netloc, parts.path or "/", parts.query, "")),
+                            *args, **kwargs)
+
+    requests.Session.request = request
+
+
+# ---------------------------------------------------------------- one scenario
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is missing)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def share_test_config():
+    """Make AppTest's per-run process globals safe for concurrent sessions
+
+    ``AppTest.run`` patches ``config.get_option`` around every run and sets,
+    then clears, the ``Runtime`` singleton. Runs overlapping on several
+    threads undo each other mid-script, so widget ids come out wrong and the
+    runtime vanishes. Patch the config once for the process and let the
+    singleton fall back to the last mock runtime any run installed.
+
+    Each run also recompiles the script into a fresh ``ScriptCache``; share
+    one, as a real server does (concurrent ``ast.parse`` on 3.11 can also
+    raise a spurious ``SystemError``).
+    """
+    import contextlib
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.testing.v1.util import build_mock_config_get_option
+
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+    script_cache = app_test.ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+    last = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+        if not last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+
+
+def _session(app: str, timeout: float):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APPS[app], default_timeout=timeout)
+    at.run()
+    return at
+
+
+def _flow(app: str, at, rng: random.Random):
+    """One user action on an already-open session"""
+    if app == "sagebrush-sniper":
+        symbols = at.selectbox[0]
+        symbols.set_value(rng.choice(symbols.options))
+        next(b for b in at.button if b.label == "🔍 ANALYZE TARGET").click()
+    else:
+        at.selectbox[0].set_value("🏥 System Health Check")
+        next(b for b in at.button if b.label == "🔍 ANALYZE").click()
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+
+def run_scenario(app: str, sessions: int, iterations: int, think: float, timeout: float) -> Dict:
+    """N concurrent sessions in this process; call from a fresh interpreter"""
+    share_test_config()
+    # Warm imports, caches and the first fetch so the baseline is a live worker
+    warm = _session(app, timeout)
+    _flow(app, warm, random.Random(0))
+    del warm
+    baseline = rss_bytes()
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+    ready = threading.Barrier(sessions + 1)
+    # AppTest's first run swaps process globals (mock runtime, pages manager);
+    # sessions connect one at a time, then all click concurrently
+    opening = threading.Lock()
+    held = []
+
+    def user(n: int):
+        rng = random.Random(n)
+        try:
+            with opening:
+                at = _session(app, timeout)
+            held.append(at)
+        except Exception as e:
+            with lock:
+                errors.append(f"open: {e}")
+            ready.wait()
+            return
+        ready.wait()
+        for _ in range(iterations):
+            started = time.perf_counter()
+            try:
+                _flow(app, at, rng)
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e)[:200])
+            if think:
+                time.sleep(rng.uniform(0, 2 * think))
+
+    threads = [threading.Thread(target=user, args=(n,), name=f"session-{n}") for n in range(sessions)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    loaded = rss_bytes()
+
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "app": app,
+        "sessions": sessions,
+        "flows": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "wall_s": wall,
+        "baseline_mb": baseline / 2**20,
+        "rss_mb": loaded / 2**20,
+        "mb_per_session": max(0, loaded - baseline) / 2**20 / sessions,
+    }
+
+
+def spawn_scenario(app: str, sessions: int, args) -> Dict:
+    """Run one scenario in a fresh interpreter, the way a new worker sees it"""
+    cmd = [sys.executable, os.path.abspath(__file__), "--scenario", app, "--sessions", str(sessions),
+           "--iterations", str(args.iterations), "--think-ms", str(args.think_ms),
+           "--stub-latency-ms", str(args.stub_latency_ms), "--timeout", str(args.timeout)]
+    if args.live:
+        cmd.append("--live")
+    proc = subprocess.run(cmd, cwd=os.path.dirname(APPS[app]), capture_output=True, text=True)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("RESULT "):
+            return json.loads(line[7:])
+    return {"app": app, "sessions": sessions, "failed": proc.stderr.strip()[-500:] or "no result"}
+
+
+def size_workers(rows: List[Dict], slo_ms: float, node_mem_gb: float, cpus: int) -> Dict:
+    """📐 Sessions per worker under the SLO, then workers that fit on a node"""
+    good = [r for r in rows if "failed" not in r and not r["errors"] and r["p99_ms"] <= slo_ms]
+    if not good:
+        return {"sessions_per_worker": 0, "workers_per_node": 0, "sessions_per_node": 0}
+    best = max(good, key=lambda r: r["sessions"])
+    per_session = max(r["mb_per_session"] for r in rows if "failed" not in r)
+    worker_mb = best["baseline_mb"] + per_session * best["sessions"]
+    # One CPU per worker (the GIL caps a worker at ~one core); keep 10% memory headroom
+    workers = max(1, min(cpus, int(node_mem_gb * 1024 * 0.9 // worker_mb)))
+    return {
+        "sessions_per_worker": best["sessions"],
+        "worker_mb": worker_mb,
+        "workers_per_node": workers,
+        "sessions_per_node": workers * best["sessions"],
+        "throughput_per_node": workers * best["throughput"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🐎 Concurrent-session load test")
+    parser.add_argument("apps", nargs="*", default=list(APPS), help="app names to load")
+    parser.add_argument("--sessions", default="1,5,10,25", help="comma-separated concurrency levels")
+    parser.add_argument("--iterations", type=int, default=5, help="flows per session (default 5)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a session's flows")
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0, help="simulated upstream latency")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-run AppTest timeout (s)")
+    parser.add_argument("--slo-ms", type=float, default=2000.0, help="p99 target for sizing (default 2000)")
+    parser.add_argument("--node-mem-gb", type=float, default=8.0, help="memory per node for sizing")
+    parser.add_argument("--cpus", type=int, default=os.cpu_count() or 1, help="cores per node for sizing")
+    parser.add_argument("--live", action="store_true", help="don't reroute non-market-service calls")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        stub = start_stub(args.stub_latency_ms / 1000)
+        base_url = f"http://127.0.0.1:{stub.server_address[1]}"
+        os.environ["MARKET_SERVICE_URL"] = base_url
+        os.environ.setdefault("STAGE_METRICS", "0")
+        if not args.live:
+            reroute_requests(base_url)
+        result = run_scenario(args.scenario, int(args.sessions), args.iterations,
+                              args.think_ms / 1000, args.timeout)
+        print("RESULT " + json.dumps(result))
+        return
+
+    levels = [int(n) for n in args.sessions.split(",") if n]
+    report = {}
+    for name in args.apps:
+        rows = []
+        for sessions in levels:
+            row = spawn_scenario(name, sessions, args)
+            rows.append(row)
+            if not args.json:
+                if "failed" in row:
+                    print(f"❌ {name} × {sessions}: {row['failed']}")
+                else:
+                    print(f"🎯 {name} × {sessions:>3} sessions | p50 {row['p50_ms']:7.0f} ms | "
+                          f"p99 {row['p99_ms']:7.0f} ms | {row['throughput']:6.1f} flows/s | "
+                          f"{row['mb_per_session']:6.1f} MB/session | errors {row['errors']}")
+                    for sample in row["error_samples"]:
+                        print(f"   ⚠️ {sample}")
+        report[name] = {"scenarios": rows, "sizing": size_workers(rows, args.slo_ms, args.node_mem_gb, args.cpus)}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print()
+    for name, result in report.items():
+        sizing = result["sizing"]
+        if not sizing["sessions_per_worker"]:
+            print(f"⚠️  {name}: no scenario met p99 ≤ {args.slo_ms:.0f} ms")
+            continue
+        print(f"📐 {name}: {sizing['sessions_per_worker']} sessions/worker (~{sizing['worker_mb']:.0f} MB) → "
+              f"{sizing['workers_per_node']} workers/node, {sizing['sessions_per_node']} concurrent sessions, "
+              f"~{sizing['throughput_per_node']:.1f} flows/s per {args.node_mem_gb:g} GB / {args.cpus}-core node")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+#!/bin/bash
+
+# 🛰️ Start the shared Sagebrush market data service
+echo "🤠 Starting Sagebrush Market Service..."
+
+cd apps/sagebrush-sniper
+
+# Every app reads market data from here instead of hitting upstream itself
+# It listens on every interface: admin endpoints stay off unless MARKET_ADMIN_TOKEN is set
+echo "🚀 Market service coming online..."
+uvicorn market_service:app --host 0.0.0.0 --port ${MARKET_SERVICE_PORT:-5000}
+
+echo "✅ Market service running at http://localhost:${MARKET_SERVICE_PORT:-5000}"
@@ -0,0 +1,367 @@
+"""
+⏱️ WyoVerse Stage Metrics - Timers, counters and latency histograms
+Know which leg of the ride is slow before the riders complain
+
+    from stage_metrics import stage, track_request
+
+    with track_request("analyze"):          # whole request, sampled when profiling
+        with stage("yfinance_fetch"):       # one leg of it
+            ...
+
+Recording is a couple of ``perf_counter`` calls and a bucket bump under a
+lock; when instrumentation is switched off ``stage`` hands back a shared
+no-op. Metrics export in Prometheus text format (``prometheus_text`` or
+``serve_metrics``) and render in Streamlit with ``render_debug_panel``.
+
+The optional sampling profiler watches only threads inside a tracked
+request. Requests slower than the threshold dump collapsed stacks
+(``frame;frame;frame count``) that flamegraph.pl and speedscope read as-is;
+only the newest ``STAGE_PROFILE_KEEP`` dumps stay in ``STAGE_PROFILE_DIR``.
+"""
+
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROFILE_DIR = os.getenv("STAGE_PROFILE_DIR", "profiles")
+# Newest slow-request dumps kept on disk; older ones are deleted as new ones land
+PROFILE_KEEP = int(os.getenv("STAGE_PROFILE_KEEP", "50"))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() not in ("0", "false", "no", "off")
+
+
+# Debug panel switches flip the process-wide registry, so only admins get them
+STAGE_METRICS_ADMIN = _flag("STAGE_METRICS_ADMIN", "0")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Labels, **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram plus a small reservoir for quantiles"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS, recent: int = 512):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+        self.last = 0.0
+        self.recent: Deque[float] = deque(maxlen=recent)
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        samples = sorted(self.recent)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class MetricsRegistry:
+    """🎯 Process-wide counters and stage histograms"""
+
+    def __init__(self, namespace: str = "wyoverse"):
+        self.namespace = namespace
+        self.enabled = _flag("STAGE_METRICS", "1")
+        self.profiling = _flag("STAGE_PROFILE", "0")
+        self.slow_seconds = float(os.getenv("STAGE_PROFILE_SLOW_MS", "1000")) / 1000
+        self.sample_interval = float(os.getenv("STAGE_PROFILE_INTERVAL_MS", "5")) / 1000
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.profiles: Deque[Dict] = deque(maxlen=20)
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, ok: bool = True):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+            key = ("stage_calls_total", (("stage", name), ("outcome", "ok" if ok else "error")))
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.profiles.clear()
+
+    def snapshot(self) -> List[Dict]:
+        """Per-stage summary rows for dashboards, slowest p99 first"""
+        with self._lock:
+            rows = []
+            for name, h in self.histograms.items():
+                errors = self.counters.get(("stage_calls_total", (("stage", name), ("outcome", "error"))), 0)
+                rows.append({
+                    "stage": name,
+                    "calls": h.count,
+                    "errors": int(errors),
+                    "mean_ms": h.total / h.count * 1000 if h.count else 0.0,
+                    "p50_ms": h.quantile(0.50) * 1000,
+                    "p99_ms": h.quantile(0.99) * 1000,
+                    "max_ms": h.max * 1000,
+                    "last_ms": h.last * 1000,
+                })
+        return sorted(rows, key=lambda r: r["p99_ms"], reverse=True)
+
+    def prometheus_text(self) -> str:
+        """Exposition format 0.0.4"""
+        ns = self.namespace
+        lines = [
+            f"# HELP {ns}_stage_seconds Latency of instrumented stages",
+            f"# TYPE {ns}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                stage_label = (("stage", name),)
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f"{ns}_stage_seconds_bucket{_labels(stage_label, le=repr(bound))} {cumulative}")
+                lines.append(f"{ns}_stage_seconds_bucket{_labels(stage_label, le='+Inf')} {h.count}")
+                lines.append(f"{ns}_stage_seconds_sum{_labels(stage_label)} {h.total!r}")
+                lines.append(f"{ns}_stage_seconds_count{_labels(stage_label)} {h.count}")
+
+            by_name: Dict[str, List[Tuple[Labels, float]]] = {}
+            for (name, labels), value in self.counters.items():
+                by_name.setdefault(name, []).append((labels, value))
+        for name, series in sorted(by_name.items()):
+            metric = f"{ns}_{name}" if name.endswith("_total") else f"{ns}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in sorted(series):
+                lines.append(f"{metric}{_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+class _Stage:
+    __slots__ = ("registry", "name", "started")
+
+    def __init__(self, registry: MetricsRegistry, name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.started, exc_type is None)
+        return False
+
+
+class _NoOp:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoOp()
+
+
+def stage(name: str, registry: MetricsRegistry = METRICS):
+    """⏱️ Time one stage (shared no-op while instrumentation is off)"""
+    if not registry.enabled:
+        return _NOOP
+    return _Stage(registry, name)
+
+
+def timed(name: str, registry: MetricsRegistry = METRICS):
+    """Decorator form of ``stage``"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name, registry):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ---------------------------------------------------------------- profiler
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+class _Sampler:
+    """Samples one thread's stack until stopped"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stage-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+class _Request(_Stage):
+    __slots__ = ("sampler",)
+
+    def __enter__(self):
+        self.sampler = _Sampler(threading.get_ident(), self.registry.sample_interval) \
+            if self.registry.profiling else None
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        self.registry.observe(self.name, elapsed, exc_type is None)
+        if self.sampler is not None:
+            stacks = self.sampler.stop()
+            if elapsed >= self.registry.slow_seconds and stacks:
+                self._dump(stacks, elapsed)
+        return False
+
+    def _dump(self, stacks: Counter, elapsed: float):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.folded")
+        with open(path, "w") as f:
+            for line, count in stacks.most_common():
+                f.write(f"{line} {count}\n")
+        self.registry.inc("slow_requests_total", request=self.name)
+        self.registry.profiles.appendleft({"request": self.name, "ms": elapsed * 1000, "path": path})
+        prune_profiles(PROFILE_DIR, PROFILE_KEEP)
+
+
+def prune_profiles(directory: str, keep: int) -> int:
+    """Delete all but the newest ``keep`` ``.folded`` dumps; returns how many went"""
+    try:
+        with os.scandir(directory) as it:
+            dumps = sorted((entry.stat().st_mtime, entry.path) for entry in it
+                           if entry.name.endswith(".folded") and entry.is_file())
+    except OSError:
+        return 0
+    removed = 0
+    for _, path in dumps[:max(0, len(dumps) - keep)]:
+        try:
+            os.unlink(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def track_request(name: str, registry: MetricsRegistry = METRICS):
+    """🔥 Time a whole request; with profiling on, dump stacks if it runs slow"""
+    if not registry.enabled:
+        return _NOOP
+    return _Request(registry, name)
+
+
+# ---------------------------------------------------------------- exporters
+
+def prometheus_text(registry: MetricsRegistry = METRICS) -> str:
+    return registry.prometheus_text()
+
+
+def serve_metrics(port: int, registry: MetricsRegistry = METRICS):
+    """🛰️ Serve ``/metrics`` from a daemon thread (for apps without a web API)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def render_debug_panel(registry: MetricsRegistry = METRICS, admin: bool = STAGE_METRICS_ADMIN):
+    """🩺 Streamlit sidebar panel: switches, per-stage latencies, slow profiles
+
+    The registry is process-wide, shared by every session, so only an admin
+    deployment (``STAGE_METRICS_ADMIN=1``) gets live switches and reset;
+    everyone else sees them read-only.
+    """
+    import streamlit as st
+
+    with st.expander("🩺 Debug Metrics"):
+        locked = None if admin else "Process-wide switch: set STAGE_METRICS_ADMIN=1 to change it here"
+        enabled = st.toggle("⏱️ Instrumentation", value=registry.enabled, key="stage_metrics_enabled",
+                            disabled=not admin, help=locked)
+        profiling = st.toggle("🔥 Sampling profiler", value=registry.profiling, key="stage_metrics_profiling",
+                              disabled=not admin,
+                              help=locked or f"Dump stacks for requests slower than {registry.slow_seconds * 1000:.0f} ms")
+        if admin:
+            registry.enabled, registry.profiling = enabled, profiling
+        rows = registry.snapshot()
+        if rows:
+            table = ["| stage | calls | err | p50 ms | p99 ms | max ms |", "|---|---:|---:|---:|---:|---:|"]
+            table += [f"| {r['stage']} | {r['calls']} | {r['errors']} | {r['p50_ms']:.1f} | "
+                      f"{r['p99_ms']:.1f} | {r['max_ms']:.1f} |" for r in rows]
+            st.markdown("\n".join(table))
+        else:
+            st.caption("No stages recorded yet")
+        for profile in registry.profiles:
+            st.caption(f"🔥 {profile['request']} {profile['ms']:.0f} ms → {profile['path']}")
+        st.download_button("📥 Prometheus metrics", registry.prometheus_text(), file_name="metrics.prom",
+                           key="stage_metrics_download")
+        if admin and st.button("♻️ Reset metrics", key="stage_metrics_reset"):
+            registry.reset()
@@ -0,0 +1,234 @@
+"""
+🧠 Quantum Batcher - Dynamic micro-batching front end for the Venice model
+Round up the stragglers, fire one volley
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_MODEL_CACHE: Dict[str, object] = {}
+_MODEL_LOCK = threading.Lock()
+_BATCHERS: Dict[str, "MicroBatcher"] = {}
+
+
+def load_model_once(key: str, factory: Callable[[], object]):
+    """🏇 Load a model at most once per process, no matter how many riders ask"""
+    model = _MODEL_CACHE.get(key)
+    if model is not None:
+        return model
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(key)
+        if model is None:
+            model = factory()
+            _MODEL_CACHE[key] = model
+    return model
+
+
+class KerasModelFactory:
+    """Imports TensorFlow only when the model is first needed
+
+    Factories for the same file compare equal, so ``shared_batcher`` can tell
+    a second engine asking for the same model from one asking for another.
+    """
+
+    def __init__(self, path: str = "venice_quantum_weights.h5", custom_objects: Optional[Dict] = None):
+        self.path = path
+        self.custom_objects = custom_objects
+
+    def __call__(self):
+        import tensorflow as tf
+        model = tf.keras.models.load_model(self.path, custom_objects=self.custom_objects)
+        return KerasModelAdapter(model)
+
+    def __eq__(self, other):
+        return isinstance(other, KerasModelFactory) and \
+            (self.path, self.custom_objects) == (other.path, other.custom_objects)
+
+    def __hash__(self):
+        return hash(self.path)
+
+
+def keras_model_factory(path: str = "venice_quantum_weights.h5",
+                        custom_objects: Optional[Dict] = None) -> Callable[[], object]:
+    """Build a factory that imports TensorFlow only when the model is first needed"""
+    return KerasModelFactory(path, custom_objects)
+
+
+class KerasModelAdapter:
+    """Wrap a Keras model in the plain ``predict(batch)`` interface"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict(batch, verbose=0))
+
+
+class NumpyLinearModel:
+    """🪵 Trivial stand-in model: ``batch @ weights + bias``"""
+
+    def __init__(self, n_inputs: int, n_outputs: int = 1, seed: int = 7,
+                 delay_s: float = 0.0):
+        rng = np.random.default_rng(seed)
+        self.weights = rng.standard_normal((n_inputs, n_outputs))
+        self.bias = rng.standard_normal(n_outputs)
+        self.delay_s = delay_s
+        self.calls = 0
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        self.calls += 1
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        return batch @ self.weights + self.bias
+
+
+class MicroBatcher:
+    """🎯 Queue single predictions and run them as dynamic micro-batches
+
+    Requests wait at most ``max_wait_ms`` for company; a batch is closed as
+    soon as it reaches ``max_batch_size``. Batches run on a CPU thread pool
+    and each caller gets its own row back through a ``Future``.
+    """
+
+    def __init__(self, model_factory: Callable[[], object], model_key: str = "default",
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0,
+                 workers: Optional[int] = None):
+        self.model_factory = model_factory
+        self.model_key = model_key
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        # As requested, so shared_batcher can spot a conflicting second request
+        self.config = {'max_batch_size': max_batch_size, 'max_wait_ms': max_wait_ms, 'workers': workers}
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Future, float]]]" = queue.Queue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._collector: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self.stats = {
+            'requests': 0,
+            'batches': 0,
+            'max_batch': 0,
+            'total_latency_s': 0.0,
+        }
+
+    @property
+    def model(self):
+        return load_model_once(self.model_key, self.model_factory)
+
+    def _ensure_started(self):
+        if self._collector is not None:
+            return
+        with self._start_lock:
+            if self._collector is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix="quantum-batch")
+                self._collector = threading.Thread(target=self._collect, daemon=True,
+                                                   name="quantum-batch-collector")
+                self._collector.start()
+
+    def submit(self, features: np.ndarray) -> Future:
+        """Queue one input row and return a future for its prediction"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((np.asarray(features), future, time.perf_counter()))
+        return future
+
+    def predict(self, features: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        """Blocking single-row prediction routed through the batcher"""
+        return self.submit(features).result(timeout=timeout)
+
+    def predict_many(self, rows: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        """Blocking ``model.predict(rows)`` equivalent: every row rides the shared queue"""
+        futures = [self.submit(row) for row in np.atleast_2d(rows)]
+        return np.stack([future.result(timeout=timeout) for future in futures])
+
+    def _collect(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.max_wait_s
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._executor.submit(self._run_batch, batch)
+                    return
+                batch.append(item)
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[np.ndarray, Future, float]]):
+        try:
+            inputs = np.stack([features for features, _, _ in batch])
+            outputs = self.model.predict(inputs)
+            if len(outputs) != len(batch):
+                # Rows can't be matched to callers any more; nobody may be left waiting
+                raise ValueError(f"model returned {len(outputs)} rows for a batch of {len(batch)}")
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        done = time.perf_counter()
+        for row, (_, future, queued_at) in zip(outputs, batch):
+            future.set_result(row)
+        with self._stats_lock:
+            self.stats['requests'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+            self.stats['total_latency_s'] += sum(done - queued_at for _, _, queued_at in batch)
+
+    def summary(self) -> Dict:
+        """Batching efficiency and mean queue-to-result latency"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        requests = stats['requests'] or 1
+        stats['mean_batch'] = stats['requests'] / (stats['batches'] or 1)
+        stats['mean_latency_ms'] = stats['total_latency_s'] / requests * 1000
+        return stats
+
+    def close(self):
+        """Flush queued work and stop the collector and pool"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._collector is not None:
+            self._queue.put(None)
+            self._collector.join()
+            self._executor.shutdown(wait=True)
+
+
+def shared_batcher(model_key: str, model_factory: Callable[[], object], **kwargs) -> MicroBatcher:
+    """🤝 One batcher per model per process, so every game rides the same queue
+
+    Asking for an existing key with another factory or other settings raises
+    ``ValueError`` rather than quietly handing back the first batcher.
+    """
+    with _MODEL_LOCK:
+        batcher = _BATCHERS.get(model_key)
+        if batcher is None:
+            batcher = MicroBatcher(model_factory, model_key=model_key, **kwargs)
+            _BATCHERS[model_key] = batcher
+            return batcher
+    conflicts = [name for name, value in kwargs.items() if batcher.config.get(name) != value]
+    if batcher.model_factory != model_factory:
+        conflicts.insert(0, 'model_factory')
+    if conflicts:
+        raise ValueError(f"Batcher {model_key!r} already exists with a different {', '.join(conflicts)}")
+    return batcher
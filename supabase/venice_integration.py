@@ -1,24 +1,30 @@
 python
 # Quantum model integration
+from quantum_batcher import keras_model_factory, shared_batcher
+
 class QuantumGameEngine:
-    def __init__(self):
-        self.quantum_model = self._load_quantum_model()
-        self.wyoming_rules = self._load_wyoming_compliance()
-        
-    def _load_quantum_model(self):
-        # Load Venice AI's quantum weights
-        return tf.keras.models.load_model(
-            "venice_quantum_weights.h5",
-            custom_objects={"QuantumAttention": QuantumAttention}
+    def __init__(self, model_factory=None, max_batch_size=32, max_wait_ms=2.0):
+        # Model loads lazily, once per process, behind a shared micro-batcher
+        self.batcher = shared_batcher(
+            "venice_quantum",
+            model_factory or keras_model_factory(
+                "venice_quantum_weights.h5",
+                custom_objects={"QuantumAttention": QuantumAttention}
+            ),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
         )
-    
+        self.wyoming_rules = self._load_wyoming_compliance()
+
+    @property
+    def quantum_model(self):
+        return self.batcher.model
+
     def process_market_data(self, crypto_data):
-        # Quantum-enhanced prediction
-        return self.quantum_model.predict(
-            self._normalize_prices(crypto_data),
-            use_quantum=True
-        )
-        
+        # Quantum-enhanced prediction, one output row per input row as before;
+        # each row is batched with every other live game's
+        return self.batcher.predict_many(self._normalize_prices(crypto_data))
+
     def _normalize_prices(self, data):
         # Wyoming data compliance
         return data * WYOMING_QUANTUM_MULTIPLIER
@@ -0,0 +1,9 @@
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Repo-root modules and the sniper's sibling modules import each other by name
+for path in (REPO_ROOT, os.path.join(REPO_ROOT, "apps", "sagebrush-sniper")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
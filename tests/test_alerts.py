@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import market_service as ms
+from alerts import ABOVE, BELOW, AlertEngine, parse_alert, parse_alerts
+from checkpoint import load_checkpoint, write_checkpoint
+
+
+def test_parse_alert_fields_and_refs():
+    assert parse_alert("ETH RSI < 25")[0] == {
+        "symbol": "ETH-USD", "field": "RSI", "direction": BELOW, "threshold": 25.0, "ref": None,
+        "crossing": False, "label": "ETH RSI < 25"}
+    assert [a["direction"] for a in parse_alert("BTC crosses lower BB")] == [BELOW]
+    assert parse_alert("BTC crosses lower BB")[0]["ref"] == "BB_lower"
+    assert parse_alert("SOL volume_ratio > 3")[0]["field"] == "Volume_Ratio"
+    assert parse_alert("btc macd crosses above macd signal")[0]["ref"] == "MACD_signal"
+    assert parse_alert("BTC > 100,000")[0]["threshold"] == 100000.0
+
+
+@pytest.mark.parametrize("spec", ["ETH RSII < 25", "ETH RSI < lower band", "ETH RSI = 25", "", " ; "])
+def test_parse_alerts_rejects_unknown_input(spec):
+    with pytest.raises(ValueError):
+        parse_alerts(spec)
+
+
+def test_parse_alerts_splits_multiple():
+    alerts = parse_alerts("ETH RSI < 25, BTC crosses lower BB; SOL > 1,500\nADA crosses SMA 50")
+    assert [(a["symbol"], a["field"], a["ref"], a["direction"]) for a in alerts] == [
+        ("ETH-USD", "RSI", None, BELOW),
+        ("BTC-USD", "Close", "BB_lower", BELOW),
+        ("SOL-USD", "Close", None, ABOVE),
+        ("ADA-USD", "Close", "SMA_50", BELOW),
+        ("ADA-USD", "Close", "SMA_50", ABOVE),
+    ]
+
+
+def _bars(symbol, period, interval):
+    if symbol == "JUNK-USD":
+        return pd.DataFrame()
+    index = pd.date_range("2024-01-01", periods=300, freq="5min", tz="UTC")
+    close = np.linspace(100, 120, len(index))
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": np.full(len(index), 1e3)}, index=index)
+
+
+def test_alert_endpoint_validates():
+    hub = ms.MarketDataHub(fetcher=_bars, tape=False)
+    client = TestClient(ms.create_app(hub, symbols=[], poll=False, admin_token="s3cret"),
+                        headers={"X-Admin-Token": "s3cret"})
+    assert client.post("/api/alerts", json={"spec": "ETH RSI < 25; BTC crosses lower BBB"}).status_code == 400
+    assert client.post("/api/alerts", json={"spec": "ETH RSI < 25", "interval": "7m"}).status_code == 400
+    assert client.post("/api/alerts", json={"spec": "ETH RSI < 25; JUNK > 1"}).status_code == 404
+    assert hub.tracked() == {("ETH-USD", "1h")}
+    assert client.get("/api/alerts").json() == {"alerts": []}
+    created = client.post("/api/alerts", json={"spec": "ETH RSI < 25, BTC crosses lower BB"}).json()["alerts"]
+    assert [a["label"] for a in created] == ["ETH RSI < 25", "BTC crosses lower BB"]
+    assert len(client.get("/api/alerts").json()["alerts"]) == 2
+
+
+def test_alert_endpoints_need_admin_and_respect_the_cap():
+    hub = ms.MarketDataHub(fetcher=_bars, tape=False)
+    hub.alerts.max_alerts = 2
+    client = TestClient(ms.create_app(hub, symbols=[], poll=False, admin_token="s3cret"))
+    assert client.post("/api/alerts", json={"spec": "ETH RSI < 25"}).status_code == 401
+    admin = {"X-Admin-Token": "s3cret"}
+    created = client.post("/api/alerts", json={"spec": "ETH RSI < 25"}, headers=admin).json()["alerts"]
+    # "crosses SMA 50" is two alerts and only one slot is left: nothing is added
+    assert client.post("/api/alerts", json={"spec": "BTC crosses SMA 50"}, headers=admin).status_code == 429
+    assert len(hub.alerts) == 1
+    assert client.delete(f"/api/alerts/{created[0]['id']}").status_code == 401
+    assert client.delete(f"/api/alerts/{created[0]['id']}", headers=admin).status_code == 200
+    assert len(hub.alerts) == 0
+
+    closed = TestClient(ms.create_app(hub, symbols=[], poll=False, admin_token=None))
+    assert closed.post("/api/alerts", json={"spec": "ETH RSI < 25"}, headers=admin).status_code == 403
+
+
+def test_removing_alerts_prunes_their_indexes():
+    engine = AlertEngine(notifiers=[])
+    rsi = engine.add_spec("ETH RSI < 25")
+    once = engine.add_spec("ETH > 150", once=True)
+    engine.update("ETH-USD", "1h", {"RSI": 40.0, "Close": 100.0})
+    engine.remove(rsi[0].id)
+    assert list(engine._indexes) == [("ETH-USD", "1h", "Close", None)]
+    assert engine._by_symbol == {("ETH-USD", "1h"): [("ETH-USD", "1h", "Close", None)]}
+    assert [e["id"] for e in engine.update("ETH-USD", "1h", {"RSI": 40.0, "Close": 160.0})] == [once[0].id]
+    assert engine._indexes == engine._by_symbol == engine._last == {}
+
+
+def test_alerts_survive_a_checkpoint(tmp_path):
+    hub = ms.MarketDataHub(fetcher=_bars, tape=False)
+    hub.series("ETH-USD", "1h")
+    created = hub.alerts.add_spec("ETH RSI < 25; ETH crosses lower BB")
+    arrays, meta = hub.checkpoint_state()
+    write_checkpoint(str(tmp_path / "hub.ckpt"), arrays, meta)
+
+    warm = ms.MarketDataHub(fetcher=_bars, tape=False)
+    assert warm.restore(load_checkpoint(str(tmp_path / "hub.ckpt")))
+    assert warm.alerts.snapshot() == hub.alerts.snapshot()
+    # New ids carry on past the restored ones
+    assert warm.alerts.add_spec("ETH > 1")[0].id > max(a.id for a in created)
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from bar_pyramid import BASE_HISTORY, PyramidCache
+
+
+def _bars(end, periods):
+    index = pd.date_range(end=end, periods=periods, freq="5min", tz="UTC")
+    return pd.DataFrame({"Open": 1.0, "High": 1.0, "Low": 1.0, "Close": 1.0, "Volume": 1.0}, index=index)
+
+
+def test_failed_first_fetch_is_retried_in_full():
+    calls = []
+
+    def fetcher(symbol, period, interval):
+        calls.append(period)
+        if len(calls) == 1:
+            raise ConnectionError("upstream down")
+        return _bars(pd.Timestamp.now(tz="UTC"), 100)
+
+    cache = PyramidCache(fetcher, base_interval="5m", ttl_seconds=0)
+    with pytest.raises(ConnectionError):
+        cache.refresh("BTC-USD")
+    assert cache.peek("BTC-USD") is None
+    cache.refresh("BTC-USD")
+    assert calls == [BASE_HISTORY["5m"]] * 2
+    assert len(cache.peek("BTC-USD").get("5m")) == 100
+
+
+def test_incremental_fetch_spans_the_gap():
+    now = pd.Timestamp.now(tz="UTC")
+    calls = []
+
+    def fetcher(symbol, period, interval):
+        calls.append(period)
+        return _bars(now - pd.Timedelta(days=3, hours=5) if len(calls) == 1 else now, 50)
+
+    cache = PyramidCache(fetcher, base_interval="5m", ttl_seconds=0)
+    cache.refresh("ETH-USD")
+    cache.refresh("ETH-USD")
+    assert calls == ["60d", "4d"]
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pytest
+
+import checkpoint
+from checkpoint import (FORMAT_VERSION, MAGIC, PREAMBLE, Checkpoint, CheckpointError, load_checkpoint,
+                        write_checkpoint)
+
+
+def _write(path, scale=1.0):
+    arrays = {"a/values": np.arange(12, dtype=np.float64).reshape(3, 4) * scale,
+              "a/ts": np.arange(3, dtype=np.int64), "empty": np.empty(0, dtype=np.uint8)}
+    write_checkpoint(str(path), arrays, meta={"schema": 1, "symbols": ["BTC-USD"]})
+    return arrays
+
+
+def test_round_trip_is_read_only_views(tmp_path):
+    arrays = _write(tmp_path / "x.ckpt")
+    ckpt = load_checkpoint(str(tmp_path / "x.ckpt"))
+    assert ckpt.meta == {"schema": 1, "symbols": ["BTC-USD"]}
+    for name, value in arrays.items():
+        assert np.array_equal(ckpt[name], value) and ckpt[name].dtype == value.dtype
+    assert ckpt["a/values"].ctypes.data % checkpoint.ALIGN == 0
+    with pytest.raises(ValueError):
+        ckpt["a/values"][0, 0] = 1.0
+    assert sorted(ckpt.names("a/")) == ["a/ts", "a/values"]
+
+
+def test_truncated_foreign_and_other_version_files_are_cold_starts(tmp_path):
+    path = tmp_path / "x.ckpt"
+    _write(path)
+    raw = path.read_bytes()
+
+    path.write_bytes(raw[:-8])
+    with pytest.raises(CheckpointError, match="truncated"):
+        Checkpoint(str(path))
+    assert load_checkpoint(str(path)) is None
+
+    path.write_bytes(raw[:len(MAGIC) + 2])
+    assert load_checkpoint(str(path)) is None
+
+    head = len(MAGIC)
+    _, header_len = PREAMBLE.unpack_from(raw, head)
+    path.write_bytes(raw[:head] + PREAMBLE.pack(FORMAT_VERSION + 1, header_len) + raw[head + PREAMBLE.size:])
+    with pytest.raises(CheckpointError, match="format"):
+        Checkpoint(str(path))
+    assert load_checkpoint(str(path)) is None
+
+    path.write_bytes(b"not a checkpoint at all")
+    assert load_checkpoint(str(path)) is None
+    assert load_checkpoint(str(tmp_path / "missing.ckpt")) is None
+    assert load_checkpoint(None) is None
+
+
+def test_replacement_is_atomic(tmp_path, monkeypatch):
+    path = tmp_path / "x.ckpt"
+    _write(path)
+    old = load_checkpoint(str(path))
+
+    # Readers holding the old mapping keep their snapshot across a rewrite
+    _write(path, scale=2.0)
+    assert old["a/values"][1, 1] == 5.0
+    assert load_checkpoint(str(path))["a/values"][1, 1] == 10.0
+
+    # A write that dies before the rename leaves the previous file and no temp files
+    def crash(fd):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(os, "fsync", crash)
+    with pytest.raises(OSError):
+        _write(path, scale=3.0)
+    assert load_checkpoint(str(path))["a/values"][1, 1] == 10.0
+    assert os.listdir(tmp_path) == ["x.ckpt"]
+    with pytest.raises(TypeError):
+        write_checkpoint(str(path), {"bad": np.array([object()])})
@@ -0,0 +1,40 @@
+import os
+
+from doc_index import DocIndex
+
+QUERIES = ["yfinance rate limit", "warm restart checkpoint", "wallet avalanche", "rsi signal", "stampede"]
+
+
+def _write(root, rel, text):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    # Same-second edits still have to look changed
+    os.utime(path, ns=(path.stat().st_mtime_ns + 10**9,) * 2)
+
+
+def _hits(index):
+    return {query: sorted((hit["path"], hit["line"], hit["title"], hit["snippet"], hit["score"])
+                          for hit in index.search(query, k=10)) for query in QUERIES}
+
+
+def test_incremental_refresh_matches_full_rebuild(tmp_path):
+    docs = tmp_path / "docs"
+    _write(docs, "guide.md", "# Rate limits\nyfinance rate limit backs off\n\n# Restarts\nwarm restart from checkpoint\n")
+    _write(docs, "wallet.md", "# Wallets\nconnect an avalanche wallet\n")
+    _write(docs, "pkg/signals.py", '"""RSI signal engine"""\n\n\ndef rsi():\n    """rsi oversold signal"""\n')
+    index = DocIndex.open(str(tmp_path / "incremental.idx"))
+    index.refresh(str(docs), extra={"dr-dee/support": "# Support\nrate limit on the stampede feed"})
+
+    _write(docs, "wallet.md", "# Wallets\nconnect a phantom wallet\n\n# Avalanche\nbridge to avalanche\n")
+    os.unlink(docs / "pkg" / "signals.py")
+    _write(docs, "notes.md", "# Stampede\nsignal stampede when rsi and checkpoint agree\n")
+    stats = index.refresh(str(docs), extra={"dr-dee/support": "# Support\nyfinance rate limit at the stampede"})
+    assert (stats["changed"], stats["removed"]) == (3, 1)
+
+    full = DocIndex.open(str(tmp_path / "full.idx"))
+    full.refresh(str(docs), extra={"dr-dee/support": "# Support\nyfinance rate limit at the stampede"})
+    assert index.sections == full.sections
+    assert sorted(index.sources) == sorted(full.sources)
+    assert all(_hits(full).values())
+    assert _hits(index) == _hits(full)
@@ -0,0 +1,20 @@
+import importlib.util
+import os
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location("import_profile", os.path.join(REPO_ROOT, "scripts", "import_profile.py"))
+import_profile = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_profile)
+
+BUDGET_MS = 1000.0  # import_profile's default --budget-ms
+
+
+@pytest.mark.parametrize("app", sorted(import_profile.APPS))
+def test_app_cold_start_stays_lazy_and_in_budget(app):
+    result = import_profile.profile_app(import_profile.APPS[app])
+    assert "error" not in result, result.get("error")
+    assert result["eager_heavy"] == []
+    assert result["process_ms"] < BUDGET_MS
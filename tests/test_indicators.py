@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+from indicators import DEFAULT_OUTPUTS, IndicatorMemo, calculate_indicators, compute, indicator, plan
+
+
+def _bars(n=200, seed=2):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq="1h", tz="UTC")
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))), index=index)
+    return pd.DataFrame({"Open": close.shift(1).fillna(close.iloc[0]), "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": rng.uniform(1e3, 5e3, n)}, index=index)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # Nodes registered by a test stay in that test
+    monkeypatch.setattr(indicators, "REGISTRY", dict(indicators.REGISTRY))
+    monkeypatch.setattr(indicators, "_PLANS", {})
+    return indicators.REGISTRY
+
+
+def test_plan_orders_dependencies_and_is_cached(registry):
+    nodes = [node.name for node in plan(["MACD_signal", "BB_lower"])]
+    assert nodes == ["ema_12", "ema_26", "macd", "macd_signal", "sma_20", "bb_middle", "bb_std", "bollinger"]
+    assert plan(["MACD_signal", "BB_lower"]) is plan(["MACD_signal", "BB_lower"])
+    # Shared intermediates run once: RSI and OBV both read _delta
+    assert [node.name for node in plan(["RSI", "OBV"])] == ["delta", "rsi", "obv"]
+
+    cached = plan(["RSI"])
+    indicator("_unused")(lambda close: close)
+    assert plan(["RSI"]) is not cached
+
+
+def test_plan_rejects_unknown_and_cyclic_indicators(registry):
+    with pytest.raises(KeyError):
+        plan(["NOPE"])
+    indicator("_a", needs=("_b",))(lambda b: b)
+    indicator("_b", needs=("_a",))(lambda a: a)
+    with pytest.raises(ValueError):
+        plan(["_a"])
+
+
+def test_memo_returns_what_a_direct_compute_does_without_recomputing(registry):
+    calls = []
+    indicator("COUNTED", needs=("RSI",))(lambda rsi: calls.append(1) or rsi * 2)
+    data = _bars()
+    wanted = DEFAULT_OUTPUTS + ("ATR", "VWAP", "COUNTED")
+    direct = compute(data, wanted)
+
+    memo = IndicatorMemo()
+    first = compute(data, wanted, memo.slot("BTC-USD", 1))
+    again = compute(data, wanted, memo.slot("BTC-USD", 1))
+    for column in wanted:
+        pd.testing.assert_series_equal(first[column], direct[column], check_names=False)
+        assert again[column] is first[column]
+    assert len(calls) == 2  # the direct compute and the first memoized one
+
+    # A new data version starts over
+    compute(data, wanted, memo.slot("BTC-USD", 2))
+    assert len(calls) == 3
+
+
+def test_memo_keeps_latest_version_per_key_and_evicts_oldest_key():
+    memo = IndicatorMemo(max_keys=2)
+    memo.slot("a", 1)["x"] = 1
+    assert memo.slot("a", 1) == {"x": 1}
+    assert memo.slot("a", 2) == {}
+    memo.slot("a", 2)["x"] = 2
+    memo.slot("b", 1)["x"] = 1
+    memo.slot("c", 1)
+    assert memo.slot("b", 1) == {"x": 1}
+    assert memo.slot("a", 2) == {}
+
+
+def test_indicator_values():
+    data = _bars()
+    out = calculate_indicators(data.copy(), ["BB_upper", "BB_lower", "RSI", "Volume_Ratio", "STOCH_K"])
+    assert not any(column.startswith("_") for column in out.columns)
+    std = data["Close"].rolling(20).std()
+    np.testing.assert_allclose((out["BB_upper"] - out["BB_lower"]).dropna(), (4 * std).dropna())
+    assert out["RSI"].dropna().between(0, 100).all()
+    assert out["STOCH_K"].dropna().between(0, 100).all()
+    np.testing.assert_allclose(out["Volume_Ratio"].dropna(),
+                               (data["Volume"] / data["Volume"].rolling(20).mean()).dropna())
+
+    rising = pd.DataFrame({"Close": np.arange(1.0, 40.0)})
+    assert (compute(rising, ["RSI"])["RSI"].dropna() == 100).all()
@@ -0,0 +1,94 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import market_service as ms
+from bar_store import bars_json
+from checkpoint import load_checkpoint, write_checkpoint
+
+
+def _bars(symbol, period, interval):
+    index = pd.date_range("2024-01-01", periods=300, freq="5min", tz="UTC")
+    close = np.linspace(100, 120, len(index))
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": np.full(len(index), 1e3)}, index=index)
+
+
+def test_history_slices_one_cached_encoding():
+    hub = ms.MarketDataHub(fetcher=_bars, tape=False)
+    client = TestClient(ms.create_app(hub, symbols=[], poll=False))
+    full = client.get("/api/history/BTC-USD", params={"interval": "5m", "limit": 20000}).json()
+    for limit in (1, 7, 300, 999):
+        body = client.get("/api/history/BTC-USD", params={"interval": "5m", "limit": limit}).json()
+        assert body["bars"] == full["bars"][-limit:]
+    assert len(hub._history_cache) == 1
+
+    series = hub.series("BTC-USD", "5m")
+    assert full["bars"] == json.loads(bars_json(series.data))
+
+
+def _known_only(symbol, period, interval):
+    return _bars(symbol, period, interval) if symbol == "BTC-USD" else pd.DataFrame()
+
+
+def test_only_successful_reads_are_watched():
+    calls = []
+
+    def fetcher(symbol, period, interval):
+        calls.append((symbol, interval))
+        return _known_only(symbol, period, interval)
+
+    hub = ms.MarketDataHub(fetcher=fetcher, tape=False)
+    client = TestClient(ms.create_app(hub, symbols=[], poll=False))
+    for path in ("snapshot", "history", "signals"):
+        assert client.get(f"/api/{path}/BTC-USD", params={"interval": "7m"}).status_code == 400
+        assert client.get(f"/api/{path}/JUNK-USD", params={"interval": "1h"}).status_code == 404
+    assert all(interval == ms.PYRAMID_BASE for _, interval in calls)
+    assert hub.tracked() == set()
+
+    assert client.get("/api/history/BTC-USD", params={"interval": "1h", "watch": "false"}).status_code == 200
+    assert hub.tracked() == set()
+    assert client.get("/api/snapshot/BTC-USD", params={"interval": "1h"}).status_code == 200
+    assert hub.tracked() == {("BTC-USD", "1h")}
+
+
+def test_unread_symbols_expire_with_their_data():
+    hub = ms.MarketDataHub(fetcher=_known_only, tape=False, watch_ttl=60)
+    hub.history_bytes("BTC-USD", "1h")
+    lengths = {interval: len(hub.store.get("BTC-USD", interval).data) for interval in hub.pyramid_intervals}
+    with pytest.raises(KeyError):
+        hub.series("JUNK-USD", "1h")
+    assert hub.expire() == ["JUNK-USD"]
+    assert hub.tracked() == {("BTC-USD", "1h")}
+
+    queue = hub.subscribe(["BTC-USD"], "1h")
+    assert hub.expire(now=time.time() + 3600) == []
+    hub.unsubscribe(queue)
+    assert hub.expire(now=time.time() + 3600) == ["BTC-USD"]
+    assert hub.tracked() == set() and hub.store.keys() == [] and hub.pyramids.symbols() == []
+    assert not hub._history_cache
+
+    # Coming back after expiry rebuilds every timeframe from full history
+    hub.series("BTC-USD", "1h")
+    assert {interval: len(hub.store.get("BTC-USD", interval).data)
+            for interval in hub.pyramid_intervals} == lengths
+
+
+def test_checkpoint_restores_only_watched_keys_with_bars(tmp_path):
+    hub = ms.MarketDataHub(fetcher=_known_only, tape=False)
+    hub.series("BTC-USD", "1h")
+    arrays, meta = hub.checkpoint_state()
+    meta["watched"] += [["JUNK-USD", "1h"], ["BTC-USD", "7m"]]
+    write_checkpoint(str(tmp_path / "hub.ckpt"), arrays, meta)
+
+    calls = []
+    warm = ms.MarketDataHub(fetcher=lambda *args: calls.append(args), tape=False)
+    assert warm.restore(load_checkpoint(str(tmp_path / "hub.ckpt")))
+    assert warm.tracked() == {("BTC-USD", "1h")}
+    assert warm.expire() == []
+    assert len(warm.store.get("BTC-USD", "1h").data) == len(hub.store.get("BTC-USD", "1h").data)
+    assert calls == []
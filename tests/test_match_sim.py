@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from match_sim import (COMBO, COMBO_DAMAGE, DOUBLE_JAB, DRAW, GUARD, HOOK, JAB, START_HEALTH, STUMBLE,
+                       UPPERCUT, WARMUP_FRAMES, Arena, simulate, synthetic_paths)
+
+
+def _scripted(arena, frames):
+    """Replace the price signals with fixed ``(red, blue)`` moves, one pair per frame"""
+    script = iter(frames)
+    arena._signals = lambda price: np.array([next(script)], dtype=np.int8)
+    return arena
+
+
+def test_damage_defense_and_combo_meter():
+    arena = _scripted(Arena(1), [(JAB, GUARD), (HOOK, STUMBLE), (UPPERCUT, JAB), (JAB, GUARD)])
+    prices = np.full((1, 2), 100.0)
+    arena.step(prices)
+    assert arena.health[0].tolist() == [START_HEALTH, START_HEALTH - 0.5]  # guarded: half damage
+    arena.step(prices)
+    assert arena.health[0].tolist() == [START_HEALTH, START_HEALTH - 6.5]  # stumbling: double
+    arena.step(prices)
+    assert arena.health[0].tolist() == [START_HEALTH - 1.0, START_HEALTH - 10.5]
+    assert arena.meter[0].tolist() == [8.0, 1.0]
+
+    arena.meter[0, 0] = 99.0
+    moves = arena.step(prices)  # the jab fills the meter
+    assert moves[0].tolist() == [COMBO, GUARD]
+    assert arena.meter[0, 0] == 0.0
+    assert arena.health[0, 1] == START_HEALTH - 10.5 - COMBO_DAMAGE * 0.5
+    assert arena.move_counts[0, 0, JAB] == 1 and arena.move_counts[0, 0, COMBO] == 1
+
+
+def test_knockout_ends_the_bout_and_freezes_it():
+    arena = _scripted(Arena(1), [(UPPERCUT, JAB)] + [(JAB, JAB)] * 3)
+    arena.health[0, 1] = 3.0
+    arena.step(np.full((1, 2), 100.0))
+    assert arena.done[0] and arena.knockout[0] and arena.winner[0] == 0
+    health = arena.health.copy()
+    for _ in range(3):
+        arena.step(np.full((1, 2), 100.0))
+    assert (arena.health == health).all() and arena.frames[0] == 1
+
+
+@pytest.mark.parametrize("moves, winner", [((GUARD, GUARD), DRAW), ((GUARD, JAB), 1)])
+def test_time_limit_goes_to_the_cards(moves, winner):
+    arena = _scripted(Arena(1, max_frames=3), [moves] * 5)
+    for _ in range(5):
+        arena.step(np.full((1, 2), 100.0))
+    assert arena.done[0] and not arena.knockout[0]
+    assert arena.winner[0] == winner and arena.frames[0] == 3
+
+
+def test_price_feed_picks_moves_after_warm_up():
+    frames = 60
+    path = 100.0 * np.stack([1.002 ** np.arange(frames), 0.998 ** np.arange(frames)])[None]
+    arena = Arena(1)
+    moves = np.array([arena.step(path[:, :, f])[0] for f in range(frames)])
+    assert (moves[:WARMUP_FRAMES] == GUARD).all()
+    # Red is up over 4% on the band window every frame; falling blue never attacks
+    assert (moves[WARMUP_FRAMES:, 0] == DOUBLE_JAB).all()
+    assert (moves[:, 1] == GUARD).all()
+    assert arena.health[0].tolist() == [START_HEALTH, START_HEALTH - (frames - WARMUP_FRAMES)]
+
+    # A bad tick holds the last good price instead of moving the indicators
+    before = arena.ema_fast.copy()
+    arena.step(np.array([[np.nan, -1.0]]))
+    assert arena.last[0].tolist() == path[0, :, -1].tolist()
+    assert np.allclose(arena.ema_fast, before + 2 / 13 * (arena.last - before))
+
+
+def test_batched_bouts_match_one_bout_arenas():
+    rng = np.random.default_rng(4)
+    paths = synthetic_paths(rng, np.array([0.002, 0.005, 0.003]), rng.integers(0, 3, (8, 2)), 400)
+    batch = Arena(8).run(paths)
+    for i in range(8):
+        assert batch.result(i) == Arena(1).run(paths[i:i + 1]).result(0)
+
+
+def test_simulate_tallies_every_bout():
+    totals = simulate(200, seed=1, tokens=["BTC", "SOL", "WYO"], vols=[0.002, 0.0032, 0.005], frames=300)
+    assert totals["bouts"].sum() == 400
+    assert totals["wins"].sum() + totals["draws"][0] == 200
+    assert totals["moves"].sum() == totals["frames"][0] * 2
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pairs import PairsEngine, synthetic_closes
+
+SYMBOLS = [f"A{i:03d}" for i in range(30)]
+OU_HALF_LIFE = -np.log(2) / np.log(0.9)  # synthetic_closes' planted spread
+
+
+def test_beta_and_zscore_match_batch_ewm():
+    rng = np.random.default_rng(8)
+    x = np.cumsum(rng.normal(0, 0.01, (500, 2)), axis=0)
+    x[:, 0] += 0.8 * x[:, 1]
+    engine = PairsEngine(["A", "B"], min_bars=10)
+    engine.step_many(np.exp(x))
+    signal = engine.scan(min_corr=None, max_halflife=np.inf)["signals"][0]
+
+    levels = pd.DataFrame(x, columns=["A", "B"]).ewm(alpha=engine.alpha, adjust=False)
+    cov = levels.cov(bias=True).loc[len(x) - 1]
+    mean = levels.mean().iloc[-1]
+    beta = cov.loc["A", "B"] / cov.loc["B", "B"]
+    spread = (x[-1, 0] - mean["A"]) - beta * (x[-1, 1] - mean["B"])
+    assert signal["pair"] == "A/B"
+    assert signal["beta"] == pytest.approx(beta, rel=1e-8)
+    assert signal["zscore"] == pytest.approx(spread / np.sqrt(cov.loc["A", "A"] - beta * cov.loc["A", "B"]), rel=1e-6)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_planted_ou_pair_ranks_first(seed):
+    closes, planted = synthetic_closes(len(SYMBOLS), 2000, planted=1, seed=seed)
+    engine = PairsEngine(SYMBOLS)
+    engine.step_many(closes)
+    report = engine.scan()
+    top = report["signals"][0]
+    assert {top["symbol"], top["hedge"]} == {SYMBOLS[k] for k in planted[0]}
+    assert OU_HALF_LIFE / 2 < top["half_life"] < OU_HALF_LIFE * 2
+    assert report["tradable"] == 1
+
+
+def test_a_stretched_spread_says_which_leg_to_sell():
+    closes, _ = synthetic_closes(len(SYMBOLS), 2000, planted=1, seed=1)
+    engine = PairsEngine(SYMBOLS)
+    engine.step_many(closes)
+    jump = closes[-1].copy()
+    jump[0] *= 1.05
+    engine.step(jump)
+    top = engine.scan()["signals"][0]
+    assert top["pair"] == "A000/A001" and top["zscore"] > 2
+    assert top["action"] == "SHORT A000 / LONG A001"
+
+
+def test_restored_state_carries_on_and_rejects_other_halflives():
+    closes, _ = synthetic_closes(8, 400, planted=2, seed=4)
+    symbols = SYMBOLS[:8]
+    whole = PairsEngine(symbols)
+    whole.step_many(closes)
+    first = PairsEngine(symbols)
+    first.step_many(closes[:250])
+    resumed = PairsEngine()
+    resumed.restore_state(*first.export_state())
+    resumed.step_many(closes[250:])
+    assert resumed.scan(min_corr=None)["signals"] == whole.scan(min_corr=None)["signals"]
+    with pytest.raises(ValueError):
+        PairsEngine(halflife=24).restore_state(*first.export_state())
@@ -0,0 +1,113 @@
+import base64
+import json
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from pyth_accounts import (ACCOUNT_TYPE_PRICE, MIN_ACCOUNT_SIZE, PRICE_ACCOUNT_SIZE, PYTH_MAGIC,
+                           STATUS_TRADING, decode_price_accounts, encode_price_account, pack_accounts,
+                           prices, reference_decode, valid_mask, verify_fixture)
+
+# Recorded mainnet accounts: python pyth_accounts.py record tests/fixtures/pyth_mainnet.jsonl
+MAINNET_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "pyth_mainnet.jsonl")
+
+# pc_price_t from pyth-client oracle.h, member by member with no offsets
+# written down: header, slots, ema price/conf, timestamp, min_pub + padding,
+# product and next keys, the previous aggregate, then the aggregate itself
+ORACLE_PRICE = struct.Struct("<IIIIIiII" "QQ" "qqq" "qqq" "q" "BBHI" "32s32s" "QqQq" "qQIIQ")
+ORACLE_FIELDS = ("magic", "version", "atype", "size", "ptype", "expo", "num_components", "num_quoters",
+                 "last_slot", "valid_slot", "ema_price", "ema_price_numer", "ema_price_denom",
+                 "ema_conf", "ema_conf_numer", "ema_conf_denom", "publish_time",
+                 "min_pub", "drv2", "drv3", "drv4", "product", "next",
+                 "prev_slot", "prev_price", "prev_conf", "prev_timestamp",
+                 "price", "conf", "status", "corp_act", "pub_slot")
+
+
+def _accounts():
+    rng = np.random.default_rng(7)
+    blobs = [encode_price_account(int(p), int(c), int(e), 1_700_000_000 + i, status=i % 3, slot=10 + i)
+             for i, (p, c, e) in enumerate(zip(rng.integers(-10**12, 10**13, 20),
+                                               rng.integers(0, 10**8, 20), rng.integers(-10, 2, 20)))]
+    wrong_type = bytearray(encode_price_account(123, 4, -2, 1_700_000_000))
+    struct.pack_into("<I", wrong_type, 8, ACCOUNT_TYPE_PRICE - 1)  # a product account
+    not_pyth = bytes(PRICE_ACCOUNT_SIZE)
+    short = encode_price_account(5_000, 7, -3, 1_700_000_001, slot=99)[:MIN_ACCOUNT_SIZE]
+    truncated = encode_price_account(5_000, 7, -3, 1_700_000_001)[:100]  # header only
+    return blobs + [bytes(wrong_type), not_pyth, short, truncated, None]
+
+
+def test_decode_matches_reference_decode():
+    blobs = _accounts()
+    raw = pack_accounts(blobs)
+    view = decode_price_accounts(raw)
+    assert len(view) == len(blobs)
+    for i in range(len(blobs)):
+        padded = bytes(raw[i * PRICE_ACCOUNT_SIZE:(i + 1) * PRICE_ACCOUNT_SIZE])
+        for field, expected in reference_decode(padded).items():
+            assert int(view[field][i]) == expected, (i, field)
+
+
+def test_valid_mask_and_scaled_prices():
+    blobs = _accounts()
+    view = decode_price_accounts(pack_accounts(blobs))
+    table = prices(view)
+    ok = valid_mask(view)
+    # 20 real accounts, wrong type, zeroed, short but complete, cut off, missing
+    assert ok.tolist() == [True] * 20 + [False, False, True, False, False]
+
+    for i in np.flatnonzero(ok):
+        ref = reference_decode(pack_accounts([blobs[i]]))
+        scale = 10.0 ** ref["expo"]
+        assert table["price"][i] == pytest.approx(ref["price"] * scale)
+        assert table["conf"][i] == pytest.approx(ref["conf"] * scale)
+        assert table["status"][i] == ref["status"]
+        assert table["slot"][i] == ref["pub_slot"]
+    assert table["price"][22] == pytest.approx(5.0) and table["status"][22] == STATUS_TRADING
+    assert table["slot"][22] == 99
+
+    invalid = ~ok
+    assert np.isnan(table["price"][invalid]).all() and np.isnan(table["conf"][invalid]).all()
+    assert (table["status"][invalid] == 0).all()
+
+
+def test_decode_is_zero_copy_and_rejects_partial_accounts():
+    raw = pack_accounts([encode_price_account(1, 1, 0, 0)])
+    view = decode_price_accounts(raw)
+    raw[208:216] = struct.pack("<q", 42)
+    assert view["price"][0] == 42
+    with pytest.raises(ValueError):
+        decode_price_accounts(bytes(PRICE_ACCOUNT_SIZE + 1))
+
+
+def test_decode_matches_oracle_struct_layout():
+    # Neighbouring fields all differ, so an offset off by one field reads the wrong number
+    fields = dict(zip(ORACLE_FIELDS, (
+        PYTH_MAGIC, 2, ACCOUNT_TYPE_PRICE, PRICE_ACCOUNT_SIZE, 1, -8, 31, 29,
+        250_000_102, 250_000_101, 6_400_000_000_000, 11, 13, 2_100_000_000, 17, 19, 1_700_000_123,
+        3, 5, 7, 9, b"\x01" * 32, b"\x02" * 32,
+        250_000_099, 6_350_000_000_000, 1_900_000_000, 1_700_000_100,
+        6_543_210_000_000, 123_456_789, STATUS_TRADING, 4, 250_000_103,
+    )))
+    blob = ORACLE_PRICE.pack(*fields.values()) + b"\xee" * (PRICE_ACCOUNT_SIZE - ORACLE_PRICE.size)
+    view = decode_price_accounts(pack_accounts([blob]))
+    for name in view.dtype.names:
+        assert int(view[name][0]) == fields[name], name
+    assert prices(view)["price"][0] == pytest.approx(65_432.1)
+
+
+def test_verify_fixture_flags_accounts_that_dont_look_live(tmp_path):
+    good = encode_price_account(6_543_210_000_000, 1, -8, 1_700_000_000, slot=5)
+    stale = encode_price_account(6_543_210_000_000, 1, -8, 1_000, slot=5)
+    path = tmp_path / "fixture.jsonl"
+    path.write_text("".join(json.dumps({"symbol": symbol, "key": "k", "data": base64.b64encode(blob).decode(),
+                                        "expected": reference_decode(blob)}) + "\n"
+                            for symbol, blob in [("BTC", good), ("OLD", stale), ("NIL", bytes(PRICE_ACCOUNT_SIZE))]))
+    problems = verify_fixture(str(path))
+    assert [p.split(":")[0] for p in problems] == ["OLD", "NIL"]
+
+
+@pytest.mark.skipif(not os.path.exists(MAINNET_FIXTURE), reason="no recorded mainnet fixture")
+def test_recorded_mainnet_accounts():
+    assert verify_fixture(MAINNET_FIXTURE) == []
@@ -0,0 +1,60 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "supabase"))
+
+from quantum_batcher import MicroBatcher, NumpyLinearModel, keras_model_factory, shared_batcher  # noqa: E402
+
+
+def test_concurrent_rows_are_batched_and_routed_back():
+    model = NumpyLinearModel(4, 2)
+    batcher = MicroBatcher(lambda: model, model_key="test-routing", max_batch_size=8, max_wait_ms=20)
+    rows = np.random.default_rng(0).standard_normal((40, 4))
+    results = [None] * len(rows)
+
+    def ask(i):
+        results[i] = batcher.predict(rows[i], timeout=5)
+
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(len(rows))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+    np.testing.assert_allclose(np.stack(results), rows @ model.weights + model.bias)
+    assert batcher.summary()["batches"] < len(rows)
+
+
+def test_predict_many_keeps_batch_semantics():
+    model = NumpyLinearModel(3)
+    batcher = MicroBatcher(lambda: model, model_key="test-many")
+    rows = np.arange(12.0).reshape(4, 3)
+    np.testing.assert_allclose(batcher.predict_many(rows, timeout=5), model.predict(rows))
+    batcher.close()
+
+
+def test_short_model_output_fails_every_waiting_future():
+    class Short:
+        def predict(self, batch):
+            return batch[:-1]
+
+    batcher = MicroBatcher(Short, model_key="test-short", max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(np.ones(2)) for _ in range(4)]
+    for future in futures:
+        with pytest.raises(ValueError, match="rows for a batch"):
+            future.result(timeout=5)
+    batcher.close()
+
+
+def test_shared_batcher_rejects_conflicting_requests():
+    factory = keras_model_factory("a.h5")
+    batcher = shared_batcher("test-shared", factory, max_batch_size=16)
+    assert shared_batcher("test-shared", keras_model_factory("a.h5"), max_batch_size=16) is batcher
+    with pytest.raises(ValueError, match="model_factory"):
+        shared_batcher("test-shared", keras_model_factory("b.h5"))
+    with pytest.raises(ValueError, match="max_batch_size"):
+        shared_batcher("test-shared", factory, max_batch_size=64)
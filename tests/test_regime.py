@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from regime import (HIGH_VOLATILITY_CORRELATED, HIGH_VOLATILITY_DECOUPLED, LOW_VOLATILITY_QUIET, WARMING_UP,
+                    RegimeEngine)
+
+SYMBOLS = ["BTC-USD", "ETH-USD", "SOL-USD", "ADA-USD", "AVAX-USD"]
+
+
+def _closes(returns):
+    return 100.0 * np.exp(np.cumsum(returns, axis=0))
+
+
+def _calm(rng, bars=400):
+    return rng.normal(0, 0.001, (bars, len(SYMBOLS)))
+
+
+def test_incremental_state_matches_batch_ewm():
+    rng = np.random.default_rng(3)
+    closes = _closes(rng.normal(0, 0.01, (300, len(SYMBOLS))) + rng.normal(0, 0.01, (300, 1)))
+    engine = RegimeEngine(SYMBOLS)
+    engine.step_many(closes)
+
+    returns = pd.DataFrame(np.log(closes)).diff().fillna(0.0)
+    ew = returns.ewm(alpha=engine.fast, adjust=False)
+    batch = ew.cov(bias=True).loc[len(returns) - 1].to_numpy()
+    assert engine.cov == pytest.approx(batch, rel=1e-9, abs=1e-15)
+    assert engine.mean == pytest.approx(ew.mean().iloc[-1].to_numpy(), abs=1e-15)
+    assert engine.slow_var == pytest.approx((returns ** 2).ewm(alpha=engine.slow, adjust=False).mean().iloc[-1].to_numpy())
+
+    corr = batch / np.sqrt(np.outer(np.diag(batch), np.diag(batch)))
+    off_diagonal = corr[~np.eye(len(SYMBOLS), dtype=bool)]
+    assert engine.average_correlation() == pytest.approx(off_diagonal.mean())
+
+
+def test_restored_state_carries_on_like_an_uninterrupted_run():
+    rng = np.random.default_rng(5)
+    closes = _closes(rng.normal(0, 0.01, (200, len(SYMBOLS))))
+    volumes = rng.uniform(1e3, 2e3, closes.shape)
+    ts = np.arange(200, dtype=np.int64) * 3_600_000_000_000
+    whole = RegimeEngine(SYMBOLS)
+    whole.step_many(closes, volumes, ts)
+
+    first = RegimeEngine(SYMBOLS)
+    first.step_many(closes[:120], volumes[:120], ts[:120])
+    resumed = RegimeEngine()
+    resumed.restore_state(*first.export_state())
+    resumed.step_many(closes[120:], volumes[120:], ts[120:])
+    for name in RegimeEngine.STATE_ARRAYS:
+        assert getattr(resumed, name) == pytest.approx(getattr(whole, name), nan_ok=True), name
+    assert resumed.state("ETH-USD") == whole.state("ETH-USD")
+
+
+@pytest.mark.parametrize("common, expected", [(True, HIGH_VOLATILITY_CORRELATED),
+                                              (False, HIGH_VOLATILITY_DECOUPLED)])
+def test_volatility_shock_is_classified_by_how_assets_move(common, expected):
+    rng = np.random.default_rng(11)
+    shock = rng.normal(0, 0.02, (30, 1 if common else len(SYMBOLS))) + rng.normal(0, 0.001, (30, len(SYMBOLS)))
+    engine = RegimeEngine(SYMBOLS)
+    engine.step_many(_closes(np.vstack([_calm(rng), shock])))
+    state = engine.state()
+    assert state["regime"] == expected
+    assert state["volatility_ratio"] > engine.high_vol_ratio
+
+
+def test_warm_up_and_quiet_markets():
+    rng = np.random.default_rng(13)
+    engine = RegimeEngine(SYMBOLS)
+    closes = _closes(np.vstack([_calm(rng), rng.normal(0, 0.0001, (100, len(SYMBOLS)))]))
+    engine.step_many(closes[:engine.min_bars - 1])
+    assert engine.state()["regime"] == WARMING_UP
+    engine.step_many(closes[engine.min_bars - 1:])
+    assert engine.state()["regime"] == LOW_VOLATILITY_QUIET
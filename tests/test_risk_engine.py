@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from checkpoint import load_checkpoint, write_checkpoint
+from risk_engine import MIN_BARS, RiskEngine
+
+
+def _closes(bars, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=bars, freq="h", tz="UTC")
+    paths = 100 * np.exp(np.cumsum(rng.standard_normal((bars, 2)) * 0.01, axis=0))
+    return {"BTC-USD": pd.Series(paths[:, 0], index=index), "SPY": pd.Series(paths[:, 1], index=index)}
+
+
+def test_history_seeds_the_book_and_each_bar_folds_once():
+    closes = _closes(60)
+    risk = RiskEngine()
+    risk.update_history({s: c.iloc[:40] for s, c in closes.items()})
+    # 39 closed bars from the first fetch; the forming one waits
+    assert risk.bars == 39 >= MIN_BARS
+    assert risk.size({"symbol": "BTC-USD", "action": "BUY", "confidence": 0.9})["approved"]
+
+    # The next run re-fetches an overlapping window
+    risk.update_history({s: c.iloc[10:41] for s, c in closes.items()})
+    risk.update_history({s: c.iloc[10:41] for s, c in closes.items()})
+    assert risk.bars == 40
+
+    fresh = RiskEngine()
+    fresh.update_history({s: c.iloc[:41] for s, c in closes.items()})
+    np.testing.assert_allclose(risk.cov, fresh.cov)
+
+
+def test_checkpoint_round_trip(tmp_path):
+    risk = RiskEngine()
+    risk.update_history(_closes(50))
+    risk.fill("BTC-USD", 2.0, 100.0)
+    path = str(tmp_path / "book.ckpt")
+    write_checkpoint(path, *risk.checkpoint_state())
+
+    restored = RiskEngine()
+    assert restored.restore(load_checkpoint(path))
+    assert restored.symbols == risk.symbols and restored.last_ts == risk.last_ts
+    np.testing.assert_allclose(restored.cov, risk.cov)
+    np.testing.assert_allclose(restored.weights(), risk.weights())
+    assert restored.report() == risk.report()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import robustness
+from robustness import _bootstrap_chunk, run_robustness, share
+
+
+@pytest.fixture
+def shared():
+    blocks = []
+
+    def make(array):
+        block, handle = share(array)
+        blocks.append(block)
+        return handle
+
+    yield make
+    for block in blocks:
+        attached = robustness._ATTACHED.pop(block.name, None)
+        if attached is not None:
+            attached[0].close()
+        block.close()
+        block.unlink()
+
+
+def test_bootstrap_resamples_whole_blocks(shared):
+    returns = np.random.default_rng(0).normal(0, 0.01, 100)
+    sharpes, drawdowns = _bootstrap_chunk(shared(returns), seed=1, paths=50, block=10, bars_per_year=8760)
+    assert sharpes.shape == drawdowns.shape == (50,)
+    assert np.isfinite(sharpes).all() and (drawdowns >= 0).all()
+
+
+def test_bootstrap_clamps_block_to_short_series(shared):
+    returns = np.random.default_rng(0).normal(0, 0.01, 10)
+    sharpes, drawdowns = _bootstrap_chunk(shared(returns), seed=1, paths=5, block=24, bars_per_year=8760)
+    # One block covers the whole series, so every path is the series itself
+    assert np.allclose(sharpes, robustness.sharpe(returns, 8760))
+    assert np.allclose(drawdowns, robustness.max_drawdown(returns))
+
+
+def test_report_with_oos_shorter_than_block():
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+    bars = pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": rng.integers(1_000, 5_000, 300)},
+                        index=pd.date_range("2024-01-01", periods=300, freq="h"))
+    report = run_robustness(bars, paths=40, block=500, train_bars=200, test_bars=20,
+                            workers=1, chunk_paths=20)
+    assert report["walk_forward"]["bars"] == 100
+    assert report["monte_carlo"]["block"] == 100
+    assert report["monte_carlo"]["paths"] == 40
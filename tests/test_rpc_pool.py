@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from rpc_pool import MockRpcServer, RpcError, RpcPool, RpcUnavailable
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**kwargs):
+        server = MockRpcServer(**kwargs).start()
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.stop()
+
+
+def test_batch_keeps_order_in_one_request(servers):
+    node = servers()
+    pool = RpcPool([node.url], name="test", max_batch=100)
+    try:
+        results = pool.batch([("getSlot", None)] * 10 + [("nope", None), ("getHealth", None)],
+                             raise_errors=False)
+        assert results[:10] == list(range(1, 11))
+        assert isinstance(results[10], RpcError) and results[10].code == -32601
+        assert results[11] == "ok"
+        assert node.requests == 1 and node.calls == 12
+        with pytest.raises(RpcError):
+            pool.batch([("getSlot", None), ("nope", None)])
+    finally:
+        pool.close()
+
+
+def test_submit_and_acall_ride_shared_batches(servers):
+    node = servers()
+    pool = RpcPool([node.url], name="test", linger=0.05)
+    try:
+        futures = [pool.submit("getSlot") for _ in range(20)]
+        assert sorted(f.result(5) for f in futures) == list(range(1, 21))
+
+        async def gather():
+            return await asyncio.gather(*(pool.acall("getHealth") for _ in range(20)))
+        assert asyncio.run(gather()) == ["ok"] * 20
+        assert node.calls == 40 and node.requests < 40
+    finally:
+        pool.close()
+
+
+def test_fails_over_and_cools_down_unhealthy_endpoint(servers):
+    down, node = servers(fail_status=503), servers()
+    pool = RpcPool([down.url, node.url], name="test", cooldown=60)
+    try:
+        assert pool.call("getSlot") == 1
+        bad, good = pool.endpoints
+        assert not bad.healthy() and bad.errors == 1
+        assert pool._ranked() == [good, bad]
+        # While it rests the bad endpoint isn't asked again
+        assert pool.call("getSlot") == 2
+        assert down.requests == 1
+    finally:
+        pool.close()
+
+
+def test_all_endpoints_down(servers):
+    first, second = servers(fail_status=429), servers(fail_status=502)
+    pool = RpcPool([first.url, second.url], name="test")
+    try:
+        with pytest.raises(RpcUnavailable):
+            pool.call("getSlot")
+        assert not any(e.healthy() for e in pool.endpoints)
+    finally:
+        pool.close()
+
+
+def test_client_errors_do_not_fail_over(servers):
+    refusing, node = servers(fail_status=400), servers()
+    pool = RpcPool([refusing.url, node.url], name="test")
+    try:
+        with pytest.raises(RpcError) as info:
+            pool.call("getSlot")
+        assert info.value.code == 400
+        assert pool.endpoints[0].healthy() and pool.endpoints[0].errors == 0
+        assert node.requests == 0
+    finally:
+        pool.close()
+
+
+def test_first_endpoint_stays_primary(servers):
+    primary, fallback = servers(), servers()
+    pool = RpcPool([primary.url, fallback.url], name="test")
+    try:
+        for _ in range(12):
+            pool.call("getSlot")
+        assert (primary.requests, fallback.requests) == (12, 0)
+        assert pool._ranked() == pool.endpoints
+    finally:
+        pool.close()
+
+
+def test_clearly_faster_endpoint_takes_over():
+    pool = RpcPool(["http://slow.invalid", "http://fast.invalid", "http://new.invalid"], name="test")
+    try:
+        slow, fast, new = pool.endpoints
+        for _ in range(5):
+            slow.record(0.100, ok=True)
+            fast.record(0.020, ok=True)
+        assert pool._ranked() == [fast, slow, new]
+        # Within FASTER_BY of each other: configured order wins
+        for _ in range(20):
+            fast.record(0.090, ok=True)
+        assert pool._ranked() == [slow, fast, new]
+    finally:
+        pool.close()
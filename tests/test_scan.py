@@ -0,0 +1,48 @@
+import io
+import sys
+
+import pyarrow.parquet as pq
+
+from scan import FIELDS, ParquetSink, read_symbols
+
+
+def _row(symbol, status="ok"):
+    row = {field: None for field in FIELDS}
+    row.update({"symbol": symbol, "status": status, "bars": 10, "rsi": 50.0})
+    return row
+
+
+def test_parquet_resume_keeps_rows_of_a_crashed_part(tmp_path):
+    out = str(tmp_path / "nightly")
+    sink = ParquetSink(out, append=False)
+    for symbol in ("BTC-USD", "ETH-USD", "SOL-USD"):
+        sink.write(_row(symbol))
+    sink.write(_row("BAD-USD", "error"))
+    # Crash: no footer yet, the part is unreadable, the journal has every row
+    assert ParquetSink.done(out) == {"BTC-USD", "ETH-USD", "SOL-USD"}
+
+    resumed = ParquetSink(out, append=True)
+    resumed.write(_row("ADA-USD"))
+    resumed.close()
+    assert resumed.part.endswith("part-00001.parquet")
+    assert pq.read_table(sink.part).column("symbol").to_pylist() == ["BTC-USD", "ETH-USD", "SOL-USD", "BAD-USD"]
+    assert ParquetSink.done(out) == {"BTC-USD", "ETH-USD", "SOL-USD", "ADA-USD"}
+    assert sorted(p.name for p in (tmp_path / "nightly").iterdir()) == ["part-00000.parquet",
+                                                                        "part-00001.parquet"]
+
+
+def test_parquet_parts_never_reuse_a_live_name(tmp_path):
+    out = tmp_path / "nightly"
+    for _ in range(3):
+        ParquetSink(str(out), append=True).close()
+    (out / "part-00000.parquet").unlink()
+    sink = ParquetSink(str(out), append=True)
+    sink.close()
+    assert sink.part.endswith("part-00003.parquet")
+
+
+def test_symbols_from_stdin_leave_it_open(monkeypatch):
+    stdin = io.StringIO("btc-usd # majors\neth-usd, sol-usd\nBTC-USD\n")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    assert list(read_symbols(["ada-usd"], "-")) == ["ADA-USD", "BTC-USD", "ETH-USD", "SOL-USD"]
+    assert not stdin.closed
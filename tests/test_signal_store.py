@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore
+from signal_store import FLAG_CHANGED, SignalStore
+
+
+def _append(store, ts, bits, rec):
+    n = len(ts)
+    return store.append_many("ETH-USD", "1h", np.array(ts), np.array(bits, dtype=np.uint32),
+                             np.zeros(n), np.zeros(n), np.array(rec), np.ones(n))
+
+
+def test_late_and_repeated_evaluations_are_skipped(tmp_path):
+    store = SignalStore(str(tmp_path))
+    assert _append(store, [10, 20], [1, 2], [0, 1]) == 2
+    # A slower writer finishing an older bar, then a repeat of the tail
+    assert _append(store, [15], [4], [2]) == 0
+    assert _append(store, [20], [2], [1]) == 0
+    # Same bar re-evaluated with a different outcome is kept
+    assert _append(store, [20, 30], [3, 3], [1, 1]) == 2
+
+    events = store.events("ETH-USD", "1h")
+    assert events["ts"].tolist() == [10, 20, 20, 30]
+    assert events["bits"].tolist() == [1, 2, 3, 3]
+    assert (events["flags"] & FLAG_CHANGED).tolist() == [0, 1, 0, 0]
+
+
+def test_torn_first_append_heals(tmp_path):
+    store = SignalStore(str(tmp_path))
+    part = store.partition("ETH-USD", "1h")
+    # Crash during the first append: ts landed, the other columns never did
+    os.makedirs(part.path)
+    with open(os.path.join(part.path, "ts"), "wb") as f:
+        f.write(np.array([10], dtype="<i8").tobytes())
+
+    assert store.partition("ETH-USD", "1h").rows == 0
+    assert store.events("ETH-USD", "1h")["ts"].tolist() == []
+    assert _append(store, [20, 30], [1, 2], [0, 1]) == 2
+    assert store.events("ETH-USD", "1h")["ts"].tolist() == [20, 30]
+    assert SignalStore(str(tmp_path)).last("ETH-USD", "1h", ["golden_cross"]) is None
+
+
+def test_failed_event_write_does_not_abort_merge():
+    def broken(*args):
+        raise OSError("disk full")
+
+    index = pd.date_range("2024-01-01", periods=60, freq="h", tz="UTC")
+    close = np.linspace(100, 130, 60)
+    bars = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": np.full(60, 1e3)}, index=index)
+    store = BarStore(events=broken)
+    assert store.merge("ETH-USD", "1h", bars) is not None
+    assert store.get("ETH-USD", "1h").version == 1
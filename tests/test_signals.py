@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore
+from pipeline import analyze_bars
+from signals import analyze_signals, empty_signals
+
+
+def _daily(n):
+    index = pd.date_range("2024-01-01", periods=n, freq="1D", tz="UTC")
+    close = np.linspace(100, 130, n)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+                         "Volume": np.full(n, 1e3)}, index=index)
+
+
+def test_short_frames_score_as_no_data():
+    # Time Frame "1d" over 1d bars trims the analysis to a single row
+    data, signals = analyze_bars(_daily(60), "1d")
+    assert len(data) == 1
+    assert signals == empty_signals()
+    assert analyze_signals(data.iloc[:0]) == empty_signals()
+
+
+def test_store_merges_a_single_bar():
+    store = BarStore()
+    change = store.merge("BTC-USD", "1d", _daily(1))
+    assert change["signals"]["recommendation"] == empty_signals()["recommendation"]
+    change = store.merge("BTC-USD", "1d", _daily(2))
+    assert len(change["bars"]) == 1
+    assert store.get("BTC-USD", "1d").signals["recommendation"] != empty_signals()["recommendation"]
@@ -0,0 +1,48 @@
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+import market_service as ms
+import stage_metrics
+from stage_metrics import METRICS, MetricsRegistry, timed
+
+
+def test_timed_keeps_metadata_and_records_the_stage():
+    registry = MetricsRegistry()
+    registry.enabled = True
+
+    @timed("double", registry)
+    def double(x):
+        """Twice x"""
+        return 2 * x
+
+    assert double(21) == 42
+    assert (double.__name__, double.__doc__, double.__wrapped__.__name__) == ("double", "Twice x", "double")
+    assert [row["calls"] for row in registry.snapshot() if row["stage"] == "double"] == [1]
+
+
+def test_instrumentation_switches_need_the_admin_token():
+    hub = ms.MarketDataHub(fetcher=lambda *args: None, tape=False)
+    was = (METRICS.enabled, METRICS.profiling)
+    try:
+        closed = TestClient(ms.create_app(hub, symbols=[], poll=False, admin_token=None))
+        assert closed.post("/api/debug/instrumentation", params={"profiling": True}).status_code == 403
+        client = TestClient(ms.create_app(hub, symbols=[], poll=False, admin_token="s3cret"))
+        assert client.post("/api/debug/instrumentation", params={"profiling": True}).status_code == 401
+        assert client.post("/api/debug/instrumentation", params={"profiling": True},
+                           headers={"X-Admin-Token": "guess"}).status_code == 401
+        assert METRICS.profiling == was[1]
+        body = client.post("/api/debug/instrumentation", params={"profiling": True},
+                           headers={"X-Admin-Token": "s3cret"}).json()
+        assert body["profiling"] is True
+    finally:
+        METRICS.enabled, METRICS.profiling = was
+
+
+def test_slow_request_dumps_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(stage_metrics, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(stage_metrics, "PROFILE_KEEP", 3)
+    registry = MetricsRegistry()
+    for i in range(6):
+        stage_metrics._Request(registry, f"slow{i}")._dump(Counter({"main;work": 1}), 2.0)
+    assert sorted(p.name.split("-")[0] for p in tmp_path.iterdir()) == ["slow3", "slow4", "slow5"]
@@ -0,0 +1,42 @@
+import asyncio
+import os
+import sys
+
+from tick_tape import MAGIC, RECORD, OfflineRpc, Replayer, ReplayPythClient, TickRecorder, read_tape
+
+
+def test_reopen_drops_torn_tail(tmp_path):
+    path = str(tmp_path / "feed.tape")
+    recorder = TickRecorder(path)
+    recorder.tick("BTC", 100.0, 0.5, ts=1)
+    recorder.close()
+    with open(path, "ab") as f:
+        f.write(b"\x01torn")
+
+    recorder = TickRecorder(path)
+    recorder.tick("BTC", 101.0, 0.5, ts=2)
+    recorder.tick("ETH", 10.0, 0.1, ts=2)
+    recorder.close()
+
+    assert (os.path.getsize(path) - len(MAGIC)) % RECORD.size == 0
+    records, symbols = read_tape(path)
+    assert symbols == ["BTC", "ETH"]
+    assert records["a"].tolist() == [100.0, 101.0, 10.0]
+
+
+def test_oracle_replay_stays_offline(tmp_path):
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "oracle"))
+    from Oracle import CryptoBoxingOracle
+
+    path = str(tmp_path / "oracle.tape")
+    recorder = TickRecorder(path)
+    for ts in range(3):
+        recorder.tick("BTC", 100.0 + ts, 0.5, ts=ts)
+    recorder.close()
+
+    replayer = Replayer(path, speed=float("inf"))
+    oracle = CryptoBoxingOracle(client=ReplayPythClient(replayer), solana_client=OfflineRpc())
+    prices = []
+    while not replayer.done:
+        prices.append(asyncio.run(oracle.get_crypto_data())["BTC"]["price"])
+    assert prices == [100.0, 101.0, 102.0]
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from trading_env import (FEATURES, LONG, OBS_DIM, PROFIT_WEIGHT, RISK_WEIGHT, SHORT, WARMUP_BARS, Market,
+                         VecTradingEnv, calculate_rewards, observe, synthetic_bars)
+
+BARS = 120
+
+
+def _market():
+    # Every value names its bar, so the row a step reads is visible in the numbers
+    bars = np.arange(BARS, dtype=np.float32)
+    features = np.repeat(np.stack([bars, bars + 1000])[:, :, None], len(FEATURES), axis=2)
+    returns = np.stack([bars / 100, -bars / 100])
+    vol = np.stack([bars / 1000, bars / 500])
+    return Market(["UP", "DOWN"], features, returns, vol, np.array([BARS, BARS]))
+
+
+def test_reset_starts_after_warm_up_with_a_flat_book():
+    env = VecTradingEnv(_market(), n_envs=64, episode_bars=10)
+    obs = env.reset()
+    assert obs.shape == (64, OBS_DIM)
+    assert (env.t >= WARMUP_BARS).all() and (env.end <= BARS - 1).all()
+    assert (obs[:, 0] == env.t + 1000 * env.symbol).all()
+    assert (obs[:, len(FEATURES):] == 0).all()
+
+
+def test_step_rewards_the_next_bar_only():
+    market = _market()
+    env = VecTradingEnv(market, n_envs=32, episode_bars=10, fee_bps=0)
+    obs = env.reset()
+    t, symbol = env.t.copy(), env.symbol.copy()
+    actions = np.arange(32) % 3
+    target = np.array([0.0, 1.0, -1.0])[actions]
+
+    obs, reward, done, _ = env.step(actions)
+    # Decided on bar t's observation, paid with the return into bar t + 1
+    expected = (PROFIT_WEIGHT * target * market.returns[symbol, t + 1]
+                - RISK_WEIGHT * np.abs(target) * market.vol[symbol, t + 1])
+    assert reward == pytest.approx(expected, rel=1e-6)
+    assert (obs[:, 0] == t + 1 + 1000 * symbol).all()
+    assert not done.any()
+    assert (env.position == target).all()
+
+
+def test_closing_a_trade_pays_for_speed_and_fees():
+    env = VecTradingEnv(_market(), n_envs=1, episode_bars=10, fee_bps=5)
+    env.reset()
+    for _ in range(3):
+        env.step(np.array([LONG]))
+    assert env.held[0] == 3
+    t = int(env.t[0])
+    _, reward, _, _ = env.step(np.array([SHORT]))
+    r, v = env.market.returns[env.symbol[0], t + 1], env.market.vol[env.symbol[0], t + 1]
+    assert reward[0] == pytest.approx(float(calculate_rewards(-r - 0.05 * 2, v, np.float32(3))), rel=1e-6)
+    # The short opens a new trade: its P&L starts over
+    assert env.trade_pnl[0] == pytest.approx(-r - 0.1)
+    assert env.held[0] == 1
+
+
+def test_episode_end_reports_and_resets_in_place():
+    env = VecTradingEnv(_market(), n_envs=8, episode_bars=5, fee_bps=0, seed=3)
+    env.reset()
+    total = np.zeros(8)
+    for step in range(5):
+        _, _, done, info = env.step(np.full(8, LONG))
+        total += info["raw_reward"]
+        assert done.all() == (step == 4)
+    assert info["episode_return"] == pytest.approx(total)
+    assert (info["terminal_obs"][:, len(FEATURES)] == 1).all()
+    assert (env.position == 0).all() and (env.end - env.t == 5).all()
+
+
+def test_observations_never_look_ahead():
+    bars = synthetic_bars(1, 400, seed=9)["SYN000"]
+    whole = observe(bars)
+    cut = observe(bars.iloc[:300])
+    np.testing.assert_array_equal(cut["features"], whole["features"][:300])
+    np.testing.assert_allclose(cut["vol"], whole["vol"][:300], rtol=1e-6)
+    # The "return" feature at bar t is the move into t, the one the previous step was paid
+    assert whole["features"][1:, FEATURES.index("return")] == pytest.approx(whole["returns"][1:], rel=1e-5)
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from truth_archive import HASH_SIZE, TruthArchiver, verify_inclusion
+
+
+def _fill(path, n):
+    archive = TruthArchiver(str(path), segment_size=16)
+    archive.add_entries([{"entry_type": "step", "description": f"entry {i}"} for i in range(n)])
+    return archive
+
+
+def _tear(path, name, keep_records):
+    os.truncate(os.path.join(path, name), keep_records * HASH_SIZE + 7)
+
+
+def test_recovery_rebuilds_short_interior_levels(tmp_path):
+    archive = _fill(tmp_path, 37)
+    root = archive.root()
+    archive.close()
+    # Torn flush: leaves made it to disk but level_1/level_3 stopped part-way
+    _tear(tmp_path, "level_1.bin", 10)
+    _tear(tmp_path, "level_3.bin", 1)
+
+    archive = TruthArchiver(str(tmp_path), segment_size=16)
+    assert len(archive) == 37
+    assert archive.root() == root
+    assert archive.verify(full=True)["ok"]
+
+    archive.add_entry("step", "after recovery")
+    report = archive.verify(full=True)
+    assert report["ok"] and report["size"] == 38
+    proof = archive.inclusion_proof(36)
+    assert verify_inclusion(archive.leaf(36), 36, 38, proof, archive.root())
+
+
+def test_recovery_trims_to_shortest_entry_column(tmp_path):
+    archive = _fill(tmp_path, 20)
+    root_18 = archive.root(18)
+    archive.close()
+    # Leaves stopped two entries short; everything else must follow them
+    _tear(tmp_path, "level_0.bin", 18)
+
+    archive = TruthArchiver(str(tmp_path), segment_size=16)
+    assert len(archive) == 18
+    assert archive.root() == root_18
+    assert archive.verify(full=True)["ok"]
+    assert [i for i, _ in archive.scan("step")] == list(range(18))
+
+
+def test_bad_entry_rejects_the_whole_batch(tmp_path):
+    archive = _fill(tmp_path, 5)
+    root = archive.root()
+    sizes = {name: os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path) if name != "index"}
+    for bad in ({"description": "no type"}, {"entry_type": ""}, {"entry_type": 7}, "not a dict",
+                {"entry_type": "x" * 200}, {"entry_type": "step", "payload": object()}):
+        with pytest.raises((ValueError, TypeError)):
+            archive.add_entries([{"entry_type": "step", "description": "fine"}, bad])
+    assert len(archive) == 5 and archive.root() == root
+    archive.flush()
+    assert {name: os.path.getsize(tmp_path / name) for name in sizes} == sizes
+
+    archive.add_entry("step", "still appends")
+    assert archive.verify(full=True)["ok"] and len(archive) == 6
@@ -0,0 +1,32 @@
+import json
+import os
+
+import pytest
+
+from truth_rebuild import rebuild_archive
+
+
+def _write(archive, name, entry):
+    with open(os.path.join(archive, name), "w") as f:
+        f.write(entry if isinstance(entry, str) else json.dumps(entry))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rebuild_skips_bad_entries_and_keeps_going(tmp_path, workers):
+    archive, out = str(tmp_path / "archive"), str(tmp_path / "out")
+    os.makedirs(archive)
+    for i in range(9):
+        _write(archive, f"good_{i}.json", {"type": "code", "timestamp": "2024-05-01T00:00:00", "content": f"x = {i}\n"})
+    _write(archive, "no_timestamp.json", {"type": "code", "content": "y = 1\n"})
+    _write(archive, "no_content.json", {"type": "code", "timestamp": "2024-05-01T00:00:00"})
+    _write(archive, "list.json", [1, 2])
+    _write(archive, "broken.json", "{not json")
+
+    stats = rebuild_archive(archive, out, workers=workers, chunk_size=2)
+    assert (stats["scanned"], stats["checked"], stats["written"], stats["errors"]) == (13, 13, 9, 4)
+    with open(os.path.join(out, "recovered_2024-05-01_good_3.py")) as f:
+        assert f.read() == "x = 3\n"
+
+    again = rebuild_archive(archive, out, workers=workers, chunk_size=2)
+    # Good entries are now in the manifest; bad ones are retried until fixed
+    assert (again["checked"], again["written"], again["errors"]) == (4, 0, 4)
@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+
+from upstream import UpstreamCoordinator, parse_limits
+
+
+def test_limits_must_be_positive():
+    assert parse_limits("yfinance=2:5,coinbase=10") == {"yfinance": (2.0, 5.0), "coinbase": (10.0, 10.0)}
+    for spec in ("yfinance=0", "yfinance=-1:5", "yfinance=2:0"):
+        with pytest.raises(ValueError, match="yfinance"):
+            parse_limits(spec)
+    with pytest.raises(ValueError):
+        UpstreamCoordinator(limits={}).configure("yfinance", 0)
+
+
+def test_identical_calls_coalesce_and_followers_honor_timeout():
+    upstream = UpstreamCoordinator(limits={"test": (100.0, 10.0)})
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "bars"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(upstream.call("test", "k", fetch)))
+    leader.start()
+    started.wait(5)
+    with pytest.raises(TimeoutError):
+        upstream.call("test", "k", fetch, timeout=0.05)
+    follower = threading.Thread(target=lambda: results.append(upstream.call("test", "k", fetch, timeout=5)))
+    follower.start()
+    while upstream._flights[("test", "k")].followers < 2:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == ["bars", "bars"] and len(calls) == 1
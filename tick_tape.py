@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+📼 WyoVerse Tick Tape - Record what the frontier saw, replay it on demand
+Compact binary tapes for the oracle, the game loop and the signal engine
+
+Record (attach to an ingestion path):
+    recorder = TickRecorder("incident.tape")
+    oracle = CryptoBoxingOracle(client=RecordingPythClient(PythClient(), recorder))
+    game_loop(fetch=recording_fetch(fetch_pyth_data, recorder))
+    MarketDataHub(tape=recorder)            # or TICK_TAPE=incident.tape for the service
+
+Replay (no network, deterministic clock, 1x / Nx / max speed):
+    python tick_tape.py info incident.tape
+    python tick_tape.py replay incident.tape --target signals --speed max
+    python tick_tape.py replay incident.tape --target oracle --speed 10
+    python tick_tape.py replay incident.tape --target game --speed max
+
+    replayer = Replayer("incident.tape", speed=10)
+    oracle = CryptoBoxingOracle(client=ReplayPythClient(replayer), solana_client=OfflineRpc())
+    game_loop(fetch=replay_fetch(replayer), sleep=replayer.clock.sleep, headless=True)
+
+Every record is 27 bytes, ``<B H q d d``: kind, symbol id, capture time
+(ns), two values. A tape is an 8-byte magic followed by records, so it loads
+with one ``np.fromfile``. Symbol names are records too (name packed into the
+two value slots, max 16 bytes). Bars take three records: (open, high),
+(low, close), (volume, bar open time in epoch seconds). Marks record points
+where the live system did periodic work (the hub's regime update) so replay
+does it at the same place.
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"WYOTAPE1"
+KIND_SYMBOL, KIND_TICK, KIND_BAR_OH, KIND_BAR_LC, KIND_BAR_V, KIND_MARK = range(6)
+TAPE_DTYPE = np.dtype([("kind", "u1"), ("symbol", "<u2"), ("ts", "<i8"), ("a", "<f8"), ("b", "<f8")])
+RECORD = struct.Struct("<BHqdd")
+NAME_HEADER = struct.Struct("<BHq")
+NAME_BYTES = 16
+
+
+def read_tape(path: str) -> Tuple[np.ndarray, List[str]]:
+    """Whole tape as a structured array (symbol records stripped) + symbol table"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a tick tape")
+    records = np.fromfile(path, dtype=TAPE_DTYPE, offset=len(MAGIC))
+    # A crash can leave a torn final record; fromfile already dropped the partial bytes
+    names = records[records["kind"] == KIND_SYMBOL]
+    symbols: List[str] = [""] * (int(names["symbol"].max()) + 1 if len(names) else 0)
+    for rec in names:
+        symbols[rec["symbol"]] = rec.tobytes()[NAME_HEADER.size:].rstrip(b"\0").decode()
+    return records[records["kind"] != KIND_SYMBOL], symbols
+
+
+# ---------------------------------------------------------------- recording
+
+class TickRecorder:
+    """🎙️ Append-only tape writer; thread-safe, buffered, cheap enough for hot paths"""
+
+    def __init__(self, path: str, clock: Callable[[], int] = time.time_ns, flush_every: int = 4096):
+        self.path = path
+        self.clock = clock
+        self.flush_every = flush_every
+        self.symbols: Dict[str, int] = {}
+        if os.path.exists(path) and os.path.getsize(path) >= len(MAGIC):
+            _, names = read_tape(path)
+            self.symbols = {name: i for i, name in enumerate(names)}
+            # Drop a torn final record so new records stay aligned
+            whole = (os.path.getsize(path) - len(MAGIC)) // RECORD.size
+            os.truncate(path, len(MAGIC) + whole * RECORD.size)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(MAGIC)
+        self._pending = bytearray()
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _symbol(self, name: str) -> int:
+        sid = self.symbols.get(name)
+        if sid is None:
+            raw = name.encode()
+            if len(raw) > NAME_BYTES:
+                raise ValueError(f"Symbol {name!r} longer than {NAME_BYTES} bytes")
+            sid = self.symbols[name] = len(self.symbols)
+            # Raw bytes, never round-tripped through floats (NaN payloads must survive)
+            self._pending += NAME_HEADER.pack(KIND_SYMBOL, sid, 0) + raw.ljust(NAME_BYTES, b"\0")
+        return sid
+
+    def tick(self, symbol: str, price: float, aux: float = 0.0, ts: Optional[int] = None):
+        """One price observation (``aux``: confidence, size... whatever the feed carries)"""
+        with self._lock:
+            self._pending += RECORD.pack(KIND_TICK, self._symbol(symbol), self.clock() if ts is None else ts,
+                                         price, aux)
+            self._count += 1
+            if self._count >= self.flush_every:
+                self._flush()
+
+    def bars(self, symbol: str, frame, ts: Optional[int] = None):
+        """A fetched OHLCV frame, exactly as it arrived (one capture time for all rows)"""
+        if frame is None or len(frame) == 0:
+            return
+        values = frame[["Open", "High", "Low", "Close", "Volume"]].to_numpy(dtype=float)
+        index = frame.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_convert("UTC")
+        opened = index.as_unit("ns").asi8 / 1e9
+        with self._lock:
+            sid = self._symbol(symbol)
+            ts = self.clock() if ts is None else ts
+            for (o, h, l, c, v), t in zip(values.tolist(), opened.tolist()):
+                self._pending += RECORD.pack(KIND_BAR_OH, sid, ts, o, h)
+                self._pending += RECORD.pack(KIND_BAR_LC, sid, ts, l, c)
+                self._pending += RECORD.pack(KIND_BAR_V, sid, ts, v, t)
+            self._count += 3 * len(values)
+            if self._count >= self.flush_every:
+                self._flush()
+
+    def mark(self, ts: Optional[int] = None):
+        """A cycle boundary (e.g. the end of one market-service poll)"""
+        with self._lock:
+            self._pending += RECORD.pack(KIND_MARK, 0, self.clock() if ts is None else ts, 0.0, 0.0)
+            self._count += 1
+
+    def _flush(self):
+        if self._pending:
+            self._file.write(self._pending)
+            self._file.flush()
+            self._pending = bytearray()
+            self._count = 0
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def recording_fetch(fetch: Callable[[], Dict[str, float]], recorder: TickRecorder) -> Callable:
+    """Wrap a ``{symbol: price}`` fetcher (e.g. ``fetch_pyth_data``) so every frame is taped"""
+    def fetch_and_record():
+        prices = fetch()
+        ts = recorder.clock()
+        for symbol, price in prices.items():
+            recorder.tick(symbol, float(price), ts=ts)
+        return prices
+    return fetch_and_record
+
+
+class RecordingPythClient:
+    """Pyth client wrapper that tapes each aggregate price/confidence it hands out"""
+
+    def __init__(self, client, recorder: TickRecorder):
+        self.client = client
+        self.recorder = recorder
+
+    async def get_price_feeds(self, symbols):
+        feeds = await self.client.get_price_feeds(symbols)
+        ts = self.recorder.clock()
+        for symbol, feed in feeds.items():
+            self.recorder.tick(symbol, float(feed.aggregate.price), float(feed.aggregate.confidence), ts=ts)
+        return feeds
+
+
+# ---------------------------------------------------------------- replay
+
+class ReplayClock:
+    """⏱️ Virtual clock: time is the tape's; real sleeping is ``virtual / speed``
+
+    ``speed=math.inf`` never sleeps. Code under replay should read time and
+    sleep through this object (``time_ns``, ``time``, ``sleep``).
+    """
+
+    def __init__(self, start_ns: int = 0, speed: float = 1.0):
+        self.now_ns = start_ns
+        self.speed = speed
+
+    def time_ns(self) -> int:
+        return self.now_ns
+
+    def time(self) -> float:
+        return self.now_ns / 1e9
+
+    def advance_to(self, ts_ns: int):
+        if ts_ns <= self.now_ns:
+            return
+        if math.isfinite(self.speed):
+            time.sleep((ts_ns - self.now_ns) / 1e9 / self.speed)
+        self.now_ns = ts_ns
+
+    def sleep(self, seconds: float):
+        self.advance_to(self.now_ns + int(seconds * 1e9))
+
+
+class Replayer:
+    """▶️ Walks a tape in capture order, keeping the clock in step"""
+
+    def __init__(self, path: str, speed: float = 1.0):
+        records, self.symbols = read_tape(path)
+        # Writers on different threads can interleave capture times slightly
+        self.records = records[np.argsort(records["ts"], kind="stable")]
+        start = int(self.records["ts"][0]) if len(self.records) else 0
+        self.clock = ReplayClock(start, speed)
+        self.cursor = 0
+        self.prices: Dict[str, Tuple[float, float]] = {}
+        self.current: Dict[str, "object"] = {}
+
+    @property
+    def done(self) -> bool:
+        return self.cursor >= len(self.records)
+
+    def _group_end(self) -> int:
+        """End of the run of records sharing the cursor's capture time"""
+        ts = self.records["ts"]
+        return int(np.searchsorted(ts, ts[self.cursor], side="right")) if not self.done else self.cursor
+
+    def next_batch(self) -> Optional[Tuple[int, np.ndarray]]:
+        """Advance the clock to the next capture time and return its records"""
+        if self.done:
+            return None
+        end = self._group_end()
+        batch = self.records[self.cursor:end]
+        self.clock.advance_to(int(batch["ts"][0]))
+        self.cursor = end
+        for rec in batch[batch["kind"] == KIND_TICK]:
+            self.prices[self.symbols[rec["symbol"]]] = (float(rec["a"]), float(rec["b"]))
+        return int(batch["ts"][0]), batch
+
+    def prices_asof(self, ts_ns: int) -> Dict[str, Tuple[float, float]]:
+        """Latest (price, aux) per symbol at virtual time ``ts_ns`` (no waiting)"""
+        ts = self.records["ts"]
+        while not self.done and ts[self.cursor] <= ts_ns:
+            end = self._group_end()
+            for rec in self.records[self.cursor:end]:
+                if rec["kind"] == KIND_TICK:
+                    self.prices[self.symbols[rec["symbol"]]] = (float(rec["a"]), float(rec["b"]))
+            self.cursor = end
+        return self.prices
+
+    def bar_frames(self, batch: np.ndarray) -> Dict[str, "object"]:
+        """Rebuild the OHLCV frames captured in one batch"""
+        import pandas as pd
+
+        oh = batch[batch["kind"] == KIND_BAR_OH]
+        lc = batch[batch["kind"] == KIND_BAR_LC]
+        vt = batch[batch["kind"] == KIND_BAR_V]
+        frames = {}
+        for sid in np.unique(oh["symbol"]):
+            pick = oh["symbol"] == sid
+            index = pd.to_datetime((vt["b"][pick] * 1e9).round().astype(np.int64), utc=True)
+            frames[self.symbols[sid]] = pd.DataFrame({
+                "Open": oh["a"][pick], "High": oh["b"][pick], "Low": lc["a"][pick],
+                "Close": lc["b"][pick], "Volume": vt["a"][pick],
+            }, index=index)
+        return frames
+
+
+def replay_fetch(replayer: Replayer) -> Callable[[], Optional[Dict[str, float]]]:
+    """``fetch_pyth_data`` stand-in: prices as of the replay clock, ``None`` once the tape ends"""
+    last_ts = int(replayer.records["ts"][-1]) if len(replayer.records) else 0
+
+    def fetch():
+        if replayer.done and replayer.clock.now_ns > last_ts:
+            return None
+        prices = replayer.prices_asof(replayer.clock.now_ns)
+        return {symbol: price for symbol, (price, _) in prices.items()}
+    return fetch
+
+
+class ReplayPythClient:
+    """Pyth client stand-in for ``CryptoBoxingOracle``: each call serves the next capture"""
+
+    def __init__(self, replayer: Replayer):
+        self.replayer = replayer
+
+    async def get_price_feeds(self, symbols):
+        self.replayer.next_batch()
+        wanted = set(symbols)
+        return {
+            symbol: SimpleNamespace(aggregate=SimpleNamespace(price=price, confidence=conf))
+            for symbol, (price, conf) in self.replayer.prices.items()
+            if symbol in wanted or not wanted
+        }
+
+
+class OfflineRpc:
+    """RPC stand-in for replays: the tape is the only source, so chain calls fail loudly"""
+
+    def call(self, method, params=None):
+        raise RuntimeError(f"{method}: no RPC during tape replay")
+
+    async def acall(self, method, params=None):
+        return self.call(method, params)
+
+
+def replay_into_hub(replayer: Replayer, hub, interval: str = "1h") -> Dict:
+    """Feed every taped fetch back through a ``MarketDataHub`` built with ``replay_fetcher``
+
+    Each capture becomes one forced refresh, so the pyramid, indicators,
+    signals, alerts and regime state see exactly the batches they saw live.
+    """
+    merges, changes, started = 0, 0, time.perf_counter()
+    while True:
+        batch = replayer.next_batch()
+        if batch is None:
+            break
+        replayer.current = replayer.bar_frames(batch[1])
+        for symbol in replayer.current:
+            merges += 1
+            changes += hub.refresh(symbol, interval, force=True) is not None
+        if (batch[1]["kind"] == KIND_MARK).any():
+            hub.update_regime()
+    return {"merges": merges, "changes": changes, "seconds": time.perf_counter() - started}
+
+
+def replay_fetcher(replayer: Replayer) -> Callable:
+    """``fetch_bars`` stand-in serving the frames of the capture being replayed"""
+    def fetch(symbol: str, period: str, interval: str):
+        return replayer.current.get(symbol)
+    return fetch
+
+
+# ---------------------------------------------------------------- CLI
+
+def _speed(text: str) -> float:
+    return math.inf if text in ("max", "inf") else float(text.rstrip("x"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="📼 Tick tape tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="summarize a tape")
+    info.add_argument("tape")
+    replay = sub.add_parser("replay", help="drive a component from a tape")
+    replay.add_argument("tape")
+    replay.add_argument("--target", choices=["signals", "oracle", "game"], default="signals")
+    replay.add_argument("--speed", type=_speed, default=math.inf, help="1, 10, 10x or max (default max)")
+    replay.add_argument("--interval", default="1h", help="bar interval label for the signal engine")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        records, symbols = read_tape(args.tape)
+        ts = records["ts"]
+        span = (ts[-1] - ts[0]) / 1e9 if len(ts) else 0
+        kinds = np.bincount(records["kind"], minlength=KIND_MARK + 1)
+        print(f"📼 {args.tape}: {len(records)} records, {len(symbols)} symbols, {span:.1f}s captured")
+        print(f"   ticks {kinds[KIND_TICK]}  bars {kinds[KIND_BAR_OH]}  marks {kinds[KIND_MARK]}"
+              f"  captures {len(np.unique(ts))}")
+        print(f"   symbols: {', '.join(symbols)}")
+        return
+
+    replayer = Replayer(args.tape, args.speed)
+    started = time.perf_counter()
+    root = os.path.dirname(os.path.abspath(__file__))
+    if args.target == "signals":
+        sys.path.insert(0, os.path.join(root, "apps", "sagebrush-sniper"))
+        from market_service import MarketDataHub
+
+        stats = replay_into_hub(replayer, MarketDataHub(fetcher=replay_fetcher(replayer), tape=False),
+                                args.interval)
+        print(f"🎯 signal engine: {stats['merges']} merges, {stats['changes']} changes")
+    elif args.target == "oracle":
+        sys.path.insert(0, os.path.join(root, "oracle"))
+        from Oracle import CryptoBoxingOracle
+
+        oracle = CryptoBoxingOracle(client=ReplayPythClient(replayer), solana_client=OfflineRpc())
+        frames = 0
+        while not replayer.done:
+            asyncio.run(oracle.get_crypto_data())
+            frames += 1
+        print(f"🥊 oracle: {frames} captures served")
+    elif args.target == "game":
+        from SOL_GAME import game_loop
+
+        rounds: List[Dict] = []
+        frames = game_loop(fetch=replay_fetch(replayer), sleep=replayer.clock.sleep, headless=True,
+                           on_round=rounds.append)
+        knockouts = sum(r["knockout"] for r in rounds)
+        print(f"🥊 game: {frames} frames, {len(rounds)} rounds ({knockouts} by knockout)")
+    wall = time.perf_counter() - started
+    virtual = (replayer.clock.now_ns - int(replayer.records["ts"][0])) / 1e9 if len(replayer.records) else 0
+    print(f"⏱️ {virtual:.1f}s of tape in {wall:.2f}s wall ({virtual / wall if wall else 0:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
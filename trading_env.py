@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+🏋️ WyoVerse Trading Gym - Where evolved strategies earn their spurs
+Thousands of gym-style trading environments stepping in lockstep over real bars
+
+    market = build_market(fetched_bars(["BTC-USD", "ETH-USD"], "730d", "1h"))
+    env = VecTradingEnv(market, n_envs=4096)
+    obs = env.reset()                                  # (4096, OBS_DIM) float32
+    obs, reward, done, info = env.step(actions)        # actions in {0 flat, 1 long, 2 short}
+
+    python trading_env.py build --source checkpoint --checkpoint market.ckpt --out market.env
+    python trading_env.py bench --envs 4096 --steps 2000 --workers 4
+    python trading_env.py evaluate --policy signal
+    python trading_env.py train --generations 30 --population 64 --out policy.npy
+
+Observations are the Sniper's indicators (``calculate_indicators``) and rule
+firings (``signals.rule_masks``), normalized and precomputed per symbol once.
+The agent's position, open-trade P&L and holding time are appended. Each
+step gathers one row per env and rewards it with ``calculate_rewards``,
+the batched form of ``pro.monitor``'s ``calculate_reward``:
+
+    profit   this bar's P&L on the position, in percent, after fees
+    risk     |position| × the symbol's EW volatility (percent per bar)
+    speed    bars a trade was held, counted when it closes (1/speed = 0 otherwise)
+
+Finished episodes reset in place, so ``step`` never stalls the batch. A market
+is saved as a checkpoint (``checkpoint.py``). Process-pool shards map it
+instead of unpickling it.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from checkpoint import load_checkpoint, write_checkpoint
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pro.monitor's calculate_reward weights
+PROFIT_WEIGHT = 0.7
+RISK_WEIGHT = 0.2
+SPEED_WEIGHT = 0.1
+
+POSITIONS = np.array([0.0, 1.0, -1.0], dtype=np.float32)  # action -> flat, long, short
+FLAT, LONG, SHORT = range(3)
+EPISODE_BARS = int(os.getenv("ENV_EPISODE_BARS", "256"))
+FEE_BPS = float(os.getenv("ENV_FEE_BPS", "5"))
+WARMUP_BARS = 50  # SMA_50
+VOL_SPAN = 20
+
+INDICATOR_FEATURES = ("rsi", "macd_hist", "bb_position", "volume_ratio", "sma_trend", "close_vs_sma20", "return")
+RULE_FEATURES = ("rsi_oversold", "lower_bb", "macd_bullish_cross", "volume_confirmation", "golden_cross",
+                 "rsi_overbought", "upper_bb", "macd_bearish_cross", "death_cross")
+AGENT_FEATURES = ("position", "trade_pnl", "held")
+FEATURES = INDICATOR_FEATURES + RULE_FEATURES
+OBS_DIM = len(FEATURES) + len(AGENT_FEATURES)
+MARKET_SCHEMA = 1
+
+
+def calculate_rewards(profit: np.ndarray, risk: np.ndarray, speed: np.ndarray,
+                      scale: Union[float, np.ndarray] = 1.0) -> np.ndarray:
+    """``calculate_reward`` over arrays; ``speed`` is ``inf`` where no trade completed"""
+    return (PROFIT_WEIGHT * profit - RISK_WEIGHT * risk + SPEED_WEIGHT * np.reciprocal(speed)) * scale
+
+
+class RewardScaler:
+    """📏 ``adaptive_scaling_factor``: 1 / running std of the batch's raw rewards"""
+
+    def __init__(self, alpha: float = 0.01, eps: float = 1e-8):
+        self.alpha = alpha
+        self.eps = eps
+        self.var = 1.0
+        self.primed = False
+
+    def update(self, rewards: np.ndarray) -> float:
+        var = float(rewards.var())
+        self.var = var if not self.primed else (1 - self.alpha) * self.var + self.alpha * var
+        self.primed = True
+        return 1.0 / np.sqrt(self.var + self.eps)
+
+
+# ---------------------------------------------------------------- market data
+
+class Market:
+    """📚 Precomputed per-symbol observations, returns and volatility, padded to one length"""
+
+    def __init__(self, symbols: Sequence[str], features: np.ndarray, returns: np.ndarray,
+                 vol: np.ndarray, lengths: np.ndarray, interval: str = "1h", path: Optional[str] = None):
+        self.symbols = list(symbols)
+        self.features = features    # (symbols, bars, len(FEATURES)) float32
+        self.returns = returns      # (symbols, bars) percent log return into each bar
+        self.vol = vol              # (symbols, bars) EW std of returns, percent
+        self.lengths = lengths      # (symbols,) real bars per symbol
+        self.interval = interval
+        self.path = path
+
+    def save(self, path: str) -> str:
+        write_checkpoint(path, {"features": self.features, "returns": self.returns, "vol": self.vol,
+                                "lengths": self.lengths},
+                         meta={"schema": MARKET_SCHEMA, "symbols": self.symbols, "features": list(FEATURES),
+                               "interval": self.interval})
+        self.path = path
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "Market":
+        ckpt = load_checkpoint(path)
+        if ckpt is None or ckpt.meta.get("schema") != MARKET_SCHEMA or ckpt.meta.get("features") != list(FEATURES):
+            raise ValueError(f"{path} is not a market file for this build (python trading_env.py build)")
+        return cls(ckpt.meta["symbols"], ckpt["features"], ckpt["returns"], ckpt["vol"], ckpt["lengths"],
+                   ckpt.meta["interval"], path)
+
+
+def _sniper():
+    """The Sniper's modules (indicators, signals, pipeline) import by bare name"""
+    sniper = os.path.join(os.path.dirname(os.path.abspath(__file__)), "apps", "sagebrush-sniper")
+    if sniper not in sys.path:
+        sys.path.insert(0, sniper)
+
+
+def observe(bars) -> Dict[str, np.ndarray]:
+    """One symbol's OHLCV frame -> ``features``, ``returns`` and ``vol`` arrays"""
+    _sniper()
+    import pandas as pd
+
+    from indicators import calculate_indicators
+    from signals import rule_masks
+
+    data = calculate_indicators(bars[["Open", "High", "Low", "Close", "Volume"]].astype(float).copy())
+    close = data["Close"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.r_[0.0, np.diff(np.log(close))] * 100
+        band = data["BB_upper"].to_numpy() - data["BB_lower"].to_numpy()
+        columns = [
+            data["RSI"].to_numpy() / 100 - 0.5,
+            (data["MACD"].to_numpy() - data["MACD_signal"].to_numpy()) / close * 100,
+            (close - data["BB_lower"].to_numpy()) / band - 0.5,
+            np.log(np.clip(data["Volume_Ratio"].to_numpy(dtype=float), 0.1, 10)),
+            (data["SMA_20"].to_numpy() / data["SMA_50"].to_numpy() - 1) * 10,
+            (close / data["SMA_20"].to_numpy() - 1) * 10,
+            returns,
+        ]
+    rules = rule_masks(data)
+    columns += [rules[key] for key in RULE_FEATURES]
+    features = np.nan_to_num(np.stack(columns, axis=1).astype(np.float32), nan=0.0, posinf=0.0, neginf=0.0)
+    vol = pd.Series(returns).ewm(span=VOL_SPAN).std().fillna(0.0).to_numpy()
+    return {"features": features, "returns": returns.astype(np.float32), "vol": vol.astype(np.float32)}
+
+
+def build_market(bars: Dict[str, "pd.DataFrame"], interval: str = "1h",
+                 min_bars: int = WARMUP_BARS + EPISODE_BARS + 1) -> Market:
+    """Observations for every symbol with enough history, padded to the longest"""
+    observed = {symbol: observe(frame) for symbol, frame in bars.items() if len(frame) >= min_bars}
+    if not observed:
+        raise ValueError(f"No symbol has the {min_bars} bars an episode needs")
+    symbols = sorted(observed)
+    lengths = np.array([len(observed[s]["returns"]) for s in symbols], dtype=np.int64)
+    size = int(lengths.max())
+    features = np.zeros((len(symbols), size, len(FEATURES)), dtype=np.float32)
+    returns = np.zeros((len(symbols), size), dtype=np.float32)
+    vol = np.zeros((len(symbols), size), dtype=np.float32)
+    for i, symbol in enumerate(symbols):
+        n = lengths[i]
+        features[i, :n], returns[i, :n], vol[i, :n] = (observed[symbol][k] for k in ("features", "returns", "vol"))
+    return Market(symbols, features, returns, vol, lengths, interval)
+
+
+def synthetic_bars(symbols: int, bars: int, seed: int = 0, interval: str = "1h") -> Dict[str, "pd.DataFrame"]:
+    """GBM closes with volatility regimes and lognormal volume, for offline runs"""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2022-01-01", periods=bars, freq=interval.replace("m", "min"), tz="UTC")
+    frames = {}
+    for i in range(symbols):
+        sigma = 0.006 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)).clip(-1, 1))
+        close = 100 * np.exp(np.cumsum(rng.standard_normal(bars) * sigma - 0.5 * sigma ** 2))
+        wick = np.abs(rng.standard_normal(bars)) * sigma * close
+        frames[f"SYN{i:03d}"] = pd.DataFrame({
+            "Open": np.r_[close[0], close[:-1]], "High": close + wick, "Low": close - wick, "Close": close,
+            "Volume": rng.lognormal(10, 0.5, bars),
+        }, index=index)
+    return frames
+
+
+def checkpoint_bars(path: str, interval: str = "1h") -> Dict[str, "pd.DataFrame"]:
+    """The market service's bar store as of its last checkpoint (MARKET_CHECKPOINT)"""
+    from checkpoint import read_frame
+
+    ckpt = load_checkpoint(path)
+    if ckpt is None:
+        raise ValueError(f"No readable checkpoint at {path}")
+    return {info["symbol"]: read_frame(ckpt, f"series/{i}", info["columns"])
+            for i, info in enumerate(ckpt.meta.get("series", [])) if info["interval"] == interval}
+
+
+def fetched_bars(symbols: Sequence[str], period: str, interval: str) -> Dict[str, "pd.DataFrame"]:
+    """History through the Sniper pipeline (market service, else rate-limited yfinance)"""
+    _sniper()
+    from pipeline import fetch_base_bars
+
+    return {symbol: fetch_base_bars(symbol, period, interval) for symbol in symbols}
+
+
+# ---------------------------------------------------------------- environment
+
+class VecTradingEnv:
+    """🏋️ ``n_envs`` single-asset episodes stepped as one batch
+
+    Each env trades one randomly drawn symbol from a random start for
+    ``episode_bars`` bars. ``step`` takes one discrete action per env and
+    returns ``(obs, reward, done, info)``. Done envs are already reset:
+    ``info["terminal_obs"]`` and ``info["episode_return"]`` describe the
+    episodes that just ended (rows where ``done``).
+    """
+
+    def __init__(self, market: Market, n_envs: int, episode_bars: int = EPISODE_BARS,
+                 fee_bps: float = FEE_BPS, seed: int = 0, normalize: bool = False):
+        self.market = market
+        self.n_envs = n_envs
+        self.episode_bars = episode_bars
+        self.fee = fee_bps / 100.0  # percent per unit of position traded
+        self.rng = np.random.default_rng(seed)
+        self.scaler = RewardScaler() if normalize else None
+        usable = market.lengths - WARMUP_BARS - episode_bars
+        if (usable < 1).all():
+            raise ValueError(f"Episodes of {episode_bars} bars don't fit this market's history")
+        self._eligible = np.flatnonzero(usable >= 1)
+        self._usable = usable
+        self.symbol = np.zeros(n_envs, dtype=np.intp)
+        self.t = np.zeros(n_envs, dtype=np.intp)
+        self.end = np.zeros(n_envs, dtype=np.intp)
+        self.position = np.zeros(n_envs, dtype=np.float32)
+        self.trade_pnl = np.zeros(n_envs, dtype=np.float32)
+        self.held = np.zeros(n_envs, dtype=np.float32)
+        self.episode_return = np.zeros(n_envs, dtype=np.float64)
+        self._obs_buf = np.empty((n_envs, OBS_DIM), dtype=np.float32)
+        self.steps = 0
+
+    @property
+    def n_actions(self) -> int:
+        return len(POSITIONS)
+
+    def reset(self) -> np.ndarray:
+        self._reset(np.arange(self.n_envs))
+        return self._obs()
+
+    def _reset(self, rows: np.ndarray):
+        symbol = self._eligible[self.rng.integers(0, len(self._eligible), size=len(rows))]
+        start = WARMUP_BARS + (self.rng.random(len(rows)) * self._usable[symbol]).astype(np.intp)
+        self.symbol[rows] = symbol
+        self.t[rows] = start
+        self.end[rows] = start + self.episode_bars
+        self.position[rows] = 0.0
+        self.trade_pnl[rows] = 0.0
+        self.held[rows] = 0.0
+        self.episode_return[rows] = 0.0
+
+    def _obs(self) -> np.ndarray:
+        obs = self._obs_buf
+        n = len(FEATURES)
+        obs[:, :n] = self.market.features[self.symbol, self.t]
+        obs[:, n] = self.position
+        obs[:, n + 1] = self.trade_pnl
+        obs[:, n + 2] = self.held / self.episode_bars
+        return obs
+
+    def step(self, actions: np.ndarray):
+        target = POSITIONS[actions]
+        traded = target != self.position
+        closed = traded & (self.position != 0)
+        speed = np.where(closed, np.maximum(self.held, 1.0), np.inf)
+
+        self.t += 1
+        bar_return = self.market.returns[self.symbol, self.t]
+        profit = target * bar_return - self.fee * np.abs(target - self.position)
+        risk = np.abs(target) * self.market.vol[self.symbol, self.t]
+        raw = calculate_rewards(profit, risk, speed)
+        reward = raw * self.scaler.update(raw) if self.scaler else raw
+
+        opened = traded & (target != 0)
+        self.trade_pnl = np.where(opened, profit, np.where(target != 0, self.trade_pnl + profit, 0.0))
+        self.held = np.where(traded, 0.0, self.held) + (target != 0)
+        self.position = target
+        self.episode_return += raw
+        self.steps += self.n_envs
+
+        done = self.t >= self.end
+        info: Dict = {"raw_reward": raw}
+        finished = np.flatnonzero(done)
+        if len(finished):
+            info["terminal_obs"] = self._obs()[finished].copy()
+            info["episode_return"] = self.episode_return[finished].copy()
+            self._reset(finished)
+        return self._obs(), reward, done, info
+
+
+# ---------------------------------------------------------------- policies
+
+def random_policy(seed: int = 0) -> Callable[[np.ndarray], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return lambda obs: rng.integers(0, len(POSITIONS), size=len(obs))
+
+
+def signal_policy(obs: np.ndarray) -> np.ndarray:
+    """The Sniper's own call: long on BUY, short on SELL, else flat (``get_recommendation``)"""
+    rules = {key: obs[:, len(INDICATOR_FEATURES) + i] for i, key in enumerate(RULE_FEATURES)}
+    buy = (2 * rules["rsi_oversold"] + 2 * rules["lower_bb"] + 3 * rules["macd_bullish_cross"]
+           + rules["volume_confirmation"] + rules["golden_cross"])
+    sell = 2 * rules["rsi_overbought"] + 2 * rules["upper_bb"] + 3 * rules["macd_bearish_cross"] + rules["death_cross"]
+    return np.select([buy >= 3, sell >= 3], [LONG, SHORT], FLAT)
+
+
+class LinearPolicy:
+    """🧬 A population of linear scorers, ``argmax(obs @ W + b)``; env ``i`` runs member ``i % members``"""
+
+    def __init__(self, weights: np.ndarray):
+        self.weights = np.asarray(weights, dtype=np.float32).reshape(-1, OBS_DIM + 1, len(POSITIONS))
+        self._member: Optional[np.ndarray] = None
+
+    @property
+    def members(self) -> int:
+        return len(self.weights)
+
+    def member_of(self, n_envs: int) -> np.ndarray:
+        return np.arange(n_envs) % self.members
+
+    def __call__(self, obs: np.ndarray) -> np.ndarray:
+        if self._member is None or len(self._member) != len(obs):
+            self._member = self.member_of(len(obs))
+        if self.members == 1:
+            scores = obs @ self.weights[0, :-1] + self.weights[0, -1]
+        else:
+            w = self.weights[self._member]
+            scores = np.einsum("nd,nda->na", obs, w[:, :-1]) + w[:, -1]
+        return scores.argmax(axis=1)
+
+
+# ---------------------------------------------------------------- evaluation
+
+def evaluate(market: Market, policy: Callable[[np.ndarray], np.ndarray], n_envs: int = 4096,
+             steps: int = 1000, seed: int = 0, episode_bars: int = EPISODE_BARS,
+             members: int = 1) -> Dict[str, np.ndarray]:
+    """Run ``policy`` for ``steps`` lockstep steps; reward sums per population member"""
+    env = VecTradingEnv(market, n_envs, episode_bars, seed=seed)
+    member = np.arange(n_envs) % members
+    reward_sum = np.zeros(members)
+    episodes = np.zeros(members)
+    episode_sum = np.zeros(members)
+    obs = env.reset()
+    started = time.perf_counter()
+    for _ in range(steps):
+        obs, _, done, info = env.step(policy(obs))
+        reward_sum += np.bincount(member, weights=info["raw_reward"], minlength=members)
+        if "episode_return" in info:
+            ended = member[done]
+            episodes += np.bincount(ended, minlength=members)
+            episode_sum += np.bincount(ended, weights=info["episode_return"], minlength=members)
+    return {
+        "reward_sum": reward_sum,
+        "env_steps": np.bincount(member, minlength=members) * float(steps),
+        "episodes": episodes,
+        "episode_return_sum": episode_sum,
+        "seconds": np.array([time.perf_counter() - started]),
+    }
+
+
+_MARKETS: Dict[str, Market] = {}
+
+
+def _evaluate_job(job: tuple) -> Dict[str, np.ndarray]:
+    path, policy, n_envs, steps, seed, episode_bars = job
+    if path not in _MARKETS:
+        _MARKETS[path] = Market.load(path)
+    if isinstance(policy, np.ndarray):
+        members = len(policy)
+        return evaluate(_MARKETS[path], LinearPolicy(policy), n_envs, steps, seed, episode_bars, members)
+    run = signal_policy if policy == "signal" else random_policy(seed)
+    return evaluate(_MARKETS[path], run, n_envs, steps, seed, episode_bars)
+
+
+def run_sharded(market: Market, policy: Union[str, np.ndarray], n_envs: int, steps: int,
+                workers: Optional[int] = None, seed: int = 0, episode_bars: int = EPISODE_BARS) -> Dict:
+    """Split envs (or a population's members) over a process pool; each shard maps the market file
+
+    ``policy`` is ``"signal"``, ``"random"`` or linear weights ``(members, OBS_DIM + 1, 3)``.
+    """
+    workers = workers or os.cpu_count() or 1
+    population = isinstance(policy, np.ndarray)
+    if population:
+        policy = LinearPolicy(policy).weights
+        shards = [np.arange(len(policy))[i::workers] for i in range(min(workers, len(policy)))]
+        per_member = max(1, n_envs // len(policy))
+        jobs = [(policy[idx], per_member * len(idx)) for idx in shards]
+    else:
+        shards = []
+        jobs = [(policy, n_envs // workers + (i < n_envs % workers)) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).generate_state(len(jobs))
+
+    started = time.perf_counter()
+    temp = None
+    if workers == 1:
+        path = market.path or ""
+        _MARKETS[path] = market
+        parts = [_evaluate_job((path, p, n, steps, int(s), episode_bars)) for (p, n), s in zip(jobs, seeds)]
+    else:
+        path = market.path
+        if path is None:
+            fd, temp = tempfile.mkstemp(suffix=".env")
+            os.close(fd)
+            path = market.save(temp)
+        try:
+            with ProcessPoolExecutor(workers) as pool:
+                parts = list(pool.map(_evaluate_job, [(path, p, n, steps, int(s), episode_bars)
+                                                      for (p, n), s in zip(jobs, seeds)]))
+        finally:
+            if temp:
+                market.path = None
+                os.unlink(temp)
+    seconds = time.perf_counter() - started
+
+    if population:
+        # Reassemble per-member results in population order
+        totals = {key: np.zeros(len(policy)) for key in ("reward_sum", "env_steps", "episodes", "episode_return_sum")}
+        for idx, part in zip(shards, parts):
+            for key in totals:
+                totals[key][idx] = part[key]
+    else:
+        totals = {key: sum(part[key] for part in parts) for key in
+                  ("reward_sum", "env_steps", "episodes", "episode_return_sum")}
+    totals["seconds"] = seconds
+    totals["workers"] = workers
+    return totals
+
+
+def summarize(totals: Dict) -> Dict:
+    steps = float(np.sum(totals["env_steps"]))
+    episodes = float(np.sum(totals["episodes"]))
+    return {
+        "workers": totals["workers"],
+        "seconds": totals["seconds"],
+        "env_steps": int(steps),
+        "steps_per_minute": steps / totals["seconds"] * 60 if totals["seconds"] else 0.0,
+        "mean_reward": float(np.sum(totals["reward_sum"]) / steps) if steps else 0.0,
+        "episodes": int(episodes),
+        "mean_episode_return": float(np.sum(totals["episode_return_sum"]) / episodes) if episodes else 0.0,
+    }
+
+
+def evolve(market: Market, generations: int = 20, population: int = 64, envs_per_member: int = 64,
+           steps: int = 512, elite: float = 0.2, workers: Optional[int] = 1, seed: int = 0,
+           log: Callable[[str], None] = print) -> np.ndarray:
+    """Cross-entropy search over linear policies; returns the final mean weights ``(OBS_DIM + 1, 3)``"""
+    rng = np.random.default_rng(seed)
+    shape = (OBS_DIM + 1, len(POSITIONS))
+    mean, std = np.zeros(shape), np.ones(shape)
+    keep = max(2, int(population * elite))
+    for generation in range(generations):
+        weights = mean + std * rng.standard_normal((population,) + shape)
+        totals = run_sharded(market, weights, envs_per_member * population, steps, workers,
+                             seed=int(rng.integers(2 ** 31)))
+        fitness = totals["reward_sum"] / np.maximum(totals["env_steps"], 1)
+        best = np.argsort(fitness)[-keep:]
+        mean, std = weights[best].mean(axis=0), weights[best].std(axis=0) + 0.02
+        log(f"🧬 gen {generation:3d}  best {fitness[best[-1]]:+.4f}  elite {fitness[best].mean():+.4f}  "
+            f"pop {fitness.mean():+.4f}  ({totals['seconds']:.1f}s)")
+    return mean
+
+
+# ---------------------------------------------------------------- CLI
+
+def _market(args) -> Market:
+    if args.market:
+        return Market.load(args.market)
+    return build_market(synthetic_bars(args.symbols, args.bars, args.seed), "1h")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="🏋️ Vectorized trading environments")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="precompute observations into a market file")
+    build.add_argument("--source", choices=("synthetic", "checkpoint", "fetch"), default="synthetic")
+    build.add_argument("--checkpoint", default=os.getenv("MARKET_CHECKPOINT"), help="market service checkpoint")
+    build.add_argument("--symbols", default="BTC-USD,ETH-USD,SOL-USD", help="for --source fetch")
+    build.add_argument("--period", default="730d")
+    build.add_argument("--interval", default="1h")
+    build.add_argument("--synthetic-symbols", type=int, default=50)
+    build.add_argument("--bars", type=int, default=20000)
+    build.add_argument("--seed", type=int, default=0)
+    build.add_argument("--out", required=True)
+
+    for name, help_text in (("bench", "lockstep throughput"), ("evaluate", "score a policy"),
+                            ("train", "evolve a linear policy")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--market", help="market file (default: synthetic, built on the fly)")
+        cmd.add_argument("--symbols", type=int, default=20, help="synthetic symbols without --market")
+        cmd.add_argument("--bars", type=int, default=5000, help="synthetic bars without --market")
+        cmd.add_argument("--workers", type=int, default=1)
+        cmd.add_argument("--seed", type=int, default=0)
+        cmd.add_argument("--json", action="store_true")
+        if name in ("bench", "evaluate"):
+            cmd.add_argument("--envs", type=int, default=4096)
+            cmd.add_argument("--steps", type=int, default=1000)
+            cmd.add_argument("--policy", default="random", help="signal, random or a .npy from train")
+        else:
+            cmd.add_argument("--generations", type=int, default=20)
+            cmd.add_argument("--population", type=int, default=64)
+            cmd.add_argument("--envs-per-member", type=int, default=64)
+            cmd.add_argument("--steps", type=int, default=512)
+            cmd.add_argument("--out", default="policy.npy")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if args.source == "checkpoint":
+            if not args.checkpoint:
+                parser.error("--source checkpoint needs --checkpoint or MARKET_CHECKPOINT")
+            bars = checkpoint_bars(args.checkpoint, args.interval)
+        elif args.source == "fetch":
+            bars = fetched_bars([s for s in args.symbols.split(",") if s], args.period, args.interval)
+        else:
+            bars = synthetic_bars(args.synthetic_symbols, args.bars, args.seed, args.interval)
+        market = build_market(bars, args.interval)
+        market.save(args.out)
+        print(f"📚 {args.out}: {len(market.symbols)} symbols, {int(market.lengths.sum()):,} bars, "
+              f"{os.path.getsize(args.out) / 1e6:.1f} MB")
+        return
+
+    market = _market(args)
+    if args.command == "train":
+        weights = evolve(market, args.generations, args.population, args.envs_per_member, args.steps,
+                         workers=args.workers, seed=args.seed)
+        np.save(args.out, weights)
+        print(f"💾 {args.out}")
+        return
+
+    policy: Union[str, np.ndarray] = args.policy if args.policy in ("signal", "random") else np.load(args.policy)
+    if isinstance(policy, np.ndarray):
+        policy = policy[None]
+    summary = summarize(run_sharded(market, policy, args.envs, args.steps, args.workers, args.seed))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"🏋️ {summary['env_steps']:,} env steps on {summary['workers']} worker(s) in {summary['seconds']:.2f}s "
+          f"= {summary['steps_per_minute'] / 1e6:,.1f}M steps/min")
+    print(f"   mean reward {summary['mean_reward']:+.4f}  episodes {summary['episodes']:,}  "
+          f"mean episode return {summary['mean_episode_return']:+.2f}")
+
+
+if __name__ == "__main__":
+    main()
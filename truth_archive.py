@@ -0,0 +1,432 @@
+"""
+🔐 Truth Archive - Append-only, Merkle-indexed ground truth
+Stone by stone, commit by commit
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import struct
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+HASH_SIZE = 32
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+_OFFSET = struct.Struct("<Q")
+_TIME = struct.Struct("<q")
+_INDEX = struct.Struct("<qQ")
+MAX_TYPE_BYTES = 120  # hex-encoded into an index file name
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha3_256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha3_256(NODE_PREFIX + left + right).digest()
+
+
+def _largest_power_of_two_below(n: int) -> int:
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+def verify_inclusion(leaf: bytes, index: int, size: int, proof: List[bytes], root: bytes) -> bool:
+    """✅ Check an RFC 6962-style audit path without touching the archive"""
+    if index >= size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+class _FixedRecords:
+    """Append-only file of fixed-size records with positional reads"""
+
+    def __init__(self, path: str, record_size: int):
+        self.path = path
+        self.record_size = record_size
+        self.file = open(path, "a+b")
+        self.fd = self.file.fileno()
+        self._buffer = bytearray()
+        self.count = os.fstat(self.fd).st_size // record_size
+
+    def truncate(self, count: int):
+        self.flush()
+        os.ftruncate(self.fd, count * self.record_size)
+        self.count = count
+
+    def append(self, record: bytes):
+        self._buffer += record
+        self.count += 1
+
+    def flush(self):
+        if self._buffer:
+            self.file.write(self._buffer)
+            self.file.flush()
+            self._buffer.clear()
+
+    def read(self, i: int) -> bytes:
+        size = self.record_size
+        on_disk = self.count - len(self._buffer) // size
+        if i >= on_disk:
+            start = (i - on_disk) * size
+            return bytes(self._buffer[start:start + size])
+        return os.pread(self.fd, size, i * size)
+
+    def read_range(self, start: int, stop: int) -> bytes:
+        self.flush()
+        return os.pread(self.fd, (stop - start) * self.record_size, start * self.record_size)
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class _TimeView:
+    """Sequence view over an int64 column so ``bisect`` can search it on disk"""
+
+    def __init__(self, records: _FixedRecords, unpack, key: int = 0):
+        self.records = records
+        self.unpack = unpack
+        self.key = key
+
+    def __len__(self):
+        return self.records.count
+
+    def __getitem__(self, i):
+        return self.unpack(self.records.read(i))[self.key]
+
+
+class TruthArchiver:
+    """🏛️ Append-only segment archive with a Merkle tree and type/time indexes
+
+    Entries are canonical JSON lines in fixed-capacity segment files. Every
+    complete Merkle subtree is stored once (``level_<k>.bin``), so appends are
+    amortized O(1), inclusion proofs are O(log n) stored-node reads and the
+    root never needs a full rehash. ``verify()`` only rechecks entries added
+    since the last verified checkpoint.
+    """
+
+    def __init__(self, path: str = "wyoming_truth", segment_size: int = 1 << 20):
+        self.path = path
+        self.segment_size = segment_size
+        os.makedirs(os.path.join(path, "index"), exist_ok=True)
+        self._offsets = _FixedRecords(os.path.join(path, "offsets.bin"), _OFFSET.size)
+        self._times = _FixedRecords(os.path.join(path, "times.bin"), _TIME.size)
+        self._levels: List[_FixedRecords] = []
+        self._type_index: Dict[str, _FixedRecords] = {}
+        self._segment = None
+        self._segment_id = -1
+        self._recover()
+
+    # ------------------------------------------------------------------ storage
+
+    def _level(self, k: int) -> _FixedRecords:
+        while len(self._levels) <= k:
+            name = os.path.join(self.path, f"level_{len(self._levels)}.bin")
+            self._levels.append(_FixedRecords(name, HASH_SIZE))
+        return self._levels[k]
+
+    def _segment_path(self, segment_id: int) -> str:
+        return os.path.join(self.path, f"segment_{segment_id:06d}.log")
+
+    def _index_for(self, entry_type: str) -> _FixedRecords:
+        records = self._type_index.get(entry_type)
+        if records is None:
+            name = os.path.join(self.path, "index", f"{entry_type.encode().hex()}.idx")
+            records = _FixedRecords(name, _INDEX.size)
+            self._type_index[entry_type] = records
+        return records
+
+    def _recover(self):
+        """Trim any half-written tail so every file agrees on the entry count
+
+        The entry count comes from offsets, times and leaves; interior Merkle
+        levels are cut back or recomputed to match it.
+        """
+        level = 0
+        while os.path.exists(os.path.join(self.path, f"level_{level}.bin")):
+            self._level(level)
+            level += 1
+        leaves = self._level(0)
+        size = min(self._offsets.count, self._times.count, leaves.count)
+        self._truncate_to(size)
+
+        index_dir = os.path.join(self.path, "index")
+        for name in os.listdir(index_dir):
+            if name.endswith(".idx"):
+                records = _FixedRecords(os.path.join(index_dir, name), _INDEX.size)
+                keep = records.count
+                while keep and _INDEX.unpack(records.read(keep - 1))[1] >= size:
+                    keep -= 1
+                records.truncate(keep)
+                self._type_index[bytes.fromhex(name[:-len(".idx")]).decode()] = records
+
+        self._frontier: List[Optional[bytes]] = []
+        for k, records in enumerate(self._levels):
+            self._frontier.append(records.read(records.count - 1) if records.count & 1 else None)
+
+    def _truncate_to(self, size: int):
+        self._offsets.truncate(size)
+        self._times.truncate(size)
+        self._level(0).truncate(size)
+        k = 1
+        while k < len(self._levels) or size >> k:
+            # A torn flush can leave an interior level short; rebuild it from below
+            below, records = self._level(k - 1), self._level(k)
+            records.truncate(min(records.count, size >> k))
+            for j in range(records.count, size >> k):
+                records.append(node_hash(below.read(2 * j), below.read(2 * j + 1)))
+            records.flush()
+            k += 1
+        if size == 0:
+            end_segment, end = 0, 0
+        else:
+            last = size - 1
+            end_segment = last // self.segment_size
+            start = _OFFSET.unpack(self._offsets.read(last))[0]
+            with open(self._segment_path(end_segment), "rb") as f:
+                f.seek(start)
+                end = start + len(f.readline())
+        path = self._segment_path(end_segment)
+        if os.path.exists(path):
+            os.truncate(path, end)
+        stale = end_segment + 1
+        while os.path.exists(self._segment_path(stale)):
+            os.unlink(self._segment_path(stale))
+            stale += 1
+
+    def _open_segment(self, segment_id: int):
+        if segment_id != self._segment_id:
+            if self._segment is not None:
+                self._segment.close()
+            self._segment = open(self._segment_path(segment_id), "ab")
+            self._segment_id = segment_id
+
+    def _read_raw(self, index: int) -> bytes:
+        segment_id = index // self.segment_size
+        if segment_id == self._segment_id:
+            self._segment.flush()
+        offset = _OFFSET.unpack(self._offsets.read(index))[0]
+        with open(self._segment_path(segment_id), "rb") as f:
+            f.seek(offset)
+            return f.readline().rstrip(b"\n")
+
+    # ------------------------------------------------------------------- append
+
+    def __len__(self) -> int:
+        return self._offsets.count
+
+    def _push_node(self, level: int, digest: bytes):
+        while True:
+            self._level(level).append(digest)
+            if len(self._frontier) <= level:
+                self._frontier.append(None)
+            left = self._frontier[level]
+            if left is None:
+                self._frontier[level] = digest
+                return
+            self._frontier[level] = None
+            digest = node_hash(left, digest)
+            level += 1
+
+    def add_entries(self, entries: List[Dict]) -> List[int]:
+        """📦 Append a batch of entries, hashing and flushing them together
+
+        The whole batch is checked (and serialized) before anything is
+        written: an entry without a usable ``entry_type`` raises ``ValueError``,
+        one that won't serialize ``TypeError``, and nothing is appended.
+        """
+        for i, entry in enumerate(entries):
+            entry_type = entry.get("entry_type") if isinstance(entry, dict) else None
+            if not isinstance(entry_type, str) or not entry_type or len(entry_type.encode()) > MAX_TYPE_BYTES:
+                raise ValueError(f"Entry {i} needs an entry_type string of 1-{MAX_TYPE_BYTES} bytes")
+        first = len(self)
+        last_ns = _TIME.unpack(self._times.read(first - 1))[0] if first else 0
+        payloads = []
+        for entry in entries:
+            now_ns = int(datetime.now(timezone.utc).timestamp() * 1e9)
+            last_ns = max(last_ns, now_ns)
+            record = dict(entry)
+            record.setdefault("timestamp", datetime.fromtimestamp(last_ns / 1e9, timezone.utc).isoformat())
+            payloads.append((last_ns, record, json.dumps(record, sort_keys=True, separators=(",", ":")).encode()))
+
+        digests = [leaf_hash(data) for _, _, data in payloads]
+        indexes = [self._index_for(record["entry_type"]) for _, record, _ in payloads]
+        for i, ((ts_ns, record, data), digest, type_index) in enumerate(zip(payloads, digests, indexes)):
+            index = first + i
+            self._open_segment(index // self.segment_size)
+            self._offsets.append(_OFFSET.pack(self._segment.tell()))
+            self._segment.write(data + b"\n")
+            self._times.append(_TIME.pack(ts_ns))
+            type_index.append(_INDEX.pack(ts_ns, index))
+            self._push_node(0, digest)
+        self.flush()
+        return list(range(first, first + len(payloads)))
+
+    def add_entry(self, entry_type: str, description: str, proof: str = "", **fields) -> int:
+        """Append one entry (same call shape the tracker already uses)"""
+        entry = {"entry_type": entry_type, "description": description, "proof": proof}
+        entry.update(fields)
+        return self.add_entries([entry])[0]
+
+    def generate_verified_file(self, filename: str, content: str) -> Dict:
+        """Wyoming-grade verified file output"""
+        file_hash = hashlib.sha3_256(content.encode()).hexdigest()
+        index = self.add_entry("artifact", f"Generated {filename}", proof=file_hash)
+        return {
+            "filename": filename,
+            "content": content,
+            "hash": file_hash,
+            "archive_index": index
+        }
+
+    def flush(self):
+        if self._segment is not None:
+            self._segment.flush()
+        # Leaves and nodes land after the data they commit to
+        for records in [self._offsets, self._times, *self._type_index.values(), *self._levels]:
+            records.flush()
+
+    def close(self):
+        self.flush()
+        if self._segment is not None:
+            self._segment.close()
+        for records in [self._offsets, self._times, *self._type_index.values(), *self._levels]:
+            records.close()
+
+    # -------------------------------------------------------------- merkle tree
+
+    def _subtree_root(self, start: int, stop: int) -> bytes:
+        """MTH(D[start:stop]) using stored complete subtrees (start is aligned)"""
+        n = stop - start
+        if n & (n - 1) == 0:
+            level = n.bit_length() - 1
+            return self._level(level).read(start >> level)
+        k = _largest_power_of_two_below(n)
+        return node_hash(self._subtree_root(start, start + k), self._subtree_root(start + k, stop))
+
+    def root(self, size: Optional[int] = None) -> bytes:
+        size = len(self) if size is None else size
+        if size == 0:
+            return hashlib.sha3_256(b"").digest()
+        return self._subtree_root(0, size)
+
+    def leaf(self, index: int) -> bytes:
+        return self._level(0).read(index)
+
+    def inclusion_proof(self, index: int, size: Optional[int] = None) -> List[bytes]:
+        """🧾 Audit path for ``index`` in the tree of ``size`` entries"""
+        size = len(self) if size is None else size
+        if not 0 <= index < size:
+            raise IndexError(f"entry {index} not in tree of size {size}")
+        path = []
+        start, stop = 0, size
+        while stop - start > 1:
+            k = _largest_power_of_two_below(stop - start)
+            if index < start + k:
+                path.append(self._subtree_root(start + k, stop))
+                stop = start + k
+            else:
+                path.append(self._subtree_root(start, start + k))
+                start += k
+        path.reverse()
+        return path
+
+    # ------------------------------------------------------------ verification
+
+    def _checkpoint_path(self) -> str:
+        return os.path.join(self.path, "checkpoint.json")
+
+    def verify(self, full: bool = False) -> Dict:
+        """🔍 Verify entries added since the last checkpoint (or everything)
+
+        The old root is recomputed from stored nodes in O(log n), then only
+        the new tail is rehashed and its interior nodes rechecked.
+        """
+        self.flush()
+        checkpoint = {"size": 0, "root": None}
+        if not full and os.path.exists(self._checkpoint_path()):
+            with open(self._checkpoint_path()) as f:
+                checkpoint = json.load(f)
+        old_size, size = checkpoint["size"], len(self)
+        if old_size > size:
+            return {"ok": False, "error": f"archive shrank from {old_size} to {size}"}
+        if old_size and self.root(old_size).hex() != checkpoint["root"]:
+            return {"ok": False, "error": "prefix root mismatch"}
+
+        for index in range(old_size, size):
+            if leaf_hash(self._read_raw(index)) != self.leaf(index):
+                return {"ok": False, "error": f"entry {index} does not match its leaf hash"}
+
+        level = 1
+        while (size >> level) > 0:
+            below, here = self._level(level - 1), self._level(level)
+            first = old_size >> level
+            children = below.read_range(2 * first, 2 * (size >> level))
+            for j in range(first, size >> level):
+                o = (j - first) * 2 * HASH_SIZE
+                if node_hash(children[o:o + HASH_SIZE], children[o + HASH_SIZE:o + 2 * HASH_SIZE]) != here.read(j):
+                    return {"ok": False, "error": f"node {level}/{j} mismatch"}
+            level += 1
+
+        root = self.root(size).hex()
+        with open(self._checkpoint_path() + ".part", "w") as f:
+            json.dump({"size": size, "root": root}, f)
+        os.replace(self._checkpoint_path() + ".part", self._checkpoint_path())
+        return {"ok": True, "size": size, "verified": size - old_size, "root": root}
+
+    # ----------------------------------------------------------------- queries
+
+    def get(self, index: int) -> Dict:
+        return json.loads(self._read_raw(index))
+
+    def _time_bounds(self, records: _FixedRecords, unpack, since_ns: Optional[int],
+                     until_ns: Optional[int]) -> Tuple[int, int]:
+        view = _TimeView(records, unpack)
+        lo = bisect.bisect_left(view, since_ns) if since_ns is not None else 0
+        hi = bisect.bisect_right(view, until_ns) if until_ns is not None else records.count
+        return lo, hi
+
+    def scan(self, entry_type: Optional[str] = None, since: Optional[datetime] = None,
+             until: Optional[datetime] = None) -> Iterator[Tuple[int, Dict]]:
+        """🔎 Yield ``(index, entry)`` for one type and/or time window only"""
+        self.flush()
+        since_ns = int(since.timestamp() * 1e9) if since else None
+        until_ns = int(until.timestamp() * 1e9) if until else None
+        if entry_type is None:
+            lo, hi = self._time_bounds(self._times, _TIME.unpack, since_ns, until_ns)
+            for index in range(lo, hi):
+                yield index, self.get(index)
+            return
+        records = self._type_index.get(entry_type)
+        if records is None:
+            return
+        lo, hi = self._time_bounds(records, _INDEX.unpack, since_ns, until_ns)
+        for i in range(lo, hi):
+            index = _INDEX.unpack(records.read(i))[1]
+            yield index, self.get(index)
+
+    def generate_report(self) -> Dict:
+        """Summary in the shape the tracker's final report expects"""
+        self.flush()
+        return {
+            "entries": len(self),
+            "verification_chain": [self.leaf(i).hex() for i in range(max(0, len(self) - 100), len(self))],
+            "ground_truth": self.root().hex(),
+            "types": {t: records.count for t, records in self._type_index.items()}
+        }
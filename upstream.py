@@ -0,0 +1,280 @@
+"""
+🚦 WyoVerse Upstream Coordinator - One rider to the trading post, not a stampede
+Single-flight coalescing, per-provider rate limits, priorities and backoff
+
+    from upstream import UPSTREAM, background, yfinance_history
+
+    bars = yfinance_history("BTC-USD", "30d", "1h")          # interactive by default
+
+    with background():                                      # pollers and batch scans
+        UPSTREAM.call("yfinance", ("history", symbol, period, interval), fetch)
+
+Identical calls already in flight share one upstream request, and every caller
+gets the same result object back, so treat it as read-only. Each provider has
+a token bucket (``UPSTREAM_LIMITS="yfinance=2:5,coingecko=0.5:3"`` is rate per
+second : burst). While a bucket is dry, interactive callers go first and then
+arrival order; a background fetch that an interactive caller joins is bumped
+to interactive. Failures retry with full-jitter exponential backoff, and every
+attempt pays for its own token.
+
+Limits are per process. The market service is the one process that should
+talk to upstream on behalf of everybody else.
+"""
+
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Type
+
+from stage_metrics import METRICS, stage
+
+INTERACTIVE, BACKGROUND = 0, 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+DEFAULT_LIMIT = (2.0, 5.0)
+UPSTREAM_LIMITS = os.getenv("UPSTREAM_LIMITS", "yfinance=2:5")
+UPSTREAM_ATTEMPTS = int(os.getenv("UPSTREAM_ATTEMPTS", "3"))
+BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_SECONDS", "0.5"))
+BACKOFF_CAP = float(os.getenv("UPSTREAM_BACKOFF_CAP_SECONDS", "8"))
+
+logger = logging.getLogger(__name__)
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("upstream_priority", default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def background():
+    """🐢 Mark upstream calls made inside (and in ``asyncio.to_thread``) as background"""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """``"yfinance=2:5,coinbase=10"`` -> ``{"yfinance": (2.0, 5.0), "coinbase": (10.0, 10.0)}``"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[name.strip()] = _checked_limit(name.strip(), float(rate), float(burst or rate))
+    return limits
+
+
+def _checked_limit(provider: str, rate: float, burst: float) -> Tuple[float, float]:
+    # A zero rate would never refill (and divides by zero while waiting)
+    if not rate > 0 or not burst > 0:
+        raise ValueError(f"Upstream limit for {provider!r} must be positive, got {rate:g}:{burst:g}")
+    return rate, burst
+
+
+class Ticket:
+    """A caller's place in a bucket's queue; ``priority`` can be raised while waiting"""
+
+    __slots__ = ("priority", "entry")
+
+    def __init__(self, priority: int = INTERACTIVE):
+        self.priority = priority
+        self.entry: Optional[List] = None
+
+
+class TokenBucket:
+    """🪣 ``rate`` tokens per second up to ``burst``, handed out by priority then arrival"""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.clock = clock
+        self.updated = clock()
+        self._queue: List[List] = []  # heap of [priority, seq, ticket]
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, ticket: Optional[Ticket] = None, timeout: Optional[float] = None) -> float:
+        """Block until the head of the queue is us and a token is free; return seconds waited"""
+        ticket = ticket or Ticket(current_priority())
+        started = time.monotonic()
+        with self._cond:
+            entry = ticket.entry = [ticket.priority, next(self._seq), ticket]
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    self._refill()
+                    head = self._queue[0] is entry
+                    if head and self.tokens >= 1:
+                        self.tokens -= 1
+                        return time.monotonic() - started
+                    # Only the head sleeps on the refill clock; the rest wait their turn
+                    wait = (1 - self.tokens) / self.rate if head else None
+                    if timeout is not None:
+                        remaining = started + timeout - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError("upstream rate limit wait timed out")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                ticket.entry = None
+                self._cond.notify_all()
+
+    def boost(self, ticket: Ticket, priority: int):
+        """Move a queued ticket up to ``priority`` (lower is sooner)"""
+        with self._cond:
+            if priority >= ticket.priority:
+                return
+            ticket.priority = priority
+            if ticket.entry is not None:
+                ticket.entry[0] = priority
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def queued(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+
+class _Flight(Ticket):
+    """One upstream call in progress and everyone waiting on it"""
+
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self, priority: int):
+        super().__init__(priority)
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class UpstreamCoordinator:
+    """🎯 Shared front door for every upstream market-data call in the process"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 attempts: int = UPSTREAM_ATTEMPTS, backoff_base: float = BACKOFF_BASE,
+                 backoff_cap: float = BACKOFF_CAP,
+                 retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+                 sleep: Callable[[float], None] = time.sleep):
+        self.limits = dict(parse_limits(UPSTREAM_LIMITS) if limits is None else limits)
+        self.attempts = max(1, attempts)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_on = retry_on
+        self.sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._flights: Dict[Tuple[str, Hashable], _Flight] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, provider: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(provider)
+            if bucket is None:
+                bucket = self._buckets[provider] = TokenBucket(*self.limits.get(provider, DEFAULT_LIMIT))
+            return bucket
+
+    def configure(self, provider: str, rate: float, burst: Optional[float] = None):
+        """Set (or replace) a provider's limit at runtime"""
+        limit = _checked_limit(provider, rate, burst if burst is not None else rate)
+        with self._lock:
+            self.limits[provider] = limit
+            self._buckets.pop(provider, None)
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in ``[0, min(cap, base * 2**attempt))``"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def call(self, provider: str, key: Hashable, fn: Callable[..., Any], *args,
+             priority: Optional[int] = None, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` once for everyone asking for ``(provider, key)`` right now
+
+        ``timeout`` bounds how long this caller waits, for a token or for the
+        call it joined (``TimeoutError``); a running upstream call is not cut short.
+        """
+        priority = current_priority() if priority is None else priority
+        deadline = None if timeout is None else time.monotonic() + timeout
+        flight_key = (provider, key)
+        with self._lock:
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = _Flight(priority)
+            else:
+                flight.followers += 1
+
+        if not leader:
+            METRICS.inc("upstream_coalesced_total", provider=provider)
+            self.bucket(provider).boost(flight, priority)
+            if not flight.done.wait(timeout):
+                raise TimeoutError(f"upstream {provider} call still running after {timeout:g}s")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._attempt(provider, flight, fn, args, kwargs, deadline)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[flight_key]
+            flight.done.set()
+
+    def _attempt(self, provider: str, flight: _Flight, fn: Callable[..., Any],
+                 args: tuple, kwargs: dict, deadline: Optional[float] = None) -> Any:
+        bucket = self.bucket(provider)
+        for attempt in range(self.attempts):
+            waited = bucket.acquire(flight, None if deadline is None else deadline - time.monotonic())
+            if METRICS.enabled:
+                METRICS.observe(f"upstream_wait_{provider}", waited)
+            try:
+                result = fn(*args, **kwargs)
+            except self.retry_on as e:
+                if attempt == self.attempts - 1:
+                    METRICS.inc("upstream_calls_total", provider=provider, outcome="error",
+                                priority=PRIORITY_NAMES.get(flight.priority, flight.priority))
+                    raise
+                delay = self.backoff(attempt)
+                METRICS.inc("upstream_retries_total", provider=provider)
+                logger.warning("🚦 %s call failed (%s), retry %d in %.2fs", provider, e, attempt + 1, delay)
+                self.sleep(delay)
+                continue
+            METRICS.inc("upstream_calls_total", provider=provider, outcome="ok",
+                        priority=PRIORITY_NAMES.get(flight.priority, flight.priority))
+            return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+UPSTREAM = UpstreamCoordinator()
+
+
+def yfinance_history(symbol: str, period: str, interval: str,
+                     coordinator: Optional[UpstreamCoordinator] = None):
+    """📈 ``yf.Ticker(symbol).history(...)`` through the coordinator"""
+    def fetch():
+        with stage("yfinance_fetch"):
+            import yfinance as yf
+
+            return yf.Ticker(symbol).history(period=period, interval=interval)
+
+    return (coordinator or UPSTREAM).call("yfinance", ("history", symbol, period, interval), fetch)